@@ -1,7 +1,11 @@
 """アプリケーションのエントリポイント。
 
 二重起動防止（共有メモリ）とインスタンス間通信（ローカルソケット）を行い、
-最初のインスタンスのみ ``ImageViewer`` を起動する。
+最初のインスタンスのみ :func:`~hiyoko_viewer.gui.run_viewer` で ``ImageViewer`` を起動する。
+
+ファイルマネージャで複数のファイルを選んで開くと、ファイルごとにプロセスが起動する。
+2 番目以降のインスタンスはパスを渡してすぐ終わるだけなので、ここでは QtCore/QtNetwork
+しか読み込まず、ウィジェットやミックスイン、画像処理の依存は import しない。
 """
 
 from __future__ import annotations
@@ -9,15 +13,12 @@ from __future__ import annotations
 import logging
 import os
 import sys
-from pathlib import Path
 
 from PyQt6.QtCore import QSharedMemory
-from PyQt6.QtGui import QIcon
-from PyQt6.QtNetwork import QLocalServer, QLocalSocket
-from PyQt6.QtWidgets import QApplication
+from PyQt6.QtNetwork import QLocalSocket
 
-from .core.resources import resource_path
-from .ui.main_window import ImageViewer
+from .config.constants import IPC_CONNECT_TIMEOUT_MS, IPC_WRITE_TIMEOUT_MS
+from .core.ipc_protocol import encode_message
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +32,12 @@ def setup_logging() -> None:
     %LOCALAPPDATA%\\HiyokoViewer\\logs\\hiyoko-viewer.log（取得できなければ %TEMP%）。
     """
     base_dir = os.environ.get("LOCALAPPDATA") or os.environ.get("TEMP") or "."
-    log_dir = Path(base_dir) / "HiyokoViewer" / "logs"
+    # 2 番目以降のインスタンスも通るので、pathlib は読み込まずに os.path で組み立てる
+    log_dir = os.path.join(base_dir, "HiyokoViewer", "logs")
     try:
-        log_dir.mkdir(parents=True, exist_ok=True)
+        os.makedirs(log_dir, exist_ok=True)
         logging.basicConfig(
-            filename=str(log_dir / "hiyoko-viewer.log"),
+            filename=os.path.join(log_dir, "hiyoko-viewer.log"),
             level=logging.INFO,
             format="%(asctime)s %(levelname)s %(name)s: %(message)s",
             encoding="utf-8",
@@ -50,22 +52,31 @@ def _forward_to_running_instance() -> None:
     """実行中のインスタンスにファイルパスを渡して、このプロセスは終了する。"""
     socket = QLocalSocket()
     socket.connectToServer(APP_UNIQUE_KEY)
-    if not socket.waitForConnected(500):  # 500ms 待つ
+    if not socket.waitForConnected(IPC_CONNECT_TIMEOUT_MS):
         # 既存インスタンスを検出したのに繋がらない＝渡したファイルが開かれない状況。
         # 黙って終わるとユーザーには「何も起きない」ので、原因を残す。
         logger.warning(
             "running instance was detected but IPC connection failed: %s", socket.errorString()
         )
         return
-    # 2番目以降の引数（ファイルパス）をUTF-8でエンコードして送信
-    args_to_send = sys.argv[1:] if len(sys.argv) > 1 else []
-    data = "\n".join(args_to_send).encode("utf-8")
-    socket.write(data)
-    socket.waitForBytesWritten(500)
+    # 2番目以降の引数（ファイルパス）をまとめて 1 通で送る。相手とは作業フォルダが違うので絶対パスにする
+    socket.write(encode_message([os.path.abspath(path) for path in sys.argv[1:]]))
+    # 待つのはこのプロセスだけ（受け取る側は readyRead で届いた分を読むので GUI は止まらない）
+    while socket.bytesToWrite() > 0:
+        if not socket.waitForBytesWritten(IPC_WRITE_TIMEOUT_MS):
+            logger.warning("failed to send paths to running instance: %s", socket.errorString())
+            return
+    socket.disconnectFromServer()
 
 
 def main() -> int:
     """アプリを起動する。新規起動なら QApplication を実行し、終了コードを返す。"""
+    # PyInstaller で固めた exe から破損チェックのプロセスプールを起動できるようにする。
+    # freeze_support() が働くのは固めた exe のときだけなので、それ以外では multiprocessing を読み込まない
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+
+        multiprocessing.freeze_support()
     # GUI/PyInstaller 実行でも IPC 失敗等の痕跡を残せるよう、早い段階でログを初期化する
     setup_logging()
 
@@ -84,73 +95,10 @@ def main() -> int:
         return 0
 
     # --- ここから下は、最初のインスタンスのみが実行する ---
-    app = QApplication(sys.argv)
-    # app.setPalette() よりも強力なスタイルシートで、デフォルトのウィンドウ背景を上書きする
-    # これにより、OSがウィンドウの「器」を作成する際のデフォルト色を制御する
-    app.setStyleSheet("QMainWindow { background-color: #2d2d2d; }")
-    app.setQuitOnLastWindowClosed(False)
-
-    app_icon_path = resource_path("app_icon.ico")
-    if os.path.exists(app_icon_path):
-        app.setWindowIcon(QIcon(app_icon_path))
-
-    viewer = ImageViewer()
-
-    # 2番目のインスタンスからファイルパスを受け取るためのサーバーをセットアップ
-    local_server = QLocalServer()
-
-    def handle_new_connection():
-        socket = local_server.nextPendingConnection()
-        if socket.waitForReadyRead(500):
-            data = socket.readAll().data().decode("utf-8")
-            file_paths = data.splitlines()
-            if file_paths:
-                viewer.load_image_from_path(file_paths[0])
-            viewer.show_window()
-
-    local_server.newConnection.connect(handle_new_connection)
-    # 異常終了で取り残されたソケット（主にUnix系）を掃除してから listen する
-    QLocalServer.removeServer(APP_UNIQUE_KEY)
-    if not local_server.listen(APP_UNIQUE_KEY):
-        # listen できないと2個目以降の起動からファイルを受け取れない（致命ではないので続行）
-        logger.warning("failed to listen IPC server: %s", local_server.errorString())
-
-    # 最初の起動時の引数を処理
-    if len(sys.argv) > 1:
-        initial_file_path = sys.argv[1]
-        viewer.load_image_from_path(initial_file_path)
-
-    viewer.show()
-
-    def cleanup_on_quit():
-        # ウィンドウ状態の保存はワーカー停止より先に行う。
-        # （後段の wait が万一固まっても設定だけは確実に残す）
-        viewer._save_settings()
-        viewer.stop_movie()
-
-        viewer.worker_thread.quit()
-        # 画像ロード中などで終わらない場合に GUI が終了不能になるのを避けるためタイムアウトを付ける
-        if not viewer.worker_thread.wait(3000):
-            current_file = (
-                viewer.image_files[viewer.current_index]
-                if 0 <= viewer.current_index < len(viewer.image_files)
-                else None
-            )
-            logger.warning(
-                "worker thread did not finish in time; terminating; current_index=%s current_file=%s",
-                getattr(viewer, "current_index", None),
-                current_file,
-            )
-            # terminate は任意地点で worker を停止するため deleteLater が走らない可能性がある（終了時の最終保険）
-            viewer.worker_thread.terminate()
-            viewer.worker_thread.wait(1000)
-
-        # 共有メモリを解放する
-        shared_memory.detach()
-
-    app.aboutToQuit.connect(cleanup_on_quit)
+    # GUI 一式の import は、最初のインスタンスと決まってから行う
+    from .gui import run_viewer
 
-    return app.exec()
+    return run_viewer(shared_memory)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""破損ファイルの検査をウィンドウを開かずに行うコマンド（``hiyoko-viewer-check``）。
+
+壊れたファイルが見つかるたびに ``パス<TAB>理由`` を標準出力へ書き、1 件でもあれば
+終了コード 1 を返す。検査結果はビューアと同じ記録ファイルに残すので、中断しても
+次回は続きから検査する（``--restart`` で最初から）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .config.constants import INTEGRITY_JOURNAL_FILE, QUARANTINE_FOLDER
+from .services.cache_paths import cache_file_path
+from .services.file_ops import move_file
+from .services.image_loader import list_image_names
+from .services.integrity_check import init_check_worker, iter_checks, open_journal
+from .services.tree_scanner import scan_directory
+
+logger = logging.getLogger(__name__)
+
+
+def _list_names(directory: str, recursive: bool) -> list[str]:
+    """``directory`` の画像を、``directory`` からの相対パスで返す"""
+    if not recursive:
+        return sorted(list_image_names(directory))
+    names: list[str] = []
+    pending = deque([""])
+    while pending:
+        relative_dir = pending.popleft()
+        try:
+            found, folders = scan_directory(directory, relative_dir)
+        except OSError:
+            logger.warning("failed to scan folder: %s", relative_dir, exc_info=True)
+            continue
+        names.extend(sorted(found))
+        pending.extend(sorted(folders))
+    return names
+
+
+def _quarantine(file_path: str) -> str:
+    """``file_path`` を同じフォルダの隔離フォルダへ移動する。失敗したら理由を返す"""
+    destination = os.path.join(
+        os.path.dirname(file_path), QUARANTINE_FOLDER, os.path.basename(file_path)
+    )
+    try:
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        move_file(file_path, destination)
+    except OSError as e:
+        return str(e)
+    return ""
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="hiyoko-viewer-check",
+        description="フォルダ内の画像を最後までデコードし、壊れた/途中で切れたファイルを探す。",
+    )
+    parser.add_argument("directory", help="検査するフォルダ")
+    parser.add_argument("-r", "--recursive", action="store_true", help="サブフォルダも検査する")
+    parser.add_argument(
+        "--quarantine",
+        action="store_true",
+        help=f"壊れたファイルを各フォルダの {QUARANTINE_FOLDER} へ移動する",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="前回の検査結果を使わずに最初から検査する"
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="並列に検査するプロセス数（既定は CPU 数）"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    multiprocessing.freeze_support()
+    args = _parse_args(argv)
+    directory = os.path.abspath(args.directory)
+    if not os.path.isdir(directory):
+        print(f"フォルダが見つかりません: {directory}", file=sys.stderr)
+        return 2
+
+    names = _list_names(directory, args.recursive)
+    journal = open_journal(cache_file_path(INTEGRITY_JOURNAL_FILE))
+    broken = 0
+    try:
+        if journal is not None and args.restart:
+            journal.forget_directory(directory)
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=init_check_worker) as pool:
+            for checked, failures in iter_checks(directory, names, pool, journal):
+                for name_id, error in failures:
+                    file_path = os.path.join(directory, names[name_id])
+                    broken += 1
+                    print(f"{file_path}\t{error}", flush=True)
+                    if args.quarantine and (move_error := _quarantine(file_path)):
+                        print(f"移動できませんでした: {file_path}: {move_error}", file=sys.stderr)
+                print(f"{checked}/{len(names)}", end="\r", file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        # 検査済みのチャンクは記録済みなので、次回は続きから検査できる
+        print("\n中断しました", file=sys.stderr)
+        return 130
+    finally:
+        if journal is not None:
+            journal.close()
+    print(f"\n{len(names)} 件中 {broken} 件が壊れています", file=sys.stderr)
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
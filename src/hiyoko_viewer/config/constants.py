@@ -2,6 +2,7 @@ from __future__ import annotations
 
 # --- 対応拡張子 ---
 SUPPORTED_EXTENSIONS = [
+    ".apng",
     ".bmp",
     ".cur",
     ".gif",
@@ -29,16 +30,123 @@ SUPPORTED_EXTENSIONS = [
 # --- 仕分けフォルダ ---
 OK_FOLDER = "_ok"
 NG_FOLDER = "_ng"
+QUARANTINE_FOLDER = "_broken"  # 破損チェックで見つかった画像の隔離先
+
+# --- ファイル操作（仕分け/ごみ箱）---
+TRASH_BATCH_DELAY_MS = 300  # 続けて削除した分をまとめて send2trash するまでの待ち時間
+MOVE_CHUNK_SIZE = 4 * 1024 * 1024  # 別ドライブへの移動でコピーする単位（バイト）
+MOVE_PROGRESS_INTERVAL = 0.2  # 別ドライブへの移動の進捗を通知する間隔（秒）
+UNDO_JOURNAL_SIZE = 200  # 取り消せる仕分け操作の件数
+
+# --- フォルダの再帰スキャン ---
+SCAN_MAX_WORKERS = 8  # サブフォルダを並列に列挙するスレッド数の上限
+SCAN_CHUNK_SIZE = 2000  # この件数たまるごとに GUI へ逐次反映する
+SCAN_FLUSH_INTERVAL = 0.2  # 件数に満たなくても、この秒数ごとに反映する
+
+# --- 兄弟フォルダの先読み ---
+SIBLING_SEARCH_LIMIT = 20  # 画像を含むフォルダを探して前後に辿る最大フォルダ数
+
+# --- 並び順 ---
+SORT_BY_NAME = "name"
+SORT_BY_MTIME = "mtime"
+SORT_BY_SIZE = "size"
+SORT_BY_CAPTURED = "captured"
+SORT_BY_PIXELS = "pixels"
+# S キーで切り替える順序と表示名
+SORT_ORDER_LABELS = {
+    SORT_BY_NAME: "名前",
+    SORT_BY_MTIME: "更新日時",
+    SORT_BY_SIZE: "ファイルサイズ",
+    SORT_BY_CAPTURED: "撮影日時",
+    SORT_BY_PIXELS: "画素数",
+}
+
+# --- 画像ヘッダの読み取り（並べ替え/絞り込み用）---
+PROBE_MAX_WORKERS = 8  # ヘッダを並列に読むスレッド数
+PROBE_CHUNK_SIZE = 512  # この件数ごとに打ち切り要求を確認する
+HEADER_CACHE_SIZE = 500_000  # パスごとのヘッダ情報を覚えておく最大件数（mtime が同じ間だけ再利用）
+
+# --- 縦横比による絞り込み ---
+ASPECT_ANY = "any"
+ASPECT_PORTRAIT = "portrait"
+ASPECT_LANDSCAPE = "landscape"
+ASPECT_SQUARE = "square"
+ASPECT_FILTER_LABELS = {
+    ASPECT_ANY: "すべて",
+    ASPECT_PORTRAIT: "縦長",
+    ASPECT_LANDSCAPE: "横長",
+    ASPECT_SQUARE: "正方形",
+}
+
+# --- 類似画像の検出 ---
+HASH_DECODE_SIZE = 256  # 知覚ハッシュの計算前に縮小デコードする大きさ（長辺の上限）
+DUPLICATE_MAX_DISTANCE = 6  # pHash（64bit）のハミング距離がこれ以下なら類似とみなす
+DUPLICATE_MAX_DHASH_DISTANCE = (
+    12  # さらに dHash の距離もこれ以下であること（平坦な画像の誤検出よけ）
+)
+HASH_CACHE_FILE = "image_hashes.sqlite3"  # キャッシュフォルダ内のハッシュ保存先
+
+# --- 破損チェック ---
+INTEGRITY_CHUNK_SIZE = 256  # この件数ごとに結果を通知・記録し、打ち切り要求を確認する
+INTEGRITY_JOURNAL_FILE = "integrity.sqlite3"  # 検査済みの結果の保存先（中断後の再開用）
+# 検査プロセスで Qt が 1 枚のデコードに確保してよい上限（MB）。既定の 256 MB では
+# 9000×9000 程度の正常な画像も読めずに「壊れている」ことになる。超える画像は Pillow に任せる
+INTEGRITY_ALLOCATION_LIMIT_MB = 2048
+
+# --- 画像送り ---
+SCRUB_SETTLE_MS = (
+    250  # 押しっぱなしの送りが止まってから、その位置の画像をデコードするまでの待ち時間
+)
 
 # --- ズーム ---
 ZOOM_IN_FACTOR = 1.15
 ZOOM_OUT_FACTOR = 1 / ZOOM_IN_FACTOR
 
+# --- 描画 ---
+SMOOTH_REDRAW_DELAY_MS = 150  # リサイズ/ズームが止まってから平滑補間で描き直すまでの待ち時間
+VIEW_UPDATE_INTERVAL_MS = 16  # パン/ホイールズームの入力をまとめて反映する間隔（約 1 表示フレーム）
+RENDITION_CACHE_SIZE = 4  # 平滑補間で縮小/拡大済みの pixmap を表示サイズごとに保持する数
+MIPMAP_MIN_SIZE = 256  # ミップマップの最小段の長辺（これより小さい段は作らない）
+MIPMAP_MEMORY_BUDGET = 128 * 1024 * 1024  # 1 枚のミップマップ全段に使ってよいメモリ（バイト）
+SVG_TILE_SIZE = 512  # SVG を worker でラスタライズするタイルの一辺（ピクセル）
+SVG_TILE_CACHE_SIZE = 96  # ラスタライズ済みの SVG タイルを（ズーム段をまたいで）保持する数
+
+# --- ヒストグラム ---
+HISTOGRAM_SAMPLE_SIZE = 512  # ヒストグラムを求める前に画素を間引く大きさ（長辺の上限）
+HISTOGRAM_CACHE_SIZE = 8  # 求めたヒストグラムを画像ごとに保持する数（A/B 比較の切り替え用）
+HISTOGRAM_CLIP_WARNING = 0.001  # 白飛び/黒つぶれの画素がこの割合を超えたら警告の色で示す
+HISTOGRAM_OVERLAY_SIZE = (272, 140)  # ヒストグラムの重ね表示の大きさ（論理ピクセル）
+HISTOGRAM_OVERLAY_MARGIN = 12  # ヒストグラムの重ね表示とビューポートの右上の角との間隔
+
+# --- アニメーション ---
+# worker でフレームを読ませる拡張子（静止画かどうかは worker が見出しだけを読んで判定する）
+ANIMATION_EXTENSIONS = (".apng", ".gif", ".jxl", ".png", ".webp")
+ANIMATION_QUEUE_SIZE = 4  # worker に先読みさせておくフレーム数
+ANIMATION_DEFAULT_FRAME_MS = 100  # 表示時間の指定が無い（または 10ms 以下の）フレームの表示時間
+ANIMATION_STATUS_INTERVAL_MS = 250  # 再生中にステータスバーのフレーム番号を書き換える間隔
+ANIMATION_CACHE_BYTES = 256 * 1024 * 1024  # デコード済みフレームのキャッシュに使うメモリの上限
+ANIMATION_SCRUBBER_WIDTH = 240  # ステータスバーのフレーム位置スライダーの幅
+
+# --- カラーマネジメント ---
+COLOR_TRANSFORM_CACHE_SIZE = 8  # worker ごとに使い回す色変換（プロファイルの組）の数
+ICC_PROFILE_FILTER = "ICC プロファイル (*.icc *.icm)"
+
+# --- HDR のトーンマッピング ---
+HDR_REFERENCE_WHITE_NITS = 203.0  # SDR の白に合わせる HDR の輝度（ITU-R BT.2408 の基準白）
+HDR_PEAK_NITS = 1000.0  # メタデータが無いときに想定するピーク輝度（HLG の公称ディスプレイ）
+HDR_TONE_MAP_KNEE = 0.5  # 基準白に対するこの割合まではそのまま、超えた分だけを圧縮する
+TONE_MAP_TILE_PIXELS = 1 << 20  # 一度に変換する画素数（作業用の一時配列をこの大きさに抑える）
+
 # --- 表示テキスト/スタイル ---
 WELCOME_TEXT = "ファイル > 開く（Ctrl+O）またはドラッグアンドドロップで読み込む"
 NOTICE_TEXT_STYLE = "font-size: 16pt; color: #555;"
 DEFAULT_TITLE = "ひよこビューア"
 
+# --- インスタンス間通信（2 番目以降の起動からパスを渡す）---
+IPC_CONNECT_TIMEOUT_MS = 500  # 送る側が実行中のインスタンスへの接続を待つ時間
+IPC_WRITE_TIMEOUT_MS = 2000  # 送る側が書き込みの完了を待つ時間
+IPC_BATCH_DELAY_MS = 150  # 続けて届いたパスをまとめて受け取るまでの待ち時間
+
 # --- QSettings の保存先（組織名/アプリ名）---
 SETTINGS_ORG = "HiyokoSoft"
 SETTINGS_APP = "HiyokoViewer"
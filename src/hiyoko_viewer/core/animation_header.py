@@ -0,0 +1,50 @@
+"""ファイルの見出しだけを読んで、アニメーションかもしれないかを調べる。Qt 非依存。
+
+PNG / WebP / JPEG XL は静止画でも同じ拡張子なので、アニメーションを読む worker が
+静止画を丸ごと読み直したりデコードし直したりしないよう、先にこれで振り分ける。
+
+* PNG（APNG）: ``IDAT`` より前に ``acTL`` があればアニメーション。チャンクの見出しだけを
+  読み、中身は読み飛ばす
+* WebP: 拡張形式（``VP8X``）の見出しのアニメーションのフラグ
+* JPEG XL: コードストリームの ImageMetadata の ``have_animation``
+* GIF 等: フレーム数は末尾まで読まないと分からないので「かもしれない」とする
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import BinaryIO
+
+from .jxl_header import has_animation, read_codestream_head
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_WEBP_ANIMATION_FLAG = 0x02
+# JPEG XL の ImageMetadata の have_animation までを読むのに足りる大きさ
+_JXL_HEAD_BYTES = 4096
+
+
+def _png_has_animation_control(file: BinaryIO) -> bool:
+    while len(chunk := file.read(8)) == 8:
+        length, chunk_type = struct.unpack(">I4s", chunk)
+        if chunk_type == b"acTL":
+            return True
+        if chunk_type in (b"IDAT", b"IEND"):
+            return False
+        file.seek(length + 4, os.SEEK_CUR)  # 中身と CRC
+    return False
+
+
+def may_be_animated(file: BinaryIO) -> bool:
+    """``file``（先頭から読める状態）がアニメーションかもしれなければ True"""
+    head = file.read(21)
+    if head.startswith(_PNG_SIGNATURE):
+        file.seek(len(_PNG_SIGNATURE))
+        return _png_has_animation_control(file)
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return head[12:16] == b"VP8X" and len(head) > 20 and bool(head[20] & _WEBP_ANIMATION_FLAG)
+    file.seek(0)
+    codestream = read_codestream_head(file, _JXL_HEAD_BYTES)
+    if codestream:
+        return has_animation(codestream)
+    return True
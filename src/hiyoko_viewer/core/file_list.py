@@ -0,0 +1,387 @@
+"""ナビゲーション用のコンパクトな画像ファイルリスト。Qt 非依存。
+
+50 万件規模のフォルダでも、絶対パス文字列のリストを複数持たずに済むよう
+次の構造で保持する:
+
+* ディレクトリのプレフィックス 1 つと、名前（ディレクトリからの相対パス）のテーブル
+* 並び順ごとのインデックス配列（名前 ID の並び）とその逆引き配列
+* シャッフル用の置換配列（シャッフル中のみ保持）
+* 削除済みを示すトゥームストーン（bytearray）
+* 絞り込み（解像度/縦横比など）で隠している名前のフラグ（bytearray）
+
+削除はトゥームストーンを立てて Fenwick 木（BIT）の生存数を 1 減らすだけなので
+O(log n)。表示位置 ⇔ 名前 ID の変換も BIT 上の二分探索/累積和で O(log n)。
+絞り込みの変更も、表示/非表示が変わった名前の数 × O(log n) で反映できる。
+"""
+
+from __future__ import annotations
+
+import operator
+import os
+import random
+from array import array
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import Any
+
+
+class _Fenwick:
+    """各スロットの生存数（0/1）を保持する Fenwick 木。添字は 1 始まり。"""
+
+    __slots__ = ("_tree", "_size", "_top")
+
+    def __init__(self, size: int, alive: bytes | None = None) -> None:
+        """``alive`` を省くと全スロット生存で作る。渡すと各スロットの 0/1 から作る。"""
+        self._tree = array("q", [0])
+        if alive is None:
+            # 全スロット生存（値 1）の木は tree[i] = i & -i で直接作れる（O(n) ビルド不要）
+            self._tree.extend(i & -i for i in range(1, size + 1))
+        else:
+            # 各ノードの値を親へ 1 回ずつ足し込む O(n) の構築
+            tree = self._tree
+            tree.extend(alive)
+            for index in range(1, size + 1):
+                parent = index + (index & -index)
+                if parent <= size:
+                    tree[parent] += tree[index]
+        self._size = size
+        self._top = 1 << size.bit_length() >> 1 if size else 0
+
+    def extend(self, count: int) -> None:
+        """末尾に生存スロットを ``count`` 個追加する。
+
+        新しいノード i が受け持つ区間 (i - lowbit(i), i] のうち、既存部分の
+        生存数だけを既存の木から求める。既存部分にまたがるノードは高々 log n 個
+        なので、全体を作り直す O(n) ではなく O(count + log² n) で済む。
+        """
+        old_size = self._size
+        tree = self._tree
+        base = self.prefix(old_size)
+        for index in range(old_size + 1, old_size + count + 1):
+            low = index & -index
+            start = index - low
+            if start >= old_size:
+                tree.append(low)
+            else:
+                tree.append(base - self.prefix(start) + index - old_size)
+        self._size = old_size + count
+        self._top = 1 << self._size.bit_length() >> 1 if self._size else 0
+
+    def add(self, index: int, delta: int) -> None:
+        tree, size = self._tree, self._size
+        while index <= size:
+            tree[index] += delta
+            index += index & -index
+
+    def prefix(self, index: int) -> int:
+        """スロット 1..index の生存数。"""
+        tree = self._tree
+        total = 0
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, rank: int) -> int:
+        """rank 番目（1 始まり）の生存スロットを返す。"""
+        tree, size = self._tree, self._size
+        position = 0
+        step = self._top
+        while step:
+            candidate = position + step
+            if candidate <= size and tree[candidate] < rank:
+                position = candidate
+                rank -= tree[candidate]
+            step >>= 1
+        return position + 1
+
+
+class _Order:
+    """1 つの並び順。スロット → 名前 ID と、その逆引きと生存数の BIT を持つ。"""
+
+    __slots__ = ("slots", "positions", "live")
+
+    def __init__(self, slots: Iterable[int], size: int, excluded: bytearray) -> None:
+        """``excluded`` は名前 ID ごとの「表示しない」フラグ（削除済み/絞り込みで非表示）。"""
+        self.slots = array("q", slots)
+        self.positions = array("q", bytes(8 * size))
+        for slot, name_id in enumerate(self.slots):
+            self.positions[name_id] = slot
+        self.reset_live(excluded)
+
+    def reset_live(self, excluded: bytes) -> None:
+        """生存数の BIT を ``excluded`` から作り直す。"""
+        size = len(self.slots)
+        if excluded.count(1) * 8 > size:
+            # 多くを隠している。1 件ずつ差し引くより各スロットの値から作る方が速い
+            self.live = _Fenwick(size, bytes(1 - excluded[name_id] for name_id in self.slots))
+            return
+        # 削除済みは通常ごく少数なので、全生存で作ってから差し引く
+        self.live = _Fenwick(size)
+        name_id = excluded.find(1)
+        while name_id != -1:
+            self.live.add(self.positions[name_id] + 1, -1)
+            name_id = excluded.find(1, name_id + 1)
+
+    def extend(self, count: int) -> None:
+        """名前テーブル末尾に追加された ``count`` 件を、この並び順の末尾に足す。"""
+        start = len(self.slots)
+        self.slots.extend(range(start, start + count))
+        self.positions.extend(range(start, start + count))
+        self.live.extend(count)
+
+    def id_at(self, position: int) -> int:
+        return self.slots[self.live.find(position + 1) - 1]
+
+    def position_of(self, name_id: int) -> int:
+        return self.live.prefix(self.positions[name_id] + 1) - 1
+
+
+def _combine_flags(a: bytes, b: bytes, op: Callable[[int, int], int]) -> bytearray:
+    """0/1 のフラグ列どうしのバイトごとの演算（int のビット演算で C レベルで処理する）。"""
+    merged = op(int.from_bytes(a, "little"), int.from_bytes(b, "little"))
+    return bytearray(merged.to_bytes(len(a), "little"))
+
+
+class ImageFileList(Sequence):
+    """表示順に並んだ画像パスの読み取り専用シーケンス。
+
+    ``list`` と同じく ``len()`` / 添字アクセス / ``in`` / ``index()`` が使え、
+    添字は削除済みと絞り込みで隠したものを除いた「表示位置」を指す。
+    添字アクセスで返すのは ``directory`` と名前を結合した絶対パス。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        names: Iterable[str],
+        key: Callable[[str], Any] | None = None,
+        order: Iterable[int] | None = None,
+    ) -> None:
+        """``key`` を渡すとその順に並べる。並べ替え済みのインデックス配列があれば
+        ``order`` で直接渡せる（worker 側でソートした結果をそのまま使う場合）。
+        """
+        self.directory = directory
+        self._names = list(names)
+        size = len(self._names)
+        if order is not None:
+            slots: Iterable[int] = order
+        elif key is None:
+            slots = range(size)
+        else:
+            names_table = self._names
+            slots = sorted(range(size), key=lambda name_id: key(names_table[name_id]))
+        self._removed = bytearray(size)
+        self._removed_count = 0
+        self._hidden = bytearray(size)
+        # 隠している名前のうち削除済みでないものの数
+        self._hidden_count = 0
+        self._sorted = _Order(slots, size, self._removed)
+        self._shuffled: _Order | None = None
+        # index(path) 用の名前 → ID 辞書。必要になるまで作らない
+        self._ids: dict[str, int] | None = None
+
+    @classmethod
+    def empty(cls) -> ImageFileList:
+        return cls("", [])
+
+    @property
+    def names(self) -> list[str]:
+        """名前テーブル（名前 ID 順）。共有しているので変更しないこと。"""
+        return self._names
+
+    @property
+    def is_shuffled(self) -> bool:
+        return self._shuffled is not None
+
+    @property
+    def _active(self) -> _Order:
+        return self._shuffled if self._shuffled is not None else self._sorted
+
+    @property
+    def is_filtered(self) -> bool:
+        return self._hidden_count > 0
+
+    @property
+    def total(self) -> int:
+        """絞り込みで隠しているものも含めた件数（削除済みは除く）。"""
+        return len(self._names) - self._removed_count
+
+    def __len__(self) -> int:
+        return len(self._names) - self._removed_count - self._hidden_count
+
+    def __getitem__(self, position: int) -> str:  # type: ignore[override]
+        return self.path_of(self.id_at(position))
+
+    def __iter__(self) -> Iterator[str]:
+        removed, hidden = self._removed, self._hidden
+        for name_id in self._active.slots:
+            if not removed[name_id] and not hidden[name_id]:
+                yield self.path_of(name_id)
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and self._live_id_of(path) is not None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.directory!r}, {len(self)} files)"
+
+    def index(self, path: str, *args: Any) -> int:  # type: ignore[override]
+        name_id = self._live_id_of(path)
+        if name_id is None:
+            raise ValueError(f"{path!r} is not in list")
+        return self.position_of_id(name_id)
+
+    def path_of(self, name_id: int) -> str:
+        return os.path.join(self.directory, self._names[name_id])
+
+    def name_of(self, name_id: int) -> str:
+        return self._names[name_id]
+
+    def id_of_name(self, name: str) -> int | None:
+        """``directory`` からの相対名 ``name`` の名前 ID。無いか削除済みなら None。"""
+        name_id = self._name_ids().get(name)
+        if name_id is None or self._removed[name_id]:
+            return None
+        return name_id
+
+    def id_at(self, position: int) -> int:
+        """表示位置 ``position`` にある名前 ID（名前テーブル上の添字）を返す。"""
+        size = len(self)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("image list index out of range")
+        return self._active.id_at(position)
+
+    def is_removed(self, name_id: int) -> bool:
+        return bool(self._removed[name_id])
+
+    def position_of_id(self, name_id: int) -> int:
+        """名前 ID の現在の表示位置。削除済み/絞り込みで非表示なら ValueError。"""
+        if self._removed[name_id]:
+            raise ValueError(f"name id {name_id} has been removed")
+        if self._hidden[name_id]:
+            raise ValueError(f"name id {name_id} is hidden by the filter")
+        return self._active.position_of(name_id)
+
+    def position_at_or_after_id(self, name_id: int) -> int:
+        """名前 ID の位置か、非表示ならその次に表示されている項目の位置を返す。
+
+        末尾より後なら先頭に戻る。表示できる項目が 1 つも無ければ -1。
+        """
+        if not len(self):
+            return -1
+        order = self._active
+        position = order.live.prefix(order.positions[name_id])
+        return position if position < len(self) else 0
+
+    def remove_at(self, position: int) -> str:
+        """表示位置 ``position`` の項目を削除し、そのパスを返す。"""
+        return self.remove_id(self.id_at(position))
+
+    def remove_id(self, name_id: int) -> str:
+        """名前 ID の項目を削除し、そのパスを返す（絞り込みで隠れていてもよい）。"""
+        if self._removed[name_id]:
+            raise ValueError(f"name id {name_id} has been removed")
+        self._removed[name_id] = 1
+        self._removed_count += 1
+        if self._hidden[name_id]:
+            self._hidden_count -= 1
+            return self.path_of(name_id)
+        for order in (self._sorted, self._shuffled):
+            if order is not None:
+                order.live.add(order.positions[name_id] + 1, -1)
+        return self.path_of(name_id)
+
+    def restore_id(self, name_id: int) -> None:
+        """削除した名前 ID を元の並び位置に戻す（ファイル操作の失敗/取り消し用）。"""
+        if not self._removed[name_id]:
+            return
+        self._removed[name_id] = 0
+        self._removed_count -= 1
+        if self._hidden[name_id]:
+            # 絞り込みで隠れたまま戻る
+            self._hidden_count += 1
+            return
+        for order in (self._sorted, self._shuffled):
+            if order is not None:
+                order.live.add(order.positions[name_id] + 1, 1)
+
+    def extend(self, names: Iterable[str]) -> None:
+        """名前を末尾に追加する（再帰スキャンの逐次反映用）。
+
+        追加分はソート順/シャッフル順のどちらでも末尾に並ぶ。正しい並び順は
+        スキャン完了後に :meth:`set_order` で差し替える。
+        """
+        start = len(self._names)
+        self._names.extend(names)
+        count = len(self._names) - start
+        if not count:
+            return
+        self._removed.extend(bytes(count))
+        self._hidden.extend(bytes(count))
+        for order in (self._sorted, self._shuffled):
+            if order is not None:
+                order.extend(count)
+        if self._ids is not None:
+            for name_id in range(start, start + count):
+                self._ids[self._names[name_id]] = name_id
+
+    def set_order(self, slots: Iterable[int]) -> None:
+        """ソート順のインデックス配列を差し替える（削除済み/絞り込みの情報は保つ）。"""
+        self._sorted = _Order(slots, len(self._names), self._excluded())
+
+    def set_hidden(self, hidden: bytes | None) -> None:
+        """絞り込みで隠す名前を、名前 ID 順の 0/1 フラグ列で指定する（None で解除）。"""
+        size = len(self._names)
+        new_hidden = bytearray(hidden) if hidden is not None else bytearray(size)
+        if len(new_hidden) != size:
+            raise ValueError(f"hidden flags must have {size} entries, got {len(new_hidden)}")
+        changed = _combine_flags(self._hidden, new_hidden, operator.xor)
+        self._hidden = new_hidden
+        self._hidden_count = new_hidden.count(1)
+        if self._removed_count:
+            self._hidden_count -= _combine_flags(new_hidden, self._removed, operator.and_).count(1)
+        orders = [order for order in (self._sorted, self._shuffled) if order is not None]
+        if changed.count(1) * 8 > size:
+            # 大きく変わった。O(n) で作り直す
+            excluded = self._excluded()
+            for order in orders:
+                order.reset_live(excluded)
+            return
+        # 表示/非表示が変わった名前だけ、各並び順の生存数を増減する
+        name_id = changed.find(1)
+        while name_id != -1:
+            if not self._removed[name_id]:
+                delta = -1 if new_hidden[name_id] else 1
+                for order in orders:
+                    order.live.add(order.positions[name_id] + 1, delta)
+            name_id = changed.find(1, name_id + 1)
+
+    def shuffle(self, rng: random.Random | None = None) -> None:
+        """ランダムな置換配列を作り、それを表示順にする。"""
+        permutation = list(range(len(self._names)))
+        (rng or random).shuffle(permutation)
+        self._shuffled = _Order(permutation, len(self._names), self._excluded())
+
+    def unshuffle(self) -> None:
+        """置換配列を捨てて、ソート順の表示に戻す（O(1)）。"""
+        self._shuffled = None
+
+    def _excluded(self) -> bytearray:
+        if not self._hidden_count:
+            return self._removed
+        return _combine_flags(self._removed, self._hidden, operator.or_)
+
+    def _name_ids(self) -> dict[str, int]:
+        if self._ids is None:
+            self._ids = dict(zip(self._names, range(len(self._names)), strict=True))
+        return self._ids
+
+    def _live_id_of(self, path: str) -> int | None:
+        prefix = os.path.join(self.directory, "")
+        if not path.startswith(prefix):
+            return None
+        name_id = self._name_ids().get(path[len(prefix) :])
+        if name_id is None or self._removed[name_id] or self._hidden[name_id]:
+            return None
+        return name_id
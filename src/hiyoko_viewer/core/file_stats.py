@@ -0,0 +1,165 @@
+"""並べ替え/絞り込み用のファイル情報テーブルと、並び順・絞り込み結果の計算。Qt 非依存。
+
+``ImageFileList`` の名前テーブルと同じ添字（名前 ID）で、更新日時・サイズと
+ヘッダから読んだ情報（画素数・撮影日時）を列ごとの配列に持つ。stat やヘッダ読みは
+一覧 1 回につき 1 度だけ行い、並べ替えはこの配列を引くだけにする
+（比較のたびに stat すると数十万件では比較回数 × システムコールになる）。
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from array import array
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+
+from ..config.constants import (
+    ASPECT_ANY,
+    ASPECT_LANDSCAPE,
+    ASPECT_PORTRAIT,
+    ASPECT_SQUARE,
+    SORT_BY_CAPTURED,
+    SORT_BY_MTIME,
+    SORT_BY_PIXELS,
+    SORT_BY_SIZE,
+)
+from .sorting import tree_logical_key
+
+# 値が不明（読めなかった/情報が無い）ことを表す
+UNKNOWN_TIME = math.nan
+UNKNOWN_DIMENSION = -1
+
+
+class FileStats:
+    """名前 ID ごとのファイル情報（列指向）。"""
+
+    __slots__ = ("mtime", "size", "width", "height", "captured", "has_headers")
+
+    def __init__(self, count: int) -> None:
+        self.mtime = array("d", [UNKNOWN_TIME]) * count
+        self.size = array("q", [0]) * count
+        self.width = array("l", [UNKNOWN_DIMENSION]) * count
+        self.height = array("l", [UNKNOWN_DIMENSION]) * count
+        self.captured = array("d", [UNKNOWN_TIME]) * count
+        # ヘッダ由来の列（width/height/captured）を埋め終えたか
+        self.has_headers = False
+
+    def __len__(self) -> int:
+        return len(self.mtime)
+
+    def pixels(self, name_id: int) -> int:
+        width, height = self.width[name_id], self.height[name_id]
+        return width * height if width >= 0 and height >= 0 else UNKNOWN_DIMENSION
+
+
+def stat_files(directory: str, names: Sequence[str]) -> FileStats:
+    """``names`` の更新日時とサイズを 1 件 1 回の stat で集める。"""
+    stats = FileStats(len(names))
+    for name_id, name in enumerate(names):
+        try:
+            result = os.stat(os.path.join(directory, name))
+        except OSError:
+            continue
+        stats.mtime[name_id] = result.st_mtime
+        stats.size[name_id] = result.st_size
+    return stats
+
+
+def parse_exif_datetime(text: object) -> float:
+    """EXIF の日時文字列（``YYYY:MM:DD HH:MM:SS``）を UNIX 時刻にする。読めなければ NaN。"""
+    if isinstance(text, bytes):
+        text = text.decode("ascii", errors="ignore")
+    if not isinstance(text, str):
+        return UNKNOWN_TIME
+    try:
+        return datetime.strptime(text.strip("\x00 ")[:19], "%Y:%m:%d %H:%M:%S").timestamp()
+    except ValueError:
+        return UNKNOWN_TIME
+
+
+def needs_headers(sort_key: str) -> bool:
+    return sort_key in (SORT_BY_CAPTURED, SORT_BY_PIXELS)
+
+
+def _value_getter(stats: FileStats, sort_key: str) -> Callable[[int], float | None]:
+    """名前 ID → 並べ替えの値（不明なら None）を返す関数を作る。"""
+
+    def known_time(value: float) -> float | None:
+        return None if math.isnan(value) else value
+
+    if sort_key == SORT_BY_MTIME:
+        return lambda name_id: known_time(stats.mtime[name_id])
+    if sort_key == SORT_BY_SIZE:
+        return stats.size.__getitem__
+    if sort_key == SORT_BY_PIXELS:
+
+        def pixels(name_id: int) -> float | None:
+            value = stats.pixels(name_id)
+            return None if value == UNKNOWN_DIMENSION else value
+
+        return pixels
+    if sort_key == SORT_BY_CAPTURED:
+        # 撮影日時を持たない画像（生成画像の PNG など）は更新日時で代用する
+        def captured_or_mtime(name_id: int) -> float | None:
+            value = stats.captured[name_id]
+            return known_time(stats.mtime[name_id] if math.isnan(value) else value)
+
+        return captured_or_mtime
+    raise ValueError(f"unknown sort key: {sort_key!r}")
+
+
+def sort_order(names: Sequence[str], stats: FileStats | None, sort_key: str) -> list[int]:
+    """名前 ID を ``sort_key`` の昇順に並べたインデックス配列を返す。
+
+    値が同じものは名前の論理順で並べ、値が不明なものは末尾に置く。
+    名前順（``stats`` が None）では論理順そのものを返す。
+    """
+    by_name = sorted(range(len(names)), key=lambda name_id: tree_logical_key(names[name_id]))
+    if stats is None:
+        return by_name
+    value_of = _value_getter(stats, sort_key)
+
+    def key(name_id: int) -> tuple[bool, float]:
+        value = value_of(name_id)
+        return (True, 0.0) if value is None else (False, value)
+
+    # 安定ソートなので、名前順に並べてから値で並べれば同値は名前順のまま残る
+    return sorted(by_name, key=key)
+
+
+@dataclass(frozen=True)
+class DimensionFilter:
+    """解像度と縦横比による絞り込み条件。既定値はすべて表示。"""
+
+    min_width: int = 0
+    min_height: int = 0
+    aspect: str = ASPECT_ANY
+
+    @property
+    def is_active(self) -> bool:
+        return self.min_width > 0 or self.min_height > 0 or self.aspect != ASPECT_ANY
+
+    def accepts(self, width: int, height: int) -> bool:
+        """サイズが分からない画像（読めない等）は隠さない。"""
+        if width < 0 or height < 0:
+            return True
+        if width < self.min_width or height < self.min_height:
+            return False
+        if self.aspect == ASPECT_PORTRAIT:
+            return height > width
+        if self.aspect == ASPECT_LANDSCAPE:
+            return width > height
+        if self.aspect == ASPECT_SQUARE:
+            return width == height
+        return True
+
+
+def hidden_flags(stats: FileStats, dimension_filter: DimensionFilter) -> bytes:
+    """条件に合わない名前 ID を 1 にしたフラグ列（``ImageFileList.set_hidden`` 用）。"""
+    accepts = dimension_filter.accepts
+    return bytes(
+        0 if accepts(width, height) else 1
+        for width, height in zip(stats.width, stats.height, strict=True)
+    )
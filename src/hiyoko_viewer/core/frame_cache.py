@@ -0,0 +1,74 @@
+"""アニメーションのデコード済みフレームを、番号から直接引けるように持つキャッシュ。Qt 非依存。
+
+GIF などはフレームが前のフレームへの差分なので、戻ったり飛んだりするたびに先頭から
+デコードし直すことになる。一度デコードしたフレームを持っておけば、コマ戻し/コマ送り/
+任意のフレームへの移動がフレーム数によらず一定時間で済む。
+
+メモリ予算の半分までは生のまま持ち、それを超えた分は zlib で圧縮して持つ（生成画像の
+アニメーションは平坦な領域が多く、よく縮む）。圧縮しても予算を超えるなら、
+最も長く使っていないフレームから捨てる。
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+# 速さ優先（圧縮率はほとんど変わらず、レベル 6 の数倍速い）
+_COMPRESS_LEVEL = 1
+
+
+class _Entry(NamedTuple):
+    data: bytes
+    compressed: bool
+    meta: Any
+
+
+class FrameCache:
+    """フレーム番号 → (画素のバイト列, 付帯情報)。付帯情報は呼び出し側が決める（大きさ等）"""
+
+    def __init__(self, budget_bytes: int) -> None:
+        self._budget = budget_bytes
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._raw_bytes = 0
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._entries
+
+    def get(self, index: int) -> tuple[bytes, Any] | None:
+        entry = self._entries.get(index)
+        if entry is None:
+            return None
+        self._entries.move_to_end(index)
+        data = zlib.decompress(entry.data) if entry.compressed else entry.data
+        return data, entry.meta
+
+    def put(self, index: int, data: bytes, meta: Any) -> None:
+        self._discard(index)
+        compressed = self._raw_bytes + len(data) > self._budget // 2
+        if compressed:
+            data = zlib.compress(data, _COMPRESS_LEVEL)
+        else:
+            self._raw_bytes += len(data)
+        self._entries[index] = _Entry(data, compressed, meta)
+        self.nbytes += len(data)
+        while self.nbytes > self._budget and len(self._entries) > 1:
+            self._discard(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._raw_bytes = 0
+        self.nbytes = 0
+
+    def _discard(self, index: int) -> None:
+        entry = self._entries.pop(index, None)
+        if entry is None:
+            return
+        self.nbytes -= len(entry.data)
+        if not entry.compressed:
+            self._raw_bytes -= len(entry.data)
@@ -0,0 +1,31 @@
+"""アニメーションのフレームの表示時間と、遅れたときに飛ばすフレームの決め方。Qt 非依存。"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+# これ以下の表示時間は（ブラウザと同じく）指定が無いものとして既定値で表示する。
+# 0/10ms 指定の GIF は多く、そのまま回すと CPU を使い切るうえ作者の意図より速くなる
+TOO_SHORT_FRAME_MS = 10
+
+
+def frame_delay(duration_ms: float | None, default_ms: int) -> int:
+    """ファイルに書かれた表示時間（ミリ秒）を、実際に表示する時間に直す"""
+    if duration_ms is None or duration_ms <= TOO_SHORT_FRAME_MS:
+        return default_ms
+    return round(duration_ms)
+
+
+def frames_to_drop(lateness_ms: float, durations: Sequence[int]) -> int:
+    """表示が ``lateness_ms`` 遅れているとき、待ち行列の先頭から飛ばすフレーム数。
+
+    ``durations`` は待ち行列のフレームの表示時間（先頭から）。表示期間がまるごと
+    過ぎたフレームを飛ばすが、最後の 1 枚は（次が届いていないので）必ず表示する。
+    """
+    dropped = 0
+    for duration in durations[:-1]:
+        if lateness_ms < duration:
+            break
+        lateness_ms -= duration
+        dropped += 1
+    return dropped
@@ -0,0 +1,73 @@
+"""知覚ハッシュのディスクキャッシュ（SQLite）。Qt 非依存。
+
+フォルダ（再帰表示ではルート）ごとに、名前 → ``(mtime, size, phash, dhash)`` を保存する。
+読み出しはフォルダ単位の 1 クエリで済ませ、mtime とサイズが一致する名前だけ再利用する。
+接続を作ったスレッドからしか使えないので、worker の中で開いて閉じること。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from collections.abc import Iterable
+
+logger = logging.getLogger(__name__)
+
+_SIGN_BIT = 1 << 63
+_WRAP = 1 << 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    phash INTEGER NOT NULL,
+    dhash INTEGER NOT NULL,
+    PRIMARY KEY (directory, name)
+)
+"""
+
+
+def _to_signed(value: int) -> int:
+    # SQLite の INTEGER は符号付き 64bit
+    return value - _WRAP if value & _SIGN_BIT else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + _WRAP if value < 0 else value
+
+
+class HashCache:
+    """``db_path`` の SQLite ファイルに知覚ハッシュを保存する。"""
+
+    def __init__(self, db_path: str) -> None:
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(_SCHEMA)
+
+    def load_directory(self, directory: str) -> dict[str, tuple[float, int, int, int]]:
+        """``directory`` で保存済みの ``名前 → (mtime, size, phash, dhash)``"""
+        rows = self._db.execute(
+            "SELECT name, mtime, size, phash, dhash FROM hashes WHERE directory = ?",
+            (directory,),
+        )
+        return {
+            name: (mtime, size, _to_unsigned(p), _to_unsigned(d))
+            for name, mtime, size, p, d in rows
+        }
+
+    def store(self, directory: str, entries: Iterable[tuple[str, float, int, int, int]]) -> None:
+        """``(名前, mtime, size, phash, dhash)`` をまとめて保存する"""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (directory, name, mtime, size, _to_signed(p), _to_signed(d))
+                    for name, mtime, size, p, d in entries
+                ),
+            )
+
+    def close(self) -> None:
+        self._db.close()
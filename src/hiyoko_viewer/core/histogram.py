@@ -0,0 +1,54 @@
+"""画像の RGB/輝度ヒストグラムと、白飛び/黒つぶれの割合を求める。Qt 非依存。
+
+画素は呼び出し側（worker）が縮小した 8bit の RGB（NumPy 配列）で受け取る。
+ヒストグラムは ``bincount`` でチャンネルごとに一括で数え、輝度は BT.709 の係数を
+整数にした重み付き和で求める（浮動小数点の一時配列を作らない）。
+
+* 白飛び: いずれかのチャンネルが 255 の画素（1 色でも飽和すれば色が転ぶ）
+* 黒つぶれ: すべてのチャンネルが 0 の画素（純色の暗部を黒つぶれと数えない）
+* アルファのある画像は完全に透明な画素を数えない
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any, NamedTuple
+
+HISTOGRAM_BINS = 256
+
+# BT.709 の輝度係数を 256 倍して丸めたもの（和は 256）
+_LUMA_WEIGHTS = (54, 183, 19)
+
+
+class ImageHistogram(NamedTuple):
+    """各チャンネルと輝度の ``HISTOGRAM_BINS`` 段の度数と、白飛び/黒つぶれの画素の割合"""
+
+    red: Any
+    green: Any
+    blue: Any
+    luma: Any
+    highlight_clipped: float
+    shadow_clipped: float
+    pixel_count: int
+
+
+def compute_histogram(rgb, alpha=None) -> ImageHistogram:
+    """``(高さ, 幅, 3)`` の uint8 の画素のヒストグラムを求める。
+
+    ``alpha`` に同じ高さ・幅のアルファを渡すと、0 の画素を除いて数える。
+    """
+    np = import_module("numpy")
+    pixels = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3)
+    if alpha is not None:
+        pixels = pixels[np.asarray(alpha).reshape(-1) > 0]
+    red, green, blue = pixels[:, 0], pixels[:, 1], pixels[:, 2]
+    # 最も明るいチャンネルが 255 なら白飛び、0 なら（全チャンネル 0 で）黒つぶれ
+    peak = np.bincount(np.maximum(np.maximum(red, green), blue), minlength=HISTOGRAM_BINS)
+    luma_r, luma_g, luma_b = (np.uint16(weight) for weight in _LUMA_WEIGHTS)
+    luma = (red * luma_r + green * luma_g + blue * luma_b + np.uint16(128)) >> 8
+    histograms = [np.bincount(values, minlength=HISTOGRAM_BINS) for values in (red, green, blue)]
+    histograms.append(np.bincount(luma, minlength=HISTOGRAM_BINS))
+    count = len(pixels)
+    if not count:
+        return ImageHistogram(*histograms, 0.0, 0.0, 0)
+    return ImageHistogram(*histograms, int(peak[-1]) / count, int(peak[0]) / count, count)
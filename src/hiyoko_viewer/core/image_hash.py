@@ -0,0 +1,141 @@
+"""類似画像を見つけるための知覚ハッシュと、ハッシュ距離によるグループ分け。Qt 非依存。
+
+ハッシュは縮小済みのグレースケール画素（NumPy 配列）から計算する。デコードと縮小は
+呼び出し側（worker）の責務。
+
+* pHash: 32x32 の 2 次元 DCT の低周波 8x8 成分を中央値で 2 値化した 64bit
+* dHash: 9x8 の横方向の隣接画素の大小を並べた 64bit
+
+グループ分けは pHash を 16bit ずつ 4 分割した多重インデックスで候補の組を作る
+（距離 ``max_distance`` 以内の 2 つのハッシュは、鳩の巣原理でどれか 1 つの断片が
+``max_distance // 4`` ビット以内で一致する）。候補の組はソート済み配列の二分探索で
+まとめて引き、pHash/dHash の両方の距離を NumPy で一括に確かめるので、全ペア比較と
+違い 10 万件を超えても件数にほぼ比例した時間で済む。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from functools import lru_cache
+from importlib import import_module
+from itertools import combinations
+
+PHASH_SIZE = 32  # pHash を計算する縮小画像の一辺
+DHASH_SIZE = (9, 8)  # dHash を計算する縮小画像の (幅, 高さ)
+
+_LOW_FREQUENCY = 8
+_CHUNK_BITS = 16
+_CHUNK_COUNT = 64 // _CHUNK_BITS
+_CHUNK_MASK = (1 << _CHUNK_BITS) - 1
+
+
+def _bits_to_int(bits, np) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+@lru_cache(maxsize=1)
+def _dct_matrix():
+    np = import_module("numpy")
+    n = np.arange(PHASH_SIZE)
+    matrix = np.cos(np.pi * (2 * n[None, :] + 1) * n[:, None] / (2 * PHASH_SIZE))
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def phash(pixels) -> int:
+    """``PHASH_SIZE`` 四方のグレースケール画素から pHash を計算する"""
+    np = import_module("numpy")
+    matrix = _dct_matrix()
+    coefficients = matrix @ np.asarray(pixels, dtype=np.float64) @ matrix.T
+    low = coefficients[:_LOW_FREQUENCY, :_LOW_FREQUENCY].ravel()
+    # 直流成分（平均輝度）は比較から外す
+    return _bits_to_int(low > np.median(low[1:]), np)
+
+
+def dhash(pixels) -> int:
+    """``DHASH_SIZE``（幅 9 x 高さ 8）のグレースケール画素から dHash を計算する"""
+    np = import_module("numpy")
+    pixels = np.asarray(pixels, dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1], np)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+@lru_cache(maxsize=4)
+def _flip_masks(radius: int) -> tuple[int, ...]:
+    """16bit の断片で ``radius`` ビット以内を反転させるマスク（0 = そのまま）を列挙する"""
+    masks = [0]
+    for flips in range(1, radius + 1):
+        for positions in combinations(range(_CHUNK_BITS), flips):
+            masks.append(sum(1 << position for position in positions))
+    return tuple(masks)
+
+
+class _ChunkTable:
+    """16bit の断片の値ごとに、その値を持つ添字を引けるようにした表（計数ソート）"""
+
+    def __init__(self, chunks, np) -> None:
+        self.chunks = chunks
+        self.order = np.argsort(chunks, kind="stable")
+        self.counts = np.bincount(chunks, minlength=1 << _CHUNK_BITS)
+        self.starts = np.cumsum(self.counts) - self.counts
+
+    def pairs_with_mask(self, mask: int, np):
+        """断片が ``mask`` だけ違う組 ``(i, j)``（i < j）をすべて返す"""
+        wanted = self.chunks ^ mask
+        starts = self.starts[wanted]
+        counts = self.counts[wanted]
+        left = np.repeat(np.arange(len(wanted)), counts)
+        # 各 i について starts[i] から counts[i] 個ぶんの位置を並べる
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(counts) - counts, counts)
+        right = self.order[np.repeat(starts, counts) + offsets]
+        keep = left < right
+        return left[keep], right[keep]
+
+
+def group_similar(
+    hashes: Sequence[tuple[int, int] | None], max_distance: int, max_dhash_distance: int
+) -> list[list[int]]:
+    """``(phash, dhash)`` の列（添字 = 名前 ID、None は計算できなかったもの）を
+    類似画像のグループに分ける。
+
+    pHash の距離が ``max_distance`` 以内かつ dHash の距離が ``max_dhash_distance``
+    以内の組をつなぎ、2 件以上になったまとまりを名前 ID 順で返す。
+    """
+    np = import_module("numpy")
+    # 完全に同じハッシュは先にまとめる（大量の完全一致で候補の組が膨らまないように）
+    ids_by_hash: dict[tuple[int, int], list[int]] = {}
+    for name_id, value in enumerate(hashes):
+        if value is not None:
+            ids_by_hash.setdefault(value, []).append(name_id)
+    keys = list(ids_by_hash)
+    parents = list(range(len(keys)))
+
+    def find(index: int) -> int:
+        while parents[index] != index:
+            parents[index] = parents[parents[index]]
+            index = parents[index]
+        return index
+
+    if len(keys) >= 2:
+        p_hashes = np.array([p for p, _ in keys], dtype=np.uint64)
+        d_hashes = np.array([d for _, d in keys], dtype=np.uint64)
+        for chunk in range(_CHUNK_COUNT):
+            chunks = (p_hashes >> np.uint64(chunk * _CHUNK_BITS)) & np.uint64(_CHUNK_MASK)
+            table = _ChunkTable(chunks.astype(np.int64), np)
+            for mask in _flip_masks(max_distance // _CHUNK_COUNT):
+                left, right = table.pairs_with_mask(mask, np)
+                similar = (np.bitwise_count(p_hashes[left] ^ p_hashes[right]) <= max_distance) & (
+                    np.bitwise_count(d_hashes[left] ^ d_hashes[right]) <= max_dhash_distance
+                )
+                for a, b in zip(left[similar].tolist(), right[similar].tolist(), strict=True):
+                    parents[find(a)] = find(b)
+
+    members: dict[int, list[int]] = {}
+    for index, key in enumerate(keys):
+        members.setdefault(find(index), []).extend(ids_by_hash[key])
+    groups = [sorted(ids) for ids in members.values() if len(ids) >= 2]
+    groups.sort(key=lambda ids: ids[0])
+    return groups
@@ -0,0 +1,55 @@
+"""破損チェックの結果を記録する SQLite ファイル（中断した検査の再開用）。Qt 非依存。
+
+フォルダ（再帰表示ではルート）ごとに、名前 → ``(mtime, size, error)`` を保存する。
+``error`` が空文字なら正常。mtime とサイズが変わっていない名前は検査済みとして扱う。
+接続を作ったスレッドからしか使えないので、worker の中で開いて閉じること。
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from collections.abc import Iterable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    error TEXT NOT NULL,
+    PRIMARY KEY (directory, name)
+)
+"""
+
+
+class IntegrityJournal:
+    """``db_path`` の SQLite ファイルに破損チェックの結果を保存する。"""
+
+    def __init__(self, db_path: str) -> None:
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(db_path)
+        self._db.execute(_SCHEMA)
+
+    def load_directory(self, directory: str) -> dict[str, tuple[float, int, str]]:
+        """``directory`` で検査済みの ``名前 → (mtime, size, error)``"""
+        rows = self._db.execute(
+            "SELECT name, mtime, size, error FROM checks WHERE directory = ?", (directory,)
+        )
+        return {name: (mtime, size, error) for name, mtime, size, error in rows}
+
+    def store(self, directory: str, entries: Iterable[tuple[str, float, int, str]]) -> None:
+        """``(名前, mtime, size, error)`` をまとめて保存する"""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO checks VALUES (?, ?, ?, ?, ?)",
+                ((directory, *entry) for entry in entries),
+            )
+
+    def forget_directory(self, directory: str) -> None:
+        """``directory`` の記録を消す（最初から検査し直す場合）"""
+        with self._db:
+            self._db.execute("DELETE FROM checks WHERE directory = ?", (directory,))
+
+    def close(self) -> None:
+        self._db.close()
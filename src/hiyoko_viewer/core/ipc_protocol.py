@@ -0,0 +1,57 @@
+"""2 番目以降のインスタンスから実行中のインスタンスへファイルパスを渡すときの形式。Qt 非依存。
+
+1 通のメッセージは「本体の長さ（4 バイト、ビッグエンディアン）+ 本体」で、本体はパスを
+NUL 区切りにした UTF-8。NUL はパスに含まれないので区切りに使え、改行を含むパスも渡せる。
+パスが 1 つも無いメッセージ（本体が空）は「ウィンドウを前面に出すだけ」を表す。
+
+受け取る側はソケットに届いた分を :class:`MessageBuffer` へ順に渡すだけでよく、
+メッセージが途中で切れて届いても、複数がまとめて届いても組み立て直せる。
+"""
+
+from __future__ import annotations
+
+import struct
+
+_HEADER = struct.Struct(">I")
+_SEPARATOR = "\0"
+
+# これより長いメッセージは壊れた（あるいは無関係な）相手とみなす
+MAX_MESSAGE_BYTES = 4 * 1024 * 1024
+
+
+def encode_message(paths: list[str]) -> bytes:
+    """``paths`` を 1 通のメッセージにする"""
+    body = _SEPARATOR.join(paths).encode("utf-8", errors="surrogateescape")
+    if len(body) > MAX_MESSAGE_BYTES:
+        raise ValueError(f"message too large: {len(body)} bytes")
+    return _HEADER.pack(len(body)) + body
+
+
+class MessageBuffer:
+    """ソケットから届いたバイト列をためて、揃ったメッセージからパスのリストに戻す。"""
+
+    def __init__(self) -> None:
+        self._pending = bytearray()
+
+    def feed(self, data: bytes) -> list[list[str]]:
+        """``data`` を追加し、これで揃ったメッセージを届いた順に返す。
+
+        長さが ``MAX_MESSAGE_BYTES`` を超えるメッセージが来たら ``ValueError`` を送出する
+        （以降の区切りを信用できないので、呼び出し側は接続を切ること）。
+        """
+        self._pending += data
+        messages = []
+        offset = 0
+        while len(self._pending) - offset >= _HEADER.size:
+            (length,) = _HEADER.unpack_from(self._pending, offset)
+            if length > MAX_MESSAGE_BYTES:
+                raise ValueError(f"message too large: {length} bytes")
+            end = offset + _HEADER.size + length
+            if len(self._pending) < end:
+                break
+            body = bytes(self._pending[offset + _HEADER.size : end])
+            text = body.decode("utf-8", errors="surrogateescape")
+            messages.append(text.split(_SEPARATOR) if text else [])
+            offset = end
+        del self._pending[:offset]
+        return messages
@@ -0,0 +1,405 @@
+"""JPEG XL のエントロピー符号（ANS / プレフィックス符号）の復号。Qt 非依存。
+
+フレーム数を数えるためにヘッダを読み飛ばすとき、圧縮された ICC プロファイルと並べ替えた
+TOC はこの符号で書かれていて、復号しないと長さが分からない（ISO/IEC 18181-1 附属書 C）。
+画素の復号には使わず、読む記号も高々数千なので、速さよりも仕様との対応の分かりやすさを
+優先している。
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple, Protocol
+
+_ANS_LOG_TAB_SIZE = 12
+_ANS_TAB_SIZE = 1 << _ANS_LOG_TAB_SIZE
+_PREFIX_MAX_BITS = 15
+_LZ77_WINDOW_MASK = (1 << 20) - 1
+
+# 複雑なプレフィックス符号の「符号長の符号」の符号長が並ぶ順
+_CODE_LENGTH_ORDER = (1, 2, 3, 4, 0, 5, 17, 6, 16, 7, 8, 9, 10, 11, 12, 13, 14, 15)
+# ANS の分布の対数の符号（(ビット数, 読んだ順に下位から詰めた値) → 対数）
+_LOG_COUNT_CODES = {
+    (3, 0b000): 10,
+    (3, 0b010): 7,
+    (3, 0b100): 6,
+    (3, 0b101): 8,
+    (3, 0b110): 9,
+    (4, 0b0011): 3,
+    (4, 0b0111): 5,
+    (4, 0b1001): 4,
+    (4, 0b1011): 1,
+    (4, 0b1111): 2,
+    (5, 0b10001): 0,
+    (6, 0b100001): 11,
+    (7, 0b0000001): 12,
+    (7, 0b1000001): 13,
+}
+_LOG_COUNT_RLE = _ANS_LOG_TAB_SIZE + 1
+
+
+class BitSource(Protocol):
+    def bits(self, count: int) -> int: ...
+
+    def u32_value(self, *distributions: tuple[int, int]) -> int: ...
+
+
+def _var_len_uint(reader: BitSource, width_bits: int) -> int:
+    if not reader.bits(1):
+        return 0
+    width = reader.bits(width_bits)
+    return (1 << width) + reader.bits(width)
+
+
+class _UintConfig(NamedTuple):
+    """HybridUintConfig（記号のうち値そのものを表す部分と、追加で読むビット数の決め方）"""
+
+    split_exponent: int
+    msb_in_token: int
+    lsb_in_token: int
+
+
+def _read_uint_config(reader: BitSource, log_alpha_size: int) -> _UintConfig:
+    split_exponent = reader.bits(log_alpha_size.bit_length())
+    msb_in_token = lsb_in_token = 0
+    if split_exponent != log_alpha_size:
+        msb_in_token = reader.bits(split_exponent.bit_length())
+        lsb_in_token = reader.bits((split_exponent - msb_in_token).bit_length())
+    return _UintConfig(split_exponent, msb_in_token, lsb_in_token)
+
+
+def _read_uint(reader: BitSource, config: _UintConfig, token: int) -> int:
+    split = 1 << config.split_exponent
+    if token < split:
+        return token
+    in_token = config.msb_in_token + config.lsb_in_token
+    count = (config.split_exponent - in_token + ((token - split) >> in_token)) & 31
+    low = token & ((1 << config.lsb_in_token) - 1)
+    token >>= config.lsb_in_token
+    high = (1 << config.msb_in_token) | (token & ((1 << config.msb_in_token) - 1))
+    return (((high << count) | reader.bits(count)) << config.lsb_in_token) | low
+
+
+class _PrefixCode:
+    """符号長から作る正準プレフィックス符号（符号は上位ビットから読む）"""
+
+    def __init__(self, lengths: list[int]) -> None:
+        used = [symbol for symbol, length in enumerate(lengths) if length]
+        # 使う記号が 1 つだけなら、ビットを読まずにその記号になる
+        self._single = used[0] if len(used) == 1 else None
+        self._counts = [0] * (_PREFIX_MAX_BITS + 1)
+        for symbol in used:
+            self._counts[lengths[symbol]] += 1
+        self._symbols = sorted(used, key=lambda symbol: (lengths[symbol], symbol))
+
+    def read(self, reader: BitSource) -> int:
+        if self._single is not None:
+            return self._single
+        code = first = index = 0
+        for count in self._counts[1:]:
+            code |= reader.bits(1)
+            if code - first < count:
+                return self._symbols[index + code - first]
+            index += count
+            first = (first + count) << 1
+            code <<= 1
+        raise ValueError("invalid prefix code")
+
+
+# 符号長の符号を読むための固定の符号
+_CODE_LENGTH_CODE = _PrefixCode([2, 4, 3, 2, 2, 4])
+
+
+def _read_simple_prefix_code(reader: BitSource, alphabet_size: int) -> _PrefixCode:
+    width = (alphabet_size - 1).bit_length()
+    symbols = [reader.bits(width) for _ in range(reader.bits(2) + 1)]
+    if max(symbols) >= alphabet_size:
+        raise ValueError("prefix code symbol out of range")
+    if len(symbols) == 4:
+        code_lengths = (1, 2, 3, 3) if reader.bits(1) else (2, 2, 2, 2)
+    else:
+        code_lengths = ((1,), (1, 1), (1, 2, 2))[len(symbols) - 1]
+    lengths = [0] * alphabet_size
+    for symbol, length in zip(symbols, code_lengths, strict=True):
+        lengths[symbol] = length
+    return _PrefixCode(lengths)
+
+
+def _read_prefix_code(reader: BitSource, alphabet_size: int) -> _PrefixCode:
+    """Brotli と同じ形式のプレフィックス符号を読む"""
+    if alphabet_size == 1:
+        return _PrefixCode([1])
+    skip = reader.bits(2)
+    if skip == 1:
+        return _read_simple_prefix_code(reader, alphabet_size)
+    code_length_lengths = [0] * len(_CODE_LENGTH_ORDER)
+    space = 32
+    for symbol in _CODE_LENGTH_ORDER[skip:]:
+        length = _CODE_LENGTH_CODE.read(reader)
+        code_length_lengths[symbol] = length
+        if length:
+            space -= 32 >> length
+            if space <= 0:
+                break
+    code_length_code = _PrefixCode(code_length_lengths)
+
+    lengths = [0] * alphabet_size
+    symbol = 0
+    previous = 8
+    repeat = repeat_length = 0
+    space = 1 << _PREFIX_MAX_BITS
+    while symbol < alphabet_size and space > 0:
+        length = code_length_code.read(reader)
+        if length < 16:
+            repeat = 0
+            lengths[symbol] = length
+            symbol += 1
+            if length:
+                previous = length
+                space -= (1 << _PREFIX_MAX_BITS) >> length
+            continue
+        # 16: 直前の符号長を、17: 0 を繰り返す（続けて現れると回数が桁上がりする）
+        extra_bits = 2 if length == 16 else 3
+        new_length = previous if length == 16 else 0
+        if repeat_length != new_length:
+            repeat = 0
+            repeat_length = new_length
+        old_repeat = repeat
+        if repeat > 0:
+            repeat = (repeat - 2) << extra_bits
+        repeat += reader.bits(extra_bits) + 3
+        delta = repeat - old_repeat
+        if symbol + delta > alphabet_size:
+            raise ValueError("prefix code lengths overflow the alphabet")
+        lengths[symbol : symbol + delta] = [repeat_length] * delta
+        symbol += delta
+        if repeat_length:
+            space -= delta << (_PREFIX_MAX_BITS - repeat_length)
+    return _PrefixCode(lengths)
+
+
+def _read_log_count(reader: BitSource) -> int:
+    value = 0
+    for width in range(1, 8):
+        value |= reader.bits(1) << (width - 1)
+        log_count = _LOG_COUNT_CODES.get((width, value))
+        if log_count is not None:
+            return log_count
+    raise ValueError("invalid ANS log count")
+
+
+def _read_histogram(reader: BitSource) -> list[int]:
+    """ANS の分布（合計 ``_ANS_TAB_SIZE``）を読む"""
+    if reader.bits(1):  # 記号が 1 つか 2 つ
+        symbols = [_var_len_uint(reader, 3) for _ in range(reader.bits(1) + 1)]
+        counts = [0] * (max(symbols) + 1)
+        if len(symbols) == 1:
+            counts[symbols[0]] = _ANS_TAB_SIZE
+        else:
+            counts[symbols[0]] = reader.bits(_ANS_LOG_TAB_SIZE)
+            counts[symbols[1]] = _ANS_TAB_SIZE - counts[symbols[0]]
+        return counts
+    if reader.bits(1):  # 一様
+        size = _var_len_uint(reader, 3) + 1
+        base, remainder = divmod(_ANS_TAB_SIZE, size)
+        return [base + (symbol < remainder) for symbol in range(size)]
+
+    log = 0
+    while log < 3 and reader.bits(1):
+        log += 1
+    shift = (reader.bits(log) | (1 << log)) - 1
+    length = _var_len_uint(reader, 3) + 3
+    log_counts = [0] * length
+    same = [0] * length
+    omit_log = omit_position = -1
+    index = 0
+    while index < length:
+        log_count = _read_log_count(reader)
+        log_counts[index] = log_count
+        if log_count == _LOG_COUNT_RLE:
+            run = _var_len_uint(reader, 3)
+            same[index] = run + 5
+            index += run + 4
+            continue
+        if log_count > omit_log:
+            omit_log, omit_position = log_count, index
+        index += 1
+    if omit_position < 0:
+        raise ValueError("invalid ANS histogram")
+
+    counts = [0] * length
+    total = 0
+    repeat = previous = 0
+    for index in range(length):
+        if same[index]:
+            repeat = same[index] - 1
+            previous = counts[index - 1] if index else 0
+        if repeat > 0:
+            counts[index] = previous
+            repeat -= 1
+        else:
+            log_count = log_counts[index]
+            if index == omit_position or log_count == 0:
+                continue
+            if log_count == 1:
+                counts[index] = 1
+            else:
+                exponent = log_count - 1
+                width = max(0, min(exponent, shift - ((_ANS_LOG_TAB_SIZE - exponent) >> 1)))
+                counts[index] = (1 << exponent) + (reader.bits(width) << (exponent - width))
+        total += counts[index]
+    # 最も大きい記号の数は省かれていて、合計から求める
+    counts[omit_position] = _ANS_TAB_SIZE - total
+    return counts
+
+
+class _AliasTable:
+    """ANS の状態の下位ビットから (記号, 記号内の位置, 頻度) を引く表"""
+
+    def __init__(self, counts: list[int], log_alpha_size: int) -> None:
+        while counts and counts[-1] == 0:
+            counts.pop()
+        if not counts:
+            counts = [_ANS_TAB_SIZE]
+        size = 1 << log_alpha_size
+        if len(counts) > size:
+            raise ValueError("ANS alphabet too large")
+        entry_size = _ANS_TAB_SIZE >> log_alpha_size
+        self._log_entry_size = _ANS_LOG_TAB_SIZE - log_alpha_size
+        self._entry_mask = entry_size - 1
+        # 各項目は (cutoff, 右側の記号, 左側の頻度, 右側の位置のずれ, 右側の頻度)
+        if _ANS_TAB_SIZE in counts:
+            # 記号が 1 つだけなら状態を変えない
+            symbol = counts.index(_ANS_TAB_SIZE)
+            self._entries = [(0, symbol, 0, entry_size * i, _ANS_TAB_SIZE) for i in range(size)]
+            return
+        cutoffs = counts + [0] * (size - len(counts))
+        right = list(range(size))
+        offsets = [0] * size
+        overfull = [i for i in range(len(counts)) if cutoffs[i] > entry_size]
+        underfull = [i for i in range(size) if cutoffs[i] < entry_size]
+        while overfull:
+            over = overfull.pop()
+            under = underfull.pop()
+            cutoffs[over] -= entry_size - cutoffs[under]
+            right[under] = over
+            offsets[under] = cutoffs[over]
+            if cutoffs[over] < entry_size:
+                underfull.append(over)
+            elif cutoffs[over] > entry_size:
+                overfull.append(over)
+
+        def frequency(symbol: int) -> int:
+            return counts[symbol] if symbol < len(counts) else 0
+
+        self._entries = []
+        for i in range(size):
+            if cutoffs[i] == entry_size:
+                entry = (0, i, frequency(i), 0, frequency(i))
+            else:
+                entry = (
+                    cutoffs[i],
+                    right[i],
+                    frequency(i),
+                    offsets[i] - cutoffs[i],
+                    frequency(right[i]),
+                )
+            self._entries.append(entry)
+
+    def lookup(self, value: int) -> tuple[int, int, int]:
+        index = value >> self._log_entry_size
+        position = value & self._entry_mask
+        cutoff, right, frequency, offset, right_frequency = self._entries[index]
+        if position >= cutoff:
+            return right, offset + position, right_frequency
+        return index, position, frequency
+
+
+def _read_context_map(reader: BitSource, size: int) -> list[int]:
+    """文脈 → 分布の番号の対応を読む"""
+    if reader.bits(1):  # 単純な形式
+        width = reader.bits(2)
+        return [reader.bits(width) for _ in range(size)]
+    use_move_to_front = reader.bits(1)
+    decoder = EntropyDecoder(reader, 1)
+    context_map = [decoder.read(0) for _ in range(size)]
+    if use_move_to_front:
+        table = list(range(256))
+        for i, index in enumerate(context_map):
+            context_map[i] = table.pop(index)
+            table.insert(0, context_map[i])
+    return context_map
+
+
+class EntropyDecoder:
+    """``contexts`` 個の文脈の分布を読み、その分布で符号化された整数を順に読む。
+
+    分布の直後から読み始めるので、作った直後から :meth:`read` で続きを読むこと。
+    """
+
+    def __init__(self, reader: BitSource, contexts: int) -> None:
+        self._reader = reader
+        self._lz77 = bool(reader.bits(1))
+        if self._lz77:
+            self._lz77_min_symbol = reader.u32_value((224, 0), (512, 0), (4096, 0), (8, 15))
+            self._lz77_min_length = reader.u32_value((3, 0), (4, 0), (5, 2), (9, 8))
+            self._lz77_length_config = _read_uint_config(reader, 8)
+            # 最後の文脈は LZ77 の距離用
+            contexts += 1
+            self._window = [0] * (_LZ77_WINDOW_MASK + 1)
+            self._decoded = 0
+            self._to_copy = 0
+            self._copy_position = 0
+        self._context_map = _read_context_map(reader, contexts) if contexts > 1 else [0]
+        clusters = max(self._context_map) + 1
+        self._use_prefix_code = bool(reader.bits(1))
+        log_alpha_size = _PREFIX_MAX_BITS if self._use_prefix_code else 5 + reader.bits(2)
+        self._configs = [_read_uint_config(reader, log_alpha_size) for _ in range(clusters)]
+        if self._use_prefix_code:
+            sizes = [_var_len_uint(reader, 4) + 1 for _ in range(clusters)]
+            self._prefix_codes = [_read_prefix_code(reader, size) for size in sizes]
+        else:
+            self._tables = [
+                _AliasTable(_read_histogram(reader), log_alpha_size) for _ in range(clusters)
+            ]
+            self._state = reader.bits(32)
+
+    def _read_token(self, cluster: int) -> int:
+        if self._use_prefix_code:
+            return self._prefix_codes[cluster].read(self._reader)
+        symbol, offset, frequency = self._tables[cluster].lookup(self._state & (_ANS_TAB_SIZE - 1))
+        self._state = frequency * (self._state >> _ANS_LOG_TAB_SIZE) + offset
+        if self._state < 1 << 16:
+            self._state = (self._state << 16) | self._reader.bits(16)
+        return symbol
+
+    def _copy(self) -> int:
+        value = self._window[self._copy_position & _LZ77_WINDOW_MASK]
+        self._copy_position += 1
+        self._to_copy -= 1
+        self._window[self._decoded & _LZ77_WINDOW_MASK] = value
+        self._decoded += 1
+        return value
+
+    def read(self, context: int) -> int:
+        """文脈 ``context`` の分布で整数を 1 つ読む"""
+        if self._lz77 and self._to_copy > 0:
+            return self._copy()
+        cluster = self._context_map[context]
+        token = self._read_token(cluster)
+        if self._lz77 and token >= self._lz77_min_symbol:
+            # 既に読んだ値の並びの繰り返し
+            self._to_copy = (
+                _read_uint(self._reader, self._lz77_length_config, token - self._lz77_min_symbol)
+                + self._lz77_min_length
+            )
+            distance_cluster = self._context_map[-1]
+            distance_token = self._read_token(distance_cluster)
+            distance = _read_uint(self._reader, self._configs[distance_cluster], distance_token)
+            distance = min(distance + 1, self._decoded, _LZ77_WINDOW_MASK + 1)
+            self._copy_position = self._decoded - distance
+            return self._copy()
+        value = _read_uint(self._reader, self._configs[cluster], token)
+        if self._lz77:
+            self._window[self._decoded & _LZ77_WINDOW_MASK] = value
+            self._decoded += 1
+        return value
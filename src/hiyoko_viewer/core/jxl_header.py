@@ -0,0 +1,627 @@
+"""JPEG XL のヘッダだけを読んで、アニメーションかどうかや色の符号化を調べる。Qt 非依存。
+
+imagecodecs にはフレーム数や色空間を返す API が無く、全体をデコードしないと分からない
+（色空間はデコードしても分からない）。コードストリーム先頭の SizeHeader と ImageMetadata を
+ビット単位で読み、``have_animation``・ビット深度・ColourEncoding の伝達特性と原色を
+取り出す（ISO/IEC 18181-1）。
+
+フレーム数は、各フレームの FrameHeader と TOC（各区画のバイト数）だけを読んで次の
+フレームへ読み飛ばしながら数える（画素のデータはデコードしない）。ICC プロファイルと
+並べ替えた TOC はエントロピー符号化されているので、:mod:`.jxl_entropy` で記号だけ復号する。
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import BinaryIO, NamedTuple
+
+from .jxl_entropy import EntropyDecoder
+
+_CODESTREAM_SIGNATURE = b"\xff\x0a"
+_CONTAINER_SIGNATURE = b"\x00\x00\x00\x0cJXL \r\n\x87\n"
+
+
+class _BitReader:
+    """LSB から順にビットを読む"""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+        self._position = 0
+
+    @property
+    def byte_position(self) -> int:
+        return self._position >> 3
+
+    def skip(self, count: int) -> None:
+        """``count`` ビット読み飛ばす。データの外へ出たら IndexError"""
+        self._position += count
+        if self._position > len(self._data) * 8:
+            raise IndexError("bit position out of range")
+
+    def skip_bytes(self, count: int) -> None:
+        self.skip(count * 8)
+
+    def align(self) -> None:
+        """次のバイト境界まで読み飛ばす（ZeroPadToByte）"""
+        self._position = (self._position + 7) & ~7
+
+    def bits(self, count: int) -> int:
+        value = 0
+        for shift in range(count):
+            byte = self._data[self._position >> 3]
+            value |= ((byte >> (self._position & 7)) & 1) << shift
+            self._position += 1
+        return value
+
+    def u32(self, *distributions: int | None) -> None:
+        """U32 を読み飛ばす。各分布は読むビット数（None なら定数でビットを使わない）"""
+        width = distributions[self.bits(2)]
+        if width is not None:
+            self.bits(width)
+
+    def u32_value(self, *distributions: tuple[int, int]) -> int:
+        """U32 を読む。各分布は (加える値, 読むビット数)"""
+        offset, width = distributions[self.bits(2)]
+        return offset + self.bits(width)
+
+    def enum(self) -> int:
+        return self.u32_value((0, 0), (1, 0), (2, 4), (18, 6))
+
+    def u64(self) -> int:
+        selector = self.bits(2)
+        if selector == 0:
+            return 0
+        if selector == 1:
+            return 1 + self.bits(4)
+        if selector == 2:
+            return 17 + self.bits(8)
+        value = self.bits(12)
+        shift = 12
+        while self.bits(1):
+            if shift == 60:
+                value |= self.bits(4) << shift
+                break
+            value |= self.bits(8) << shift
+            shift += 8
+        return value
+
+
+class JxlMetadata(NamedTuple):
+    have_animation: bool
+    bits_per_sample: int
+    float_sample: bool
+    # CICP の番号（ICC プロファイルで指定されている/ガンマ値で指定されている場合は None）
+    transfer: int | None
+    primaries: int | None
+
+
+_TRANSFER_SRGB = 13
+_PRIMARIES_SRGB = 1
+_DEFAULT_METADATA = JxlMetadata(False, 8, False, _TRANSFER_SRGB, _PRIMARIES_SRGB)
+
+# ColourEncoding の列挙値
+_COLOUR_SPACE_GREY = 1
+_COLOUR_SPACE_XYB = 2
+_CUSTOM = 2  # 白色点/原色を xy 座標で指定する
+# ExtraChannelInfo の種類
+_CHANNEL_ALPHA = 0
+_CHANNEL_SPOT_COLOUR = 2
+_CHANNEL_CFA = 5
+
+
+# SizeHeader の ratio（幅を高さから求めるときの 幅/高さ）
+_ASPECT_RATIOS = {1: (1, 1), 2: (12, 10), 3: (4, 3), 4: (3, 2), 5: (16, 9), 6: (5, 4), 7: (2, 1)}
+_SIZE = ((1, 9), (1, 13), (1, 18), (1, 30))
+
+
+def _read_size_header(reader: _BitReader) -> tuple[int, int]:
+    """(幅, 高さ) を読む"""
+    small = reader.bits(1)
+    height = (reader.bits(5) + 1) * 8 if small else reader.u32_value(*_SIZE)
+    ratio = reader.bits(3)
+    if ratio:
+        numerator, denominator = _ASPECT_RATIOS[ratio]
+        return height * numerator // denominator, height
+    width = (reader.bits(5) + 1) * 8 if small else reader.u32_value(*_SIZE)
+    return width, height
+
+
+def _read_preview_header(reader: _BitReader) -> tuple[int, int]:
+    """プレビューの (幅, 高さ) を読む"""
+    div8 = reader.bits(1)
+
+    def read_dimension() -> int:
+        if div8:
+            return 8 * reader.u32_value((16, 0), (32, 0), (1, 5), (33, 9))
+        return reader.u32_value((1, 6), (65, 8), (321, 10), (1345, 12))
+
+    height = read_dimension()
+    ratio = reader.bits(3)
+    if ratio:  # 縦横比の指定が無ければ幅も書かれている
+        numerator, denominator = _ASPECT_RATIOS[ratio]
+        return height * numerator // denominator, height
+    return read_dimension(), height
+
+
+def _read_animation_header(reader: _BitReader) -> bool:
+    """AnimationHeader を読み、have_timecodes を返す"""
+    reader.u32(None, None, 10, 30)  # tps_numerator
+    reader.u32(None, None, 8, 10)  # tps_denominator
+    reader.u32(None, 3, 16, 32)  # num_loops
+    return bool(reader.bits(1))
+
+
+def _read_bit_depth(reader: _BitReader) -> tuple[int, bool]:
+    """(ビット深度, 浮動小数点か) を読む"""
+    if reader.bits(1):
+        bits_per_sample = reader.u32_value((32, 0), (16, 0), (24, 0), (1, 6))
+        reader.bits(4)  # exp_bits
+        return bits_per_sample, True
+    return reader.u32_value((8, 0), (10, 0), (12, 0), (1, 6)), False
+
+
+def _skip_extra_channel_info(reader: _BitReader) -> None:
+    if reader.bits(1):  # all_default（ただのアルファ）
+        return
+    channel_type = reader.enum()
+    _read_bit_depth(reader)
+    reader.u32(None, None, None, 3)  # dim_shift
+    name_length = reader.u32_value((0, 0), (0, 4), (16, 5), (48, 10))
+    reader.bits(8 * name_length)
+    if channel_type == _CHANNEL_ALPHA:
+        reader.bits(1)  # alpha_associated
+    elif channel_type == _CHANNEL_SPOT_COLOUR:
+        reader.bits(4 * 16)  # 色と強さ（F16 x 4）
+    elif channel_type == _CHANNEL_CFA:
+        reader.u32(None, 2, 4, 8)
+
+
+def _skip_custom_xy(reader: _BitReader) -> None:
+    reader.u32(19, 19, 20, 21)
+    reader.u32(19, 19, 20, 21)
+
+
+def _read_colour_encoding(reader: _BitReader) -> tuple[int | None, int | None, bool]:
+    """ColourEncoding を最後まで読み、(伝達特性, 原色, want_icc) を返す"""
+    if reader.bits(1):  # all_default
+        return _TRANSFER_SRGB, _PRIMARIES_SRGB, False
+    want_icc = reader.bits(1)
+    colour_space = reader.enum()
+    if want_icc:
+        # プロファイルは ImageMetadata の後ろでエントロピー符号化されている
+        return None, None, True
+    if colour_space != _COLOUR_SPACE_XYB and reader.enum() == _CUSTOM:  # white_point
+        _skip_custom_xy(reader)
+    primaries = None
+    if colour_space not in (_COLOUR_SPACE_GREY, _COLOUR_SPACE_XYB):
+        primaries = reader.enum()
+        if primaries == _CUSTOM:
+            for _ in range(3):
+                _skip_custom_xy(reader)
+    transfer = None
+    if reader.bits(1):  # have_gamma
+        reader.bits(24)
+    else:
+        transfer = reader.enum()
+    reader.enum()  # rendering_intent
+    return transfer, primaries, False
+
+
+class _MetadataHead(NamedTuple):
+    all_default: bool
+    extra_fields: bool
+    preview: tuple[int, int] | None
+    have_animation: bool
+
+
+def _read_metadata_head(reader: _BitReader) -> _MetadataHead:
+    """ImageMetadata の have_animation までを読む（SizeHeader は読み終えていること）"""
+    if reader.bits(1):  # all_default
+        return _MetadataHead(True, False, None, False)
+    if not reader.bits(1):  # extra_fields
+        return _MetadataHead(False, False, None, False)
+    reader.bits(3)  # orientation
+    if reader.bits(1):  # have_intrinsic_size
+        _read_size_header(reader)
+    preview = _read_preview_header(reader) if reader.bits(1) else None
+    return _MetadataHead(False, True, preview, bool(reader.bits(1)))
+
+
+def _skip_extensions(reader: _BitReader) -> None:
+    extensions = reader.u64()
+    # 拡張ごとのビット数がまとめて先に書かれ、中身はその後に続く
+    reader.skip(sum(reader.u64() for bit in range(64) if extensions >> bit & 1))
+
+
+def _skip_tone_mapping(reader: _BitReader) -> None:
+    if not reader.bits(1):  # all_default
+        reader.skip(16 + 16 + 1 + 16)
+
+
+def _skip_transform_data(reader: _BitReader, xyb_encoded: bool) -> None:
+    """CustomTransformData（ImageMetadata の直後に続く）を読み飛ばす"""
+    if reader.bits(1):  # all_default
+        return
+    if xyb_encoded and not reader.bits(1):  # OpsinInverseMatrix の all_default
+        reader.skip(16 * 16)
+    weights_mask = reader.bits(3)
+    # 2x/4x/8x の拡大の重み（F16）
+    reader.skip(
+        16 * sum(count for bit, count in enumerate((15, 55, 210)) if weights_mask >> bit & 1)
+    )
+
+
+def _codestream(data: bytes) -> bytes:
+    """コンテナ形式ならコードストリームの箱の中身（分割されていれば繋げたもの）を、
+    そうでなければそのまま返す"""
+    if not data.startswith(_CONTAINER_SIGNATURE):
+        return data
+    parts = []
+    offset = 0
+    while offset + 8 <= len(data):
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1:
+            (size,) = struct.unpack_from(">Q", data, offset + 8)
+            header = 16
+        elif size == 0:
+            size = len(data) - offset
+        if size < header:
+            break
+        if box_type == b"jxlc":
+            return data[offset + header : offset + size]
+        if box_type == b"jxlp":
+            # 分割された箱は先頭 4 バイトが通し番号
+            parts.append(data[offset + header + 4 : offset + size])
+        offset += size
+    return b"".join(parts)
+
+
+def read_codestream_head(file: BinaryIO, size: int) -> bytes:
+    """``file`` のコードストリームの先頭 ``size`` バイトを返す（JPEG XL でなければ空）。
+
+    コンテナ形式では箱の見出しだけを読んで読み飛ばすので、コードストリームより前に
+    大きな Exif/XMP の箱があってもファイル全体は読まない。
+    """
+    head = file.read(len(_CONTAINER_SIGNATURE))
+    if head.startswith(_CODESTREAM_SIGNATURE):
+        return (head + file.read(max(0, size - len(head))))[:size]
+    if head != _CONTAINER_SIGNATURE:
+        return b""
+    while len(box := file.read(8)) == 8:
+        box_size, box_type = struct.unpack(">I4s", box)
+        header = 8
+        if box_size == 1:
+            extended = file.read(8)
+            if len(extended) < 8:
+                break
+            (box_size,) = struct.unpack(">Q", extended)
+            header = 16
+        if box_type in (b"jxlc", b"jxlp"):
+            if box_type == b"jxlp":
+                # 分割された箱は先頭 4 バイトが通し番号
+                file.read(4)
+            return file.read(size)
+        if box_size < header:
+            break
+        file.seek(box_size - header, os.SEEK_CUR)
+    return b""
+
+
+def has_animation(data: bytes) -> bool:
+    """JPEG XL の ``data``（ファイルの先頭部分でよい）がアニメーションなら True"""
+    codestream = _codestream(data)
+    if not codestream.startswith(_CODESTREAM_SIGNATURE):
+        return False
+    reader = _BitReader(codestream[2:])
+    try:
+        _read_size_header(reader)
+        return _read_metadata_head(reader).have_animation
+    except IndexError:
+        return False
+
+
+def read_metadata(data: bytes) -> JxlMetadata | None:
+    """JPEG XL の ``data`` の ImageMetadata を読む。JPEG XL でない/途中で切れていれば None"""
+    codestream = _codestream(data)
+    if not codestream.startswith(_CODESTREAM_SIGNATURE):
+        return None
+    reader = _BitReader(codestream[2:])
+    try:
+        _read_size_header(reader)
+        head = _read_metadata_head(reader)
+        if head.all_default:
+            return _DEFAULT_METADATA
+        have_animation = head.have_animation
+        if have_animation:
+            _read_animation_header(reader)
+        bits_per_sample, float_sample = _read_bit_depth(reader)
+        reader.bits(1)  # modular_16bit_buffers
+        for _ in range(reader.u32_value((0, 0), (1, 0), (2, 4), (1, 12))):
+            _skip_extra_channel_info(reader)
+        reader.bits(1)  # xyb_encoded
+        transfer, primaries, _ = _read_colour_encoding(reader)
+    except IndexError:
+        return None
+    return JxlMetadata(have_animation, bits_per_sample, float_sample, transfer, primaries)
+
+
+class _ImageInfo(NamedTuple):
+    """フレームを読み飛ばすのに要る、画像全体のヘッダの値"""
+
+    width: int
+    height: int
+    xyb_encoded: bool
+    extra_channels: int
+    have_animation: bool
+    have_timecodes: bool
+    preview: tuple[int, int] | None
+
+
+# FrameHeader の frame_type
+_FRAME_REGULAR = 0
+_FRAME_LF = 1
+_FRAME_REFERENCE_ONLY = 2
+_FRAME_SKIP_PROGRESSIVE = 3
+# FrameHeader の flags の use_lf_frame
+_FLAG_USE_LF_FRAME = 0x20
+# BlendingInfo の mode
+_BLEND_REPLACE = 0
+_BLEND_BLEND = 2
+_BLEND_ALPHA_WEIGHTED_ADD = 3
+_BLEND_MUL = 4
+# YCbCr の色差の間引き（jpeg_upsampling の値 → 横/縦の縮小の段数）
+_CHROMA_SHIFTS = ((0, 0), (1, 1), (1, 0), (0, 1))
+_FRAME_CROP = ((0, 8), (256, 11), (2304, 14), (18688, 30))
+_TOC_ENTRY = ((0, 10), (1024, 14), (17408, 22), (4211712, 30))
+# エントロピー符号の文脈の数
+_ICC_CONTEXTS = 41
+_PERMUTATION_CONTEXTS = 8
+_MAX_ICC_SIZE = 1 << 28
+
+
+def _icc_byte_kind(byte: int, wide: bool) -> int:
+    """ICC プロファイルの文脈を決めるバイトの種類（``wide`` は直前のバイトの細かい分類）"""
+    if 0x61 <= byte <= 0x7A or 0x41 <= byte <= 0x5A:
+        return 0
+    if 0x30 <= byte <= 0x39 or byte in (0x2E, 0x2C):
+        return 1
+    if not wide:
+        return 2 if byte < 16 else 3 if byte > 240 else 4
+    if byte < 2:
+        return 2 + byte
+    if byte < 16:
+        return 4
+    return 6 if byte == 255 else 5 if byte > 240 else 7
+
+
+def _skip_icc(reader: _BitReader) -> None:
+    """圧縮された ICC プロファイルを読み飛ばす（記号は前の 2 バイトで決まる文脈で復号する）"""
+    size = reader.u64()
+    if size > _MAX_ICC_SIZE:
+        raise ValueError("ICC profile too large")
+    decoder = EntropyDecoder(reader, _ICC_CONTEXTS)
+    previous = previous2 = 0
+    for index in range(size):
+        context = 0
+        if index > 128:
+            context = 1 + _icc_byte_kind(previous, True) + 8 * _icc_byte_kind(previous2, False)
+        previous2, previous = previous, decoder.read(context) & 0xFF
+
+
+def _permutation_context(value: int) -> int:
+    return min(7, value.bit_length())
+
+
+def _skip_permutation(reader: _BitReader, size: int) -> None:
+    """TOC の並べ替え（Lehmer 符号）を読み飛ばす"""
+    decoder = EntropyDecoder(reader, _PERMUTATION_CONTEXTS)
+    previous = 0
+    for _ in range(decoder.read(_permutation_context(size))):
+        previous = decoder.read(_permutation_context(previous))
+
+
+def _read_image_info(reader: _BitReader) -> _ImageInfo:
+    """SizeHeader から ICC プロファイルまで、最初のフレーム（かプレビュー）の手前までを読む"""
+    width, height = _read_size_header(reader)
+    head = _read_metadata_head(reader)
+    xyb_encoded = True
+    extra_channels = 0
+    have_timecodes = False
+    want_icc = False
+    if not head.all_default:
+        if head.have_animation:
+            have_timecodes = _read_animation_header(reader)
+        _read_bit_depth(reader)
+        reader.bits(1)  # modular_16bit_buffers
+        extra_channels = reader.u32_value((0, 0), (1, 0), (2, 4), (1, 12))
+        for _ in range(extra_channels):
+            _skip_extra_channel_info(reader)
+        xyb_encoded = bool(reader.bits(1))
+        want_icc = _read_colour_encoding(reader)[2]
+        if head.extra_fields:
+            _skip_tone_mapping(reader)
+        _skip_extensions(reader)
+    _skip_transform_data(reader, xyb_encoded)
+    if want_icc:
+        _skip_icc(reader)
+    reader.align()
+    return _ImageInfo(
+        width,
+        height,
+        xyb_encoded,
+        extra_channels,
+        head.have_animation,
+        have_timecodes,
+        head.preview,
+    )
+
+
+def _skip_passes(reader: _BitReader) -> int:
+    """Passes を読み、パスの数を返す"""
+    passes = reader.u32_value((1, 0), (2, 0), (3, 0), (4, 3))
+    if passes != 1:
+        downsamples = reader.u32_value((0, 0), (1, 0), (2, 0), (3, 1))
+        reader.bits(2 * (passes - 1))  # shift
+        reader.bits(2 * downsamples)  # downsample
+        for _ in range(downsamples):
+            reader.u32_value((0, 0), (1, 0), (2, 0), (0, 3))  # last_pass
+    return passes
+
+
+def _skip_blending_info(reader: _BitReader, extra_channels: int, partial: bool) -> int:
+    """BlendingInfo を読み、mode を返す"""
+    mode = reader.u32_value((0, 0), (1, 0), (2, 0), (3, 2))
+    uses_alpha = extra_channels > 0 and mode in (_BLEND_BLEND, _BLEND_ALPHA_WEIGHTED_ADD)
+    if uses_alpha:
+        reader.u32_value((0, 0), (1, 0), (2, 0), (3, 3))  # alpha_channel
+    if uses_alpha or mode == _BLEND_MUL:
+        reader.bits(1)  # clamp
+    if mode != _BLEND_REPLACE or partial:
+        reader.bits(2)  # source
+    return mode
+
+
+def _skip_loop_filter(reader: _BitReader, modular: bool) -> None:
+    if reader.bits(1):  # all_default
+        return
+    if reader.bits(1) and reader.bits(1):  # gab と gab_custom
+        reader.skip(6 * 16)
+    if reader.bits(2):  # epf_iters
+        if not modular and reader.bits(1):  # epf_sharp_custom
+            reader.skip(8 * 16)
+        if reader.bits(1):  # epf_weight_custom
+            reader.skip(5 * 16)
+        if reader.bits(1):  # epf_sigma_custom
+            reader.skip((3 if modular else 4) * 16)
+        if modular:
+            reader.skip(16)  # epf_sigma_for_modular
+    _skip_extensions(reader)
+
+
+def _unpack_signed(value: int) -> int:
+    """符号付きの値に戻す（偶数は正、奇数は負）"""
+    return (value >> 1) ^ -(value & 1)
+
+
+def _ceil_div(value: int, divisor: int) -> int:
+    return -(-value // divisor)
+
+
+def _skip_frame(reader: _BitReader, image: _ImageInfo) -> tuple[bool, bool]:
+    """FrameHeader と TOC を読んでフレームを読み飛ばし、(表示されるか, 最後のフレームか) を返す"""
+    frame_type = _FRAME_REGULAR
+    modular = False
+    upsampling = 1
+    group_shift = 1
+    chroma_shift = (0, 0)
+    passes = 1
+    lf_level = 0
+    width, height = image.width, image.height
+    partial = False
+    blend_mode = _BLEND_REPLACE
+    duration = 0
+    is_last = True
+    if not reader.bits(1):  # all_default
+        frame_type = reader.bits(2)
+        modular = bool(reader.bits(1))
+        flags = reader.u64()
+        ycbcr = not image.xyb_encoded and reader.bits(1)
+        if not flags & _FLAG_USE_LF_FRAME:
+            if ycbcr:
+                shifts = [_CHROMA_SHIFTS[reader.bits(2)] for _ in range(3)]
+                chroma_shift = (max(h for h, _ in shifts), max(v for _, v in shifts))
+            upsampling = 1 << reader.bits(2)
+            reader.bits(2 * image.extra_channels)  # ec_upsampling
+        if modular:
+            group_shift = reader.bits(2)
+        elif image.xyb_encoded:
+            reader.bits(3 + 3)  # x_qm_scale, b_qm_scale
+        if frame_type != _FRAME_REFERENCE_ONLY:
+            passes = _skip_passes(reader)
+        normal = frame_type in (_FRAME_REGULAR, _FRAME_SKIP_PROGRESSIVE)
+        if frame_type == _FRAME_LF:
+            lf_level = reader.bits(2) + 1
+        elif reader.bits(1):  # have_crop
+            x0 = y0 = 0
+            if normal:
+                x0 = _unpack_signed(reader.u32_value(*_FRAME_CROP))
+                y0 = _unpack_signed(reader.u32_value(*_FRAME_CROP))
+            width = reader.u32_value(*_FRAME_CROP)
+            height = reader.u32_value(*_FRAME_CROP)
+            partial = x0 > 0 or y0 > 0 or x0 + width < image.width or y0 + height < image.height
+        if normal:
+            blend_mode = _skip_blending_info(reader, image.extra_channels, partial)
+            for _ in range(image.extra_channels):
+                _skip_blending_info(reader, image.extra_channels, partial)
+            if image.have_animation:
+                duration = reader.u32_value((0, 0), (1, 0), (0, 8), (0, 32))
+                if image.have_timecodes:
+                    reader.bits(32)
+            is_last = bool(reader.bits(1))
+        else:
+            is_last = False
+        save_as_reference = 0
+        if frame_type != _FRAME_LF and not is_last:
+            save_as_reference = reader.bits(2)
+        if frame_type == _FRAME_REFERENCE_ONLY or (
+            normal
+            and not partial
+            and blend_mode == _BLEND_REPLACE
+            and (duration == 0 or save_as_reference)
+            and not is_last
+        ):
+            reader.bits(1)  # save_before_colour_transform
+        reader.skip_bytes(reader.u32_value((0, 0), (0, 4), (16, 5), (48, 10)))  # name
+        _skip_loop_filter(reader, modular)
+        _skip_extensions(reader)
+    else:
+        normal = True
+
+    # TOC の項目数は、フレームを分割した群（group）と LF 群の数で決まる
+    if lf_level:
+        width = _ceil_div(width, 1 << (3 * lf_level))
+        height = _ceil_div(height, 1 << (3 * lf_level))
+    width = _ceil_div(width, upsampling)
+    height = _ceil_div(height, upsampling)
+    group_dim = 128 << group_shift
+    groups = _ceil_div(width, group_dim) * _ceil_div(height, group_dim)
+    h_shift, v_shift = chroma_shift
+    blocks_x = _ceil_div(width, 8 << h_shift) << h_shift
+    blocks_y = _ceil_div(height, 8 << v_shift) << v_shift
+    lf_groups = _ceil_div(blocks_x, group_dim) * _ceil_div(blocks_y, group_dim)
+    entries = 1 if passes == 1 and groups == 1 else 2 + lf_groups + groups * passes
+    if reader.bits(1):  # permuted
+        _skip_permutation(reader, entries)
+    reader.align()
+    size = sum(reader.u32_value(*_TOC_ENTRY) for _ in range(entries))
+    reader.align()
+    reader.skip_bytes(size)
+    # 時間 0 のフレームは次のフレームに重ねて 1 枚として表示される
+    return normal and (duration > 0 or is_last), is_last
+
+
+def count_frames(data: bytes) -> int | None:
+    """JPEG XL の ``data``（ファイル全体）で表示されるフレームの数。数えられなければ None
+
+    デコーダが 1 枚にまとめて返すフレーム（時間 0 で次に重ねるフレームや参照用のフレーム）と
+    プレビューは数えない。途中で切れたファイルや壊れたファイルは None。
+    """
+    codestream = _codestream(data)
+    if not codestream.startswith(_CODESTREAM_SIGNATURE):
+        return None
+    reader = _BitReader(codestream[2:])
+    try:
+        image = _read_image_info(reader)
+        if image.preview is not None:
+            preview_width, preview_height = image.preview
+            _skip_frame(reader, image._replace(width=preview_width, height=preview_height))
+        frames = 0
+        while True:
+            displayed, is_last = _skip_frame(reader, image)
+            frames += displayed
+            if is_last:
+                return frames
+    except (IndexError, ValueError):
+        return None
@@ -1,10 +1,15 @@
-"""画像メタデータ（AI生成パラメータ等）の抽出。Qt 非依存・PIL のみ。"""
+"""画像メタデータ（AI生成パラメータ等）の抽出。Qt 非依存・PIL のみ。
+
+PIL はメタデータを初めて表示するときに読み込む（起動時には要らない）。
+"""
 
 from __future__ import annotations
 
 import json
+from typing import TYPE_CHECKING
 
-from PIL import Image
+if TYPE_CHECKING:
+    from PIL import Image
 
 NO_METADATA_TEXT = "この画像には表示可能なメタデータが見つかりませんでした。"
 
@@ -97,6 +102,8 @@ def extract_metadata_text(image: Image.Image) -> str:
 
 
 def load_metadata_text(file_path: str) -> str:
+    from PIL import Image
+
     try:
         with Image.open(file_path) as image:
             return extract_metadata_text(image)
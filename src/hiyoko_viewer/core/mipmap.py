@@ -0,0 +1,43 @@
+"""縮小表示用のミップマップ（2 分の 1 ずつの縮小画像の列）の段の決め方。Qt 非依存。
+
+縮小表示はズーム後の大きさ以上の段のうち最も小さいものから拡縮するので、毎回
+フル解像度から縮小するより軽く、小さな倍率でもエイリアシングが出にくい。
+画素の縮小そのものは呼び出し側（worker）が行う。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+BYTES_PER_PIXEL = 4  # 32bit（ARGB）で保持する
+
+
+def pyramid_sizes(width: int, height: int, min_size: int, budget: int) -> list[tuple[int, int]]:
+    """``width`` x ``height`` から 2 分の 1 ずつ縮めた各段の ``(幅, 高さ)`` を大きい順に返す。
+
+    長辺が ``min_size`` を下回る段は作らない。合計が ``budget`` バイトを超える場合は
+    大きい段から省く（小さい段は安く、縮小表示で効果が大きい）。
+    """
+    sizes: list[tuple[int, int]] = []
+    while max(width, height) // 2 >= min_size and min(width, height) >= 2:
+        width, height = width // 2, height // 2
+        sizes.append((width, height))
+    kept: list[tuple[int, int]] = []
+    used = 0
+    for size in reversed(sizes):
+        used += size[0] * size[1] * BYTES_PER_PIXEL
+        if used > budget:
+            break
+        kept.append(size)
+    kept.reverse()
+    return kept
+
+
+def level_for(sizes: Sequence[tuple[int, int]], width: int, height: int) -> int:
+    """``width`` x ``height`` 以上の段のうち最も小さい段の添字。どの段も小さすぎれば -1"""
+    chosen = -1
+    for index, (level_width, level_height) in enumerate(sizes):
+        if level_width < width or level_height < height:
+            break
+        chosen = index
+    return chosen
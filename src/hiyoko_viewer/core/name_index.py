@@ -0,0 +1,81 @@
+"""ファイル名のインクリメンタル検索用インデックス。Qt 非依存。
+
+worker でファイル一覧を読み込んだ直後に構築し、GUI スレッドでは二分探索と
+``str.find`` だけで検索する。10 万件でも 1 キー入力あたり数ミリ秒に収まる。
+
+* 前方一致: 正規化済みファイル名をソートした配列を ``bisect`` で引く
+* 部分一致: 同じ順に改行区切りで連結した 1 本の文字列を ``str.find`` で走査し、
+  各名前の開始オフセット配列を ``bisect`` して名前を特定する（1 つの名前は 1 回だけ返す）
+
+一致には「前方一致 → 部分一致」の順で通し番号（ランク）を振り、``search`` に
+直前のランクを渡すと次の一致を返す（Enter で次候補へ進む操作に使う）。
+"""
+
+from __future__ import annotations
+
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+
+# 検索語の末尾に付けて「この接頭辞で始まる範囲」の上端を作る
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize_name(text: str) -> str:
+    return text.casefold()
+
+
+class NameIndex:
+    """名前テーブル（``ImageFileList`` と同じ並び）に対する検索インデックス。"""
+
+    __slots__ = ("_keys", "_ids", "_haystack", "_offsets")
+
+    def __init__(self, names: Sequence[str]) -> None:
+        # 再帰表示では名前がフォルダ付きの相対パスなので、ファイル名部分だけを対象にする
+        keyed = sorted(
+            (normalize_name(os.path.basename(name)).replace("\n", " "), name_id)
+            for name_id, name in enumerate(names)
+        )
+        self._keys = [key for key, _ in keyed]
+        self._ids = array("q", (name_id for _, name_id in keyed))
+        self._haystack = "\n".join(self._keys)
+        offsets = array("q")
+        position = 0
+        for key in self._keys:
+            offsets.append(position)
+            position += len(key) + 1
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, query: str, after: int = -1) -> tuple[int, int] | None:
+        """ランクが ``after`` より後の最初の一致を ``(rank, name_id)`` で返す。"""
+        query = normalize_name(query)
+        if not query or "\n" in query:
+            return None
+        size = len(self._keys)
+
+        # 1) 前方一致。ソート済みなので連続した範囲になる
+        low = bisect_left(self._keys, query)
+        high = bisect_left(self._keys, query + _MAX_CHAR, low)
+        rank = max(low, after + 1)
+        if rank < high:
+            return rank, self._ids[rank]
+
+        # 2) 部分一致。ランクは size + 一致した名前の連結文字列上の開始位置
+        keys, haystack, offsets = self._keys, self._haystack, self._offsets
+        start = 0
+        if after >= size:
+            slot = bisect_right(offsets, after - size) - 1
+            start = offsets[slot] + len(keys[slot]) + 1
+        while True:
+            found = haystack.find(query, start)
+            if found < 0:
+                return None
+            slot = bisect_right(offsets, found) - 1
+            # 1 つの名前は 1 回だけ返す。前方一致する名前は 1) で返済み
+            start = offsets[slot] + len(keys[slot]) + 1
+            if not keys[slot].startswith(query):
+                return size + offsets[slot], self._ids[slot]
@@ -45,6 +45,16 @@ def _load_windows_logical_comparer():
 _STRCMP_LOGICALW = _load_windows_logical_comparer()
 
 
+def init_collation() -> None:
+    """フォールバックの並べ替えを OS のロケール順にする。起動時に GUI スレッドから 1 回呼ぶ。
+
+    ``setlocale`` はプロセス全体の設定を書き換え、スレッドセーフでもないので、並べ替えの
+    途中（worker スレッド）では呼ばない。呼ばなければ C ロケールの順になる。
+    """
+    if _STRCMP_LOGICALW is None:
+        locale.setlocale(locale.LC_COLLATE, "")
+
+
 def _create_windows_logical_key(comparer=_STRCMP_LOGICALW):
     """Windowsの論理順比較に基づくキーを生成する key 関数を返す。"""
 
@@ -58,16 +68,32 @@ def _create_windows_logical_key(comparer=_STRCMP_LOGICALW):
         return functools.cmp_to_key(_cmp)
 
     # ここから下は非 Windows や DLL が使えないときのフォールバック
-    locale.setlocale(locale.LC_COLLATE, "")  # OS のロケールに合わせる
-    locale_transform = locale.strxfrm
-
     def _fallback_key(path: str):
         name = os.path.basename(path)
         # まずロケール順、同値なら簡易ナチュラル順
-        return (locale_transform(name.casefold()), natural_key(path))
+        return (locale.strxfrm(name.casefold()), natural_key(path))
 
     return _fallback_key
 
 
 # 実際に sorted(..., key=windows_logical_key) で使うキー
 windows_logical_key = _create_windows_logical_key()
+
+
+def tree_folder_key(relative_dir: str):
+    """フォルダ再帰表示でのフォルダの並び替えキー（``root`` からの相対パス。``root`` 自身は ``""``）"""
+    if not relative_dir:
+        return ()
+    return tuple(
+        windows_logical_key(folder) for folder in relative_dir.replace("\\", "/").split("/")
+    )
+
+
+def tree_logical_key(relative_path: str):
+    """フォルダ再帰表示用の並び替えキー（``root`` からの相対パスを受け取る）。
+
+    フォルダごとにまとめ（:func:`tree_folder_key` の順）、同じフォルダ内ではファイルを
+    サブフォルダより先に、各階層の名前は :data:`windows_logical_key` と同じ論理順で並べる。
+    """
+    folder, _, name = relative_path.replace("\\", "/").rpartition("/")
+    return (tree_folder_key(folder), windows_logical_key(name))
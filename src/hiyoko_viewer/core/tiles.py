@@ -0,0 +1,48 @@
+"""拡大表示を正方形のタイルに分けて描くときの、タイルの番号付けと範囲。Qt 非依存。
+
+タイルは表示サイズ（ズーム段）ごとに左上から ``(列, 行)`` で数え、右端/下端のタイルは
+表示サイズで切り詰める。ラスタライズそのものは呼び出し側（worker）が行う。
+"""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class TileKey(NamedTuple):
+    """どの表示サイズの、どのタイルか"""
+
+    width: int
+    height: int
+    column: int
+    row: int
+
+
+def tile_bounds(key: TileKey, tile_size: int) -> tuple[int, int, int, int]:
+    """``key`` のタイルが表示上で占める ``(x, y, 幅, 高さ)``"""
+    x, y = key.column * tile_size, key.row * tile_size
+    return x, y, min(tile_size, key.width - x), min(tile_size, key.height - y)
+
+
+def visible_tiles(
+    width: int, height: int, left: int, top: int, right: int, bottom: int, tile_size: int
+) -> list[TileKey]:
+    """``width`` x ``height`` の表示のうち、``[left, right) x [top, bottom)`` にかかるタイル。
+
+    見えている範囲の中央に近いものから順に返す（先に描けたものから鮮明になるため）。
+    """
+    left, top = max(0, left), max(0, top)
+    right, bottom = min(width, right), min(height, bottom)
+    if right <= left or bottom <= top:
+        return []
+    columns = range(left // tile_size, (right - 1) // tile_size + 1)
+    rows = range(top // tile_size, (bottom - 1) // tile_size + 1)
+    center_x, center_y = (left + right) / 2, (top + bottom) / 2
+
+    def distance(key: TileKey) -> float:
+        x, y, w, h = tile_bounds(key, tile_size)
+        return abs(x + w / 2 - center_x) + abs(y + h / 2 - center_y)
+
+    return sorted(
+        (TileKey(width, height, column, row) for row in rows for column in columns), key=distance
+    )
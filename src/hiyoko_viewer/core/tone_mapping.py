@@ -0,0 +1,135 @@
+"""HDR（PQ / HLG）の画素を SDR の 8bit へトーンマッピングする。Qt 非依存。
+
+HDR の符号値は輝度に対して PQ（SMPTE ST 2084）や HLG（ARIB STD-B67）の曲線で
+符号化されているので、線形に 8bit へ縮めると中間調が持ち上がって白っぽく見える。
+符号値 → 輝度（EOTF）→ 圧縮 → sRGB の曲線、を符号値ごとに前もって計算した LUT にし、
+画素には LUT を 1 回引くだけにする。
+
+* 輝度は ``HDR_REFERENCE_WHITE_NITS`` を SDR の白 (1.0) とする相対値に直す
+* 基準白の ``HDR_TONE_MAP_KNEE`` 倍まではそのまま、それを超えた分は
+  ``HDR_PEAK_NITS`` がちょうど 1.0 になるよう拡張 Reinhard で滑らかに圧縮する
+* チャンネルごとに同じ曲線を掛ける（原色は変えないので、色域の変換は呼び出し側が
+  プロファイルを付けて色変換に任せる）
+
+変換は ``TONE_MAP_TILE_PIXELS`` 画素ずつ出力配列へ書き込むので、作業用の一時配列
+（浮動小数点の画素を LUT の添字にしたもの等）は画像の大きさによらず一定で済む。
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from importlib import import_module
+
+from ..config.constants import (
+    HDR_PEAK_NITS,
+    HDR_REFERENCE_WHITE_NITS,
+    HDR_TONE_MAP_KNEE,
+    TONE_MAP_TILE_PIXELS,
+)
+
+# 伝達特性の番号（ITU-T H.273 の CICP。JPEG XL の TransferFunction も同じ番号）
+TRANSFER_SRGB = 13
+TRANSFER_PQ = 16
+TRANSFER_HLG = 18
+HDR_TRANSFERS = frozenset({TRANSFER_PQ, TRANSFER_HLG})
+
+# SMPTE ST 2084
+_PQ_M1 = 2610 / 16384
+_PQ_M2 = 2523 / 4096 * 128
+_PQ_C1 = 3424 / 4096
+_PQ_C2 = 2413 / 4096 * 32
+_PQ_C3 = 2392 / 4096 * 32
+_PQ_MAX_NITS = 10000.0
+
+# ARIB STD-B67（ITU-R BT.2100 の HLG）
+_HLG_A = 0.17883277
+_HLG_B = 1 - 4 * _HLG_A
+_HLG_C = 0.55991073
+_HLG_SYSTEM_GAMMA = 1.2  # 公称ピーク 1000 nit のディスプレイでの OOTF
+
+
+def _pq_nits(code, np):
+    power = code ** (1 / _PQ_M2)
+    return _PQ_MAX_NITS * (np.maximum(power - _PQ_C1, 0.0) / (_PQ_C2 - _PQ_C3 * power)) ** (
+        1 / _PQ_M1
+    )
+
+
+def _hlg_nits(code, np):
+    scene = np.where(
+        code <= 0.5,
+        code * code / 3,
+        (np.exp((code - _HLG_C) / _HLG_A) + _HLG_B) / 12,
+    )
+    return HDR_PEAK_NITS * scene**_HLG_SYSTEM_GAMMA
+
+
+def _compress_highlights(relative, np):
+    """基準白を 1.0 とする輝度を、ピークが 1.0 になるよう圧縮する（膝より下はそのまま）"""
+    knee = HDR_TONE_MAP_KNEE
+    peak = (HDR_PEAK_NITS / HDR_REFERENCE_WHITE_NITS - knee) / (1 - knee)
+    over = np.maximum(relative - knee, 0.0) / (1 - knee)
+    shoulder = knee + (1 - knee) * over * (1 + over / (peak * peak)) / (1 + over)
+    return np.clip(np.where(relative <= knee, relative, shoulder), 0.0, 1.0)
+
+
+def _srgb_encode(linear, np):
+    return np.where(
+        linear <= 0.0031308,
+        linear * 12.92,
+        1.055 * np.power(linear, 1 / 2.4) - 0.055,
+    )
+
+
+@lru_cache(maxsize=8)
+def linear_lut(bit_depth: int):
+    """``bit_depth`` ビットの符号値をそのまま 8bit へ縮める LUT"""
+    np = import_module("numpy")
+    full_scale = (1 << bit_depth) - 1
+    return np.round(np.arange(full_scale + 1) * (255.0 / full_scale)).astype(np.uint8)
+
+
+@lru_cache(maxsize=8)
+def hdr_lut(transfer: int, bit_depth: int):
+    """``bit_depth`` ビットの PQ / HLG 符号値 → sRGB 曲線の 8bit の LUT"""
+    np = import_module("numpy")
+    code = np.arange(1 << bit_depth, dtype=np.float64) / ((1 << bit_depth) - 1)
+    if transfer == TRANSFER_PQ:
+        nits = _pq_nits(code, np)
+    elif transfer == TRANSFER_HLG:
+        nits = _hlg_nits(code, np)
+    else:
+        raise ValueError(f"not an HDR transfer function: {transfer}")
+    linear = _compress_highlights(nits / HDR_REFERENCE_WHITE_NITS, np)
+    return np.round(_srgb_encode(linear, np) * 255.0).astype(np.uint8)
+
+
+def apply_lut(array, lut, *, alpha: bool = False, tile_pixels: int = TONE_MAP_TILE_PIXELS):
+    """``array`` の各画素に ``lut`` を引いた uint8 の配列を返す。
+
+    ``alpha`` なら最後の軸の末尾をアルファとみなし、曲線を掛けずに線形に縮める。
+    整数の画素は LUT の範囲外なら端の値に丸め、浮動小数点の画素は 0..1 を
+    LUT の全域へ対応させる。
+    """
+    np = import_module("numpy")
+    out = np.empty(array.shape, dtype=np.uint8)
+    if alpha:
+        channels = array.shape[-1]
+        source = array.reshape(-1, channels)
+        target = out.reshape(-1, channels)
+        alpha_lut = linear_lut((len(lut) - 1).bit_length())
+    else:
+        source = array.reshape(-1)
+        target = out.reshape(-1)
+    last_code = len(lut) - 1
+    for start in range(0, len(source), tile_pixels):
+        band = source[start : start + tile_pixels]
+        if band.dtype.kind == "f":
+            band = (np.clip(band, 0.0, 1.0) * last_code + 0.5).astype(np.intp)
+        band_out = target[start : start + tile_pixels]
+        if alpha:
+            np.take(lut, band[:, :-1], out=band_out[:, :-1], mode="clip")
+            np.take(alpha_lut, band[:, -1], out=band_out[:, -1], mode="clip")
+        else:
+            np.take(lut, band, out=band_out, mode="clip")
+    return out
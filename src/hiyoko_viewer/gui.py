@@ -0,0 +1,119 @@
+"""最初のインスタンスだけが実行する GUI の起動。
+
+``QApplication`` と ``ImageViewer``（ウィジェット/ミックスイン一式）はここで初めて
+読み込む。2 番目以降のインスタンスは :mod:`hiyoko_viewer.app` でパスを渡して終わるので、
+このモジュールを import しない。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+
+from PyQt6.QtCore import QMetaObject, QSharedMemory, Qt
+from PyQt6.QtGui import QIcon
+from PyQt6.QtWidgets import QApplication
+
+from .app import APP_UNIQUE_KEY
+from .core.resources import resource_path
+from .core.sorting import init_collation
+from .services.instance_server import InstanceServer
+from .ui.main_window import ImageViewer
+
+logger = logging.getLogger(__name__)
+
+
+def run_viewer(shared_memory: QSharedMemory) -> int:
+    """ビューアを起動してイベントループを回し、終了コードを返す。
+
+    ``shared_memory`` は二重起動防止に確保したもので、終了時に解放する。
+    """
+    app = QApplication(sys.argv)
+    # 一覧の並べ替えは worker スレッドで行うので、ロケールはスレッドを作る前に設定しておく
+    init_collation()
+    # app.setPalette() よりも強力なスタイルシートで、デフォルトのウィンドウ背景を上書きする
+    # これにより、OSがウィンドウの「器」を作成する際のデフォルト色を制御する
+    app.setStyleSheet("QMainWindow { background-color: #2d2d2d; }")
+    app.setQuitOnLastWindowClosed(False)
+
+    app_icon_path = resource_path("app_icon.ico")
+    if os.path.exists(app_icon_path):
+        app.setWindowIcon(QIcon(app_icon_path))
+
+    viewer = ImageViewer()
+
+    # 2番目のインスタンスからファイルパスを受け取るためのサーバーをセットアップ
+    instance_server = InstanceServer(app)
+    instance_server.paths_received.connect(viewer.open_forwarded_paths)
+    # listen できないと2個目以降の起動からファイルを受け取れない（致命ではないので続行）
+    instance_server.listen(APP_UNIQUE_KEY)
+
+    # 最初の起動時の引数を処理
+    if len(sys.argv) > 1:
+        initial_file_path = sys.argv[1]
+        viewer.load_image_from_path(initial_file_path)
+
+    viewer.show()
+
+    def cleanup_on_quit():
+        # ウィンドウ状態の保存はワーカー停止より先に行う。
+        # （後段の wait が万一固まっても設定だけは確実に残す）
+        viewer._save_settings()
+        viewer.stop_animation()
+
+        # 再帰スキャン/兄弟フォルダの先読み/ヘッダ読み/ハッシュ計算/破損チェック/SVG 描画/アニメーションのデコードの途中なら
+        # 打ち切らせてからスレッドを止める
+        viewer.tree_scanner.cancel_older_than(viewer._load_generation + 1)
+        viewer.sibling_prefetcher.cancel_older_than(viewer._load_generation + 1)
+        viewer.file_probe.cancel_older_than(viewer._load_generation + 1)
+        viewer.duplicate_finder.cancel_older_than(viewer._load_generation + 1)
+        viewer.integrity_checker.cancel_older_than(viewer._load_generation + 1)
+        viewer.svg_tiler.cancel_older_than(viewer._svg_tile_request + 1)
+        for thread in (
+            viewer.scan_thread,
+            viewer.prefetch_thread,
+            viewer.probe_thread,
+            viewer.hash_thread,
+            viewer.integrity_thread,
+            viewer.svg_thread,
+            viewer.animation_thread,
+        ):
+            thread.quit()
+            if not thread.wait(3000):
+                logger.warning("background thread did not finish in time; terminating")
+                thread.terminate()
+                thread.wait(1000)
+
+        # まとめ待ちのごみ箱送りを実行させてから止める。移動のコピー中に terminate すると
+        # 中途半端なファイルが残るため、こちらは強制終了せずに待つ
+        QMetaObject.invokeMethod(
+            viewer.file_operations, "flush", Qt.ConnectionType.BlockingQueuedConnection
+        )
+        viewer.file_ops_thread.quit()
+        if not viewer.file_ops_thread.wait(30000):
+            logger.warning("file operation thread did not finish in time")
+
+        viewer.worker_thread.quit()
+        # 画像ロード中などで終わらない場合に GUI が終了不能になるのを避けるためタイムアウトを付ける
+        if not viewer.worker_thread.wait(3000):
+            current_file = (
+                viewer.image_files[viewer.current_index]
+                if 0 <= viewer.current_index < len(viewer.image_files)
+                else None
+            )
+            logger.warning(
+                "worker thread did not finish in time; terminating; current_index=%s current_file=%s",
+                getattr(viewer, "current_index", None),
+                current_file,
+            )
+            # terminate は任意地点で worker を停止するため deleteLater が走らない可能性がある（終了時の最終保険）
+            viewer.worker_thread.terminate()
+            viewer.worker_thread.wait(1000)
+
+        # 共有メモリを解放する
+        shared_memory.detach()
+
+    app.aboutToQuit.connect(cleanup_on_quit)
+
+    return app.exec()
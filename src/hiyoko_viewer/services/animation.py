@@ -0,0 +1,366 @@
+"""アニメーション画像（GIF / アニメーション WebP / APNG / アニメーション JPEG XL）の
+フレームをバックグラウンドスレッドでデコードするワーカー。
+
+GUI スレッドではデコードも拡縮もしない。worker がフレームを順にデコードして表示サイズへ
+縮小し、表示時間と一緒に渡す。先読みは GUI が受け取った分だけ補充させる（待ち行列は
+``ANIMATION_QUEUE_SIZE`` 枚まで）ので、デコードが表示より速くてもメモリは増えない。
+デコードしたフレームは :class:`~hiyoko_viewer.core.frame_cache.FrameCache` に残し、
+2 周目以降の再生やコマ戻し/任意のフレームへの移動ではデコードし直さない。
+ファイルは開いたときに丸ごと読み込み、再生中にハンドルを掴まない（仕分けの移動を妨げない）。
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Protocol
+
+from PyQt6.QtCore import QBuffer, QByteArray, QIODevice, QObject, Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QColorSpace, QImage, QImageReader
+
+from ..config.constants import (
+    ANIMATION_CACHE_BYTES,
+    ANIMATION_DEFAULT_FRAME_MS,
+    ANIMATION_QUEUE_SIZE,
+)
+from ..core.animation_header import may_be_animated
+from ..core.frame_cache import FrameCache
+from ..core.frame_pacing import frame_delay
+from ..core.jxl_header import count_frames, read_metadata
+from .color_management import ColorManager
+from .image_loader import _as_uint8_array, _jxl_color_space
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+
+class AnimationSource(Protocol):
+    frame_count: int
+
+    def read(self, index: int) -> tuple[QImage, int]:
+        """``index`` 番目のフレームと表示時間（ミリ秒）。先頭から順に読むこと"""
+        ...
+
+    def first_duration(self) -> int:
+        """先頭フレームの表示時間（ミリ秒）。以降は 2 枚目から読めるようにする
+
+        先頭フレームは ImageLoader がデコードして表示済みなので、デコードせずに分かる形式では
+        デコードしない。
+        """
+        ...
+
+
+def _qimage_from_pillow(frame: Image.Image) -> QImage:
+    rgba = frame.convert("RGBA")
+    width, height = rgba.size
+    return QImage(
+        rgba.tobytes(), width, height, width * 4, QImage.Format.Format_RGBA8888
+    ).convertToFormat(QImage.Format.Format_ARGB32_Premultiplied)
+
+
+class _QtAnimation:
+    """GIF / WebP。Qt のデコーダは Pillow より速い（大きな GIF で約 2 倍）"""
+
+    def __init__(self, data: bytes) -> None:
+        self._data = QByteArray(data)
+        self._rewind()
+        self.frame_count = self._reader.imageCount()
+
+    def _rewind(self) -> None:
+        self._buffer = QBuffer(self._data)
+        self._buffer.open(QIODevice.OpenModeFlag.ReadOnly)
+        self._reader = QImageReader(self._buffer)
+        self._next_index = 0
+
+    def supports_animation(self) -> bool:
+        return self._reader.supportsAnimation() and self._reader.imageCount() > 1
+
+    def read(self, index: int) -> tuple[QImage, int]:
+        if index < self._next_index:
+            # 先頭に戻ってから読み直す（フレームは前のフレームに重ねて描かれるため）
+            self._rewind()
+        while True:
+            image = self._reader.read()
+            if image.isNull():
+                raise OSError(self._reader.errorString())
+            self._next_index += 1
+            if self._next_index > index:
+                break
+        # read() の後の nextImageDelay() は、読んだフレームを表示しておく時間
+        return image, frame_delay(self._reader.nextImageDelay(), ANIMATION_DEFAULT_FRAME_MS)
+
+    def first_duration(self) -> int:
+        # Qt のデコーダは表示時間をフレームを読んだ後にしか返さず、2 枚目も 1 枚目に重ねて
+        # 描くので、ここで先頭フレームを読んで読み位置を進めておく
+        return self.read(0)[1]
+
+
+class _PillowAnimation:
+    """APNG（Qt の PNG デコーダは 1 枚目しか読まない）。重ね合わせは Pillow が行う"""
+
+    def __init__(self, image: Image.Image) -> None:
+        self._image = image
+        self.frame_count = image.n_frames
+
+    def read(self, index: int) -> tuple[QImage, int]:
+        self._image.seek(index)
+        duration = self._image.info.get("duration")
+        image = _qimage_from_pillow(self._image)
+        icc_profile = self._image.info.get("icc_profile")
+        if icc_profile:
+            image.setColorSpace(QColorSpace.fromIccProfile(icc_profile))
+        return image, frame_delay(duration, ANIMATION_DEFAULT_FRAME_MS)
+
+    def first_duration(self) -> int:
+        # 開いた直後は先頭フレームの見出しを読んだところ（画素はまだデコードしていない）
+        self._image.seek(0)
+        return frame_delay(self._image.info.get("duration"), ANIMATION_DEFAULT_FRAME_MS)
+
+
+class _JxlAnimation:
+    """アニメーション JPEG XL。imagecodecs は表示時間を返さないので既定の表示時間で回す
+
+    全フレームを一度にデコードするとフレーム数×画素分のメモリを使うので、``read`` の
+    たびにそのフレームだけをデコードする（残しておくのは FrameCache の予算の範囲だけ）。
+    """
+
+    def __init__(self, data: bytes, frame_count: int, metadata, color_space) -> None:
+        self._data = data
+        self._metadata = metadata
+        self._color_space = color_space
+        self.frame_count = frame_count
+
+    def read(self, index: int) -> tuple[QImage, int]:
+        np = import_module("numpy")
+        frame = import_module("imagecodecs").jpegxl_decode(self._data, index=index)
+        alpha = frame.ndim == 3 and frame.shape[2] in (2, 4)
+        array = np.ascontiguousarray(_as_uint8_array(frame, np, self._metadata, alpha=alpha))
+        if array.ndim == 2:
+            array = np.dstack((array, array, array))
+        elif array.shape[2] == 1:
+            array = np.dstack((array[:, :, 0],) * 3)
+        elif array.shape[2] == 2:
+            gray, alpha = array[:, :, 0], array[:, :, 1]
+            array = np.dstack((gray, gray, gray, alpha))
+        height, width, channels = array.shape
+        image_format = (
+            QImage.Format.Format_RGBA8888 if channels == 4 else QImage.Format.Format_RGB888
+        )
+        image = QImage(array.data, width, height, array.strides[0], image_format).copy()
+        image.setColorSpace(self._color_space)
+        return image, ANIMATION_DEFAULT_FRAME_MS
+
+    def first_duration(self) -> int:
+        return ANIMATION_DEFAULT_FRAME_MS
+
+
+def open_animation(file_path: str) -> AnimationSource | None:
+    """``file_path`` がアニメーションなら読み込んで返す。静止画/読めなければ None
+
+    静止画は見出しだけを読んで返す（丸ごと読み直したりデコードし直したりしない）。
+    """
+    try:
+        with open(file_path, "rb") as file:
+            if not may_be_animated(file):
+                return None
+        data = Path(file_path).read_bytes()
+    except OSError:
+        logger.warning("failed to read animation: %s", file_path, exc_info=True)
+        return None
+    if file_path.lower().endswith(".jxl"):
+        metadata = read_metadata(data)
+        if metadata is None or not metadata.have_animation:
+            return None
+        # imagecodecs にはフレーム数を返す API が無いので、フレームの見出しを読んで数える
+        frame_count = count_frames(data)
+        if frame_count is None:
+            logger.warning("failed to count JPEG XL frames; showing a still: %s", file_path)
+            return None
+        if frame_count < 2:
+            return None
+        return _JxlAnimation(data, frame_count, metadata, _jxl_color_space(metadata))
+    qt_animation = _QtAnimation(data)
+    if qt_animation.supports_animation():
+        return qt_animation
+    # Qt で読めないアニメーションを開くときだけ Pillow を読み込む
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        if getattr(image, "is_animated", False) and image.n_frames > 1:
+            return _PillowAnimation(image)
+    except (OSError, ValueError, SyntaxError, EOFError, Image.DecompressionBombError):
+        logger.debug("not an animation Pillow can read: %s", file_path)
+    return None
+
+
+def _pack(image: QImage) -> tuple[bytes, tuple[int, int, int, int]]:
+    """キャッシュに入れるため、QImage を画素のバイト列と (幅, 高さ, 行のバイト数, 形式) にする"""
+    data = image.constBits().asstring(image.sizeInBytes())
+    return data, (image.width(), image.height(), image.bytesPerLine(), image.format().value)
+
+
+def _unpack(data: bytes, shape: tuple[int, int, int, int]) -> QImage:
+    width, height, bytes_per_line, image_format = shape
+    # data はキャッシュが持つバイト列なので、共有しないよう複製する
+    return QImage(data, width, height, bytes_per_line, QImage.Format(image_format)).copy()
+
+
+class AnimationDecoder(QObject):
+    # (serial, frame_count, 先頭フレームの表示時間)。先頭フレームは ImageLoader が
+    # デコードして表示済み（open で受け取る）なので、ここからは 2 枚目以降を送る
+    animation_opened = pyqtSignal(int, int, int)
+    # (serial, index, image, 表示時間)
+    frame_decoded = pyqtSignal(int, int, QImage, int)
+
+    def __init__(self, cache_bytes: int = ANIMATION_CACHE_BYTES) -> None:
+        super().__init__()
+        self._latest_serial = 0
+        self._serial = 0
+        self._source: AnimationSource | None = None
+        self._next_index = 0
+        # source から次に順に読めるフレーム番号と、先頭フレームの幅（縮小が要るかの判定用）
+        self._read_position = 0
+        self._frame_width = 0
+        # デコード済みフレーム（index → 縮小後の画素, (形状, 表示時間)）と、その縮小先
+        self._cache = FrameCache(cache_bytes)
+        self._cache_size = (0, 0)
+        # 縮小先の大きさ（GUI スレッドから更新する。0 なら縮小しない）
+        self._display_size = (0, 0)
+        # GUI が最後に頼んだ移動 (依頼番号, フレーム番号) と、反映済みの依頼番号
+        self._seek = (0, 0)
+        self._applied_seek = 0
+        self._color = ColorManager()
+
+    def cancel_older_than(self, serial: int) -> None:
+        """GUI スレッドから呼ぶ。``serial`` より古いアニメーションのデコードをやめさせる。"""
+        self._latest_serial = max(self._latest_serial, serial)
+
+    def set_display_size(self, width: int, height: int) -> None:
+        """GUI スレッドから呼ぶ。以降のフレームを ``width`` x ``height`` に縮小させる。"""
+        self._display_size = (width, height)
+
+    def seek(self, seek_id: int, index: int) -> None:
+        """GUI スレッドから呼ぶ。次に送るフレームを ``index`` 番からにさせる。
+
+        続けて頼まれたら最後の依頼だけが効く（スクラバーのドラッグ中にデコードを溜めない）。
+        """
+        self._seek = (seek_id, index)
+
+    @pyqtSlot(bytes)
+    def set_output_profile(self, icc_profile: bytes) -> None:
+        """以降のフレームを ``icc_profile``（空なら sRGB）の色に変換させる"""
+        if self._color.set_output_profile(icc_profile):
+            self._cache.clear()
+
+    @pyqtSlot(int, str, QImage)
+    def open(self, serial: int, file_path: str, first: QImage) -> None:
+        """``file_path`` のアニメーションを開く。``first`` は ImageLoader が表示用に
+        デコードした先頭フレーム（出力プロファイルへの変換済み）で、デコードし直さずに使う"""
+        self._close()
+        self.cancel_older_than(serial)
+        if self._latest_serial != serial:
+            return
+        source = open_animation(file_path)
+        if source is None or self._latest_serial != serial:
+            return
+        try:
+            first_duration = source.first_duration()
+        except Exception:
+            logger.warning("failed to decode animation: %s", file_path, exc_info=True)
+            return
+        self._serial, self._source, self._next_index = serial, source, 1
+        self._read_position, self._frame_width = 1, first.width()
+        # 開く前の移動の依頼は前のアニメーションのもの
+        self._applied_seek = self._seek[0]
+        # 先頭フレームも、コマ戻しで戻ってきたときのためにキャッシュしておく
+        self._cache_size = self._target_size()
+        self._store(0, self._prepare(first, self._cache_size), first_duration)
+        logger.debug("animation opened: frames=%d path=%s", source.frame_count, file_path)
+        self.animation_opened.emit(serial, source.frame_count, first_duration)
+        self._decode(serial, ANIMATION_QUEUE_SIZE)
+
+    @pyqtSlot(int, int)
+    def request_frames(self, serial: int, count: int) -> None:
+        """GUI が ``count`` 枚表示した（または飛ばした）ので、その分を補充する"""
+        self._decode(serial, count)
+
+    def _decode(self, serial: int, count: int) -> None:
+        for _ in range(count):
+            if self._source is None or serial != self._serial:
+                return
+            if self._latest_serial != serial:
+                self._close()
+                return
+            seek_id, target = self._seek
+            if seek_id != self._applied_seek:
+                self._applied_seek = seek_id
+                self._next_index = target % self._source.frame_count
+            index = self._next_index
+            try:
+                image, duration = self._frame(index)
+            except Exception:
+                logger.warning("failed to decode animation frame %d", index, exc_info=True)
+                self._close()
+                return
+            self._next_index = (index + 1) % self._source.frame_count
+            self.frame_decoded.emit(serial, index, image, duration)
+
+    def _frame(self, index: int) -> tuple[QImage, int]:
+        """縮小済みの ``index`` 番のフレームと表示時間。キャッシュに無ければデコードする"""
+        size = self._target_size()
+        if size != self._cache_size:
+            # 縮小先が変わったら、前の大きさで縮小したフレームは使わない
+            self._cache.clear()
+            self._cache_size = size
+        cached = self._cache.get(index)
+        if cached is not None:
+            data, (shape, duration) = cached
+            return _unpack(data, shape), duration
+        # 多くの形式は先頭から順にしか読めないので、読み飛ばす途中のフレームもキャッシュする
+        start = self._read_position if index >= self._read_position else 0
+        for skipped in range(start, index):
+            if skipped not in self._cache:
+                image, duration = self._source.read(skipped)
+                self._store(skipped, self._prepare(image, size), duration)
+        image, duration = self._source.read(index)
+        self._read_position = index + 1
+        image = self._prepare(image, size)
+        self._store(index, image, duration)
+        return image, duration
+
+    def _store(self, index: int, image: QImage, duration: int) -> None:
+        data, shape = _pack(image)
+        self._cache.put(index, data, (shape, duration))
+
+    def _target_size(self) -> tuple[int, int]:
+        """フレームを縮小する先の大きさ。縮小しないなら (0, 0)"""
+        width, height = self._display_size
+        if width <= 0 or height <= 0 or width >= self._frame_width:
+            return (0, 0)
+        return (width, height)
+
+    def _prepare(self, image: QImage, size: tuple[int, int]) -> QImage:
+        """表示用に縮小し、出力プロファイルの色に変換する（縮小してから変換する方が軽い）"""
+        return self._color.convert(self._prescale(image, size))
+
+    def _prescale(self, image: QImage, size: tuple[int, int]) -> QImage:
+        """``size`` が (0, 0) でなければ平滑に縮小する（拡大は表示側が最近傍で行う）"""
+        width, height = size
+        if width <= 0 or height <= 0:
+            return image
+        return image.scaled(
+            width,
+            height,
+            Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+
+    def _close(self) -> None:
+        self._source = None
+        self._serial = 0
+        self._cache.clear()
@@ -0,0 +1,17 @@
+"""知覚ハッシュや破損チェックの記録など、作り直せるデータの保存先。"""
+
+from __future__ import annotations
+
+import os
+
+from PyQt6.QtCore import QStandardPaths
+
+from ..config.constants import SETTINGS_APP, SETTINGS_ORG
+
+
+def cache_file_path(file_name: str) -> str:
+    """ユーザーのキャッシュフォルダ内の ``file_name`` のパス。取得できなければ空文字。"""
+    root = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation)
+    if not root:
+        return ""
+    return os.path.join(root, SETTINGS_ORG, SETTINGS_APP, file_name)
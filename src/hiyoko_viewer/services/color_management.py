@@ -0,0 +1,91 @@
+"""デコードした画像を、埋め込みプロファイルから出力プロファイル（ディスプレイ）の色へ変換する。
+
+Qt は画像を描くときに色変換をしないので、広色域（Display P3 / Adobe RGB 等）の画像は
+そのままだと彩度が落ちて（あるいは上がって）見える。各 worker がデコード直後に
+:class:`ColorManager` で出力プロファイルへ変換してから GUI に渡す。
+
+変換オブジェクト（:class:`QColorTransform`）は作るのに LUT の構築を伴うので、
+プロファイルの組ごとに使い回し、画像 1 枚あたりの費用は画素への 1 回の適用だけにする。
+ColorManager はスレッドごとに持つこと（worker 間で共有しない）。
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+
+from PyQt6.QtGui import QColorSpace, QColorTransform, QImage
+
+from ..config.constants import COLOR_TRANSFORM_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+_NON_RGB_MODELS = (QColorSpace.ColorModel.Cmyk, QColorSpace.ColorModel.Gray)
+
+
+def _profile_key(color_space: QColorSpace) -> bytes:
+    """色空間を辞書のキーにする（Qt の名前付き色空間も ICC プロファイルを生成して返す）"""
+    return bytes(color_space.iccProfile()) or color_space.description().encode()
+
+
+def output_color_space(icc_profile: bytes) -> QColorSpace | None:
+    """ICC プロファイルのバイト列を出力先の色空間にする。空なら sRGB、使えなければ None"""
+    if not icc_profile:
+        return QColorSpace(QColorSpace.NamedColorSpace.SRgb)
+    color_space = QColorSpace.fromIccProfile(icc_profile)
+    return color_space if color_space.isValidTarget() else None
+
+
+class ColorManager:
+    def __init__(self) -> None:
+        self._srgb = QColorSpace(QColorSpace.NamedColorSpace.SRgb)
+        self._output = self._srgb
+        self._output_key = _profile_key(self._srgb)
+        # (入力プロファイル, 出力プロファイル) → QColorTransform（古いものから捨てる）
+        self._transforms: OrderedDict[tuple[bytes, bytes], QColorTransform] = OrderedDict()
+
+    def set_output_profile(self, icc_profile: bytes) -> bool:
+        """出力プロファイルを ICC のバイト列で設定する（空なら sRGB）。使えなければ False"""
+        color_space = output_color_space(icc_profile)
+        if color_space is None:
+            logger.warning("unusable output ICC profile (%d bytes)", len(icc_profile))
+            return False
+        self._output = color_space
+        self._output_key = _profile_key(color_space)
+        return True
+
+    def convert(self, image: QImage) -> QImage:
+        """``image`` を出力プロファイルの色に変換する（可能ならその場で書き換える）"""
+        if image.isNull():
+            return image
+        source = image.colorSpace()
+        if not source.isValid():
+            # プロファイルの無い画像は（ブラウザと同じく）sRGB とみなす
+            source = self._srgb
+        if source == self._output:
+            return image
+        transform = self._transform(source)
+        if source.colorModel() in _NON_RGB_MODELS:
+            # CMYK/グレーは RGB の画素形式へ変えながら変換する（出力プロファイルは RGB）
+            rgb_format = (
+                QImage.Format.Format_ARGB32
+                if image.hasAlphaChannel()
+                else QImage.Format.Format_RGB32
+            )
+            image.applyColorTransform(transform, rgb_format)
+        else:
+            image.applyColorTransform(transform)
+        image.setColorSpace(self._output)
+        return image
+
+    def _transform(self, source: QColorSpace) -> QColorTransform:
+        key = (_profile_key(source), self._output_key)
+        transform = self._transforms.get(key)
+        if transform is None:
+            transform = source.transformationToColorSpace(self._output)
+            self._transforms[key] = transform
+            if len(self._transforms) > COLOR_TRANSFORM_CACHE_SIZE:
+                self._transforms.popitem(last=False)
+        else:
+            self._transforms.move_to_end(key)
+        return transform
@@ -0,0 +1,155 @@
+"""類似画像（重複/ほぼ重複）を探すワーカー（専用スレッドで動かす）。
+
+一覧全体の知覚ハッシュをスレッドプールで並列に計算し、
+:func:`~hiyoko_viewer.core.image_hash.group_similar` でグループに分けて返す。
+デコードは縮小して行い（JPEG は ``draft`` で DCT の段階から縮小）、計算したハッシュは
+mtime/サイズ付きでディスクに保存して、次回からは変更されたファイルだけ計算する。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from ..config.constants import (
+    DUPLICATE_MAX_DHASH_DISTANCE,
+    DUPLICATE_MAX_DISTANCE,
+    HASH_DECODE_SIZE,
+    PROBE_CHUNK_SIZE,
+    PROBE_MAX_WORKERS,
+)
+from ..core.file_stats import stat_files
+from ..core.hash_cache import HashCache
+from ..core.image_hash import DHASH_SIZE, PHASH_SIZE, dhash, group_similar, phash
+
+logger = logging.getLogger(__name__)
+
+
+def compute_hashes(file_path: str) -> tuple[int, int] | None:
+    """画像を縮小デコードして ``(phash, dhash)`` を返す。読めなければ None。"""
+    np = import_module("numpy")
+    from PIL import Image
+
+    try:
+        with Image.open(file_path) as image:
+            image.draft("L", (HASH_DECODE_SIZE, HASH_DECODE_SIZE))
+            image.thumbnail((HASH_DECODE_SIZE, HASH_DECODE_SIZE), reducing_gap=2.0)
+            gray = image.convert("L")
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        # Pillow が扱えない形式（JPEG XL/SVG 等）は対象外
+        return None
+    box = Image.Resampling.BOX
+    return (
+        phash(np.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), box))),
+        dhash(np.asarray(gray.resize(DHASH_SIZE, box))),
+    )
+
+
+class DuplicateFinder(QObject):
+    # (generation, hashed, total)
+    hash_progress = pyqtSignal(int, int, int)
+    # (generation, groups)。groups は名前 ID のリストのリスト
+    duplicates_ready = pyqtSignal(int, list)
+
+    def __init__(self, cache_path: str = "") -> None:
+        super().__init__()
+        self._latest_generation = 0
+        # 空ならディスクキャッシュを使わない
+        self._cache_path = cache_path
+
+    def cancel_older_than(self, generation: int) -> None:
+        """GUI スレッドから呼ぶ。``generation`` より古い一覧のハッシュ計算を打ち切らせる。"""
+        self._latest_generation = max(self._latest_generation, generation)
+
+    @pyqtSlot(int, str, list)
+    def find_duplicates(self, generation: int, directory: str, names: list) -> None:
+        """``directory`` の ``names``（名前 ID 順）から類似画像のグループを探す"""
+        self.cancel_older_than(generation)
+        cache = self._open_cache()
+        try:
+            hashes = self._hash_all(generation, directory, names, cache)
+        finally:
+            if cache is not None:
+                cache.close()
+        if hashes is None or self._latest_generation != generation:
+            logger.info("duplicate search cancelled: directory=%s", directory)
+            return
+        groups = group_similar(hashes, DUPLICATE_MAX_DISTANCE, DUPLICATE_MAX_DHASH_DISTANCE)
+        logger.info("duplicate search finished: %d groups in %d files", len(groups), len(names))
+        self.duplicates_ready.emit(generation, groups)
+
+    def _open_cache(self) -> HashCache | None:
+        if not self._cache_path:
+            return None
+        try:
+            return HashCache(self._cache_path)
+        except (OSError, sqlite3.Error):
+            logger.warning("hash cache is unavailable: %s", self._cache_path, exc_info=True)
+            return None
+
+    def _hash_all(
+        self, generation: int, directory: str, names: list, cache: HashCache | None
+    ) -> list[tuple[int, int] | None] | None:
+        """全件のハッシュを揃える。途中で別の一覧が開かれたら None"""
+        stats = stat_files(directory, names)
+        cached = self._load_cached(cache, directory)
+        hashes: list[tuple[int, int] | None] = [None] * len(names)
+        pending: list[int] = []
+        for name_id, name in enumerate(names):
+            mtime, size = stats.mtime[name_id], stats.size[name_id]
+            if math.isnan(mtime):
+                continue
+            entry = cached.get(name)
+            if entry is not None and entry[0] == mtime and entry[1] == size:
+                hashes[name_id] = (entry[2], entry[3])
+            else:
+                pending.append(name_id)
+        if pending:
+            logger.info("hashing %d images: directory=%s", len(pending), directory)
+        done = len(names) - len(pending)
+        with ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS) as pool:
+            for start in range(0, len(pending), PROBE_CHUNK_SIZE):
+                if self._latest_generation != generation:
+                    return None
+                chunk = pending[start : start + PROBE_CHUNK_SIZE]
+                results = pool.map(
+                    compute_hashes, (os.path.join(directory, names[name_id]) for name_id in chunk)
+                )
+                entries = []
+                for name_id, result in zip(chunk, results, strict=True):
+                    hashes[name_id] = result
+                    if result is not None:
+                        entries.append(
+                            (names[name_id], stats.mtime[name_id], stats.size[name_id], *result)
+                        )
+                self._store(cache, directory, entries)
+                done += len(chunk)
+                self.hash_progress.emit(generation, done, len(names))
+        return hashes
+
+    @staticmethod
+    def _load_cached(
+        cache: HashCache | None, directory: str
+    ) -> dict[str, tuple[float, int, int, int]]:
+        if cache is None:
+            return {}
+        try:
+            return cache.load_directory(directory)
+        except sqlite3.Error:
+            logger.warning("failed to read hash cache: %s", directory, exc_info=True)
+            return {}
+
+    @staticmethod
+    def _store(cache: HashCache | None, directory: str, entries: list) -> None:
+        if cache is None or not entries:
+            return
+        try:
+            cache.store(directory, entries)
+        except sqlite3.Error:
+            logger.warning("failed to write hash cache: %s", directory, exc_info=True)
@@ -0,0 +1,214 @@
+"""仕分け（移動）とごみ箱への削除を GUI から切り離して実行するワーカー（専用スレッドで動かす）。
+
+GUI は一覧から項目を外してすぐ次の画像へ進み、実際のファイル操作はここで順に行う。
+
+* 移動: 同じドライブ内なら名前の付け替え 1 回。別ドライブ（ネットワークドライブ等）では
+  コピーしてから元を消し、コピー中は進捗を通知する。どちらも移動先に同名のファイルが
+  あれば上書きせずに失敗する（確認してから移すのではなく、置く操作そのものが失敗する）
+* ごみ箱: 短時間に続いた削除をまとめて 1 回の ``send2trash`` 呼び出しにする
+  （Windows ではシェル操作 1 回あたりの固定コストが大きい）
+
+結果は操作 ID 付きで返し、失敗した項目は GUI 側で一覧に戻す。
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+
+from ..config.constants import MOVE_CHUNK_SIZE, MOVE_PROGRESS_INTERVAL, TRASH_BATCH_DELAY_MS
+
+logger = logging.getLogger(__name__)
+
+
+def send2trash(paths: str | list[str]) -> None:
+    """``send2trash`` を呼ぶ。パッケージは最初の削除の時点で読み込む（起動時には要らない）"""
+    # import_module ではなく import 文にして、PyInstaller の静的解析に拾わせる
+    from send2trash import send2trash as send_to_trash
+
+    send_to_trash(paths)
+
+
+# 操作の種類
+FILE_OP_MOVE = "move"
+FILE_OP_TRASH = "trash"
+FILE_OP_RESTORE = "restore"
+
+
+@dataclass(frozen=True)
+class FileOperation:
+    """GUI 側で保持する、依頼中/完了済みのファイル操作。
+
+    ``generation``/``name_id`` は操作時に表示していた一覧と、その中での名前 ID。
+    同じ一覧を表示している間は、失敗や取り消しの際にこの ID で一覧へ戻せる。
+    """
+
+    op_id: int
+    kind: str
+    source: str
+    destination: str
+    generation: int
+    name_id: int
+
+
+# ハードリンクを張れないファイルシステム（FAT 等）で os.link が返すエラー
+_LINK_UNSUPPORTED = frozenset(
+    {errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EMLINK, errno.ENOSYS}
+)
+
+
+def _rename_no_clobber(source: str, destination: str) -> None:
+    """同じドライブ内で ``source`` の名前を ``destination`` に変える。既にあれば FileExistsError"""
+    if os.name == "nt":
+        # Windows の rename（置き換えを指定しない MoveFileEx）は、移動先があれば失敗する
+        os.rename(source, destination)
+        return
+    # POSIX の rename は黙って上書きするので、ハードリンクを張って（既にあれば失敗する）から
+    # 元の名前を消す
+    try:
+        os.link(source, destination, follow_symlinks=False)
+    except FileExistsError:
+        raise
+    except OSError as e:
+        if e.errno not in _LINK_UNSUPPORTED:
+            raise
+        # 確認から rename までの間に作られた場合は防げないが、ここでしか起きない
+        logger.debug("hard links are not supported, falling back to rename: %s", destination)
+        if os.path.lexists(destination):
+            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination) from None
+        os.rename(source, destination)
+        return
+    os.unlink(source)
+
+
+def move_file(
+    source: str, destination: str, progress: Callable[[int, int], None] | None = None
+) -> None:
+    """``source`` を ``destination``（ファイルパス）へ移動する。既にあれば FileExistsError。"""
+    try:
+        try:
+            _rename_no_clobber(source, destination)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        _copy_then_remove(source, destination, progress)
+    except FileExistsError:
+        raise FileExistsError(
+            errno.EEXIST, "移動先に同名のファイルがあります", destination
+        ) from None
+
+
+def _copy_then_remove(
+    source: str, destination: str, progress: Callable[[int, int], None] | None
+) -> None:
+    """別ドライブへの移動。一時ファイルへコピーし終えてから移動先の名前を付け、最後に元を消す"""
+    if os.path.lexists(destination):
+        # 置く時点でも確かめるが、大きなファイルを無駄にコピーしないよう先に断る
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination)
+    total = os.path.getsize(source)
+    # 一時ファイルは O_EXCL で作り、同名の一時ファイルが既にあれば別の名前にする
+    fd, partial = tempfile.mkstemp(
+        suffix=".part",
+        prefix=os.path.basename(destination) + ".",
+        dir=os.path.dirname(destination),
+    )
+    copied = 0
+    last_report = time.monotonic()
+    try:
+        with open(fd, "wb") as dst, open(source, "rb") as src:
+            while chunk := src.read(MOVE_CHUNK_SIZE):
+                dst.write(chunk)
+                copied += len(chunk)
+                if (
+                    progress is not None
+                    and time.monotonic() - last_report >= MOVE_PROGRESS_INTERVAL
+                ):
+                    progress(copied, total)
+                    last_report = time.monotonic()
+        shutil.copystat(source, partial)
+        _rename_no_clobber(partial, destination)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.remove(source)
+    if progress is not None:
+        progress(total, total)
+
+
+class FileOperationQueue(QObject):
+    operation_finished = pyqtSignal(int)  # (op_id)
+    operation_failed = pyqtSignal(int, str)  # (op_id, message)
+    move_progress = pyqtSignal(int, int, int)  # (op_id, copied_bytes, total_bytes)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._trash_batch: list[tuple[int, str]] = []
+        # 子オブジェクトにしておけば moveToThread で一緒にワーカースレッドへ移る
+        self._trash_timer = QTimer(self)
+        self._trash_timer.setSingleShot(True)
+        self._trash_timer.setInterval(TRASH_BATCH_DELAY_MS)
+        self._trash_timer.timeout.connect(self.flush)
+
+    @pyqtSlot(int, str, str)
+    def move(self, op_id: int, source: str, destination: str) -> None:
+        """``source`` を ``destination`` へ移動する（移動先フォルダは必要なら作る）"""
+        try:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            move_file(
+                source,
+                destination,
+                lambda copied, total: self.move_progress.emit(op_id, copied, total),
+            )
+        except OSError as e:
+            logger.exception("ファイルの移動に失敗: %s -> %s", source, destination)
+            self.operation_failed.emit(op_id, str(e))
+            return
+        self.operation_finished.emit(op_id)
+
+    @pyqtSlot(int, str)
+    def trash(self, op_id: int, path: str) -> None:
+        """ごみ箱へ送る。続けて届いた分とまとめて、少し待ってから実行する"""
+        self._trash_batch.append((op_id, path))
+        if not self._trash_timer.isActive():
+            self._trash_timer.start()
+
+    @pyqtSlot()
+    def flush(self) -> None:
+        """まとめて待っているごみ箱送りを今すぐ実行する（終了時にも呼ぶ）"""
+        self._trash_timer.stop()
+        batch, self._trash_batch = self._trash_batch, []
+        if not batch:
+            return
+        try:
+            send2trash([path for _, path in batch])
+        except Exception:
+            # どれが失敗したか分からないので、1 件ずつやり直して結果を確定させる
+            logger.warning("ごみ箱への一括移動に失敗。1 件ずつ再試行します: %d 件", len(batch))
+            for op_id, path in batch:
+                self._trash_one(op_id, path)
+            return
+        for op_id, _ in batch:
+            self.operation_finished.emit(op_id)
+
+    def _trash_one(self, op_id: int, path: str) -> None:
+        if not os.path.lexists(path):
+            # 一括呼び出しの途中までで送れていた
+            self.operation_finished.emit(op_id)
+            return
+        try:
+            send2trash(path)
+        except Exception as e:
+            logger.exception("ファイルの削除に失敗: %s", path)
+            self.operation_failed.emit(op_id, str(e))
+            return
+        self.operation_finished.emit(op_id)
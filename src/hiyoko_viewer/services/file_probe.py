@@ -0,0 +1,181 @@
+"""並べ替え/絞り込み用のファイル情報を集めるワーカー（専用スレッドで動かす）。
+
+一覧が確定するたびに名前テーブルを受け取り、stat を 1 回ずつ行って
+:class:`~hiyoko_viewer.core.file_stats.FileStats` を作っておく。並び順の切り替えや
+絞り込みは、このテーブルから結果を計算して返すだけなので、フォルダを読み直さずに済む。
+
+画素数/撮影日時はヘッダの読み取りが要るため、それらを使う並び順か絞り込みが初めて
+要求された時点で読む（デコードはしない）。ヘッダ読みはスレッドプールで並列に行い、
+結果はパスごとに mtime と合わせて覚えておき、変更されていなければ次回は読まない。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImageReader
+
+from ..config.constants import (
+    HEADER_CACHE_SIZE,
+    PROBE_CHUNK_SIZE,
+    PROBE_MAX_WORKERS,
+    SORT_BY_NAME,
+)
+from ..core.file_stats import (
+    UNKNOWN_DIMENSION,
+    UNKNOWN_TIME,
+    DimensionFilter,
+    FileStats,
+    hidden_flags,
+    needs_headers,
+    parse_exif_datetime,
+    sort_order,
+    stat_files,
+)
+
+logger = logging.getLogger(__name__)
+
+# EXIF のタグ番号
+_EXIF_IFD = 0x8769
+_DATETIME_ORIGINAL = 0x9003
+_DATETIME = 0x0132
+_ORIENTATION = 0x0112
+# 90° 回転を含む EXIF Orientation（表示時は幅と高さが入れ替わる）
+_TRANSPOSED_ORIENTATIONS = frozenset((5, 6, 7, 8))
+
+
+def read_header(file_path: str) -> tuple[int, int, float]:
+    """画像ヘッダだけを読んで ``(width, height, captured)`` を返す。
+
+    ``Image.open`` はヘッダまでしか読まない。Pillow が扱えない形式（JPEG XL/SVG 等）は
+    Qt のプラグインでサイズだけ読む（``QImageReader.size()`` も本体はデコードしない）。
+    幅と高さは EXIF の回転を反映した表示上の値を返す。
+    """
+    # Pillow は並べ替え/絞り込みで初めてヘッダを読むときに読み込む（起動時には要らない）
+    from PIL import Image
+
+    try:
+        with Image.open(file_path) as image:
+            width, height = image.size
+            exif = image.getexif()
+            if exif.get(_ORIENTATION) in _TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            captured = parse_exif_datetime(
+                exif.get_ifd(_EXIF_IFD).get(_DATETIME_ORIGINAL) or exif.get(_DATETIME)
+            )
+            return width, height, captured
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        # UnidentifiedImageError は OSError の派生。巨大画像は Qt 側でサイズだけ読む
+        pass
+    size = QImageReader(file_path).size()
+    if size.isValid():
+        return size.width(), size.height(), UNKNOWN_TIME
+    return UNKNOWN_DIMENSION, UNKNOWN_DIMENSION, UNKNOWN_TIME
+
+
+class FileProbe(QObject):
+    # (generation, sort_key, order)。order は名前 ID を並べたインデックス配列
+    sort_order_ready = pyqtSignal(int, str, list)
+    # (generation, DimensionFilter, hidden)。hidden は名前 ID ごとの非表示フラグ（bytes）
+    filter_ready = pyqtSignal(int, object, object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._latest_generation = 0
+        self._generation = -1
+        self._directory = ""
+        self._names: list[str] = []
+        self._stats: FileStats | None = None
+        # パス → (mtime, width, height, captured)。フォルダを行き来しても読み直さない
+        self._header_cache: dict[str, tuple[float, int, int, float]] = {}
+
+    def cancel_older_than(self, generation: int) -> None:
+        """GUI スレッドから呼ぶ。``generation`` より古い一覧のヘッダ読みを打ち切らせる。"""
+        self._latest_generation = max(self._latest_generation, generation)
+
+    @pyqtSlot(int, str, list)
+    def load_listing(self, generation: int, directory: str, names: list) -> None:
+        """確定した一覧を受け取り、更新日時とサイズを集めておく"""
+        self.cancel_older_than(generation)
+        self._generation = generation
+        self._directory = directory
+        self._names = names
+        self._stats = stat_files(directory, names)
+
+    @pyqtSlot(int, str)
+    def compute_sort_order(self, generation: int, sort_key: str) -> None:
+        """保持している一覧の並び順を ``sort_key`` で計算して返す"""
+        if not self._is_current(generation):
+            return
+        stats = None if sort_key == SORT_BY_NAME else self._stats
+        if stats is not None and needs_headers(sort_key) and not self._ensure_headers(generation):
+            return
+        self.sort_order_ready.emit(generation, sort_key, sort_order(self._names, stats, sort_key))
+
+    @pyqtSlot(int, object)
+    def compute_filter(self, generation: int, dimension_filter: DimensionFilter) -> None:
+        """保持している一覧のうち、条件に合わないものの非表示フラグを返す"""
+        if not self._is_current(generation) or not self._ensure_headers(generation):
+            return
+        self.filter_ready.emit(
+            generation, dimension_filter, hidden_flags(self._stats, dimension_filter)
+        )
+
+    def _is_current(self, generation: int) -> bool:
+        # 一覧がまだ届いていない/既に別の一覧に切り替わった場合は False
+        return generation == self._generation and self._latest_generation == generation
+
+    def _ensure_headers(self, generation: int) -> bool:
+        """全件のヘッダ情報を揃える。途中で別の一覧が開かれたら False"""
+        stats = self._stats
+        if stats.has_headers:
+            return True
+        paths = [os.path.join(self._directory, name) for name in self._names]
+        pending = [
+            name_id
+            for name_id in range(len(paths))
+            if not self._fill_from_cache(stats, paths, name_id)
+        ]
+        if pending:
+            logger.info("probing %d image headers: directory=%s", len(pending), self._directory)
+        with ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS) as pool:
+            for start in range(0, len(pending), PROBE_CHUNK_SIZE):
+                if self._latest_generation != generation:
+                    logger.info("header probe cancelled: directory=%s", self._directory)
+                    return False
+                chunk = pending[start : start + PROBE_CHUNK_SIZE]
+                headers = pool.map(read_header, (paths[name_id] for name_id in chunk))
+                for name_id, header in zip(chunk, headers, strict=True):
+                    self._store(stats, paths[name_id], name_id, header)
+        stats.has_headers = True
+        return True
+
+    def _fill_from_cache(self, stats: FileStats, paths: list[str], name_id: int) -> bool:
+        cached = self._header_cache.get(paths[name_id])
+        if cached is None or cached[0] != stats.mtime[name_id]:
+            return False
+        _, width, height, captured = cached
+        stats.width[name_id] = width
+        stats.height[name_id] = height
+        stats.captured[name_id] = captured
+        return True
+
+    def _store(
+        self, stats: FileStats, path: str, name_id: int, header: tuple[int, int, float]
+    ) -> None:
+        width, height, captured = header
+        stats.width[name_id] = width
+        stats.height[name_id] = height
+        stats.captured[name_id] = captured
+        mtime = stats.mtime[name_id]
+        if math.isnan(mtime):
+            return
+        cache = self._header_cache
+        if len(cache) >= HEADER_CACHE_SIZE:
+            # 最も古く覚えたものから捨てる（dict は挿入順を保つ）
+            del cache[next(iter(cache))]
+        cache[path] = (mtime, width, height, captured)
@@ -4,12 +4,28 @@ from __future__ import annotations
 
 import logging
 import os
+from collections.abc import Callable
 from importlib import import_module
 from pathlib import Path
 
-from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
 from PyQt6.QtGui import QColorSpace, QImage, QImageReader
 
+from ..config.constants import HISTOGRAM_SAMPLE_SIZE, MIPMAP_MEMORY_BUDGET, MIPMAP_MIN_SIZE
+from ..core.histogram import ImageHistogram, compute_histogram
+from ..core.jxl_header import JxlMetadata, read_metadata
+from ..core.mipmap import pyramid_sizes
+from ..core.name_index import NameIndex
+from ..core.tone_mapping import (
+    HDR_TRANSFERS,
+    TRANSFER_HLG,
+    TRANSFER_PQ,
+    apply_lut,
+    hdr_lut,
+    linear_lut,
+)
+from .color_management import ColorManager
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,21 +33,31 @@ def _load_jxl_with_imagecodecs(file_path: str) -> QImage:
     """Qt の JPEG XL プラグインが無い環境向けに imagecodecs で読み込む。
 
     用途は JPEG XL に限定されるため、汎用ディスパッチャ ``imread`` ではなく
-    JXL デコーダを直接呼ぶ。埋め込みプロファイルは引き継がず、sRGB 相当として
-    表示する（広色域 JXL では Qt 経由と色が変わり得る）。
+    JXL デコーダを直接呼ぶ。imagecodecs は埋め込みプロファイルを返さないので色空間は
+    未設定のまま返し、色変換（:class:`ColorManager`）では sRGB とみなす
+    （広色域 JXL では Qt 経由と色が変わり得る）。ただし PQ / HLG の HDR は
+    ヘッダの ColourEncoding から分かるので、SDR へトーンマッピングし原色を付けて返す。
     """
     imagecodecs = import_module("imagecodecs")
     np = import_module("numpy")
 
+    data = Path(file_path).read_bytes()
+    metadata = read_metadata(data)
     # JPEG XL は複数フレーム（アニメーション）を持てる。index 既定の None だと
     # 全フレームを (frames, h, w, c) で返し後段の形状判定で失敗するため、
     # 静止表示として先頭フレームのみを取得する。
-    array = imagecodecs.jpegxl_decode(Path(file_path).read_bytes(), index=0)
+    array = imagecodecs.jpegxl_decode(data, index=0)
     if array is None:
         return QImage()
 
-    array = _as_uint8_array(array, np)
+    alpha = array.ndim == 3 and array.shape[2] in (2, 4)
+    image = _qimage_from_array(_as_uint8_array(array, np, metadata, alpha=alpha), np)
+    if not image.isNull():
+        image.setColorSpace(_jxl_color_space(metadata))
+    return image
+
 
+def _qimage_from_array(array, np) -> QImage:
     if array.ndim == 2:
         return _qimage_from_grayscale_array(array, np)
 
@@ -58,97 +84,243 @@ def _load_jxl_with_imagecodecs(file_path: str) -> QImage:
     contiguous = np.ascontiguousarray(array)
     height, width, _ = contiguous.shape
     bytes_per_line = contiguous.strides[0]
-    image = QImage(contiguous.data, width, height, bytes_per_line, image_format).copy()
-    image.setColorSpace(QColorSpace(QColorSpace.NamedColorSpace.SRgb))
-    return image
+    return QImage(contiguous.data, width, height, bytes_per_line, image_format).copy()
 
 
-def _as_uint8_array(array, np):
-    if array.dtype == np.uint8:
-        return array
+def _as_uint8_array(array, np, metadata: JxlMetadata | None = None, *, alpha: bool = False):
+    """imagecodecs が返した JPEG XL の画素を 8bit にする。
+
+    ``metadata`` の伝達特性が PQ / HLG なら SDR へトーンマッピングする。``alpha`` なら
+    最後の軸の末尾をアルファとみなし、トーンマッピングせずに線形に縮める。
+    """
     if array.dtype.kind == "f":
-        array = np.clip(array, 0.0, 1.0) * 255.0
+        bit_depth = 16  # 0..1 を 16bit の LUT の添字にする
     elif array.dtype == np.uint16:
         # imagecodecs は 9〜16bit の JPEG XL を 16bit フルレンジへ正規化せず、
         # native ビット深度のレンジ（例: 10bit→0..1023）の uint16 で返す。
-        # そのため /257 固定では 10/12bit が極端に暗くなる。実データの最大値から
-        # ビット深度を推定し、そのフルスケールで 8bit へスケールする。
-        max_value = int(array.max()) if array.size else 0
-        bit_depth = min(16, max(8, max_value.bit_length()))
-        full_scale = (1 << bit_depth) - 1
-        array = array.astype(np.float64) * (255.0 / full_scale)
-    array = np.clip(array, 0, 255).astype(np.uint8)
-    return array
+        # そのため /257 固定では 10/12bit が極端に暗くなる。ヘッダが読めればその
+        # ビット深度、読めなければ実データの最大値から推定したビット深度の
+        # フルスケールで 8bit へスケールする。
+        if metadata is not None and not metadata.float_sample:
+            bit_depth = min(16, max(8, metadata.bits_per_sample))
+        else:
+            max_value = int(array.max()) if array.size else 0
+            bit_depth = min(16, max(8, max_value.bit_length()))
+    else:
+        bit_depth = 8
+    if metadata is not None and metadata.transfer in HDR_TRANSFERS:
+        return apply_lut(array, hdr_lut(metadata.transfer, bit_depth), alpha=alpha)
+    if array.dtype == np.uint8:
+        return array
+    if array.dtype.kind == "f":
+        return (np.clip(array, 0.0, 1.0) * 255.0).astype(np.uint8)
+    return apply_lut(array, linear_lut(bit_depth))
+
+
+# JPEG XL の原色の番号（CICP と同じ）→ Qt の原色
+_JXL_PRIMARIES = {
+    1: QColorSpace.Primaries.SRgb,
+    9: QColorSpace.Primaries.Bt2020,
+    11: QColorSpace.Primaries.DciP3D65,
+}
+
+
+def _tone_mapped_color_space(primaries: QColorSpace.Primaries | None) -> QColorSpace:
+    """トーンマッピングした画素の色空間（原色は元のまま、伝達特性は sRGB）"""
+    if primaries in (None, QColorSpace.Primaries.Custom):
+        # HDR の原色はほぼ BT.2020 なので、分からなければ BT.2020 とみなす
+        primaries = QColorSpace.Primaries.Bt2020
+    return QColorSpace(primaries, QColorSpace.TransferFunction.SRgb)
+
+
+def _jxl_color_space(metadata: JxlMetadata | None) -> QColorSpace:
+    """:func:`_as_uint8_array` で 8bit にした画素の色空間。分からなければ無効な色空間"""
+    if metadata is None or metadata.transfer not in HDR_TRANSFERS:
+        return QColorSpace()
+    return _tone_mapped_color_space(_JXL_PRIMARIES.get(metadata.primaries))
+
+
+def _tone_map_qt_hdr(image: QImage) -> QImage:
+    """Qt が読んだ画像の色空間が PQ / HLG なら SDR へトーンマッピングする"""
+    color_space = image.colorSpace()
+    transfer = {
+        QColorSpace.TransferFunction.St2084: TRANSFER_PQ,
+        QColorSpace.TransferFunction.Hlg: TRANSFER_HLG,
+    }.get(color_space.transferFunction())
+    if transfer is None:
+        return image
+    np = import_module("numpy")
+    # 16bit/チャンネルへ並べ替えるだけ（符号値は色変換されない）
+    image = image.convertToFormat(QImage.Format.Format_RGBA64)
+    width, height = image.width(), image.height()
+    pixels = np.frombuffer(image.constBits().asarray(image.sizeInBytes()), dtype=np.uint16)
+    pixels = pixels.reshape(height, image.bytesPerLine() // 2)[:, : width * 4]
+    array = apply_lut(pixels.reshape(height, width, 4), hdr_lut(transfer, 16), alpha=True)
+    tone_mapped = QImage(
+        array.data, width, height, array.strides[0], QImage.Format.Format_RGBA8888
+    ).copy()
+    tone_mapped.setColorSpace(_tone_mapped_color_space(color_space.primaries()))
+    return tone_mapped
 
 
 def _qimage_from_grayscale_array(array, np) -> QImage:
     contiguous = np.ascontiguousarray(array)
     height, width = contiguous.shape
     bytes_per_line = contiguous.strides[0]
-    image = QImage(
+    return QImage(
         contiguous.data,
         width,
         height,
         bytes_per_line,
         QImage.Format.Format_Grayscale8,
     ).copy()
-    image.setColorSpace(QColorSpace(QColorSpace.NamedColorSpace.SRgb))
+
+
+def decode_image(file_path: str) -> QImage:
+    """``file_path`` を QImage にデコードする。読めなければ null の QImage を返す。"""
+    # QImageReader だと失敗理由（未対応フォーマット/破損/権限等）を errorString で残せる
+    reader = QImageReader(file_path)
+    reader.setAutoTransform(True)
+    image = reader.read()
+    if not image.isNull():
+        image = _tone_map_qt_hdr(image)
+
+    if image.isNull() and file_path.lower().endswith(".jxl"):
+        logger.debug("Qt failed to load JPEG XL, trying imagecodecs fallback: %s", file_path)
+        try:
+            image = _load_jxl_with_imagecodecs(file_path)
+        except Exception:
+            logger.exception("failed to load JPEG XL fallback: %s", file_path)
+
+    # fallback まで含めて読めなかった場合のみ警告する（成功時の誤検知を防ぐ）
+    if image.isNull():
+        logger.warning("failed to load image: %s error=%s", file_path, reader.errorString())
     return image
 
 
+def build_mipmaps(image: QImage, should_stop: Callable[[], bool] = lambda: False) -> list[QImage]:
+    """``image`` のミップマップ（大きい順）を作る。小さい画像や打ち切られた場合は空。
+
+    各段は 1 つ上の段をちょうど 2 分の 1 に平滑縮小して作る（Qt の縮小は面積平均なので
+    2x2 画素の平均になる）。予算から外れた大きい段も、下の段を作る途中経過としては使う。
+    """
+    sizes = pyramid_sizes(image.width(), image.height(), MIPMAP_MIN_SIZE, MIPMAP_MEMORY_BUDGET)
+    if not sizes:
+        return []
+    wanted = set(sizes)
+    levels: list[QImage] = []
+    level = image
+    while len(levels) < len(sizes):
+        if should_stop():
+            return []
+        level = level.scaled(
+            level.width() // 2,
+            level.height() // 2,
+            Qt.AspectRatioMode.IgnoreAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        if (level.width(), level.height()) in wanted:
+            levels.append(level)
+    return levels
+
+
+def image_histogram(image: QImage) -> ImageHistogram | None:
+    """``image`` のヒストグラムを、長辺 ``HISTOGRAM_SAMPLE_SIZE`` 以下に間引いた画素から求める。
+
+    度数の分布と白飛び/黒つぶれの割合を見るだけなので、縮小は補間しない
+    （平均すると飽和した画素がならされて白飛びを見落とす）。
+    """
+    if image.isNull():
+        return None
+    np = import_module("numpy")
+    if max(image.width(), image.height()) > HISTOGRAM_SAMPLE_SIZE:
+        image = image.scaled(
+            HISTOGRAM_SAMPLE_SIZE,
+            HISTOGRAM_SAMPLE_SIZE,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.FastTransformation,
+        )
+    # 乗算済みアルファだと半透明の画素の値が変わるので、乗算しない形式で読む
+    rgba = image.convertToFormat(QImage.Format.Format_RGBA8888)
+    width, height = rgba.width(), rgba.height()
+    rows = np.frombuffer(rgba.constBits().asstring(rgba.sizeInBytes()), dtype=np.uint8)
+    pixels = rows.reshape(height, rgba.bytesPerLine())[:, : width * 4].reshape(height, width, 4)
+    alpha = pixels[:, :, 3] if image.hasAlphaChannel() else None
+    return compute_histogram(pixels[:, :, :3], alpha)
+
+
+def list_image_names(directory: str) -> list[str]:
+    """``directory`` 直下の対応画像のファイル名を返す（順不同）。
+
+    絶対パスではなくファイル名だけを返し、ディレクトリは呼び出し側で 1 つだけ持つ
+    （数十万件でも同じプレフィックス文字列を件数分複製しない）。
+    表示にもそのまま使うため、元の大文字小文字を保持する。
+    """
+    from ..config.constants import SUPPORTED_EXTENSIONS
+
+    extensions = tuple(SUPPORTED_EXTENSIONS)
+    return [f for f in os.listdir(directory) if f.lower().endswith(extensions)]
+
+
 class ImageLoader(QObject):
     # QPixmap は GUI リソースで GUI スレッド専用のため、worker では QImage までに留め、
     # QPixmap への変換は受信側（GUI スレッド）の update_image_display で行う。
     image_loaded = pyqtSignal(int, str, QImage)  # (generation, file_path, image)
-    list_loaded = pyqtSignal(int, list, int)  # (generation, file_list, initial_index)
+    histogram_ready = pyqtSignal(int, str, object)  # (generation, file_path, ImageHistogram)
+    mipmaps_ready = pyqtSignal(int, str, list)  # (generation, file_path, levels)
+    list_loaded = pyqtSignal(int, str, list, int)  # (generation, directory, names, initial_index)
+    name_index_ready = pyqtSignal(int, object)  # (generation, NameIndex)
 
     def __init__(self) -> None:
         super().__init__()
+        self._skip_mipmaps = False
+        self._color = ColorManager()
+
+    def cancel_mipmaps(self) -> None:
+        """GUI スレッドから呼ぶ。作成中のミップマップを打ち切らせる（次の画像を優先する）。"""
+        self._skip_mipmaps = True
+
+    @pyqtSlot(bytes)
+    def set_output_profile(self, icc_profile: bytes) -> None:
+        """以降に読み込む画像を ``icc_profile``（空なら sRGB）の色に変換させる"""
+        self._color.set_output_profile(icc_profile)
 
     @pyqtSlot(int, str)
     def load_image(self, generation: int, file_path: str) -> None:
-        # QImageReader だと失敗理由（未対応フォーマット/破損/権限等）を errorString で残せる
-        reader = QImageReader(file_path)
-        reader.setAutoTransform(True)
-        image = reader.read()
-
-        if image.isNull() and file_path.lower().endswith(".jxl"):
-            logger.debug("Qt failed to load JPEG XL, trying imagecodecs fallback: %s", file_path)
-            try:
-                image = _load_jxl_with_imagecodecs(file_path)
-            except Exception:
-                logger.exception("failed to load JPEG XL fallback: %s", file_path)
-
-        # fallback まで含めて読めなかった場合のみ警告する（成功時の誤検知を防ぐ）
-        if image.isNull():
-            logger.warning("failed to load image: %s error=%s", file_path, reader.errorString())
-
+        self._skip_mipmaps = False
+        image = self._color.convert(decode_image(file_path))
         self.image_loaded.emit(generation, file_path, image)
+        # 表示を待たせないよう、ヒストグラムとミップマップは画像を渡してから作る
+        histogram = image_histogram(image)
+        if histogram is not None:
+            self.histogram_ready.emit(generation, file_path, histogram)
+        levels = build_mipmaps(image, should_stop=lambda: self._skip_mipmaps)
+        if levels:
+            self.mipmaps_ready.emit(generation, file_path, levels)
+
+    @pyqtSlot(int, list)
+    def build_name_index(self, generation: int, names: list) -> None:
+        """ファイル名検索用のインデックスを作る（GUI スレッドでのソートを避ける）"""
+        self.name_index_ready.emit(generation, NameIndex(names))
 
     @pyqtSlot(int, str, str)
     def load_file_list(self, generation: int, directory: str, target_path: str) -> None:
         """指定されたディレクトリをスキャンし、ファイルリストと初期インデックスを返す"""
-        from ..config.constants import SUPPORTED_EXTENSIONS
-
         try:
-            # 表示にもそのまま使うため、元の大文字小文字を保持したパスを返す。
             # 並び順は呼び出し側 (ImageViewer) が Windows 論理順で決めるので、ここではソートしない。
-            file_list = [
-                os.path.join(directory, f)
-                for f in os.listdir(directory)
-                if f.lower().endswith(tuple(SUPPORTED_EXTENSIONS))
-            ]
+            names = list_image_names(directory)
             # 比較は大文字小文字を無視して行う（target_path は呼び出し側で正規化済み）
             initial_index = next(
                 (
                     i
-                    for i, path in enumerate(file_list)
-                    if os.path.normcase(os.path.normpath(path)) == target_path
+                    for i, name in enumerate(names)
+                    if os.path.normcase(os.path.normpath(os.path.join(directory, name)))
+                    == target_path
                 ),
                 0,
             )
 
-            self.list_loaded.emit(generation, file_list, initial_index)
+            self.list_loaded.emit(generation, directory, names, initial_index)
         except Exception:
             logger.exception("ファイルリストの読み込みに失敗: directory=%s", directory)
-            self.list_loaded.emit(generation, [], -1)
+            self.list_loaded.emit(generation, directory, [], -1)
@@ -0,0 +1,82 @@
+"""2 番目以降のインスタンスから渡されたファイルパスを受け取るサーバー（GUI スレッドで動かす）。
+
+相手ごとの読み取りは ``readyRead`` で届いた分だけを行い、GUI スレッドで相手を待たない
+（``waitFor*`` を呼ばない）。メッセージの形式は :mod:`hiyoko_viewer.core.ipc_protocol`。
+
+複数ファイルを選んで開くとファイルの数だけインスタンスが起動し、ほぼ同時に送ってくる。
+届いたパスは 1 つの待ち行列にまとめ（同じパスは 1 回だけ）、最後に届いてから
+``IPC_BATCH_DELAY_MS`` 待って ``paths_received`` でまとめて渡す。
+"""
+
+from __future__ import annotations
+
+import logging
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal, pyqtSlot
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+
+from ..config.constants import IPC_BATCH_DELAY_MS
+from ..core.ipc_protocol import MessageBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class InstanceServer(QObject):
+    # (paths) 届いた順。空なら「ウィンドウを前面に出すだけ」
+    paths_received = pyqtSignal(list)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._accept_connections)
+        # 届いた順を保ったまま同じパスを 1 回にまとめる（値は使わない）
+        self._queue: dict[str, None] = {}
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.setInterval(IPC_BATCH_DELAY_MS)
+        self._batch_timer.timeout.connect(self.flush)
+
+    def listen(self, name: str) -> bool:
+        """``name`` で待ち受ける。できなければ理由をログに残して False を返す"""
+        # 異常終了で取り残されたソケット（主にUnix系）を掃除してから listen する
+        QLocalServer.removeServer(name)
+        if self._server.listen(name):
+            return True
+        logger.warning("failed to listen IPC server: %s", self._server.errorString())
+        return False
+
+    def _accept_connections(self) -> None:
+        while (socket := self._server.nextPendingConnection()) is not None:
+            buffer = MessageBuffer()
+            socket.readyRead.connect(
+                lambda socket=socket, buffer=buffer: self._read(socket, buffer)
+            )
+            socket.disconnected.connect(socket.deleteLater)
+            # 接続の通知より先にデータが届いていることがある
+            self._read(socket, buffer)
+
+    def _read(self, socket: QLocalSocket, buffer: MessageBuffer) -> None:
+        if not socket.bytesAvailable():
+            return
+        try:
+            messages = buffer.feed(socket.readAll().data())
+        except ValueError:
+            logger.warning("dropping IPC peer that sent a malformed message", exc_info=True)
+            socket.abort()
+            return
+        for paths in messages:
+            self.enqueue(paths)
+
+    def enqueue(self, paths: list[str]) -> None:
+        """``paths`` を待ち行列に加え、続けて届く分を待ってからまとめて渡す"""
+        for path in paths:
+            if path:
+                self._queue.setdefault(path)
+        self._batch_timer.start()
+
+    @pyqtSlot()
+    def flush(self) -> None:
+        """待ち行列のパスを今すぐ渡す"""
+        self._batch_timer.stop()
+        paths, self._queue = list(self._queue), {}
+        self.paths_received.emit(paths)
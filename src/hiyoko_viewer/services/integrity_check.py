@@ -0,0 +1,222 @@
+"""フォルダ内の画像を最後までデコードして、壊れた/途中で切れたファイルを探す検査。
+
+GUI からはワーカー（専用スレッド）として、コマンドラインからは
+:mod:`hiyoko_viewer.check` として使う。デコードは CPU を使い切るのでプロセスプールで
+並列に行い、結果はチャンクごとに逐次返す。検査結果は mtime/サイズ付きで
+:class:`~hiyoko_viewer.core.integrity_journal.IntegrityJournal` に記録し、中断しても
+次回は変更の無い検査済みファイルを飛ばして続きから検査する。
+
+Qt の JPEG デコーダは途中で切れたファイルも（下側を灰色で埋めて）読めたことにするため、
+Qt で読めた画像は Pillow でも全フレームを読み、切れていないかを確かめる。
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import sqlite3
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Executor
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImageReader
+
+from ..config.constants import INTEGRITY_ALLOCATION_LIMIT_MB, INTEGRITY_CHUNK_SIZE
+from ..core.file_stats import stat_files
+from ..core.integrity_journal import IntegrityJournal
+from .image_loader import _load_jxl_with_imagecodecs
+
+logger = logging.getLogger(__name__)
+
+
+def init_check_worker() -> None:
+    """検査プロセスの初期化。Qt のデコードの確保上限を検査用に引き上げる"""
+    QImageReader.setAllocationLimit(INTEGRITY_ALLOCATION_LIMIT_MB)
+
+
+def _exceeds_allocation_limit(reader: QImageReader) -> bool:
+    """上限を超えて Qt がデコードを断る大きさか（その場合は壊れているかどうか分からない）"""
+    limit_mb = QImageReader.allocationLimit()
+    size = reader.size()
+    if limit_mb <= 0 or not size.isValid():
+        return False
+    # Qt は 32bit の画素で見積もる
+    return size.width() * size.height() * 4 > limit_mb * 1024 * 1024
+
+
+def _check_with_qt(file_path: str) -> str:
+    reader = QImageReader(file_path)
+    if _exceeds_allocation_limit(reader):
+        # 断られた結果を破損と見なさず、Pillow の検査に任せる
+        return ""
+    frames = max(reader.imageCount(), 1)
+    for _ in range(frames):
+        if reader.read().isNull():
+            return f"Qt: {reader.errorString()}"
+    return ""
+
+
+def _check_with_pillow(file_path: str) -> str:
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(file_path) as image:
+            for frame in range(getattr(image, "n_frames", 1)):
+                image.seek(frame)
+                image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        # Pillow が扱えない形式（SVG 等）/巨大画像は Qt の結果に任せる
+        return ""
+    except (OSError, ValueError, SyntaxError, EOFError) as e:
+        return f"Pillow: {e}"
+    return ""
+
+
+def check_image(file_path: str) -> str:
+    """``file_path`` を全フレームデコードする。正常なら空文字、壊れていれば理由を返す。
+
+    プロセスプールから呼ぶので、モジュールの最上位に置いて例外を外へ出さないこと。
+    """
+    if not os.path.isfile(file_path):
+        return "ファイルが見つかりません"
+    error = _check_with_qt(file_path)
+    if error and file_path.lower().endswith(".jxl"):
+        # Qt に JPEG XL プラグインが無い環境では表示と同じく imagecodecs で読む
+        try:
+            if not _load_jxl_with_imagecodecs(file_path).isNull():
+                return ""
+        except Exception as e:
+            return f"{error} / imagecodecs: {e}"
+        return error
+    return error or _check_with_pillow(file_path)
+
+
+def iter_checks(
+    directory: str,
+    names: Sequence[str],
+    pool: Executor,
+    journal: IntegrityJournal | None = None,
+    should_stop: Callable[[], bool] = lambda: False,
+) -> Iterator[tuple[int, list[tuple[int, str]]]]:
+    """``names`` を検査し、``(検査済みの件数, 今回見つかった (名前 ID, 理由))`` を逐次返す。
+
+    記録済みで mtime/サイズが変わっていないファイルは検査せず、最初にまとめて返す。
+    ``should_stop`` が True を返したらチャンクの切れ目で打ち切る。
+    """
+    stats = stat_files(directory, names)
+    recorded = _load_recorded(journal, directory)
+    failures: list[tuple[int, str]] = []
+    pending: list[int] = []
+    for name_id, name in enumerate(names):
+        entry = recorded.get(name)
+        if (
+            entry is not None
+            and entry[0] == stats.mtime[name_id]
+            and entry[1] == stats.size[name_id]
+        ):
+            if entry[2]:
+                failures.append((name_id, entry[2]))
+        else:
+            pending.append(name_id)
+    done = len(names) - len(pending)
+    yield done, failures
+    if pending:
+        logger.info("checking %d images: directory=%s", len(pending), directory)
+    for start in range(0, len(pending), INTEGRITY_CHUNK_SIZE):
+        if should_stop():
+            return
+        chunk = pending[start : start + INTEGRITY_CHUNK_SIZE]
+        errors = pool.map(
+            check_image, [os.path.join(directory, names[name_id]) for name_id in chunk]
+        )
+        failures = []
+        entries = []
+        for name_id, error in zip(chunk, errors, strict=True):
+            if error:
+                failures.append((name_id, error))
+            if not math.isnan(stats.mtime[name_id]):
+                entries.append((names[name_id], stats.mtime[name_id], stats.size[name_id], error))
+        _store(journal, directory, entries)
+        done += len(chunk)
+        yield done, failures
+
+
+def open_journal(db_path: str) -> IntegrityJournal | None:
+    """検査記録を開く。``db_path`` が空/開けなければ None（記録せずに検査する）"""
+    if not db_path:
+        return None
+    try:
+        return IntegrityJournal(db_path)
+    except (OSError, sqlite3.Error):
+        logger.warning("integrity journal is unavailable: %s", db_path, exc_info=True)
+        return None
+
+
+def _load_recorded(
+    journal: IntegrityJournal | None, directory: str
+) -> dict[str, tuple[float, int, str]]:
+    if journal is None:
+        return {}
+    try:
+        return journal.load_directory(directory)
+    except sqlite3.Error:
+        logger.warning("failed to read integrity journal: %s", directory, exc_info=True)
+        return {}
+
+
+def _store(journal: IntegrityJournal | None, directory: str, entries: list) -> None:
+    if journal is None or not entries:
+        return
+    try:
+        journal.store(directory, entries)
+    except sqlite3.Error:
+        logger.warning("failed to write integrity journal: %s", directory, exc_info=True)
+
+
+class IntegrityChecker(QObject):
+    # (generation, checked, total, failures)。failures は今回見つかった (名前 ID, 理由)
+    integrity_progress = pyqtSignal(int, int, int, list)
+    # (generation, checked)
+    integrity_finished = pyqtSignal(int, int)
+
+    def __init__(self, journal_path: str = "", max_workers: int | None = None) -> None:
+        super().__init__()
+        self._latest_generation = 0
+        # 空なら検査結果を記録しない（再開できない）
+        self._journal_path = journal_path
+        self._max_workers = max_workers
+
+    def cancel_older_than(self, generation: int) -> None:
+        """GUI スレッドから呼ぶ。``generation`` より古い一覧の検査を打ち切らせる。"""
+        self._latest_generation = max(self._latest_generation, generation)
+
+    @pyqtSlot(int, str, list)
+    def scan(self, generation: int, directory: str, names: list) -> None:
+        """``directory`` の ``names``（名前 ID 順）を検査する"""
+        self.cancel_older_than(generation)
+        journal = open_journal(self._journal_path)
+        checked = 0
+        # プロセスプール（multiprocessing の大半）は検査を始めるときに読み込む
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self._max_workers, initializer=init_check_worker
+            ) as pool:
+                for checked, failures in iter_checks(
+                    directory,
+                    names,
+                    pool,
+                    journal,
+                    should_stop=lambda: self._latest_generation != generation,
+                ):
+                    self.integrity_progress.emit(generation, checked, len(names), failures)
+        finally:
+            if journal is not None:
+                journal.close()
+        if self._latest_generation != generation:
+            logger.info("integrity check cancelled: directory=%s", directory)
+            return
+        logger.info("integrity check finished: %d files in %s", checked, directory)
+        self.integrity_finished.emit(generation, checked)
@@ -0,0 +1,123 @@
+"""前後の兄弟フォルダを先読みするワーカー（専用スレッドで動かす）。
+
+表示中のフォルダと同じ親を持つフォルダを論理順に並べ、前後それぞれで画像を
+含む最初のフォルダについて、ファイル一覧の論理順ソートと先頭画像のデコードまで
+済ませておく。フォルダ移動時はこの結果をそのまま使うので、画像の切り替えと同じ
+速さでフォルダを切り替えられる。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage
+
+from ..config.constants import NG_FOLDER, OK_FOLDER, QUARANTINE_FOLDER, SIBLING_SEARCH_LIMIT
+from ..core.histogram import ImageHistogram
+from ..core.sorting import windows_logical_key
+from .color_management import ColorManager
+from .image_loader import decode_image, image_histogram, list_image_names
+
+logger = logging.getLogger(__name__)
+
+_SKIPPED_FOLDERS = frozenset(name.casefold() for name in (OK_FOLDER, NG_FOLDER, QUARANTINE_FOLDER))
+
+
+@dataclass(frozen=True)
+class FolderListing:
+    """先読み済みのフォルダ。``order`` は ``names`` を論理順に並べたインデックス配列。"""
+
+    directory: str
+    names: list[str]
+    order: list[int]
+    first_image: QImage
+    first_histogram: ImageHistogram | None = None
+
+    @property
+    def first_path(self) -> str:
+        return os.path.join(self.directory, self.names[self.order[0]])
+
+
+def list_sibling_folders(directory: str) -> tuple[list[str], int]:
+    """``directory`` の兄弟フォルダ（自身を含む）を論理順で返し、自身の位置も返す。"""
+    parent = os.path.dirname(os.path.normpath(directory))
+    if not parent or os.path.normcase(parent) == os.path.normcase(os.path.normpath(directory)):
+        # ドライブ直下など、親が無い
+        return [], -1
+    with os.scandir(parent) as entries:
+        folders = [
+            entry.path
+            for entry in entries
+            if entry.name.casefold() not in _SKIPPED_FOLDERS and entry.is_dir()
+        ]
+    folders.sort(key=windows_logical_key)
+    target = os.path.normcase(os.path.normpath(directory))
+    index = next(
+        (i for i, path in enumerate(folders) if os.path.normcase(path) == target),
+        -1,
+    )
+    return folders, index
+
+
+class SiblingPrefetcher(QObject):
+    # (generation, direction, listing)。direction は +1（次）/-1（前）、無ければ listing は None
+    sibling_prefetched = pyqtSignal(int, int, object)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._latest_generation = 0
+        self._color = ColorManager()
+
+    def cancel_older_than(self, generation: int) -> None:
+        """GUI スレッドから呼ぶ。``generation`` より古い先読みを打ち切らせる。"""
+        self._latest_generation = max(self._latest_generation, generation)
+
+    @pyqtSlot(bytes)
+    def set_output_profile(self, icc_profile: bytes) -> None:
+        self._color.set_output_profile(icc_profile)
+
+    @pyqtSlot(int, str)
+    def prefetch(self, generation: int, directory: str) -> None:
+        self.cancel_older_than(generation)
+        try:
+            folders, index = list_sibling_folders(directory)
+        except OSError:
+            logger.exception("兄弟フォルダの列挙に失敗: directory=%s", directory)
+            folders, index = [], -1
+
+        for direction in (1, -1):
+            listing = None
+            if index >= 0:
+                listing = self._find_listing(folders, index, direction, generation)
+            if self._latest_generation != generation:
+                return
+            self.sibling_prefetched.emit(generation, direction, listing)
+
+    def _find_listing(
+        self, folders: list[str], index: int, direction: int, generation: int
+    ) -> FolderListing | None:
+        """``direction`` 方向で画像を含む最初の兄弟フォルダを読み込む。"""
+        position = index + direction
+        searched = 0
+        while 0 <= position < len(folders) and searched < SIBLING_SEARCH_LIMIT:
+            if self._latest_generation != generation:
+                return None
+            directory = folders[position]
+            try:
+                names = list_image_names(directory)
+            except OSError:
+                names = []
+            if names:
+                order = sorted(range(len(names)), key=lambda i: windows_logical_key(names[i]))
+                first_image = self._color.convert(
+                    decode_image(os.path.join(directory, names[order[0]]))
+                )
+                return FolderListing(
+                    directory, names, order, first_image, image_histogram(first_image)
+                )
+            position += direction
+            searched += 1
+        return None
@@ -0,0 +1,84 @@
+"""SVG をバックグラウンドスレッドでタイルごとにラスタライズするワーカー。
+
+経路の多い SVG（地図や 10 万本のパスを持つグラフ等）は、解析にも全体のラスタライズにも
+時間がかかる。GUI スレッドでは行わず、解析済みの文書をこの worker で持ち回り、
+表示サイズ（ズーム段）ごとに見えているタイルだけを ``QImage`` に描いて返す。
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from PyQt6.QtCore import QObject, QRectF, Qt, pyqtSignal, pyqtSlot
+from PyQt6.QtGui import QImage, QPainter
+
+from ..config.constants import SVG_TILE_SIZE
+from ..core.tiles import TileKey, tile_bounds
+from .color_management import ColorManager
+
+if TYPE_CHECKING:
+    from PyQt6.QtSvg import QSvgRenderer
+
+logger = logging.getLogger(__name__)
+
+
+def render_tile(renderer: QSvgRenderer, key: TileKey, tile_size: int = SVG_TILE_SIZE) -> QImage:
+    """文書全体を ``key`` の表示サイズに拡縮したときの、``key`` のタイルの部分だけを描く"""
+    x, y, width, height = tile_bounds(key, tile_size)
+    image = QImage(width, height, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+    painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+    painter.setClipRect(0, 0, width, height)
+    painter.translate(-x, -y)
+    renderer.render(painter, QRectF(0, 0, key.width, key.height))
+    painter.end()
+    return image
+
+
+class SvgTileRenderer(QObject):
+    # (file_path, TileKey, image)
+    tile_ready = pyqtSignal(str, object, QImage)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._latest_request = 0
+        # 最後に解析した文書。同じファイルのタイルはズーム段が変わっても解析し直さない
+        self._document_path = ""
+        self._renderer: QSvgRenderer | None = None
+        # SVG の色は sRGB として描かれるので、タイルも出力プロファイルへ変換する
+        self._color = ColorManager()
+
+    def cancel_older_than(self, request: int) -> None:
+        """GUI スレッドから呼ぶ。``request`` より古い依頼の残りのタイルを描かせない。"""
+        self._latest_request = max(self._latest_request, request)
+
+    @pyqtSlot(bytes)
+    def set_output_profile(self, icc_profile: bytes) -> None:
+        self._color.set_output_profile(icc_profile)
+
+    def _document(self, file_path: str) -> QSvgRenderer | None:
+        if file_path != self._document_path:
+            # QtSvg は SVG を初めて開くときに読み込む（起動時には要らない）
+            from PyQt6.QtSvg import QSvgRenderer
+
+            renderer = QSvgRenderer(file_path)
+            self._document_path = file_path
+            self._renderer = renderer if renderer.isValid() else None
+            if self._renderer is None:
+                logger.warning("failed to parse SVG: %s", file_path)
+        return self._renderer
+
+    @pyqtSlot(int, str, list)
+    def render_tiles(self, request: int, file_path: str, keys: list) -> None:
+        """``keys`` のタイルを順に描いて返す。新しい依頼が来たら残りは捨てる"""
+        self.cancel_older_than(request)
+        renderer = self._document(file_path)
+        if renderer is None:
+            return
+        for key in keys:
+            if self._latest_request != request:
+                return
+            self.tile_ready.emit(file_path, key, self._color.convert(render_tile(renderer, key)))
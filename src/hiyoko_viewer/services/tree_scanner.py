@@ -0,0 +1,159 @@
+"""フォルダ以下を再帰的に列挙するスキャナ（専用スレッドで動かす）。
+
+サブフォルダの列挙は上限付きのスレッドプールで並列に行い、見つかった画像は
+一定件数/一定時間ごとに GUI へ逐次送る。``os.scandir`` は I/O 待ちの間 GIL を
+手放すため、ネットワークドライブのように 1 回の列挙が遅い環境ほど効く。
+
+最後に送るフォルダ単位の論理順は、全件のキーを作って並べ直すのではなく、列挙した
+フォルダごとにその場で並べておき、フォルダ（名前 ID の連続した範囲）の順だけを決めて作る。
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from ..config.constants import (
+    NG_FOLDER,
+    OK_FOLDER,
+    QUARANTINE_FOLDER,
+    SCAN_CHUNK_SIZE,
+    SCAN_FLUSH_INTERVAL,
+    SCAN_MAX_WORKERS,
+    SUPPORTED_EXTENSIONS,
+)
+from ..core.sorting import tree_folder_key, windows_logical_key
+
+logger = logging.getLogger(__name__)
+
+# 仕分け先フォルダは再帰表示の対象に含めない（仕分け済みの画像が再び流れてくるため）
+_SKIPPED_FOLDERS = frozenset(name.casefold() for name in (OK_FOLDER, NG_FOLDER, QUARANTINE_FOLDER))
+
+
+def scan_directory(root: str, relative_dir: str) -> tuple[list[str], list[str]]:
+    """``root/relative_dir`` 直下の画像とサブフォルダを ``root`` からの相対パスで返す。"""
+    extensions = tuple(SUPPORTED_EXTENSIONS)
+    names: list[str] = []
+    folders: list[str] = []
+    with os.scandir(os.path.join(root, relative_dir)) as entries:
+        for entry in entries:
+            relative_path = os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+            try:
+                # シンボリックリンク/ジャンクションは辿らない（循環すると終わらない）
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name.casefold() not in _SKIPPED_FOLDERS:
+                        folders.append(relative_path)
+                elif entry.name.lower().endswith(extensions):
+                    names.append(relative_path)
+            except OSError:
+                continue
+    return names, folders
+
+
+def _scan_sorted(root: str, relative_dir: str) -> tuple[str, list[str], list[str]]:
+    """:func:`scan_directory` の画像をフォルダ内の論理順に並べ、フォルダの相対パスと一緒に返す"""
+    names, folders = scan_directory(root, relative_dir)
+    names.sort(key=windows_logical_key)
+    return relative_dir, names, folders
+
+
+class TreeScanner(QObject):
+    # (generation, root, names, initial_index)。initial_index は最初の塊でのみ有効（他は -1）
+    chunk_loaded = pyqtSignal(int, str, list, int)
+    # (generation, order)。全件の名前 ID をフォルダ単位の論理順に並べたインデックス配列
+    scan_finished = pyqtSignal(int, list)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._latest_generation = 0
+
+    def cancel_older_than(self, generation: int) -> None:
+        """GUI スレッドから呼ぶ。``generation`` より古いスキャンを打ち切らせる。"""
+        self._latest_generation = max(self._latest_generation, generation)
+
+    @pyqtSlot(int, str, str)
+    def scan(self, generation: int, root: str, target_path: str) -> None:
+        """``root`` 以下を走査し、見つかった画像を逐次 ``chunk_loaded`` で送る。"""
+        self.cancel_older_than(generation)
+        # 列挙したフォルダごとの (相対パス, 先頭の名前 ID, 件数)。名前自体は保持しない
+        folder_ranges: list[tuple[str, int, int]] = []
+        found = 0
+        chunk: list[str] = []
+        initial_index = -1
+        last_flush = time.monotonic()
+
+        def flush() -> None:
+            nonlocal chunk, initial_index, last_flush
+            self.chunk_loaded.emit(generation, root, chunk, initial_index)
+            chunk = []
+            initial_index = -1
+            last_flush = time.monotonic()
+
+        try:
+            # 開いたファイルがあるフォルダを最初に列挙し、すぐ表示を始められるようにする
+            _, names, folders = _scan_sorted(root, "")
+        except OSError:
+            logger.exception("フォルダの列挙に失敗: root=%s", root)
+            self.chunk_loaded.emit(generation, root, [], -1)
+            self.scan_finished.emit(generation, [])
+            return
+        chunk = names
+        if names:
+            folder_ranges.append(("", 0, len(names)))
+        found = len(names)
+        initial_index = next(
+            (
+                i
+                for i, name in enumerate(names)
+                if os.path.normcase(os.path.normpath(os.path.join(root, name))) == target_path
+            ),
+            0 if names else -1,
+        )
+        flush()
+
+        waiting = deque(folders)
+        running: set[Future] = set()
+        with ThreadPoolExecutor(max_workers=SCAN_MAX_WORKERS) as pool:
+            while waiting or running:
+                if self._latest_generation != generation:
+                    # 別のフォルダが開かれた。未着手の列挙は捨てて打ち切る
+                    for future in running:
+                        future.cancel()
+                    logger.info("recursive scan cancelled: root=%s", root)
+                    return
+                # 投入数を抑えて、巨大なツリーでも future が溜まり続けないようにする
+                while waiting and len(running) < SCAN_MAX_WORKERS * 2:
+                    running.add(pool.submit(_scan_sorted, root, waiting.popleft()))
+                done, running = wait(
+                    running, timeout=SCAN_FLUSH_INTERVAL, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    try:
+                        relative_dir, names, folders = future.result()
+                    except OSError as e:
+                        logger.warning("サブフォルダの列挙に失敗: %s", e)
+                        continue
+                    if names:
+                        folder_ranges.append((relative_dir, found, len(names)))
+                        found += len(names)
+                    chunk.extend(names)
+                    waiting.extend(folders)
+                if len(chunk) >= SCAN_CHUNK_SIZE or (
+                    chunk and time.monotonic() - last_flush >= SCAN_FLUSH_INTERVAL
+                ):
+                    flush()
+        if chunk:
+            flush()
+
+        # 各フォルダの中は並べ済みなので、キーを作るのはフォルダ 1 つにつき 1 回だけ
+        folder_ranges.sort(key=lambda folder_range: tree_folder_key(folder_range[0]))
+        order = [
+            name_id for _, start, count in folder_ranges for name_id in range(start, start + count)
+        ]
+        if self._latest_generation == generation:
+            self.scan_finished.emit(generation, order)
@@ -0,0 +1,167 @@
+"""画像を表示するウィジェット。
+
+静止画は拡縮済みの pixmap を作らず、描く元の pixmap と表示サイズだけを持ち、
+``paintEvent`` で露出した範囲だけを描く。800% に拡大しても拡大後の大きさの
+pixmap は確保しないので、ズーム/パンの負荷は倍率ではなくビューポートの大きさで決まる。
+SVG は worker が描いたタイルを重ね、まだ届いていない所は仮の画像を拡大して埋める。
+アニメーションは worker が縮小したフレームを届くたびに差し替える。
+案内/エラーの文字は ``QLabel`` の機能のまま表示する。
+
+表示サイズとタイルの一辺はデバイスピクセルで受け取る。150%/200% の画面でも、
+デバイスピクセルの大きさに仕上げた pixmap を画面の画素へ 1 対 1 で描く
+（論理ピクセルの大きさで作って描画時に Qt にもう一度拡大させると、ぼやける）。
+"""
+
+from __future__ import annotations
+
+import math
+
+from PyQt6.QtCore import QRectF, QSize
+from PyQt6.QtGui import QPainter, QPaintEvent, QPixmap
+from PyQt6.QtWidgets import QLabel
+
+
+class ImageCanvas(QLabel):
+    """元画像と表示サイズから、見えている範囲だけを描く ``QLabel``。"""
+
+    def __init__(self, text: str = "") -> None:
+        super().__init__(text)
+        self._source = QPixmap()
+        self._display_size = QSize()
+        # タイル表示のときのタイルの一辺と、届いたタイル（(列, 行) → QPixmap）
+        self._tile_size = 0
+        self._tiles: dict[tuple[int, int], QPixmap] = {}
+
+    def set_view(self, source: QPixmap, display_size: QSize) -> None:
+        """``source`` を ``display_size``（デバイスピクセル）に拡縮して描く。
+
+        拡縮は描画時に見えている範囲だけ最近傍で行う（等倍を超える拡大でも画素が
+        ぼやけない）。平滑に縮小したい場合は、縮小済みの pixmap を等倍で渡す。
+        """
+        self.set_tiled_view(source, display_size, 0, {})
+
+    def set_tiled_view(
+        self,
+        placeholder: QPixmap,
+        display_size: QSize,
+        tile_size: int,
+        tiles: dict[tuple[int, int], QPixmap],
+    ) -> None:
+        """``display_size`` の大きさに描いた一辺 ``tile_size`` のタイルを並べて描く。
+
+        大きさはどちらもデバイスピクセル。タイルは ``setDevicePixelRatio`` で画面の
+        倍率を付けておくこと。``tiles`` に無い（まだ届いていない）所は ``placeholder`` を
+        拡縮して埋める。
+        """
+        super().clear()
+        self._source = placeholder
+        self._display_size = QSize(display_size)
+        self._tile_size = tile_size
+        self._tiles = dict(tiles)
+        self.updateGeometry()
+        self.update()
+
+    def add_tile(self, column: int, row: int, tile: QPixmap) -> None:
+        """タイル表示中なら、届いたタイルを加えてその範囲だけ描き直す"""
+        if not self._tile_size or not self.has_view():
+            return
+        self._tiles[(column, row)] = tile
+        target = self._target_rect()
+        ratio = self.devicePixelRatioF()
+        self.update(
+            QRectF(
+                target.x() + column * self._tile_size / ratio,
+                target.y() + row * self._tile_size / ratio,
+                tile.width() / ratio,
+                tile.height() / ratio,
+            ).toAlignedRect()
+        )
+
+    def show_frame(self, frame: QPixmap) -> None:
+        """表示サイズはそのままで、描く元の pixmap だけを差し替える（アニメーションの 1 コマ）"""
+        if not self.has_view():
+            return
+        self._source = frame
+        self.update()
+
+    def has_view(self) -> bool:
+        return not self._source.isNull()
+
+    def display_size(self) -> QSize:
+        """表示サイズ（デバイスピクセル）"""
+        return QSize(self._display_size)
+
+    def _drop_view(self) -> None:
+        self._source = QPixmap()
+        self._display_size = QSize()
+        self._tile_size = 0
+        self._tiles = {}
+
+    def setText(self, text: str) -> None:
+        self._drop_view()
+        super().setText(text)
+
+    def sizeHint(self) -> QSize:
+        if self.has_view():
+            ratio = self.devicePixelRatioF()
+            return QSize(
+                math.ceil(self._display_size.width() / ratio),
+                math.ceil(self._display_size.height() / ratio),
+            )
+        return super().sizeHint()
+
+    def _target_rect(self) -> QRectF:
+        """ウィジェット内で画像を描く範囲（論理ピクセル。ウィジェットの方が大きければ中央）"""
+        ratio = self.devicePixelRatioF()
+        width, height = self._display_size.width(), self._display_size.height()
+        # 画面の画素の境界に揃える（1 対 1 で描き、タイルを継ぎ目なく並べるため）
+        return QRectF(
+            max(0, int(self.width() * ratio - width) // 2) / ratio,
+            max(0, int(self.height() * ratio - height) // 2) / ratio,
+            width / ratio,
+            height / ratio,
+        )
+
+    def _draw_source(self, painter: QPainter, target: QRectF, area: QRectF) -> None:
+        """元の pixmap のうち、表示上の ``area`` に当たる部分を拡縮して描く"""
+        x_scale = self._source.width() / target.width()
+        y_scale = self._source.height() / target.height()
+        source_rect = QRectF(
+            (area.x() - target.x()) * x_scale,
+            (area.y() - target.y()) * y_scale,
+            area.width() * x_scale,
+            area.height() * y_scale,
+        )
+        painter.drawPixmap(area, self._source, source_rect)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if not self.has_view() or self._display_size.isEmpty():
+            super().paintEvent(event)
+            return
+        target = self._target_rect()
+        exposed = QRectF(event.rect()).intersected(target)
+        if exposed.isEmpty():
+            return
+        painter = QPainter(self)
+        if not self._tile_size:
+            self._draw_source(painter, target, exposed)
+        else:
+            # 仮の画像は小さいものを拡大するので、最近傍だとブロック状になりすぎる
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
+            # 透過のある SVG で仮の画像が透けないよう、タイルの無い所だけを仮の画像で埋める
+            size = self._tile_size / self.devicePixelRatioF()
+            left = int((exposed.left() - target.x()) // size)
+            top = int((exposed.top() - target.y()) // size)
+            right = math.ceil((exposed.right() - target.x()) / size) - 1
+            bottom = math.ceil((exposed.bottom() - target.y()) / size) - 1
+            for row in range(top, bottom + 1):
+                for column in range(left, right + 1):
+                    cell = QRectF(
+                        target.x() + column * size, target.y() + row * size, size, size
+                    ).intersected(target)
+                    tile = self._tiles.get((column, row))
+                    if tile is not None:
+                        painter.drawPixmap(cell.topLeft(), tile)
+                    else:
+                        self._draw_source(painter, target, cell.intersected(exposed))
+        painter.end()
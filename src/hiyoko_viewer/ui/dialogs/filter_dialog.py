@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from PyQt6.QtWidgets import (
+    QComboBox,
+    QDialog,
+    QDialogButtonBox,
+    QFormLayout,
+    QSpinBox,
+    QWidget,
+)
+
+from ...config.constants import ASPECT_ANY, ASPECT_FILTER_LABELS
+from ...core.file_stats import DimensionFilter
+
+_MAX_DIMENSION = 100_000
+
+
+class DimensionFilterDialog(QDialog):
+    """解像度と縦横比で表示する画像を絞り込む条件を入力するダイアログ"""
+
+    def __init__(self, current: DimensionFilter, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("解像度/縦横比で絞り込み")
+
+        layout = QFormLayout(self)
+
+        # 0 は「指定なし」として表示する
+        self.min_width_spin = QSpinBox()
+        self.min_width_spin.setRange(0, _MAX_DIMENSION)
+        self.min_width_spin.setSuffix(" px")
+        self.min_width_spin.setSpecialValueText("指定なし")
+        self.min_width_spin.setValue(current.min_width)
+
+        self.min_height_spin = QSpinBox()
+        self.min_height_spin.setRange(0, _MAX_DIMENSION)
+        self.min_height_spin.setSuffix(" px")
+        self.min_height_spin.setSpecialValueText("指定なし")
+        self.min_height_spin.setValue(current.min_height)
+
+        self.aspect_combo = QComboBox()
+        for aspect, label in ASPECT_FILTER_LABELS.items():
+            self.aspect_combo.addItem(label, aspect)
+        self.aspect_combo.setCurrentIndex(max(0, self.aspect_combo.findData(current.aspect)))
+
+        layout.addRow("最小の幅", self.min_width_spin)
+        layout.addRow("最小の高さ", self.min_height_spin)
+        layout.addRow("縦横比", self.aspect_combo)
+
+        button_box = QDialogButtonBox(
+            QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
+        )
+        reset_button = button_box.addButton("解除", QDialogButtonBox.ButtonRole.ResetRole)
+        layout.addRow(button_box)
+
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        reset_button.clicked.connect(self.reset)
+
+    def reset(self) -> None:
+        """条件をすべて外す（OK で確定するまでは反映しない）"""
+        self.min_width_spin.setValue(0)
+        self.min_height_spin.setValue(0)
+        self.aspect_combo.setCurrentIndex(self.aspect_combo.findData(ASPECT_ANY))
+
+    def dimension_filter(self) -> DimensionFilter:
+        return DimensionFilter(
+            min_width=self.min_width_spin.value(),
+            min_height=self.min_height_spin.value(),
+            aspect=self.aspect_combo.currentData(),
+        )
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ...config.constants import QUARANTINE_FOLDER
+
+
+class IntegrityReportDialog(QDialog):
+    """破損チェックで見つかったファイルの一覧。OK で隔離フォルダへの移動を選ぶ"""
+
+    def __init__(self, failures: list[tuple[str, str]], parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("破損ファイルの検査結果")
+        self.resize(640, 400)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel(f"読み込めないファイルが {len(failures)} 件見つかりました。"))
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["ファイル", "エラー"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.addTopLevelItems([QTreeWidgetItem([name, error]) for name, error in failures])
+        self.tree.resizeColumnToContents(0)
+        layout.addWidget(self.tree)
+
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        quarantine_button = button_box.addButton(
+            f"{QUARANTINE_FOLDER} へ移動", QDialogButtonBox.ButtonRole.AcceptRole
+        )
+        layout.addWidget(button_box)
+
+        quarantine_button.clicked.connect(self.accept)
+        button_box.rejected.connect(self.reject)
@@ -0,0 +1,135 @@
+"""ビューポートの右上に重ねて表示するヒストグラム。
+
+worker が求めた :class:`~hiyoko_viewer.core.histogram.ImageHistogram` を受け取り、
+R/G/B を加算合成の塗りで、輝度を白の線で描く。左上/右上の三角は黒つぶれ/白飛びの
+警告で、その画素が ``HISTOGRAM_CLIP_WARNING`` を超えると点灯する（割合は下に文字で出す）。
+描く形は受け取った時点で作っておき、``paintEvent`` では塗るだけにする。
+"""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QPainter, QPainterPath, QPaintEvent, QPolygonF
+from PyQt6.QtWidgets import QWidget
+
+from ..config.constants import HISTOGRAM_CLIP_WARNING, HISTOGRAM_OVERLAY_SIZE
+from ..core.histogram import HISTOGRAM_BINS, ImageHistogram
+
+_PADDING = 8
+_TEXT_HEIGHT = 18
+_MARKER_SIZE = 8
+_CHANNEL_COLORS = (QColor(255, 60, 60, 170), QColor(60, 220, 60, 170), QColor(70, 110, 255, 170))
+_LUMA_COLOR = QColor(235, 235, 235)
+_BACKGROUND = QColor(20, 20, 20, 190)
+_IDLE_MARKER = QColor(90, 90, 90)
+_HIGHLIGHT_WARNING = QColor(255, 80, 80)
+_SHADOW_WARNING = QColor(80, 140, 255)
+
+
+class HistogramOverlay(QWidget):
+    """ヒストグラムと白飛び/黒つぶれの警告を描く、マウスを素通しする半透明のパネル。"""
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents, True)
+        self.setFixedSize(*HISTOGRAM_OVERLAY_SIZE)
+        self._histogram: ImageHistogram | None = None
+        self._channel_paths: list[QPainterPath] = []
+        self._luma_line = QPolygonF()
+
+    def set_histogram(self, histogram: ImageHistogram | None) -> None:
+        """表示するヒストグラムを差し替える（None なら枠と「—」だけ描く）"""
+        self._histogram = histogram
+        self._channel_paths = []
+        self._luma_line = QPolygonF()
+        if histogram is not None:
+            plot = self._plot_rect()
+            # 両端の山（飽和した画素）に全体の縦の縮尺を取られないよう、端を除いた最大で揃える
+            peak = max(1, *(int(bins[1:-1].max()) for bins in histogram[:4]))
+            self._channel_paths = [self._area_path(bins, peak, plot) for bins in histogram[:3]]
+            self._luma_line = QPolygonF(self._points(histogram.luma, peak, plot))
+        self.update()
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(
+            _PADDING,
+            _PADDING + _MARKER_SIZE,
+            self.width() - 2 * _PADDING,
+            self.height() - 2 * _PADDING - _MARKER_SIZE - _TEXT_HEIGHT,
+        )
+
+    @staticmethod
+    def _points(bins, peak: int, plot: QRectF) -> list[QPointF]:
+        step = plot.width() / (HISTOGRAM_BINS - 1)
+        return [
+            QPointF(
+                plot.left() + index * step, plot.bottom() - min(count / peak, 1.0) * plot.height()
+            )
+            for index, count in enumerate(bins.tolist())
+        ]
+
+    def _area_path(self, bins, peak: int, plot: QRectF) -> QPainterPath:
+        path = QPainterPath(QPointF(plot.left(), plot.bottom()))
+        for point in self._points(bins, peak, plot):
+            path.lineTo(point)
+        path.lineTo(plot.right(), plot.bottom())
+        path.closeSubpath()
+        return path
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(_BACKGROUND)
+        painter.drawRoundedRect(QRectF(self.rect()), 6, 6)
+        histogram = self._histogram
+        text_rect = QRectF(
+            _PADDING,
+            self.height() - _PADDING - _TEXT_HEIGHT,
+            self.width() - 2 * _PADDING,
+            _TEXT_HEIGHT,
+        )
+        if histogram is None:
+            painter.setPen(_LUMA_COLOR)
+            painter.drawText(text_rect, Qt.AlignmentFlag.AlignCenter, "—")
+            painter.end()
+            return
+        # 重なった所が白に近づくよう、チャンネルは加算で塗る
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_Plus)
+        for path, color in zip(self._channel_paths, _CHANNEL_COLORS, strict=True):
+            painter.fillPath(path, color)
+        painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_SourceOver)
+        painter.setPen(_LUMA_COLOR)
+        painter.drawPolyline(self._luma_line)
+        shadow_warning = histogram.shadow_clipped > HISTOGRAM_CLIP_WARNING
+        highlight_warning = histogram.highlight_clipped > HISTOGRAM_CLIP_WARNING
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(_SHADOW_WARNING if shadow_warning else _IDLE_MARKER)
+        painter.drawPolygon(self._marker(_PADDING, 1))
+        painter.setBrush(_HIGHLIGHT_WARNING if highlight_warning else _IDLE_MARKER)
+        painter.drawPolygon(self._marker(self.width() - _PADDING, -1))
+        painter.setPen(_SHADOW_WARNING if shadow_warning else _LUMA_COLOR)
+        painter.drawText(
+            text_rect,
+            Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+            f"黒つぶれ {histogram.shadow_clipped:.1%}",
+        )
+        painter.setPen(_HIGHLIGHT_WARNING if highlight_warning else _LUMA_COLOR)
+        painter.drawText(
+            text_rect,
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter,
+            f"白飛び {histogram.highlight_clipped:.1%}",
+        )
+        painter.end()
+
+    @staticmethod
+    def _marker(x: float, direction: int) -> QPolygonF:
+        """上端の ``x`` から内側（``direction`` の向き）へ伸びる警告の三角"""
+        top = _PADDING
+        return QPolygonF(
+            [
+                QPointF(x, top),
+                QPointF(x + direction * _MARKER_SIZE, top),
+                QPointF(x, top + _MARKER_SIZE),
+            ]
+        )
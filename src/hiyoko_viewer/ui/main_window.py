@@ -1,68 +1,139 @@
 """アプリケーションのメインウィンドウ。
 
-描画 (:class:`RenderingMixin`)、ナビゲーション/ファイル操作
-(:class:`NavigationMixin`)、入力イベント (:class:`InputEventMixin`) を
-合成し、ウィンドウ固有の責務（UI 構築・トレイ・設定の保存復元・ダイアログ）を担う。
+描画 (:class:`RenderingMixin`)、アニメーションの再生 (:class:`AnimationMixin`)、
+出力カラープロファイルの選択 (:class:`ColorProfileMixin`)、A/B 比較 (:class:`CompareMixin`)、
+ヒストグラムの重ね表示 (:class:`HistogramMixin`)、
+ナビゲーション/ファイル操作
+(:class:`NavigationMixin`)、ファイル名検索 (:class:`NameSearchMixin`)、
+画像サイズによる絞り込み (:class:`DimensionFilterMixin`)、仕分けの結果処理と取り消し
+(:class:`FileOperationMixin`)、類似画像の確認 (:class:`DuplicateReviewMixin`)、
+破損チェック (:class:`IntegrityScanMixin`)、
+入力イベント (:class:`InputEventMixin`) を合成し、ウィンドウ固有の責務（UI 構築・トレイ・設定の保存復元・ダイアログ）を担う。
 """
 
 from __future__ import annotations
 
 import logging
 import os
+from collections import OrderedDict, deque
 from typing import TYPE_CHECKING
 
-from PyQt6.QtCore import QSettings, Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QAction, QIcon, QPixmap
+from PyQt6.QtCore import QSettings, Qt, QThread, QTimer, pyqtSignal
+from PyQt6.QtGui import QAction, QIcon, QImage, QPixmap
 from PyQt6.QtWidgets import (
     QApplication,
     QFileDialog,
-    QLabel,
     QMainWindow,
     QMenu,
     QMenuBar,
     QScrollArea,
+    QSlider,
     QStatusBar,
     QSystemTrayIcon,
 )
 
 from ..config.constants import (
+    ANIMATION_SCRUBBER_WIDTH,
+    ANIMATION_STATUS_INTERVAL_MS,
     DEFAULT_TITLE,
+    HASH_CACHE_FILE,
+    INTEGRITY_JOURNAL_FILE,
     NOTICE_TEXT_STYLE,
+    SCRUB_SETTLE_MS,
     SETTINGS_APP,
     SETTINGS_ORG,
+    SMOOTH_REDRAW_DELAY_MS,
+    SORT_BY_NAME,
+    SORT_ORDER_LABELS,
     SUPPORTED_EXTENSIONS,
+    UNDO_JOURNAL_SIZE,
+    VIEW_UPDATE_INTERVAL_MS,
     WELCOME_TEXT,
 )
+from ..core.file_list import ImageFileList
+from ..core.file_stats import DimensionFilter
 from ..core.metadata import load_metadata_text
 from ..core.resources import resource_path
+from ..services.animation import AnimationDecoder
+from ..services.cache_paths import cache_file_path
+from ..services.duplicate_finder import DuplicateFinder
+from ..services.file_ops import FileOperationQueue
+from ..services.file_probe import FileProbe
 from ..services.image_loader import ImageLoader
+from ..services.integrity_check import IntegrityChecker
+from ..services.sibling_prefetcher import SiblingPrefetcher
+from ..services.svg_tiles import SvgTileRenderer
+from ..services.tree_scanner import TreeScanner
+from .canvas import ImageCanvas
 from .dialogs.metadata_dialog import MetadataDialog
+from .histogram_overlay import HistogramOverlay
+from .mixins.animation import AnimationMixin
+from .mixins.color_profile import ColorProfileMixin
+from .mixins.compare import CompareMixin
+from .mixins.duplicates import DuplicateReviewMixin
+from .mixins.file_operations import FileOperationMixin
+from .mixins.filtering import DimensionFilterMixin
+from .mixins.histogram import HistogramMixin
 from .mixins.input import InputEventMixin
+from .mixins.integrity import IntegrityScanMixin
 from .mixins.navigation import NavigationMixin
 from .mixins.rendering import RenderingMixin
+from .mixins.search import NameSearchMixin
 
 if TYPE_CHECKING:
     from PyQt6.QtCore import QPointF
-    from PyQt6.QtGui import QMovie
-    from PyQt6.QtSvg import QSvgRenderer
+
+    from ..core.name_index import NameIndex
 
 logger = logging.getLogger(__name__)
 
 
-class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow):
+class ImageViewer(
+    RenderingMixin,
+    AnimationMixin,
+    ColorProfileMixin,
+    CompareMixin,
+    HistogramMixin,
+    NavigationMixin,
+    NameSearchMixin,
+    DimensionFilterMixin,
+    FileOperationMixin,
+    DuplicateReviewMixin,
+    IntegrityScanMixin,
+    InputEventMixin,
+    QMainWindow,
+):
     request_load_image = pyqtSignal(int, str)  # (generation, path)
     request_load_list = pyqtSignal(int, str, str)  # (generation, directory, path)
+    request_scan_tree = pyqtSignal(int, str, str)  # (generation, root, path)
+    request_prefetch_siblings = pyqtSignal(int, str)  # (generation, directory)
+    request_build_name_index = pyqtSignal(int, list)  # (generation, names)
+    request_probe_listing = pyqtSignal(int, str, list)  # (generation, directory, names)
+    request_sort_order = pyqtSignal(int, str)  # (generation, sort_key)
+    request_filter = pyqtSignal(int, object)  # (generation, DimensionFilter)
+    request_move_file = pyqtSignal(int, str, str)  # (op_id, source, destination)
+    request_trash_file = pyqtSignal(int, str)  # (op_id, path)
+    request_find_duplicates = pyqtSignal(int, str, list)  # (generation, directory, names)
+    request_integrity_scan = pyqtSignal(int, str, list)  # (generation, directory, names)
+    request_svg_tiles = pyqtSignal(int, str, list)  # (request, path, [TileKey])
+    request_open_animation = pyqtSignal(int, str, QImage)  # (serial, path, first_frame)
+    request_animation_frames = pyqtSignal(int, int)  # (serial, count)
+    output_profile_changed = pyqtSignal(bytes)  # 出力 ICC プロファイル（空なら sRGB）
 
     # --- インスタンス変数の型宣言 (Python 3.6+) ---
     fit_to_window: bool
     is_loading: bool
     is_shuffled: bool
-    image_files: list[str]
-    sorted_image_files: list[str]
+    recursive_mode: bool
+    sort_key: str
+    dimension_filter: DimensionFilter
+    image_files: ImageFileList
     current_index: int
+    _name_index: NameIndex | None
+    _search_text: str | None
+    _search_prompt: str | None
     original_pixmap: QPixmap
-    svg_renderer: QSvgRenderer | None
-    current_movie: QMovie | None
+    svg_path: str | None
     current_filesize: int
     scale_factor: float
     space_key_pressed: bool
@@ -70,8 +141,25 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
     pan_last_mouse_pos: QPointF | None
     worker_thread: QThread
     image_loader: ImageLoader
-    image_label: QLabel
+    scan_thread: QThread
+    tree_scanner: TreeScanner
+    prefetch_thread: QThread
+    sibling_prefetcher: SiblingPrefetcher
+    probe_thread: QThread
+    file_probe: FileProbe
+    file_ops_thread: QThread
+    file_operations: FileOperationQueue
+    hash_thread: QThread
+    duplicate_finder: DuplicateFinder
+    integrity_thread: QThread
+    integrity_checker: IntegrityChecker
+    svg_thread: QThread
+    svg_tiler: SvgTileRenderer
+    animation_thread: QThread
+    animation_decoder: AnimationDecoder
+    image_label: ImageCanvas
     scroll_area: QScrollArea
+    histogram_overlay: HistogramOverlay
 
     def __init__(self) -> None:
         super().__init__()
@@ -92,17 +180,77 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
         self.is_loading = False
         self._load_generation = 0
         self.is_shuffled = False
-        self.image_files = []
-        self.sorted_image_files = []
+        self.recursive_mode = False
+        self.sort_key = SORT_BY_NAME
+        self.dimension_filter = DimensionFilter()
+        self._tree_list_pending = False
+        # 兄弟フォルダの先読み結果（+1: 次 / -1: 前 → FolderListing、無ければ None）
+        self._sibling_folders = {}
+        self._pending_folder_jump = 0
+        # 複数ファイルを渡されて開いたときの絞り込み（一覧を待つ間の正規化パスの集合と、
+        # 一覧に対する非表示フラグ。絞り込んでいなければ None）
+        self._forwarded_selection = None
+        self._forwarded_hidden = None
+        self.image_files = ImageFileList.empty()
         self.current_index = -1
+        # ファイル名検索（索引は worker で構築。検索中でなければ _search_text は None）
+        self._name_index = None
+        self._search_text = None
+        self._search_rank = -1
+        self._search_prompt = None
+        # 依頼中のファイル操作（op_id → FileOperation）と、取り消せる移動の記録
+        self._next_file_op_id = 0
+        self._pending_file_operations = {}
+        self._undo_journal = deque(maxlen=UNDO_JOURNAL_SIZE)
+        # 類似画像の確認（確認中でなければ _duplicate_groups は None）
+        self._duplicate_groups = None
+        self._duplicate_group_index = 0
+        # 破損チェック中に見つかった (名前 ID, 理由)（検査中でなければ None）
+        self._integrity_failures = None
         self.original_pixmap = QPixmap()
-        self.svg_renderer = None
-        self.current_movie = None
+        # 表示中の SVG のパス（解析とラスタライズは worker が行う。SVG でなければ None）
+        self.svg_path = None
+        # worker が描いた SVG タイル（TileKey → QPixmap）と、最後に出したタイル描画の依頼番号
+        self._svg_tiles = OrderedDict()
+        self._svg_tile_request = 0
+        # 平滑補間で描いた表示サイズごとの pixmap（(幅, 高さ) → QPixmap）と、その元画像の cacheKey
+        self._renditions = OrderedDict()
+        self._rendition_source = 0
+        # 表示中の画像のミップマップ（大きい順。worker から届くまでは空）
+        self._mipmaps = []
+        # 再生中のアニメーション（worker が開いた順の通し番号、届いたフレームの待ち行列
+        # (index, QPixmap, 表示時間)、表示中のコマ、次のコマを出す時刻 (ms)、飛ばしたコマ数、
+        # worker に頼んでまだ届いていないコマ数、次に待ち行列へ積むコマの番号、
+        # 届き次第表示する移動先のコマの番号（移動中でなければ None）と移動の依頼番号）
+        self._animation_serial = 0
+        self._animation_frames = deque()
+        self._animation_frame = None
+        self._animation_frame_count = 0
+        self._animation_index = 0
+        self._animation_due = 0.0
+        self._animation_paused = False
+        self._animation_dropped = 0
+        self._animation_pending = 0
+        self._animation_next_index = 0
+        self._animation_seek_index = None
+        self._animation_seek_id = 0
+        # A/B 比較中の 2 枚の名前 ID（比較中でなければ None）と、デコード済みの方の表示
+        # （名前 ID → _CompareView）
+        self._compare_pair = None
+        self._compare_views = {}
+        # worker が求めた画像ごとのヒストグラム（パス → ImageHistogram。古いものから捨てる）
+        self._histograms = OrderedDict()
+        # 出力（ディスプレイ）の ICC プロファイルのパス（空なら sRGB）
+        self._output_profile_path = ""
         self.current_filesize = 0
         self.scale_factor = 1.0
         self.space_key_pressed = False
         self.is_panning = False
         self.pan_last_mouse_pos = None
+        # 次の表示フレームでまとめて反映するパンの移動量と、合成したズームの変換
+        self._pending_pan = (0.0, 0.0)
+        self._pending_zoom = 1.0
+        self._pending_zoom_shift = (0.0, 0.0)
         self._was_maximized_before_fullscreen: bool = False
 
     def _setup_ui(self) -> None:
@@ -110,7 +258,7 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
         self.setWindowTitle(DEFAULT_TITLE)
         self.setGeometry(100, 100, 800, 600)
         self.setAcceptDrops(True)
-        self.image_label = QLabel(WELCOME_TEXT)
+        self.image_label = ImageCanvas(WELCOME_TEXT)
         self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.image_label.setStyleSheet(NOTICE_TEXT_STYLE)
         self.scroll_area = QScrollArea()
@@ -118,10 +266,53 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
         self.scroll_area.setWidget(self.image_label)
         self.scroll_area.setWidgetResizable(True)
         self.setCentralWidget(self.scroll_area)
+        # ビューポートの子にして右上に重ねる（スクロールする画像とは別に固定で描く）
+        self.histogram_overlay = HistogramOverlay(self.scroll_area.viewport())
+        self.histogram_overlay.hide()
+        # リサイズ/ズーム中は高速補間で描き、操作が止まったらこのタイマーで描き直す
+        self._smooth_redraw_timer = QTimer(self)
+        self._smooth_redraw_timer.setSingleShot(True)
+        self._smooth_redraw_timer.setInterval(SMOOTH_REDRAW_DELAY_MS)
+        # 押しっぱなしの送りが止まったら、このタイマーでその位置の画像を読み込む
+        self._scrub_timer = QTimer(self)
+        self._scrub_timer.setSingleShot(True)
+        self._scrub_timer.setInterval(SCRUB_SETTLE_MS)
+        # パン/ホイールズームの入力はこのタイマーで 1 表示フレームに 1 回まとめて反映する
+        self._view_update_timer = QTimer(self)
+        self._view_update_timer.setSingleShot(True)
+        self._view_update_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._view_update_timer.setInterval(VIEW_UPDATE_INTERVAL_MS)
+        # 描き直し/スクロールのたびに、レイアウトが落ち着いてから SVG タイルを依頼する
+        self._svg_tile_timer = QTimer(self)
+        self._svg_tile_timer.setSingleShot(True)
+        self._svg_tile_timer.setInterval(0)
+        self._animation_timer = QTimer(self)
+        self._animation_timer.setSingleShot(True)
+        self._animation_timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._animation_status_timer = QTimer(self)
+        self._animation_status_timer.setSingleShot(True)
+        self._animation_status_timer.setInterval(ANIMATION_STATUS_INTERVAL_MS)
         menu: QMenuBar = self.menuBar()
         file_menu = menu.addMenu("ファイル")
         self.open_action = file_menu.addAction("開く")
         self.open_action.setShortcut("Ctrl+O")
+        self.recursive_action = file_menu.addAction("サブフォルダも含めて表示")
+        self.recursive_action.setCheckable(True)
+        self.recursive_action.setShortcut("Ctrl+R")
+        self.integrity_action = file_menu.addAction("破損ファイルを検査")
+        self.integrity_action.setShortcut("Ctrl+Shift+I")
+        view_menu = menu.addMenu("表示")
+        self.filter_action = view_menu.addAction("解像度/縦横比で絞り込み...")
+        self.filter_action.setShortcut("Ctrl+Shift+F")
+        self.duplicates_action = view_menu.addAction("類似画像を確認")
+        self.duplicates_action.setShortcut("Ctrl+D")
+        view_menu.addSeparator()
+        self.choose_profile_action = view_menu.addAction("出力カラープロファイルを選択...")
+        self.reset_profile_action = view_menu.addAction("出力カラープロファイルを sRGB に戻す")
+        self.reset_profile_action.setEnabled(False)
+        view_menu.addSeparator()
+        self.histogram_action = view_menu.addAction("ヒストグラムを表示 (H)")
+        self.histogram_action.setCheckable(True)
         self.status_bar = QStatusBar(self)
         self.setStatusBar(self.status_bar)
         self.status_bar.setStyleSheet("""
@@ -135,10 +326,33 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
                 border: none;
             }
         """)
+        # アニメーションのフレーム位置。ドラッグで任意のフレームへ移る（アニメーション以外では隠す）
+        self.frame_scrubber = QSlider(Qt.Orientation.Horizontal)
+        self.frame_scrubber.setFixedWidth(ANIMATION_SCRUBBER_WIDTH)
+        # キー操作（←/→ での画像送り等）をスライダーに取られないようにする
+        self.frame_scrubber.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.frame_scrubber.hide()
+        self.status_bar.addPermanentWidget(self.frame_scrubber)
 
     def _create_connections(self) -> None:
         """シグナルとスロット、イベントフィルターを接続する"""
         self.open_action.triggered.connect(self.open_image)
+        self.recursive_action.toggled.connect(self._set_recursive_mode)
+        self.filter_action.triggered.connect(self._open_filter_dialog)
+        self.duplicates_action.triggered.connect(self._toggle_duplicate_review)
+        self.integrity_action.triggered.connect(self.start_integrity_scan)
+        self.choose_profile_action.triggered.connect(self._choose_output_profile)
+        self.reset_profile_action.triggered.connect(self._reset_output_profile)
+        self.histogram_action.toggled.connect(self._set_histogram_visible)
+        self._smooth_redraw_timer.timeout.connect(self.redraw_image)
+        self._view_update_timer.timeout.connect(self._apply_view_update)
+        self._scrub_timer.timeout.connect(self._end_scrub)
+        self._svg_tile_timer.timeout.connect(self._request_visible_svg_tiles)
+        self._animation_timer.timeout.connect(self._advance_animation)
+        self._animation_status_timer.timeout.connect(self._refresh_animation_status)
+        self.frame_scrubber.valueChanged.connect(self.on_frame_scrubbed)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.on_view_scrolled)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.on_view_scrolled)
         self.scroll_area.viewport().installEventFilter(self)
         self.scroll_area.installEventFilter(self)
 
@@ -150,13 +364,107 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
         # 別スレッドへ移した QObject は、そのスレッドの終了時にイベントループ上で破棄する
         self.worker_thread.finished.connect(self.image_loader.deleteLater)
         self.image_loader.image_loaded.connect(self.update_image_display)
+        self.image_loader.mipmaps_ready.connect(self.on_mipmaps_ready)
+        self.image_loader.histogram_ready.connect(self.on_histogram_ready)
         self.image_loader.list_loaded.connect(self.on_file_list_loaded)
+        self.image_loader.name_index_ready.connect(self.on_name_index_ready)
 
         self.request_load_image.connect(self.image_loader.load_image)
         self.request_load_list.connect(self.image_loader.load_file_list)
+        self.request_build_name_index.connect(self.image_loader.build_name_index)
 
         self.worker_thread.start()
 
+        # 再帰スキャンは長時間かかり得るため、画像デコードとは別スレッドで行う
+        # （同じスレッドだとスキャン完了まで最初の画像すら表示できない）
+        self.scan_thread = QThread()
+        self.tree_scanner = TreeScanner()
+        self.tree_scanner.moveToThread(self.scan_thread)
+        self.scan_thread.finished.connect(self.tree_scanner.deleteLater)
+        self.tree_scanner.chunk_loaded.connect(self.on_tree_chunk_loaded)
+        self.tree_scanner.scan_finished.connect(self.on_tree_scan_finished)
+        self.request_scan_tree.connect(self.tree_scanner.scan)
+        self.scan_thread.start()
+
+        # 兄弟フォルダの先読みも、表示中フォルダの画像読み込みを待たせないよう別スレッドで行う
+        self.prefetch_thread = QThread()
+        self.sibling_prefetcher = SiblingPrefetcher()
+        self.sibling_prefetcher.moveToThread(self.prefetch_thread)
+        self.prefetch_thread.finished.connect(self.sibling_prefetcher.deleteLater)
+        self.sibling_prefetcher.sibling_prefetched.connect(self.on_sibling_prefetched)
+        self.request_prefetch_siblings.connect(self.sibling_prefetcher.prefetch)
+        self.prefetch_thread.start()
+
+        # 並べ替え/絞り込み用の stat/ヘッダ読みは件数に比例して長くなるので、これも別スレッドにする
+        self.probe_thread = QThread()
+        self.file_probe = FileProbe()
+        self.file_probe.moveToThread(self.probe_thread)
+        self.probe_thread.finished.connect(self.file_probe.deleteLater)
+        self.file_probe.sort_order_ready.connect(self.on_sort_order_ready)
+        self.file_probe.filter_ready.connect(self.on_filter_ready)
+        self.request_probe_listing.connect(self.file_probe.load_listing)
+        self.request_sort_order.connect(self.file_probe.compute_sort_order)
+        self.request_filter.connect(self.file_probe.compute_filter)
+        self.probe_thread.start()
+
+        self.file_ops_thread = QThread()
+        self.file_operations = FileOperationQueue()
+        self.file_operations.moveToThread(self.file_ops_thread)
+        self.file_ops_thread.finished.connect(self.file_operations.deleteLater)
+        self.file_operations.operation_finished.connect(self.on_file_operation_finished)
+        self.file_operations.operation_failed.connect(self.on_file_operation_failed)
+        self.file_operations.move_progress.connect(self.on_move_progress)
+        self.request_move_file.connect(self.file_operations.move)
+        self.request_trash_file.connect(self.file_operations.trash)
+        self.file_ops_thread.start()
+
+        self.hash_thread = QThread()
+        self.duplicate_finder = DuplicateFinder(cache_file_path(HASH_CACHE_FILE))
+        self.duplicate_finder.moveToThread(self.hash_thread)
+        self.hash_thread.finished.connect(self.duplicate_finder.deleteLater)
+        self.duplicate_finder.hash_progress.connect(self.on_hash_progress)
+        self.duplicate_finder.duplicates_ready.connect(self.on_duplicates_ready)
+        self.request_find_duplicates.connect(self.duplicate_finder.find_duplicates)
+        self.hash_thread.start()
+
+        self.integrity_thread = QThread()
+        self.integrity_checker = IntegrityChecker(cache_file_path(INTEGRITY_JOURNAL_FILE))
+        self.integrity_checker.moveToThread(self.integrity_thread)
+        self.integrity_thread.finished.connect(self.integrity_checker.deleteLater)
+        self.integrity_checker.integrity_progress.connect(self.on_integrity_progress)
+        self.integrity_checker.integrity_finished.connect(self.on_integrity_finished)
+        self.request_integrity_scan.connect(self.integrity_checker.scan)
+        self.integrity_thread.start()
+
+        # 重い SVG の解析/ラスタライズで画像のデコードも GUI も待たせないよう、これも別スレッドにする
+        self.svg_thread = QThread()
+        self.svg_tiler = SvgTileRenderer()
+        self.svg_tiler.moveToThread(self.svg_thread)
+        self.svg_thread.finished.connect(self.svg_tiler.deleteLater)
+        self.svg_tiler.tile_ready.connect(self.on_svg_tile_ready)
+        self.request_svg_tiles.connect(self.svg_tiler.render_tiles)
+        self.svg_thread.start()
+
+        # アニメーションのフレームは再生中ずっとデコードし続けるので、画像の読み込みとは分ける
+        self.animation_thread = QThread()
+        self.animation_decoder = AnimationDecoder()
+        self.animation_decoder.moveToThread(self.animation_thread)
+        self.animation_thread.finished.connect(self.animation_decoder.deleteLater)
+        self.animation_decoder.animation_opened.connect(self.on_animation_opened)
+        self.animation_decoder.frame_decoded.connect(self.on_animation_frame)
+        self.request_open_animation.connect(self.animation_decoder.open)
+        self.request_animation_frames.connect(self.animation_decoder.request_frames)
+        self.animation_thread.start()
+
+        # 画像をデコードする worker はそれぞれ出力プロファイルへの色変換を持つ
+        for worker in (
+            self.image_loader,
+            self.sibling_prefetcher,
+            self.svg_tiler,
+            self.animation_decoder,
+        ):
+            self.output_profile_changed.connect(worker.set_output_profile)
+
     # --------------------------------------------------------------------------
     # システムトレイ
     # --------------------------------------------------------------------------
@@ -266,6 +574,12 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
             if geometry:
                 self.restoreGeometry(geometry)
 
+        sort_key = settings.value("view/sort_order", SORT_BY_NAME, type=str)
+        self.sort_key = sort_key if sort_key in SORT_ORDER_LABELS else SORT_BY_NAME
+        self.histogram_action.setChecked(settings.value("view/histogram", False, type=bool))
+        # 読めなくなったプロファイルは諦めて sRGB で表示する
+        self._apply_output_profile(settings.value("color/output_profile", "", type=str))
+
     def _save_settings(self) -> None:
         """現在のウィンドウの状態をアプリケーションの設定として保存する"""
         settings = QSettings(SETTINGS_ORG, SETTINGS_APP)
@@ -274,6 +588,9 @@ class ImageViewer(RenderingMixin, NavigationMixin, InputEventMixin, QMainWindow)
         if self.isFullScreen():
             self.showNormal()  # <<< 全画面を解除してから状態を取得
 
+        settings.setValue("view/sort_order", self.sort_key)
+        settings.setValue("view/histogram", self.histogram_action.isChecked())
+        settings.setValue("color/output_profile", self._output_profile_path)
         settings.setValue("main_window/maximized", str(self.isMaximized()).lower())
         if not self.isMaximized():
             # saveGeometryはウィンドウの位置とサイズをまとめて保存する便利なメソッド
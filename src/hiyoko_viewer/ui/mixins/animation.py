@@ -0,0 +1,211 @@
+"""アニメーション画像の再生を担うミックスイン。
+
+フレームのデコードと縮小は worker（:class:`~hiyoko_viewer.services.animation.AnimationDecoder`）
+が行い、GUI スレッドは届いたフレームを待ち行列に積んで、各フレームの表示時間どおりに
+差し替えるだけにする。表示が遅れたら表示期間の過ぎたフレームを飛ばして（落ちた数は
+ステータスバーに出す）実時間に追いつき、ステータスバーの書き換えは間引く。
+
+コマ戻しやスクラバーでの移動は worker に移動先を伝え、そこから先のフレームを送り直させる
+（worker はデコード済みフレームをキャッシュしているので、どのフレームへもすぐ移れる）。
+移動前に頼んでいたフレームも届くので、待ち行列には番号が続くフレームだけを積む。
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from PyQt6.QtCore import QSize, pyqtSlot
+from PyQt6.QtGui import QImage, QPixmap
+
+from ...config.constants import ANIMATION_EXTENSIONS, ANIMATION_QUEUE_SIZE
+from ...core.frame_pacing import frames_to_drop
+
+logger = logging.getLogger(__name__)
+
+
+def _now_ms() -> float:
+    return time.monotonic() * 1000
+
+
+class AnimationMixin:
+    """アニメーションの再生・一時停止・コマ送りのメソッド群。"""
+
+    def is_animating(self) -> bool:
+        return self._animation_frame_count > 1
+
+    def _start_animation(self, file_path: str, first: QImage) -> None:
+        """表示した画像がアニメーションなら、2 枚目以降のデコードを worker に依頼する
+
+        表示した画像 ``first`` を先頭フレームとして渡し、worker にデコードし直させない。
+        """
+        self.stop_animation()
+        if not file_path.lower().endswith(ANIMATION_EXTENSIONS):
+            return
+        self._update_animation_size(self.image_label.display_size())
+        # worker は開いたら 2 枚目から待ち行列の分だけ送ってくる
+        self._animation_pending = ANIMATION_QUEUE_SIZE
+        self._animation_next_index = 1
+        self.request_open_animation.emit(self._animation_serial, file_path, first)
+
+    def stop_animation(self) -> None:
+        """再生をやめ、worker にも残りのデコードをやめさせる"""
+        self._animation_serial += 1
+        self.animation_decoder.cancel_older_than(self._animation_serial)
+        self._animation_timer.stop()
+        self._animation_frames.clear()
+        self._animation_frame = None
+        self._animation_frame_count = 0
+        self._animation_index = 0
+        self._animation_paused = False
+        self._animation_dropped = 0
+        self._animation_pending = 0
+        self._animation_next_index = 0
+        self._animation_seek_index = None
+        self._sync_frame_scrubber()
+
+    def _update_animation_size(self, display_size: QSize) -> None:
+        self.animation_decoder.set_display_size(display_size.width(), display_size.height())
+
+    @pyqtSlot(int, int, int)
+    def on_animation_opened(self, serial: int, frame_count: int, first_duration: int) -> None:
+        if serial != self._animation_serial:
+            return
+        # 先頭フレームは静止画として表示済み。その表示時間が過ぎたら 2 枚目を出す
+        self._animation_frame_count = frame_count
+        self._animation_due = _now_ms() + first_duration
+        self._refresh_animation_status()
+
+    @pyqtSlot(int, int, QImage, int)
+    def on_animation_frame(self, serial: int, index: int, image: QImage, duration: int) -> None:
+        if serial != self._animation_serial:
+            return
+        self._animation_pending -= 1
+        if index != self._animation_next_index:
+            # 移動する前に頼んでいたフレーム。番号が続かないものは捨てて補充する
+            self._top_up_animation_frames()
+            return
+        self._animation_next_index = (index + 1) % self._animation_frame_count
+        frame = QPixmap.fromImage(image)
+        if index == self._animation_seek_index:
+            # 移動先のフレームは待たせずに出す
+            self._animation_seek_index = None
+            self._show_animation_frame(index, frame)
+            self._top_up_animation_frames()
+            return
+        if not self._animation_frames and not self._animation_timer.isActive():
+            # デコードが追いつかず待たせていた場合は、届いた時点から数え直す
+            self._animation_due = max(self._animation_due, _now_ms())
+        self._animation_frames.append((index, frame, duration))
+        if not self._animation_paused and not self._animation_timer.isActive():
+            self._schedule_next_frame()
+
+    def _top_up_animation_frames(self) -> None:
+        """待ち行列と依頼中の分を合わせて ``ANIMATION_QUEUE_SIZE`` 枚になるよう worker に頼む"""
+        count = ANIMATION_QUEUE_SIZE - len(self._animation_frames) - self._animation_pending
+        if count > 0:
+            self._animation_pending += count
+            self.request_animation_frames.emit(self._animation_serial, count)
+
+    def _schedule_next_frame(self) -> None:
+        self._animation_timer.start(max(0, round(self._animation_due - _now_ms())))
+
+    def _advance_animation(self) -> None:
+        """``_animation_timer`` から呼ぶ。表示時刻の来たフレームを表示する"""
+        if self._animation_paused or not self._animation_frames:
+            return
+        frames = self._animation_frames
+        dropped = frames_to_drop(
+            _now_ms() - self._animation_due, [duration for _, _, duration in frames]
+        )
+        for _ in range(dropped):
+            _, _, duration = frames.popleft()
+            self._animation_due += duration
+        if dropped:
+            self._animation_dropped += dropped
+            logger.debug("dropped %d animation frames", dropped)
+        index, frame, duration = frames.popleft()
+        self._animation_due += duration
+        self._show_animation_frame(index, frame)
+        self._top_up_animation_frames()
+        if frames:
+            self._schedule_next_frame()
+
+    def _show_animation_frame(self, index: int, frame: QPixmap) -> None:
+        self._animation_index = index
+        self._animation_frame = frame
+        self.image_label.show_frame(frame)
+        if self._animation_paused:
+            self._refresh_animation_status()
+        elif not self._animation_status_timer.isActive():
+            # 再生中はフレームごとにステータスバーを作り直さない
+            self._animation_status_timer.start()
+
+    def _refresh_animation_status(self) -> None:
+        """ステータスバーとスクラバーを表示中のフレームに合わせる"""
+        self.update_status_bar()
+        self._sync_frame_scrubber()
+
+    def _sync_frame_scrubber(self) -> None:
+        scrubber = self.frame_scrubber
+        if not self.is_animating():
+            scrubber.hide()
+            return
+        # プログラムから動かしたときは on_frame_scrubbed を呼ばせない
+        scrubber.blockSignals(True)
+        scrubber.setMaximum(self._animation_frame_count - 1)
+        if not scrubber.isSliderDown():
+            scrubber.setValue(self._animation_index)
+        scrubber.blockSignals(False)
+        scrubber.show()
+
+    @pyqtSlot(int)
+    def on_frame_scrubbed(self, index: int) -> None:
+        """スクラバーを動かしたら、一時停止してそのフレームへ移る"""
+        if self.is_animating():
+            self._seek_animation(index)
+
+    def _seek_animation(self, index: int) -> None:
+        """一時停止して ``index`` 番のフレームへ移る（届き次第表示する）"""
+        self._animation_paused = True
+        self._animation_timer.stop()
+        self._animation_frames.clear()
+        self._animation_next_index = index
+        self._animation_seek_index = index
+        self._animation_seek_id += 1
+        self.animation_decoder.seek(self._animation_seek_id, index)
+        self._top_up_animation_frames()
+        self._refresh_animation_status()
+
+    def _toggle_animation_playback(self) -> bool:
+        """再生/一時停止を切り替える。アニメーションでなければ False"""
+        if not self.is_animating():
+            return False
+        self._animation_paused = not self._animation_paused
+        if self._animation_paused:
+            self._animation_timer.stop()
+        else:
+            # 移動先がまだ届いていなくても、届いたものから順に再生する
+            self._animation_seek_index = None
+            self._animation_due = _now_ms()
+            if self._animation_frames:
+                self._schedule_next_frame()
+        self._refresh_animation_status()
+        return True
+
+    def _step_animation_frame(self, step: int = 1) -> None:
+        """一時停止して ``step`` コマ進める（負なら戻る）"""
+        if not self.is_animating():
+            return
+        self._animation_paused = True
+        self._animation_timer.stop()
+        target = (self._animation_index + step) % self._animation_frame_count
+        if self._animation_seek_index is not None:
+            # 前の移動先がまだ届いていなければ、そこから数える
+            target = (self._animation_seek_index + step) % self._animation_frame_count
+        elif self._animation_frames and self._animation_frames[0][0] == target:
+            index, frame, _ = self._animation_frames.popleft()
+            self._show_animation_frame(index, frame)
+            self._top_up_animation_frames()
+            return
+        self._seek_animation(target)
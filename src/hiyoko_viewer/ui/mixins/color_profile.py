@@ -0,0 +1,59 @@
+"""出力（ディスプレイ）の ICC プロファイルを選ぶミックスイン。
+
+色変換そのものは各 worker がデコード直後に行う
+（:class:`~hiyoko_viewer.services.color_management.ColorManager`）。ここでは選んだ
+プロファイルを ``output_profile_changed`` で worker に配り、表示中の画像と先読み済みの
+兄弟フォルダの先頭画像を新しいプロファイルで読み直させる。
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+from PyQt6.QtWidgets import QFileDialog
+
+from ...config.constants import ICC_PROFILE_FILTER
+from ...services.color_management import output_color_space
+
+logger = logging.getLogger(__name__)
+
+
+class ColorProfileMixin:
+    """出力プロファイルの選択・解除のメソッド群。"""
+
+    def _choose_output_profile(self) -> None:
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "出力カラープロファイルを選択", self._output_profile_path, ICC_PROFILE_FILTER
+        )
+        if file_path:
+            self._set_output_profile(file_path)
+
+    def _reset_output_profile(self) -> None:
+        self._set_output_profile("")
+
+    def _set_output_profile(self, file_path: str) -> None:
+        if not self._apply_output_profile(file_path):
+            self.statusBar().showMessage("エラー: このカラープロファイルは使えません", 5000)
+            return
+        # 変換済みの画像は前のプロファイルの色なので読み直す
+        if self.image_files:
+            self._request_sibling_prefetch(self._load_generation, self.image_files.directory)
+            self.load_image_by_index()
+
+    def _apply_output_profile(self, file_path: str) -> bool:
+        """``file_path`` の ICC プロファイル（空なら sRGB）へ変換するよう worker に伝える"""
+        icc_profile = b""
+        if file_path:
+            try:
+                icc_profile = Path(file_path).read_bytes()
+            except OSError:
+                logger.warning("failed to read ICC profile: %s", file_path, exc_info=True)
+                return False
+            if output_color_space(icc_profile) is None:
+                logger.warning("unusable ICC profile: %s", file_path)
+                return False
+        self._output_profile_path = file_path
+        self.reset_profile_action.setEnabled(bool(file_path))
+        self.output_profile_changed.emit(icc_profile)
+        return True
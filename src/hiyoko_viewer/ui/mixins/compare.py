@@ -0,0 +1,177 @@
+"""ほぼ同じ 2 枚を見比べて片方を選ぶ A/B 比較のミックスイン（``C``）。
+
+表示中の画像 (A) と一覧で次の画像 (B) をどちらもデコード済みのまま持ち、``←``/``→`` で
+同じキャンバス上を瞬時に切り替える（デコードし直さず、ズーム倍率とスクロール位置も
+そのまま。大きさの違う 2 枚は表示上の幅が揃うよう倍率を合わせる）。
+``Enter`` で表示中の方を残してもう一方を ``_ng`` へ送り、``テンキー 9`` で表示中の方を
+``_ng`` へ送る。残った方はそのまま表示し、一覧で次の画像を新しい相手にして比較を続ける。
+通常の画像送り等で ``load_image_by_index`` が呼ばれたら比較は終わる。
+"""
+
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from typing import NamedTuple
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage, QKeyEvent, QPixmap
+
+from ...config.constants import NG_FOLDER
+
+
+class _CompareView(NamedTuple):
+    """片方の画像の表示に要るもの（元 pixmap、ミップマップ、仕上げた縮小版とその元の cacheKey）"""
+
+    pixmap: QPixmap
+    mipmaps: list
+    renditions: OrderedDict
+    rendition_source: int
+
+
+class CompareMixin:
+    """A/B 比較の開始/終了・切り替え・勝敗の仕分けのメソッド群。"""
+
+    def _toggle_compare_mode(self) -> None:
+        if self._compare_pair is not None:
+            self._leave_compare_mode()
+            self.statusBar().showMessage("比較を終了しました", 2000)
+            return
+        if len(self.image_files) < 2 or self.original_pixmap.isNull():
+            return
+        if self.svg_path is not None:
+            self.statusBar().showMessage("SVG は比較できません", 3000)
+            return
+        # 静止画として見比べる（アニメーションは表示中の 1 枚目で比べる）
+        self.stop_animation()
+        self.redraw_image()
+        self._start_comparison(self.image_files.id_at(self.current_index))
+
+    def _start_comparison(self, shown_id: int) -> None:
+        """表示中の ``shown_id`` と、一覧でその次の画像を比べる（相手はデコードを依頼する）"""
+        image_files = self.image_files
+        challenger_id = image_files.id_at((self.current_index + 1) % len(image_files))
+        self._compare_pair = (shown_id, challenger_id)
+        self._compare_views = {shown_id: self._current_compare_view()}
+        self.request_load_image.emit(self._load_generation, image_files.path_of(challenger_id))
+        self.update_status_bar()
+
+    def _leave_compare_mode(self) -> None:
+        """比較をやめる。表示中の画像はそのまま残す"""
+        self._compare_pair = None
+        self._compare_views = {}
+
+    def _current_compare_view(self) -> _CompareView:
+        return _CompareView(
+            self.original_pixmap, self._mipmaps, self._renditions, self._rendition_source
+        )
+
+    def _compare_id_for_path(self, file_path: str) -> int | None:
+        """比較中の 2 枚のうち ``file_path`` の方の名前 ID（どちらでもなければ None）"""
+        for name_id in self._compare_pair:
+            if self.image_files.path_of(name_id) == file_path:
+                return name_id
+        return None
+
+    def _store_compare_image(self, file_path: str, image: QImage) -> bool:
+        """比較の相手のデコード結果なら、表示せずに持っておく。受け取ったら True"""
+        name_id = self._compare_id_for_path(file_path)
+        if name_id is None or name_id in self._compare_views:
+            return False
+        if image.isNull():
+            self._leave_compare_mode()
+            self.statusBar().showMessage("エラー: 比較する画像を読み込めませんでした", 5000)
+            return True
+        self._compare_views[name_id] = _CompareView(QPixmap.fromImage(image), [], OrderedDict(), 0)
+        self.update_status_bar()
+        return True
+
+    def _store_compare_mipmaps(self, file_path: str, levels: list) -> bool:
+        """表示していない方のミップマップなら、その画像の分として持っておく。受け取ったら True"""
+        name_id = self._compare_id_for_path(file_path)
+        view = self._compare_views.get(name_id) if name_id is not None else None
+        if view is None or name_id == self.image_files.id_at(self.current_index):
+            return False
+        self._compare_views[name_id] = view._replace(
+            mipmaps=[QPixmap.fromImage(level) for level in levels]
+        )
+        return True
+
+    def _handle_compare_key(self, event: QKeyEvent) -> bool:
+        """比較中のキー入力。処理した場合のみ True を返す"""
+        key = event.key()
+        modifiers = event.modifiers()
+        if not modifiers and key in (
+            Qt.Key.Key_Right,
+            Qt.Key.Key_PageDown,
+            Qt.Key.Key_Left,
+            Qt.Key.Key_PageUp,
+        ):
+            self._flip_comparison()
+            return True
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            # 表示中の方の勝ち
+            self._decide_comparison(self._compare_opponent())
+            return True
+        if modifiers & Qt.KeyboardModifier.KeypadModifier and key == Qt.Key.Key_9:
+            # 表示中の方の負け
+            self._decide_comparison(self.image_files.id_at(self.current_index))
+            return True
+        return False
+
+    def _compare_opponent(self) -> int:
+        """比較中の 2 枚のうち、表示していない方の名前 ID"""
+        shown_id = self.image_files.id_at(self.current_index)
+        first, second = self._compare_pair
+        return second if first == shown_id else first
+
+    def _flip_comparison(self) -> None:
+        if self._compare_opponent() not in self._compare_views:
+            self.statusBar().showMessage("比較する画像を読み込み中...", 2000)
+            return
+        self._show_compare_view(self._compare_opponent())
+
+    def _show_compare_view(self, name_id: int) -> None:
+        """デコード済みの ``name_id`` に表示を切り替える（倍率とスクロール位置は変えない）"""
+        try:
+            position = self.image_files.position_of_id(name_id)
+        except ValueError:
+            # 比較中に絞り込み等で一覧から外れた
+            self._leave_compare_mode()
+            self.update_status_bar()
+            return
+        shown_id = self.image_files.id_at(self.current_index)
+        # 切り替えのたびに縮小し直さないよう、仕上げた縮小版も画像ごとに持ち回る
+        self._compare_views[shown_id] = self._current_compare_view()
+        view = self._compare_views[name_id]
+        if not self.fit_to_window and view.pixmap.width() > 0:
+            # 大きさが違っても表示上の幅を揃え、同じ所が同じ位置に重なるようにする
+            self.scale_factor *= self.original_pixmap.width() / view.pixmap.width()
+        self.original_pixmap = view.pixmap
+        self._mipmaps = view.mipmaps
+        self._renditions = view.renditions
+        self._rendition_source = view.rendition_source
+        self.current_index = position
+        self.redraw_image()
+        self._refresh_histogram_overlay()
+        self._refresh_title()
+
+    def _decide_comparison(self, loser_id: int) -> None:
+        """``loser_id`` を ``_ng`` へ送り、残った方と一覧で次の画像で比較を続ける"""
+        first, second = self._compare_pair
+        winner_id = first if loser_id == second else second
+        if winner_id not in self._compare_views:
+            self.statusBar().showMessage("比較する画像を読み込み中...", 2000)
+            return
+        if self.image_files.id_at(self.current_index) != winner_id:
+            self._show_compare_view(winner_id)
+            if self._compare_pair is None:
+                return
+        loser_name = os.path.basename(self.image_files.path_of(loser_id))
+        self._move_files_to_folder([loser_id], NG_FOLDER)
+        if len(self.image_files) < 2:
+            self._leave_compare_mode()
+            self.update_status_bar()
+            return
+        self._start_comparison(winner_id)
+        self.statusBar().showMessage(f"{NG_FOLDER} へ送りました: {loser_name}", 2000)
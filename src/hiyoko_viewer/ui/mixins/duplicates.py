@@ -0,0 +1,78 @@
+"""類似画像のグループを順に確認して仕分けるミックスイン（``Ctrl+D``）。
+
+ハッシュ計算とグループ分けは worker
+（:class:`~hiyoko_viewer.services.duplicate_finder.DuplicateFinder`）で行う。
+確認中は表示中のグループ以外を ``ImageFileList`` の非表示フラグで隠すので、
+グループ内の移動は通常の ``←``/``→``、不要な画像は通常どおり ``テンキー 9`` で
+``_ng`` へ送れる。``]``/``[`` で次/前のグループへ進む。
+"""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import pyqtSlot
+
+
+class DuplicateReviewMixin:
+    """類似画像の検索とグループごとの確認のメソッド群。"""
+
+    def _toggle_duplicate_review(self) -> None:
+        if self._duplicate_groups is not None:
+            self._leave_duplicate_review()
+            return
+        if not self.image_files.total:
+            return
+        self.statusBar().showMessage("🧬 類似画像を検索中...")
+        self.request_find_duplicates.emit(
+            self._load_generation, self.image_files.directory, self.image_files.names
+        )
+
+    @pyqtSlot(int, int, int)
+    def on_hash_progress(self, generation: int, hashed: int, total: int) -> None:
+        if generation != self._load_generation:
+            return
+        self.statusBar().showMessage(f"🧬 類似画像を検索中... {hashed}/{total}")
+
+    @pyqtSlot(int, list)
+    def on_duplicates_ready(self, generation: int, groups: list) -> None:
+        if generation != self._load_generation:
+            return
+        if not groups:
+            self.statusBar().showMessage("類似画像は見つかりませんでした", 3000)
+            return
+        self._duplicate_groups = groups
+        self._show_duplicate_group(0, 1)
+
+    def show_next_duplicate_group(self) -> None:
+        if self._duplicate_groups is not None:
+            self._show_duplicate_group(self._duplicate_group_index + 1, 1)
+
+    def show_prev_duplicate_group(self) -> None:
+        if self._duplicate_groups is not None:
+            self._show_duplicate_group(self._duplicate_group_index - 1, -1)
+
+    def _show_duplicate_group(self, index: int, direction: int) -> None:
+        """``index`` のグループだけを表示する。仕分け済みで 1 枚以下のグループは飛ばす"""
+        groups = self._duplicate_groups
+        image_files = self.image_files
+        for step in range(len(groups)):
+            group_index = (index + step * direction) % len(groups)
+            members = [
+                name_id for name_id in groups[group_index] if not image_files.is_removed(name_id)
+            ]
+            if len(members) >= 2:
+                break
+        else:
+            self._leave_duplicate_review()
+            self.statusBar().showMessage("確認の残っている類似画像はありません", 3000)
+            return
+        self._duplicate_group_index = group_index
+        hidden = bytearray(b"\x01") * len(image_files.names)
+        for name_id in members:
+            hidden[name_id] = 0
+        image_files.set_hidden(bytes(hidden))
+        self.current_index = 0
+        self.load_image_by_index()
+
+    def _leave_duplicate_review(self) -> None:
+        """確認を終え、解像度/縦横比の絞り込みを元に戻す"""
+        self._set_dimension_filter(self.dimension_filter)
@@ -0,0 +1,158 @@
+"""仕分け/削除の実行結果の受け取りと、仕分けの取り消し（``Ctrl+Z``）のミックスイン。
+
+ファイル操作そのものは :class:`~hiyoko_viewer.services.file_ops.FileOperationQueue` が
+別スレッドで行う。GUI は依頼した時点で一覧から外して次の画像へ進み、ここでは
+失敗した項目を一覧へ戻すことと、完了した移動を取り消し用に記録することを担う。
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import replace
+
+from PyQt6.QtCore import pyqtSlot
+
+from ...services.file_ops import FILE_OP_MOVE, FILE_OP_RESTORE, FILE_OP_TRASH, FileOperation
+
+
+class FileOperationMixin:
+    """ファイル操作の依頼・結果処理・取り消しのメソッド群。"""
+
+    def _queue_file_operation(
+        self, kind: str, destination: str = "", name_id: int | None = None
+    ) -> None:
+        """画像（既定は表示中の画像）に対する操作をワーカーに依頼する（一覧から外すのは呼び出し側）"""
+        if name_id is None:
+            name_id = self.image_files.id_at(self.current_index)
+        self._next_file_op_id += 1
+        operation = FileOperation(
+            op_id=self._next_file_op_id,
+            kind=kind,
+            source=self.image_files.path_of(name_id),
+            destination=destination,
+            generation=self._load_generation,
+            name_id=name_id,
+        )
+        self._pending_file_operations[operation.op_id] = operation
+        if kind == FILE_OP_TRASH:
+            self.request_trash_file.emit(operation.op_id, operation.source)
+        else:
+            self.request_move_file.emit(operation.op_id, operation.source, destination)
+
+    def _move_files_to_folder(self, name_ids: list[int], subfolder_name: str) -> int:
+        """一覧中の ``name_ids`` を各ファイルと同じフォルダの ``subfolder_name`` へ移動する。
+
+        一覧からもまとめて外し、表示中の画像が含まれていれば次の画像へ進む。
+        依頼した件数を返す。
+        """
+        image_files = self.image_files
+        has_current = 0 <= self.current_index < len(image_files)
+        current_id = image_files.id_at(self.current_index) if has_current else -1
+        moved = 0
+        for name_id in name_ids:
+            if image_files.is_removed(name_id):
+                continue
+            if name_id == current_id:
+                self._release_current_file_handles()
+            source = image_files.path_of(name_id)
+            destination = os.path.join(
+                os.path.dirname(source), subfolder_name, os.path.basename(source)
+            )
+            self._queue_file_operation(FILE_OP_MOVE, destination, name_id)
+            image_files.remove_id(name_id)
+            moved += 1
+        if not moved or current_id < 0:
+            return moved
+        if not image_files:
+            self._clear_display()
+        elif image_files.is_removed(current_id):
+            self.current_index = image_files.position_at_or_after_id(current_id)
+            self.load_image_by_index()
+        else:
+            # 手前の項目が減った分だけ表示位置がずれるので付け替える
+            self.current_index = image_files.position_of_id(current_id)
+            self._refresh_title()
+        return moved
+
+    @pyqtSlot(int)
+    def on_file_operation_finished(self, op_id: int) -> None:
+        operation = self._pending_file_operations.pop(op_id, None)
+        if operation is None:
+            return
+        if operation.kind == FILE_OP_MOVE:
+            self._undo_journal.append(operation)
+        elif operation.kind == FILE_OP_RESTORE:
+            self._reinsert_file(operation, jump=True)
+            self.statusBar().showMessage(
+                f"元に戻しました: {os.path.basename(operation.destination)}", 3000
+            )
+
+    @pyqtSlot(int, str)
+    def on_file_operation_failed(self, op_id: int, message: str) -> None:
+        operation = self._pending_file_operations.pop(op_id, None)
+        if operation is None:
+            return
+        if operation.kind == FILE_OP_RESTORE:
+            # 戻せなかった移動は、もう一度取り消せるよう記録に戻す
+            self._undo_journal.append(
+                replace(
+                    operation,
+                    kind=FILE_OP_MOVE,
+                    source=operation.destination,
+                    destination=operation.source,
+                )
+            )
+            self.statusBar().showMessage(f"エラー: 元に戻せませんでした（{message}）", 5000)
+            return
+        # 移動/削除できなかったファイルは元の場所に残っているので、一覧にも戻す
+        self._reinsert_file(operation, jump=False)
+        if operation.kind == FILE_OP_MOVE:
+            self.statusBar().showMessage("エラー: ファイルの移動に失敗しました", 5000)
+        else:
+            self.statusBar().showMessage("エラー: ファイルの削除に失敗しました", 5000)
+
+    @pyqtSlot(int, int, int)
+    def on_move_progress(self, op_id: int, copied: int, total: int) -> None:
+        operation = self._pending_file_operations.get(op_id)
+        if operation is None or total <= 0:
+            return
+        name = os.path.basename(operation.source)
+        self.statusBar().showMessage(f"📦 移動中... {copied * 100 // total}% {name}", 2000)
+
+    def undo_last_file_operation(self) -> None:
+        """最後に完了した仕分け（移動）を取り消し、ファイルを元の場所へ戻す"""
+        if not self._undo_journal:
+            self.statusBar().showMessage("元に戻せる仕分けはありません", 3000)
+            return
+        operation = self._undo_journal.pop()
+        self._next_file_op_id += 1
+        restore = replace(
+            operation,
+            op_id=self._next_file_op_id,
+            kind=FILE_OP_RESTORE,
+            source=operation.destination,
+            destination=operation.source,
+        )
+        self._pending_file_operations[restore.op_id] = restore
+        self.request_move_file.emit(restore.op_id, restore.source, restore.destination)
+
+    def _reinsert_file(self, operation: FileOperation, jump: bool) -> None:
+        """操作前に表示していた一覧のままなら、対象の名前を一覧へ戻す"""
+        if operation.generation != self._load_generation:
+            return
+        image_files = self.image_files
+        has_current = 0 <= self.current_index < len(image_files)
+        current_id = image_files.id_at(self.current_index) if has_current else -1
+        image_files.restore_id(operation.name_id)
+        try:
+            position = image_files.position_of_id(operation.name_id)
+        except ValueError:
+            # 絞り込みで隠れている
+            position = -1
+        if position >= 0 and not self.is_loading and (jump or current_id < 0):
+            self.current_index = position
+            self.load_image_by_index()
+        elif current_id >= 0:
+            # 戻した分だけ表示位置がずれるので付け替える
+            self.current_index = image_files.position_of_id(current_id)
+            self._refresh_title()
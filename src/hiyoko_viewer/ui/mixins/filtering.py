@@ -0,0 +1,82 @@
+"""解像度/縦横比による絞り込みのミックスイン。
+
+画像サイズはヘッダだけを worker（:class:`~hiyoko_viewer.services.file_probe.FileProbe`）
+で読み、条件に合わない名前の非表示フラグを受け取って ``ImageFileList`` に反映する。
+"""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtWidgets import QDialog
+
+from ...core.file_stats import DimensionFilter
+from ..dialogs.filter_dialog import DimensionFilterDialog
+
+
+class DimensionFilterMixin:
+    """表示する画像を画像サイズで絞り込むメソッド群。"""
+
+    def _open_filter_dialog(self) -> None:
+        dialog = DimensionFilterDialog(self.dimension_filter, parent=self)
+        if dialog.exec() == QDialog.DialogCode.Accepted:
+            self._set_dimension_filter(dialog.dimension_filter())
+
+    def _set_dimension_filter(self, dimension_filter: DimensionFilter) -> None:
+        # 類似画像の確認中なら終える（非表示フラグを絞り込みの結果に戻す）
+        self._duplicate_groups = None
+        self.dimension_filter = dimension_filter
+        if not dimension_filter.is_active:
+            self._apply_hidden(None)
+            return
+        if self.image_files.total:
+            # 初回はフォルダ全体のヘッダ読みになるので、届くまでは今の表示のまま
+            self.statusBar().showMessage("📐 画像サイズを確認中...")
+            self.request_filter.emit(self._load_generation, dimension_filter)
+
+    @pyqtSlot(int, object, object)
+    def on_filter_ready(
+        self, generation: int, dimension_filter: DimensionFilter, hidden: bytes
+    ) -> None:
+        """worker で判定した非表示フラグを反映する"""
+        if (
+            generation != self._load_generation
+            or dimension_filter != self.dimension_filter
+            or self._duplicate_groups is not None
+        ):
+            return
+        self._apply_hidden(hidden)
+
+    def _apply_hidden(self, hidden: bytes | None) -> None:
+        """非表示フラグを差し替え、表示中の画像が隠れたら次に表示できる画像へ移る
+
+        複数ファイルを渡されて絞り込んでいる間は、その絞り込みも重ねる。
+        """
+        image_files = self.image_files
+        forwarded = self._forwarded_hidden
+        if forwarded is not None:
+            if hidden is None:
+                hidden = forwarded
+            else:
+                # フラグは 0/1 の 1 バイトずつなので、整数にして OR すればバイトごとの OR になる
+                size = len(forwarded)
+                combined = int.from_bytes(hidden, "big") | int.from_bytes(forwarded, "big")
+                hidden = combined.to_bytes(size, "big")
+        current_id = image_files.id_at(self.current_index) if self.current_index >= 0 else -1
+        image_files.set_hidden(hidden)
+        if not image_files:
+            if image_files.total:
+                self._clear_display()
+                self.image_label.setText("条件に合う画像がありません。")
+            return
+        if current_id < 0:
+            # 全件隠れていた状態から解除した
+            self.current_index = 0
+            self.load_image_by_index()
+            return
+        try:
+            self.current_index = image_files.position_of_id(current_id)
+        except ValueError:
+            self.current_index = image_files.position_at_or_after_id(current_id)
+            self.load_image_by_index()
+            return
+        self._refresh_title()
@@ -0,0 +1,70 @@
+"""ヒストグラムと白飛び/黒つぶれの警告を重ねて表示するミックスイン（``H``）。
+
+ヒストグラムは worker（:class:`~hiyoko_viewer.services.image_loader.ImageLoader` と
+兄弟フォルダの先読み）がデコードの続きで間引いた画素から求め、画像を渡した後に届ける。
+GUI スレッドでは画素を読まず、届いたものを画像のパスごとに覚えておいて、
+表示中の画像の分を :class:`~hiyoko_viewer.ui.histogram_overlay.HistogramOverlay` に渡すだけにする。
+"""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import pyqtSlot
+
+from ...config.constants import HISTOGRAM_CACHE_SIZE, HISTOGRAM_OVERLAY_MARGIN
+from ...core.histogram import ImageHistogram
+
+
+class HistogramMixin:
+    """ヒストグラムの受け取り・表示の切り替え・配置のメソッド群。"""
+
+    def _toggle_histogram_overlay(self) -> None:
+        # メニューのチェックと揃えるため、アクション経由で切り替える
+        self.histogram_action.toggle()
+
+    def _set_histogram_visible(self, visible: bool) -> None:
+        self.histogram_overlay.setVisible(visible)
+        if visible:
+            self._refresh_histogram_overlay()
+            self._place_histogram_overlay()
+
+    @pyqtSlot(int, str, object)
+    def on_histogram_ready(
+        self, generation: int, file_path: str, histogram: ImageHistogram
+    ) -> None:
+        if generation != self._load_generation:
+            return
+        self._remember_histogram(file_path, histogram)
+        # 画像を表示した後に届くので、表示中の画像の分なら出し直す
+        if (
+            0 <= self.current_index < len(self.image_files)
+            and self.image_files[self.current_index] == file_path
+        ):
+            self._refresh_histogram_overlay()
+
+    def _remember_histogram(self, file_path: str, histogram: ImageHistogram | None) -> None:
+        if histogram is None:
+            return
+        self._histograms[file_path] = histogram
+        self._histograms.move_to_end(file_path)
+        if len(self._histograms) > HISTOGRAM_CACHE_SIZE:
+            self._histograms.popitem(last=False)
+
+    def _refresh_histogram_overlay(self) -> None:
+        """表示中の画像のヒストグラムを出す（まだ届いていなければ空で出す）"""
+        # ウィンドウがトレイに隠れている間も、表示する設定なら更新しておく
+        if self.histogram_overlay.isHidden():
+            return
+        histogram = None
+        if 0 <= self.current_index < len(self.image_files) and not self.original_pixmap.isNull():
+            histogram = self._histograms.get(self.image_files[self.current_index])
+        self.histogram_overlay.set_histogram(histogram)
+
+    def _place_histogram_overlay(self) -> None:
+        """ビューポートの右上の角に置く（スクロールしても動かない）"""
+        viewport = self.scroll_area.viewport()
+        overlay = self.histogram_overlay
+        overlay.move(
+            max(0, viewport.width() - overlay.width() - HISTOGRAM_OVERLAY_MARGIN),
+            HISTOGRAM_OVERLAY_MARGIN,
+        )
+        overlay.raise_()
@@ -15,6 +15,14 @@ from PyQt6.QtGui import (
 
 from ...config.constants import NG_FOLDER, OK_FOLDER
 
+# 押しっぱなしで画像を送るキー → 送る向き
+_SCRUB_KEYS = {
+    Qt.Key.Key_Right: 1,
+    Qt.Key.Key_PageDown: 1,
+    Qt.Key.Key_Left: -1,
+    Qt.Key.Key_PageUp: -1,
+}
+
 
 class InputEventMixin:
     """イベントの横取りとディスパッチを担うメソッド群。"""
@@ -33,6 +41,9 @@ class InputEventMixin:
                 return self._handle_mouse_move_on_viewport(event)
             elif event_type == QEvent.Type.MouseButtonRelease:
                 return self._handle_mouse_release_on_viewport(event)
+            elif event_type == QEvent.Type.Resize:
+                # スクロールバーの出入りでも大きさが変わるので、ビューポート側で追う
+                self._place_histogram_overlay()
             elif event_type == QEvent.Type.MouseButtonDblClick:  # ダブルクリックしたら画像読み込み
                 # 何も読み込まれていない場合限定
                 if not self.image_files:
@@ -41,6 +52,8 @@ class InputEventMixin:
         if source is self.scroll_area and event.type() == QEvent.Type.KeyPress:
             if self._handle_key_press_on_scroll_area(event):
                 return True
+        if source is self.scroll_area and event.type() == QEvent.Type.KeyRelease:
+            self._handle_key_release_on_scroll_area(event)
 
         return super().eventFilter(source, event)
 
@@ -61,8 +74,14 @@ class InputEventMixin:
             self._toggle_fit_mode()
         elif key == Qt.Key.Key_R:
             self._toggle_shuffle_mode()
+        elif key == Qt.Key.Key_S:
+            self._cycle_sort_order()
         elif key == Qt.Key.Key_I:
             self.show_metadata_dialog()
+        elif key == Qt.Key.Key_C:
+            self._toggle_compare_mode()
+        elif key == Qt.Key.Key_H:
+            self._toggle_histogram_overlay()
         else:
             super().keyPressEvent(event)
 
@@ -91,9 +110,15 @@ class InputEventMixin:
     def resizeEvent(self, event) -> None:
         super().resizeEvent(event)
         if self.fit_to_window:
-            self.redraw_image()
+            # ウィンドウ枠のドラッグ中は毎回平滑補間すると追従が遅れるので、止まってから仕上げる
+            self._redraw_interactive()
         self.update_status_bar()
 
+    def changeEvent(self, event: QEvent) -> None:
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.DevicePixelRatioChange:
+            self._on_device_pixel_ratio_changed()
+
     def closeEvent(self, event: QCloseEvent) -> None:
         """ウィンドウを非表示にしてトレイに格納する（セッションは保持）"""
         event.ignore()
@@ -118,7 +143,7 @@ class InputEventMixin:
                 self.pan_last_mouse_pos = event.position()
                 self.setCursor(QCursor(Qt.CursorShape.ClosedHandCursor))
                 return True
-            if self._toggle_gif_playback():
+            if self._toggle_animation_playback():
                 return True
         return False
 
@@ -126,10 +151,7 @@ class InputEventMixin:
         """ビューポート上でのマウス移動を処理する"""
         if self.is_panning:
             delta = event.position() - self.pan_last_mouse_pos
-            h_bar = self.scroll_area.horizontalScrollBar()
-            v_bar = self.scroll_area.verticalScrollBar()
-            h_bar.setValue(int(h_bar.value() - delta.x()))
-            v_bar.setValue(int(v_bar.value() - delta.y()))
+            self._pan_by(delta.x(), delta.y())
             self.pan_last_mouse_pos = event.position()
             return True
         return False
@@ -147,12 +169,31 @@ class InputEventMixin:
             return True
         return False
 
+    def _handle_key_release_on_scroll_area(self, event: QKeyEvent) -> None:
+        """押しっぱなしの送りを、キーを離した位置で止める（自動リピートの離しは無視）"""
+        if not event.isAutoRepeat() and event.key() in _SCRUB_KEYS:
+            self._end_scrub_now()
+
     def _handle_key_press_on_scroll_area(self, event: QKeyEvent) -> bool:
         """スクロールエリアがフォーカス時のキー入力を処理する"""
-        if self.is_loading:
+        # 検索中の文字入力は読み込み中でも受け付ける（打鍵を取りこぼさない）
+        if self._search_text is not None and self._handle_search_key(event):
+            return True
+        if self._compare_pair is not None and self._handle_compare_key(event):
             return True
         key = event.key()
         modifiers = event.modifiers()
+        if event.isAutoRepeat() and key in _SCRUB_KEYS and not modifiers:
+            # 押しっぱなしは読み込み中でも位置だけ進める（デコードは離した所だけ）
+            self._scrub(_SCRUB_KEYS[key])
+            return True
+        if self.is_loading:
+            return True
+        if key == Qt.Key.Key_Slash or (
+            modifiers & Qt.KeyboardModifier.ControlModifier and key == Qt.Key.Key_F
+        ):
+            self._start_name_search()
+            return True
         if modifiers & Qt.KeyboardModifier.KeypadModifier:
             if key == Qt.Key.Key_7:
                 self.move_current_image_and_load_next(OK_FOLDER)
@@ -160,6 +201,27 @@ class InputEventMixin:
             elif key == Qt.Key.Key_9:
                 self.move_current_image_and_load_next(NG_FOLDER)
                 return True
+        elif modifiers & Qt.KeyboardModifier.ControlModifier and key in (
+            Qt.Key.Key_Right,
+            Qt.Key.Key_PageDown,
+        ):
+            self.show_next_folder()
+            return True
+        elif modifiers & Qt.KeyboardModifier.ControlModifier and key in (
+            Qt.Key.Key_Left,
+            Qt.Key.Key_PageUp,
+        ):
+            self.show_prev_folder()
+            return True
+        elif modifiers & Qt.KeyboardModifier.ControlModifier and key == Qt.Key.Key_Z:
+            self.undo_last_file_operation()
+            return True
+        elif key == Qt.Key.Key_BracketRight:
+            self.show_next_duplicate_group()
+            return True
+        elif key == Qt.Key.Key_BracketLeft:
+            self.show_prev_duplicate_group()
+            return True
         elif key in (Qt.Key.Key_Right, Qt.Key.Key_PageDown):
             self.show_next_image()
             return True
@@ -170,6 +232,9 @@ class InputEventMixin:
             self.delete_current_image_and_load_next()
             return True
         elif key == Qt.Key.Key_Period:
-            self._step_gif_frame(key)
+            self._step_animation_frame(1)
+            return True
+        elif key == Qt.Key.Key_Comma:
+            self._step_animation_frame(-1)
             return True
         return False
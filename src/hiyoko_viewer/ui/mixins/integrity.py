@@ -0,0 +1,65 @@
+"""一覧の画像を最後までデコードして壊れたファイルを探すミックスイン（``Ctrl+Shift+I``）。
+
+検査は worker（:class:`~hiyoko_viewer.services.integrity_check.IntegrityChecker`）が
+プロセスプールで行い、見つかった分から逐次届く。終わったら結果を一覧で示し、
+選べば壊れたファイルを各フォルダの隔離フォルダ（``_broken``）へ移動する。
+"""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import pyqtSlot
+from PyQt6.QtWidgets import QDialog
+
+from ...config.constants import QUARANTINE_FOLDER
+from ..dialogs.integrity_dialog import IntegrityReportDialog
+
+
+class IntegrityScanMixin:
+    """破損チェックの開始・進捗表示・結果の隔離のメソッド群。"""
+
+    def start_integrity_scan(self) -> None:
+        if self._integrity_failures is not None or not self.image_files.total:
+            return
+        self._integrity_failures = []
+        self.statusBar().showMessage("🩺 破損チェック中...")
+        self.request_integrity_scan.emit(
+            self._load_generation, self.image_files.directory, self.image_files.names
+        )
+
+    @pyqtSlot(int, int, int, list)
+    def on_integrity_progress(
+        self, generation: int, checked: int, total: int, failures: list
+    ) -> None:
+        if generation != self._load_generation or self._integrity_failures is None:
+            return
+        self._integrity_failures.extend(failures)
+        self.statusBar().showMessage(
+            f"🩺 破損チェック中... {checked}/{total}（破損 {len(self._integrity_failures)}）"
+        )
+
+    @pyqtSlot(int, int)
+    def on_integrity_finished(self, generation: int, checked: int) -> None:
+        if generation != self._load_generation or self._integrity_failures is None:
+            return
+        image_files = self.image_files
+        failures = [
+            (name_id, error)
+            for name_id, error in self._integrity_failures
+            if not image_files.is_removed(name_id)
+        ]
+        self._integrity_failures = None
+        if not failures:
+            self.statusBar().showMessage(
+                f"破損ファイルは見つかりませんでした（{checked} 件）", 3000
+            )
+            return
+        self.statusBar().clearMessage()
+        dialog = IntegrityReportDialog(
+            [(image_files.name_of(name_id), error) for name_id, error in failures], parent=self
+        )
+        accepted = dialog.exec() == QDialog.DialogCode.Accepted
+        # ダイアログ表示中に別の一覧が開かれていたら名前 ID が合わない
+        if not accepted or generation != self._load_generation or self.is_loading:
+            return
+        moved = self._move_files_to_folder([name_id for name_id, _ in failures], QUARANTINE_FOLDER)
+        self.statusBar().showMessage(f"{moved} 件を {QUARANTINE_FOLDER} へ移動しました", 3000)
@@ -4,17 +4,28 @@ from __future__ import annotations
 
 import logging
 import os
-import random
-import shutil
 
 from PyQt6.QtCore import pyqtSlot
-from send2trash import send2trash
+from PyQt6.QtGui import QImage
 
-from ...core.sorting import windows_logical_key
+from ...config.constants import SORT_BY_NAME, SORT_ORDER_LABELS
+from ...core.file_list import ImageFileList
+from ...core.sorting import tree_logical_key, windows_logical_key
+from ...services.file_ops import FILE_OP_MOVE, FILE_OP_TRASH
+from ...services.sibling_prefetcher import FolderListing
 
 logger = logging.getLogger(__name__)
 
 
+def _relative_name(path: str, directory: str) -> str:
+    """``directory`` から見た ``path`` の相対名（一覧の名前と同じ形）"""
+    try:
+        return os.path.relpath(path, directory)
+    except ValueError:
+        # Windows で別のドライブ。一覧のどの名前とも一致しないので絶対パスのままでよい
+        return path
+
+
 class NavigationMixin:
     """画像リストの遷移とファイル操作のメソッド群。"""
 
@@ -23,48 +34,263 @@ class NavigationMixin:
         if not file_path:
             return
 
+        generation = self._begin_listing()
+        directory = os.path.dirname(file_path)
+        normalized_path = os.path.normcase(os.path.normpath(file_path))
+        if self.recursive_mode:
+            self._tree_list_pending = True
+            self.request_scan_tree.emit(generation, directory, normalized_path)
+        else:
+            self.request_load_list.emit(generation, directory, normalized_path)
+        self._request_sibling_prefetch(generation, directory)
+
+    def _begin_listing(self) -> int:
+        """別の一覧へ移る。表示を消して世代を進め、前の一覧の worker の処理と状態を捨てる
+
+        新しい世代を返す。
+        """
         self._clear_display()
         self._load_generation += 1
         generation = self._load_generation
-        directory = os.path.dirname(file_path)
-        normalized_path = os.path.normcase(os.path.normpath(file_path))
-        self.request_load_list.emit(generation, directory, normalized_path)
+        self._name_index = None
+        self._forwarded_selection = None
+        self._forwarded_hidden = None
+        # 再帰スキャン中等に別のファイルを開いた場合は、古い処理を打ち切らせる
+        self.tree_scanner.cancel_older_than(generation)
+        self.file_probe.cancel_older_than(generation)
+        self.duplicate_finder.cancel_older_than(generation)
+        self.integrity_checker.cancel_older_than(generation)
+        self._integrity_failures = None
+        return generation
+
+    @pyqtSlot(list)
+    def open_forwarded_paths(self, paths: list) -> None:
+        """2 番目以降の起動から渡されたパスを開き、ウィンドウを前面に出す
 
-    @pyqtSlot(int, list, int)
-    def on_file_list_loaded(self, generation: int, image_list: list, initial_index: int) -> None:
+        複数のファイルを選んで開いた場合は先頭のファイルのフォルダを開き、一覧が揃ったら
+        渡されたファイルだけを辿れるように絞り込む（:meth:`_restrict_to_forwarded`）。
+        一覧の名前と突き合わせられるよう、渡されたパスはここでフォルダからの相対名にしておく。
+        """
+        if paths:
+            self.load_image_from_path(paths[0])
+            if len(paths) > 1:
+                directory = os.path.dirname(paths[0])
+                self._forwarded_selection = {_relative_name(path, directory) for path in paths}
+        self.show_window()
+
+    def _restrict_to_forwarded(self) -> None:
+        """開いたフォルダの一覧を、2 番目以降の起動から渡されたファイルだけに絞り込む
+
+        絞り込みは別のフォルダを開くまで続き、解像度の絞り込みとも重ねて効く。
+        開いたフォルダの一覧に無いパス（別のフォルダのファイル等）は表示できないので、
+        その件数をステータスバーで知らせる。
+        """
+        selection = self._forwarded_selection
+        self._forwarded_selection = None
+        image_files = self.image_files
+        # 一覧の全件ではなく、渡された名前の分だけ引く
+        shown_ids = {image_files.id_of_name(name) for name in selection} - {None}
+        missing = len(selection) - len(shown_ids)
+        if missing:
+            logger.info(
+                "%d forwarded path(s) are not in %s and were not opened",
+                missing,
+                image_files.directory,
+            )
+        missing_note = f"{missing} 件は開いたフォルダに無いため表示できません" if missing else ""
+        if len(shown_ids) < 2:
+            if missing_note:
+                self.statusBar().showMessage(f"選択されたうち {missing_note}", 5000)
+            return
+        hidden = bytearray(b"\x01") * len(image_files.names)
+        for name_id in shown_ids:
+            hidden[name_id] = 0
+        self._forwarded_hidden = bytes(hidden)
+        self._apply_hidden(None)
+        message = f"選択された {len(shown_ids)} 件だけを表示しています"
+        if missing_note:
+            message += f"（{missing_note}）"
+        self.statusBar().showMessage(message, 5000 if missing else 3000)
+
+    def _request_sibling_prefetch(self, generation: int, directory: str) -> None:
+        """前後の兄弟フォルダの一覧と先頭画像を、別スレッドで先読みさせる"""
+        self._sibling_folders = {}
+        self._pending_folder_jump = 0
+        self.sibling_prefetcher.cancel_older_than(generation)
+        self.request_prefetch_siblings.emit(generation, directory)
+
+    @pyqtSlot(int, str, list, int)
+    def on_file_list_loaded(
+        self, generation: int, directory: str, names: list, initial_index: int
+    ) -> None:
         """ワーカーからのファイルリスト読み込み完了通知を受け取る"""
         if generation != self._load_generation:
             return
-        if not image_list:
+        if not names:
             self.image_label.setText("画像の読み込みに失敗しました。")
             return
 
         # 念のため initial_index 範囲チェック
-        if not (0 <= initial_index < len(image_list)):
+        if not (0 <= initial_index < len(names)):
             initial_index = 0
 
-        # ワーカーが「最初に開いたファイル」として渡してきたパス
-        selected_path = image_list[initial_index]
-
-        # ★ ここで Windows 論理順（StrCmpLogicalW ベース）でソート
-        self.sorted_image_files = sorted(image_list, key=windows_logical_key)
-        self.image_files = list(self.sorted_image_files)
+        # ★ ここで Windows 論理順（StrCmpLogicalW ベース）のインデックス配列を作る。
+        # 名前テーブル自体は並べ替えないので、worker が返した initial_index は
+        # そのまま「最初に開いたファイル」の名前 ID として使える。
+        self.image_files = ImageFileList(directory, names, key=windows_logical_key)
         self.is_shuffled = False
-
-        # ソート後リスト中で selected_path がどこに来たかを探しなおす
-        try:
-            self.current_index = self.image_files.index(selected_path)
-        except ValueError:
-            # 万が一見つからなければ先頭にフォールバック
-            self.current_index = 0
+        self.current_index = self.image_files.position_of_id(initial_index)
 
         # ファイルリストの準備ができたので、次に画像の読み込みを開始
         self.load_image_by_index()
+        self._on_listing_ready()
 
-    def load_image_by_index(self) -> None:
-        """現在のインデックスに基づいて画像を非同期で読み込む"""
+    @pyqtSlot(int, str, list, int)
+    def on_tree_chunk_loaded(
+        self, generation: int, root: str, names: list, initial_index: int
+    ) -> None:
+        """再帰スキャンで見つかった画像を、届いた分だけナビゲーションに反映する"""
+        if generation != self._load_generation:
+            return
+        if self._tree_list_pending:
+            # 最初の塊は開いたファイルのフォルダ直下。これだけは届いた時点で論理順に並べる
+            self._tree_list_pending = False
+            self.image_files = ImageFileList(root, names, key=tree_logical_key)
+            self.is_shuffled = False
+        else:
+            self.image_files.extend(names)
+            self.statusBar().showMessage(f"📂 スキャン中... {len(self.image_files)} 件", 2000)
+
+        if self.current_index < 0 and self.image_files:
+            self.current_index = (
+                self.image_files.position_of_id(initial_index) if initial_index >= 0 else 0
+            )
+            self.load_image_by_index()
+
+    @pyqtSlot(int, list)
+    def on_tree_scan_finished(self, generation: int, order: list) -> None:
+        """スキャン完了時に、全件をフォルダ単位の論理順へ並べ直す"""
+        if generation != self._load_generation:
+            return
+        if not self.image_files:
+            if self.current_index < 0:
+                self.image_label.setText("画像の読み込みに失敗しました。")
+            return
+        self._apply_order(order)
+        self._on_listing_ready()
+
+    def _apply_order(self, order: list) -> None:
+        """並び順を差し替える。表示中の画像はそのまま、位置だけ付け替える"""
+        current_id = self.image_files.id_at(self.current_index) if self.current_index >= 0 else -1
+        self.image_files.set_order(order)
+        if current_id >= 0:
+            self.current_index = self.image_files.position_of_id(current_id)
+            self._refresh_title()
+        else:
+            self.update_status_bar()
+
+    def _refresh_title(self) -> None:
+        """一覧の件数や表示位置が変わったときに、タイトルとステータスバーだけ更新する"""
+        current_path = self.image_files[self.current_index]
+        self.setWindowTitle(
+            f"[{self.current_index + 1}/{len(self.image_files)}] {os.path.basename(current_path)}"
+        )
+        self.update_status_bar()
+
+    def _on_listing_ready(self) -> None:
+        """一覧が確定した。検索用インデックスと並べ替え/絞り込み用の情報を worker に作らせる"""
+        generation = self._load_generation
+        self._duplicate_groups = None
+        if self._forwarded_selection is not None:
+            self._restrict_to_forwarded()
+        self._request_name_index()
+        self.request_probe_listing.emit(
+            generation, self.image_files.directory, self.image_files.names
+        )
+        if self.sort_key != SORT_BY_NAME:
+            self.request_sort_order.emit(generation, self.sort_key)
+        if self.dimension_filter.is_active:
+            self.request_filter.emit(generation, self.dimension_filter)
+
+    def _cycle_sort_order(self) -> None:
+        """並び順を 名前 → 更新日時 → サイズ → 撮影日時 → 画素数 の順に切り替える"""
+        keys = list(SORT_ORDER_LABELS)
+        self.sort_key = keys[(keys.index(self.sort_key) + 1) % len(keys)]
+        self.statusBar().showMessage(f"並び順: {SORT_ORDER_LABELS[self.sort_key]}", 2000)
+        if self.image_files:
+            # 計算は worker 側で行い、届いた時点で差し替える（フォルダは読み直さない）
+            self.request_sort_order.emit(self._load_generation, self.sort_key)
+
+    @pyqtSlot(int, str, list)
+    def on_sort_order_ready(self, generation: int, sort_key: str, order: list) -> None:
+        """worker で計算した並び順を反映する"""
+        if generation != self._load_generation or sort_key != self.sort_key:
+            return
+        self._apply_order(order)
+
+    def _set_recursive_mode(self, enabled: bool) -> None:
+        """サブフォルダも含めて表示するかを切り替え、表示中のフォルダを読み直す"""
+        self.recursive_mode = enabled
+        if self.image_files and self.current_index >= 0:
+            self.load_image_from_path(self.image_files[self.current_index])
+
+    @pyqtSlot(int, int, object)
+    def on_sibling_prefetched(
+        self, generation: int, direction: int, listing: FolderListing | None
+    ) -> None:
+        """兄弟フォルダの先読み結果を保持し、待っていたフォルダ移動があれば実行する"""
+        if generation != self._load_generation:
+            return
+        self._sibling_folders[direction] = listing
+        if self._pending_folder_jump == direction:
+            self._pending_folder_jump = 0
+            self._show_sibling_folder(direction)
+
+    def show_next_folder(self) -> None:
+        self._show_sibling_folder(1)
+
+    def show_prev_folder(self) -> None:
+        self._show_sibling_folder(-1)
+
+    def _show_sibling_folder(self, direction: int) -> None:
+        """論理順で前後の（画像を含む）兄弟フォルダへ移動する"""
+        if self.is_loading or not self.image_files:
+            return
+        if direction not in self._sibling_folders:
+            # 先読みがまだ終わっていない。GUI では列挙せず、届いた時点で移動する
+            self._pending_folder_jump = direction
+            self.statusBar().showMessage("フォルダを検索中...")
+            return
+        listing = self._sibling_folders[direction]
+        if listing is None:
+            message = "次のフォルダはありません" if direction > 0 else "前のフォルダはありません"
+            self.statusBar().showMessage(message, 3000)
+            return
+        if self.recursive_mode:
+            # 再帰表示ではフォルダ直下だけの先読み結果は使えないので、通常どおりスキャンする
+            self.load_image_from_path(listing.first_path)
+            return
+
+        generation = self._begin_listing()
+        # worker 側でソート済みのインデックス配列をそのまま使う
+        self.image_files = ImageFileList(listing.directory, listing.names, order=listing.order)
+        self.is_shuffled = False
+        self.current_index = 0
+        self._request_sibling_prefetch(generation, listing.directory)
+        self._remember_histogram(listing.first_path, listing.first_histogram)
+        self.load_image_by_index(preloaded=listing.first_image)
+        self._on_listing_ready()
+
+    def load_image_by_index(self, preloaded: QImage | None = None) -> None:
+        """現在のインデックスに基づいて画像を非同期で読み込む
+
+        ``preloaded`` にデコード済みの画像があれば、worker を経由せずそのまま表示する。
+        """
         if self.is_loading or not (0 <= self.current_index < len(self.image_files)):
             return
+        if self._compare_pair is not None:
+            # 比較中の 2 枚以外へ移った（画像送り/削除等）。比較はそこで終わる
+            self._leave_compare_mode()
         self.fit_to_window = True
         self.scale_factor = 1.0
         self.is_loading = True
@@ -75,6 +301,11 @@ class NavigationMixin:
             self.current_filesize = 0
         self.setWindowTitle(f"{self.windowTitle()} | 読み込み中...")
         self.statusBar().showMessage("読み込み中...")
+        if preloaded is not None and not preloaded.isNull():
+            self.update_image_display(self._load_generation, file_path, preloaded)
+            return
+        # 前の画像のミップマップ作りより、次の画像のデコードを先にさせる
+        self.image_loader.cancel_mipmaps()
         self.request_load_image.emit(self._load_generation, file_path)
 
     def show_next_image(self) -> None:
@@ -91,65 +322,77 @@ class NavigationMixin:
         )
         self.load_image_by_index()
 
-    def _remove_path_from_lists(self, path: str) -> None:
-        """image_files と sorted_image_files の両方から指定パスを削除する"""
-        self.image_files = [p for p in self.image_files if p != path]
-        self.sorted_image_files = [p for p in self.sorted_image_files if p != path]
+    def _scrub(self, step: int) -> None:
+        """キーの押しっぱなし中の送り。位置だけ進め、番号とファイル名を出す。
+
+        デコードは送りが止まった位置（キーを離した所か、``SCRUB_SETTLE_MS`` 次が
+        来なかった所）だけで行う。読み込み中に届いた前の画像は位置が合わないので捨てられる。
+        """
+        if not self.image_files:
+            return
+        # 表示中の画像と位置がずれている間は、仕分け/削除などを受け付けない
+        self.is_loading = True
+        self.current_index = (self.current_index + step) % len(self.image_files)
+        position = f"[{self.current_index + 1}/{len(self.image_files)}]"
+        name = os.path.basename(self.image_files[self.current_index])
+        self.setWindowTitle(f"{position} {name}")
+        self.statusBar().showMessage(f"⏩ {position} {name}")
+        self._scrub_timer.start()
+
+    def _end_scrub_now(self) -> None:
+        """押しっぱなしの送り中なら、待たずにその位置の画像を読み込む"""
+        if self._scrub_timer.isActive():
+            self._scrub_timer.stop()
+            self._end_scrub()
+
+    def _end_scrub(self) -> None:
+        self.is_loading = False
+        self.load_image_by_index()
 
     def move_current_image_and_load_next(self, subfolder_name: str) -> None:
         if self.is_loading or not self.image_files:
             return
         source_path = self.image_files[self.current_index]
-        # GIF/animated WebP 表示中は QMovie がファイルハンドルを掴んでおり、
-        # Windows では掴んだまま move すると失敗するため、先に解放する。
+        # アニメーションの worker がこれから読みに行かないよう、先に止める。
+        # （Windows では読み込み中のファイルを move すると失敗する）
         self._release_current_file_handles()
-        dest_folder = os.path.join(os.path.dirname(source_path), subfolder_name)
-        os.makedirs(dest_folder, exist_ok=True)
-        try:
-            shutil.move(source_path, dest_folder)
-            self._remove_path_from_lists(source_path)
-            if not self.image_files:
-                self._clear_display()
-            else:
-                if self.current_index >= len(self.image_files):
-                    self.current_index = 0
-                self.load_image_by_index()
-        except Exception:
-            logger.exception("ファイルの移動に失敗: %s -> %s", source_path, dest_folder)
-            self.statusBar().showMessage("エラー: ファイルの移動に失敗しました", 5000)
+        destination = os.path.join(
+            os.path.dirname(source_path), subfolder_name, os.path.basename(source_path)
+        )
+        # 移動はワーカーで行い、完了を待たずに次へ進む（失敗したら一覧に戻る）
+        self._queue_file_operation(FILE_OP_MOVE, destination)
+        self._remove_current_and_load_next()
 
     def delete_current_image_and_load_next(self) -> None:
         """現在の画像をごみ箱に移動し、次の画像を読み込む（確認なし）"""
         if self.is_loading or not self.image_files:
             return
-        source_path = self.image_files[self.current_index]
-        # 削除でも同様に、QMovie が掴むファイルハンドルを先に解放する。
+        # 削除でも同様に、アニメーションの読み込みを先に止める。
         self._release_current_file_handles()
-        try:
-            send2trash(source_path)
-            self._remove_path_from_lists(source_path)
-            if not self.image_files:
-                self._clear_display()
-            else:
-                if self.current_index >= len(self.image_files):
-                    self.current_index = 0
-                self.load_image_by_index()
-        except Exception:
-            logger.exception("ファイルの削除に失敗: %s", source_path)
-            self.statusBar().showMessage("エラー: ファイルの削除に失敗しました", 5000)
+        self._queue_file_operation(FILE_OP_TRASH)
+        self._remove_current_and_load_next()
+
+    def _remove_current_and_load_next(self) -> None:
+        # ソート順/シャッフル順のどちらからも O(log n) で消える
+        self.image_files.remove_at(self.current_index)
+        if not self.image_files:
+            self._clear_display()
+        else:
+            if self.current_index >= len(self.image_files):
+                self.current_index = 0
+            self.load_image_by_index()
 
     def _toggle_shuffle_mode(self) -> None:
         if not self.image_files:
             return
         self.is_shuffled = not self.is_shuffled
         if self.is_shuffled:
-            random.shuffle(self.image_files)
+            self.image_files.shuffle()
             self.current_index = 0
             self.load_image_by_index()
         else:
-            current_path = self.image_files[self.current_index]
-            self.image_files = list(self.sorted_image_files)
-            self.current_index = (
-                self.image_files.index(current_path) if current_path in self.image_files else 0
-            )
+            # 置換配列を捨てるだけなので、リストのコピーも index() の線形探索も要らない
+            current_id = self.image_files.id_at(self.current_index)
+            self.image_files.unshuffle()
+            self.current_index = self.image_files.position_of_id(current_id)
             self.update_status_bar()
@@ -1,42 +1,42 @@
 """画像の描画・ラスタライズ・ステータスバー表示を担うミックスイン。
 
 ``ImageViewer`` に合成されることを前提に ``self`` の各属性
-(``original_pixmap`` / ``svg_renderer`` / ``scroll_area`` など) を参照する。
+(``original_pixmap`` / ``svg_path`` / ``scroll_area`` など) を参照する。
+
+表示サイズ（縮小版・SVG のタイル・アニメーションのコマ）はデバイスピクセルで決める。
+``scale_factor`` の 100% は画像の 1 画素 = 画面の 1 画素。
 """
 
 from __future__ import annotations
 
+import logging
 import os
+import time
 
-from PIL import Image
 from PyQt6.QtCore import QSize, Qt, pyqtSlot
-from PyQt6.QtGui import QImage, QMovie, QPainter, QPixmap
-from PyQt6.QtSvg import QSvgRenderer
+from PyQt6.QtGui import QImage, QPixmap
 
 from ...config.constants import (
     DEFAULT_TITLE,
     NOTICE_TEXT_STYLE,
+    RENDITION_CACHE_SIZE,
+    SORT_BY_NAME,
+    SORT_ORDER_LABELS,
+    SVG_TILE_CACHE_SIZE,
+    SVG_TILE_SIZE,
     WELCOME_TEXT,
     ZOOM_IN_FACTOR,
     ZOOM_OUT_FACTOR,
 )
+from ...core.mipmap import level_for
+from ...core.tiles import TileKey, visible_tiles
+
+logger = logging.getLogger(__name__)
 
 
 class RenderingMixin:
     """画像表示まわりのメソッド群。"""
 
-    def _is_animated_webp(self, file_path: str) -> bool:
-        """WebP がアニメーションかどうかを Pillow で判定する"""
-        if not file_path.lower().endswith(".webp"):
-            return False
-        try:
-            with Image.open(file_path) as im:
-                # Pillow の WebP サポートが有効なら is_animated/n_frames が使える
-                return bool(getattr(im, "is_animated", False) and getattr(im, "n_frames", 1) > 1)
-        except Exception:
-            # 壊れたファイルなどは安全側で False
-            return False
-
     @pyqtSlot(int, str, QImage)
     def update_image_display(self, generation: int, file_path: str, image: QImage) -> None:
         # 別ディレクトリを開き直した後に届いた古い結果は無視する
@@ -44,99 +44,85 @@ class RenderingMixin:
             return
         if not self.image_files or self.current_index < 0:
             return
+        if self._compare_pair is not None and self._store_compare_image(file_path, image):
+            return
         if self.image_files[self.current_index] != file_path:
             return
-        self.stop_movie()
+        self.stop_animation()
+        self._mipmaps = []
         ext = os.path.splitext(file_path)[1].lower()
-        use_movie = False
-
-        if ext == ".gif":
-            use_movie = True
-        elif ext == ".webp" and self._is_animated_webp(file_path):
-            # アニメーション WebP だけ QMovie で扱う
-            use_movie = True
-
-        if use_movie:
-            self.svg_renderer = None
-            movie = QMovie(file_path)
-            if movie.isValid():
-                self.current_movie = movie
-                self.current_movie.frameChanged.connect(self.on_gif_first_frame)
-                self.current_movie.frameChanged.connect(self.update_gif_frame_status)
-                self.image_label.setMovie(self.current_movie)
-                self.current_movie.start()
-            else:
-                # 何らかの理由で QMovie が扱えなければ静止画フォールバック
-                use_movie = False
-
-        if not use_movie:
-            # SVG はベクターのまま保持し、ズーム/フィットのたびに再ラスタライズする。
-            # （worker が渡す pixmap は固有サイズの 1 回ラスタライズで、拡大するとガビガビになるため）
-            self.svg_renderer = None
+        self.svg_path = None
+        self._svg_tiles.clear()
+        self._cancel_svg_tiles()
+        if image.isNull():
+            self.image_label.setText("画像の読み込みに失敗しました")
+            self.original_pixmap = QPixmap()
+        else:
+            # QPixmap への変換は GUI スレッドであるここで行う
+            self.original_pixmap = QPixmap.fromImage(image)
             if ext in (".svg", ".svgz"):
-                renderer = QSvgRenderer(file_path)
-                if renderer.isValid():
-                    self.svg_renderer = renderer
-
-            if self.svg_renderer is not None:
-                size = self.svg_renderer.defaultSize()
-                if size.isEmpty():
-                    size = QSize(512, 512)
-                # original_pixmap は固有サイズの基準（サイズ表示・アスペクト比）として保持
-                self.original_pixmap = self._render_svg(size)
-            elif image.isNull():
-                self.image_label.setText("画像の読み込みに失敗しました")
-                self.original_pixmap = QPixmap()
-            else:
-                # QPixmap への変換は GUI スレッドであるここで行う
-                self.original_pixmap = QPixmap.fromImage(image)
-            self.redraw_image()
-            self.update_status_bar()
+                # SVG はズーム/フィットのたびに worker がベクターからタイルで描き直す。
+                # worker が渡した固有サイズの画像は、サイズの基準とタイルが届くまでの仮表示に使う
+                self.svg_path = file_path
+        self.redraw_image()
+        self._refresh_histogram_overlay()
+        self.update_status_bar()
+        if not image.isNull():
+            # アニメーションなら、表示した 1 枚目に続くフレームを worker が届ける
+            self._start_animation(file_path, image)
 
         self.setWindowTitle(
             f"[{self.current_index + 1}/{len(self.image_files)}] {os.path.basename(file_path)}"
         )
         self.is_loading = False
 
-    @pyqtSlot(int)
-    def on_gif_first_frame(self, frame_number: int) -> None:
-        if not self.current_movie:
+    @pyqtSlot(int, str, list)
+    def on_mipmaps_ready(self, generation: int, file_path: str, levels: list) -> None:
+        """worker で作ったミップマップを受け取る（以降の縮小表示はこれを元にする）"""
+        if generation != self._load_generation or self.is_loading:
             return
-        first_frame_pixmap = self.current_movie.currentPixmap()
-        if not first_frame_pixmap.isNull():
-            self.original_pixmap = first_frame_pixmap
-            try:
-                self.current_movie.frameChanged.disconnect(self.on_gif_first_frame)
-            except TypeError:
-                pass
-            self.redraw_image()
-            self.update_status_bar()
-
-    @pyqtSlot(int)
-    def update_gif_frame_status(self, frame_number: int) -> None:
-        if self.current_movie and self.current_movie.isValid():
-            self.update_status_bar()
+        if not (0 <= self.current_index < len(self.image_files)):
+            return
+        if self._compare_pair is not None and self._store_compare_mipmaps(file_path, levels):
+            return
+        if self.image_files[self.current_index] != file_path:
+            return
+        if self.svg_path is not None:
+            # SVG はベクターから描く
+            return
+        self._mipmaps = [QPixmap.fromImage(level) for level in levels]
 
-    def redraw_image(self) -> None:
+    def redraw_image(self, fast: bool = False) -> None:
+        """表示サイズに合わせて描き直す。``fast`` なら平滑な縮小を省く（操作中の仮描画）"""
         if self.original_pixmap.isNull():
             return
-        is_gif = self.current_movie and self.current_movie.isValid()
-        if is_gif:
-            self._redraw_gif()
-        else:
-            self._redraw_static_image()
+        self._redraw_static_image(fast)
+
+    def _redraw_interactive(self) -> None:
+        """リサイズ/ズーム操作中の描き直し。
+
+        まず最近傍（平滑済みの同じサイズがあればそれ）で描き、操作が
+        ``SMOOTH_REDRAW_DELAY_MS`` 途切れたら平滑補間で描き直す。
+        """
+        self.redraw_image(fast=True)
+        self._smooth_redraw_timer.start()
 
     def update_status_bar(self) -> None:
         if self.original_pixmap.isNull():
-            self.statusBar().clearMessage()
+            if self._search_prompt is not None:
+                self.statusBar().showMessage(self._search_prompt)
+            else:
+                self.statusBar().clearMessage()
             return
         parts: list[str] = []
+        if self._search_prompt is not None:
+            parts.append(self._search_prompt)
         w, h = self.original_pixmap.width(), self.original_pixmap.height()
         fs_mb = f"{self.current_filesize / (1024 * 1024):.2f}MB"
         parts.append(f"🖼️ {w}x{h}")
         parts.append(f"💾 {fs_mb}")
         if self.fit_to_window:
-            vp_size = self.scroll_area.viewport().size()
+            vp_size = self._viewport_device_size()
             scale = min(vp_size.width() / w, vp_size.height() / h) if w > 0 and h > 0 else 0
             zoom_percent = scale * 100
             mode_icon = "↕️"
@@ -144,86 +130,122 @@ class RenderingMixin:
             zoom_percent = self.scale_factor * 100
             mode_icon = ""
         parts.append(f"{mode_icon} {zoom_percent:.1f}%")
+        if self.sort_key != SORT_BY_NAME:
+            parts.append(f"⇅ {SORT_ORDER_LABELS[self.sort_key]}")
+        if self._duplicate_groups is not None:
+            parts.append(
+                f"🧬 グループ {self._duplicate_group_index + 1}/{len(self._duplicate_groups)}"
+                f" ({len(self.image_files)}枚)"
+            )
+        elif self.dimension_filter.is_active:
+            parts.append(f"📐 {len(self.image_files)}/{self.image_files.total}")
         if self.is_shuffled:
             parts.append("🔀")
-        if self.current_movie and self.current_movie.isValid():
-            state = self.current_movie.state()
-            state_icon = "►" if state == QMovie.MovieState.Running else "⏸"
-            frame_info = f"🎞️ [{self.current_movie.currentFrameNumber() + 1}/{self.current_movie.frameCount()}]"
+        if self._compare_pair is not None:
+            side = (
+                "A" if self.image_files.id_at(self.current_index) == self._compare_pair[0] else "B"
+            )
+            ready = "" if len(self._compare_views) == 2 else " (読み込み中)"
+            parts.append(f"⚖️ 比較 {side}{ready}")
+        if self.is_animating():
+            state_icon = "⏸" if self._animation_paused else "►"
+            frame_info = f"🎞️ [{self._animation_index + 1}/{self._animation_frame_count}]"
+            if self._animation_dropped:
+                frame_info += f" 落ち {self._animation_dropped}"
             parts.append(f"{frame_info} {state_icon}")
         status_text = "  |  ".join(parts)
         self.statusBar().showMessage(status_text)
 
     def _release_current_file_handles(self) -> None:
-        """現在表示中のファイルを掴み得るリソース（QMovie）を解放する。
+        """現在表示中のファイルを読み得る処理（アニメーションのデコード）を止める。
 
-        QMovie は Windows で元ファイルのハンドルを保持し得るため、move/delete の前に
-        明示的に止める。静止画の pixmap は既にメモリ上にあり元ファイルを掴まないので、
-        ラベル表示まで消す必要はない（消すと操作失敗時に表示だけ空になってしまう）。
+        worker はアニメーションを開くときにファイルを丸ごと読むので、move/delete の前に
+        止めておけば、まだ開いていないファイルを読みに行くことは無い。表示中の pixmap は
+        既にメモリ上にあり元ファイルを掴まないので、表示まで消す必要はない
+        （消すと操作失敗時に表示だけ空になってしまう）。
         """
-        self.stop_movie()
-
-    def stop_movie(self) -> None:
-        if self.current_movie:
-            try:
-                self.current_movie.frameChanged.disconnect()
-            except TypeError:
-                pass
-            self.current_movie.stop()
-            self.current_movie = None
-        self.image_label.setMovie(None)
-
-    def _redraw_gif(self) -> None:
-        self.image_label.setScaledContents(True)
-        if self.fit_to_window:
-            self.scroll_area.setWidgetResizable(False)
-            scaled_pixmap = self.original_pixmap.scaled(
-                self.scroll_area.viewport().size(),
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            self.image_label.setFixedSize(scaled_pixmap.size())
-        else:
-            self.scroll_area.setWidgetResizable(False)
-            scaled_size = self.original_pixmap.size() * self.scale_factor
-            self.image_label.setFixedSize(scaled_size)
-        if self.image_label.movie() is not self.current_movie:
-            self.image_label.setMovie(self.current_movie)
-        if self.current_movie and self.current_movie.state() != QMovie.MovieState.Running:
-            self.current_movie.start()
-
-    def _redraw_static_image(self) -> None:
+        self.stop_animation()
+
+    def _redraw_static_image(self, fast: bool = False) -> None:
         self.image_label.setMinimumSize(1, 1)
         self.image_label.setMaximumSize(16777215, 16777215)
         self.image_label.setScaledContents(False)
+        viewport_size = self._viewport_device_size()
         if self.fit_to_window:
             self.scroll_area.setWidgetResizable(True)
-            scaled_pixmap = self._scaled_pixmap_for(self.scroll_area.viewport().size())
-            self.image_label.setPixmap(scaled_pixmap)
+            display_size = self._aspect_fit_size(viewport_size)
         else:
             self.scroll_area.setWidgetResizable(False)
-            bounds = QSize(
-                int(self.original_pixmap.width() * self.scale_factor),
-                int(self.original_pixmap.height() * self.scale_factor),
+            display_size = self._aspect_fit_size(
+                QSize(
+                    int(self.original_pixmap.width() * self.scale_factor),
+                    int(self.original_pixmap.height() * self.scale_factor),
+                )
             )
-            scaled_pixmap = self._scaled_pixmap_for(bounds)
-            self.image_label.setPixmap(scaled_pixmap)
+        if self.is_animating():
+            # 以降のコマは worker がこの大きさに縮小して届ける
+            self._update_animation_size(display_size)
+        if self.svg_path is not None:
+            self._show_svg_tiles(display_size, fast)
+        elif self._animation_frame is not None:
+            # 再生中のコマを描き直す
+            self.image_label.set_view(self._animation_frame, display_size)
+        elif display_size.width() >= self.original_pixmap.width():
+            # 等倍以上は元画像から見えている範囲だけを描く（拡大後の pixmap は作らない）
+            self.image_label.set_view(self.original_pixmap, display_size)
+        else:
+            # 縮小は平滑に仕上げたものを等倍で描く。操作中でまだ無ければミップマップから最近傍で描く
+            rendition = self._scaled_pixmap_for(display_size, fast)
+            self.image_label.set_view(rendition or self._mipmap_for(display_size), display_size)
+        if not self.fit_to_window:
             self.image_label.adjustSize()
 
-    def _scaled_pixmap_for(self, bounds: QSize) -> QPixmap:
-        """bounds に収まるよう（アスペクト比維持で）スケールした pixmap を返す。
+    def _scaled_pixmap_for(self, size: QSize, fast: bool = False) -> QPixmap | None:
+        """``size`` ちょうどに平滑補間で縮小した pixmap を返す。
 
-        SVG はベクターから表示サイズちょうどで都度ラスタライズするのでズームしても
-        鮮明なまま。それ以外は元 pixmap を平滑補間でスケールする。
+        元 pixmap（ミップマップがあればその段）を平滑補間でスケールする。仕上げた分は
+        表示サイズごとに ``RENDITION_CACHE_SIZE`` 件まで覚えておき、``F``/``F11`` で
+        行き来したときは描き直さない。``fast`` で覚えていなければ None（作らない）。
         """
-        if self.svg_renderer is not None:
-            return self._render_svg(self._aspect_fit_size(bounds))
-        return self.original_pixmap.scaled(
-            bounds.width(),
-            bounds.height(),
-            Qt.AspectRatioMode.KeepAspectRatio,
+        key = (size.width(), size.height())
+        source = self.original_pixmap.cacheKey()
+        if source != self._rendition_source:
+            # 別の画像に変わった
+            self._renditions.clear()
+            self._rendition_source = source
+        cached = self._renditions.get(key)
+        if cached is not None:
+            self._renditions.move_to_end(key)
+            return cached
+        if fast:
+            return None
+        rendition = self._mipmap_for(size).scaled(
+            size.width(),
+            size.height(),
+            Qt.AspectRatioMode.IgnoreAspectRatio,
             Qt.TransformationMode.SmoothTransformation,
         )
+        # デバイスピクセルの大きさで作ったので、描くときに Qt に拡大させない
+        rendition.setDevicePixelRatio(self.devicePixelRatioF())
+        self._renditions[key] = rendition
+        if len(self._renditions) > RENDITION_CACHE_SIZE:
+            self._renditions.popitem(last=False)
+        return rendition
+
+    def _mipmap_for(self, size: QSize) -> QPixmap:
+        """``size`` へ縮小する元にする pixmap（それ以上の大きさで最も小さいミップマップの段）"""
+        index = level_for(
+            [(level.width(), level.height()) for level in self._mipmaps],
+            size.width(),
+            size.height(),
+        )
+        return self._mipmaps[index] if index >= 0 else self.original_pixmap
+
+    def _viewport_device_size(self) -> QSize:
+        """ビューポートの大きさ（デバイスピクセル。端数は収まるよう切り捨てる）"""
+        size = self.scroll_area.viewport().size()
+        ratio = self.devicePixelRatioF()
+        return QSize(int(size.width() * ratio), int(size.height() * ratio))
 
     def _aspect_fit_size(self, bounds: QSize) -> QSize:
         """original_pixmap のアスペクト比を保ったまま bounds に収まる最大サイズ。"""
@@ -233,16 +255,89 @@ class RenderingMixin:
         scale = min(bounds.width() / w, bounds.height() / h)
         return QSize(max(1, round(w * scale)), max(1, round(h * scale)))
 
-    def _render_svg(self, size: QSize) -> QPixmap:
-        """保持中の SVG を指定ピクセルサイズでラスタライズする。"""
-        image = QImage(size, QImage.Format.Format_ARGB32_Premultiplied)
-        image.fill(Qt.GlobalColor.transparent)
-        painter = QPainter(image)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
-        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, True)
-        self.svg_renderer.render(painter)
-        painter.end()
-        return QPixmap.fromImage(image)
+    def _show_svg_tiles(self, display_size: QSize, fast: bool = False) -> None:
+        """SVG を ``display_size`` のタイルで描く。無いタイルは仮の画像で埋めておく"""
+        width, height = display_size.width(), display_size.height()
+        tiles = {}
+        for key, tile in self._svg_tiles.items():
+            if key.width == width and key.height == height:
+                tiles[(key.column, key.row)] = tile
+        self.image_label.set_tiled_view(self.original_pixmap, display_size, SVG_TILE_SIZE, tiles)
+        if fast:
+            # 操作中の途中の倍率は描かせない（止まったら平滑描画の再描画から依頼する）
+            self._cancel_svg_tiles()
+        else:
+            self._svg_tile_timer.start()
+
+    def _cancel_svg_tiles(self) -> None:
+        self._svg_tile_request += 1
+        self.svg_tiler.cancel_older_than(self._svg_tile_request)
+
+    def _request_visible_svg_tiles(self) -> None:
+        """見えている範囲のうち、まだ描いていない SVG タイルを worker に依頼する。
+
+        レイアウトとスクロール位置が確定してから見える範囲を求めるよう、
+        ``_svg_tile_timer``（待ち時間 0）から呼ぶ。
+        """
+        if self.svg_path is None or not self.image_label.has_view():
+            return
+        # タイルはデバイスピクセルで切ってあるので、見える範囲もデバイスピクセルで求める
+        ratio = self.devicePixelRatioF()
+        size = self.image_label.display_size()
+        viewport = self._viewport_device_size()
+        # ビューポートより小さい向きは全体が見えている（中央寄せでスクロールしない）
+        left = int(self.scroll_area.horizontalScrollBar().value() * ratio)
+        top = int(self.scroll_area.verticalScrollBar().value() * ratio)
+        if size.width() <= viewport.width():
+            left = 0
+        if size.height() <= viewport.height():
+            top = 0
+        missing = []
+        for key in visible_tiles(
+            size.width(),
+            size.height(),
+            left,
+            top,
+            left + viewport.width(),
+            top + viewport.height(),
+            SVG_TILE_SIZE,
+        ):
+            if key in self._svg_tiles:
+                # 見えているタイルは追い出されにくくする
+                self._svg_tiles.move_to_end(key)
+            else:
+                missing.append(key)
+        if not missing:
+            return
+        self._cancel_svg_tiles()
+        self.request_svg_tiles.emit(self._svg_tile_request, self.svg_path, missing)
+
+    @pyqtSlot(int)
+    def on_view_scrolled(self, _value: int) -> None:
+        # ズーム操作中のスクロールは途中の倍率なので依頼しない
+        if self.svg_path is not None and not self._smooth_redraw_timer.isActive():
+            self._svg_tile_timer.start()
+
+    @pyqtSlot(str, object, QImage)
+    def on_svg_tile_ready(self, file_path: str, key: TileKey, image: QImage) -> None:
+        if file_path != self.svg_path:
+            return
+        tile = QPixmap.fromImage(image)
+        tile.setDevicePixelRatio(self.devicePixelRatioF())
+        self._svg_tiles[key] = tile
+        if len(self._svg_tiles) > SVG_TILE_CACHE_SIZE:
+            self._svg_tiles.popitem(last=False)
+        if self.image_label.display_size() == QSize(key.width, key.height):
+            self.image_label.add_tile(key.column, key.row, tile)
+
+    def _on_device_pixel_ratio_changed(self) -> None:
+        """拡大率の違う画面へ移った。デバイスピクセルの大きさで作り直す"""
+        # 前の倍率で作った縮小版/タイルは大きさも倍率の印も合わない
+        self._renditions.clear()
+        self._svg_tiles.clear()
+        self._cancel_svg_tiles()
+        self.redraw_image()
+        self.update_status_bar()
 
     def _toggle_fit_mode(self) -> None:
         self.fit_to_window = not self.fit_to_window
@@ -252,31 +347,66 @@ class RenderingMixin:
         self.update_status_bar()
 
     def _zoom_at_cursor(self, event) -> None:
-        old_scale_factor = self.scale_factor
+        """ホイール 1 ノッチ分のズームを溜める（描き直しは次の表示フレームでまとめて行う）"""
         if self.fit_to_window:
             pixmap_size = self.original_pixmap.size()
             if pixmap_size.width() == 0 or pixmap_size.height() == 0:
                 return
-            vp_size = self.scroll_area.viewport().size()
+            vp_size = self._viewport_device_size()
             scale = min(
                 vp_size.width() / pixmap_size.width(), vp_size.height() / pixmap_size.height()
             )
             self.scale_factor = scale
             self.fit_to_window = False
-        angle_delta = event.angleDelta().y()
-        self.scale_factor *= ZOOM_IN_FACTOR if angle_delta > 0 else ZOOM_OUT_FACTOR
-        self.redraw_image()
+        factor = ZOOM_IN_FACTOR if event.angleDelta().y() > 0 else ZOOM_OUT_FACTOR
+        self.scale_factor *= factor
+        # カーソル位置 p を動かさないズームでは、スクロール位置 s は s' = (s + p) * f - p へ
+        # 動く。ノッチごとの変換を s' = zoom * s + shift に合成しておき、カーソルが
+        # 途中で動いても 1 回の反映で各ノッチを順に当てたのと同じ位置にする
         mouse_pos = event.position()
+        shift_x, shift_y = self._pending_zoom_shift
+        self._pending_zoom *= factor
+        self._pending_zoom_shift = (
+            (shift_x + mouse_pos.x()) * factor - mouse_pos.x(),
+            (shift_y + mouse_pos.y()) * factor - mouse_pos.y(),
+        )
+        self._schedule_view_update()
+
+    def _pan_by(self, delta_x: float, delta_y: float) -> None:
+        """パンの移動量を溜める（スクロールは次の表示フレームでまとめて行う）"""
+        pan_x, pan_y = self._pending_pan
+        self._pending_pan = (pan_x + delta_x, pan_y + delta_y)
+        self._schedule_view_update()
+
+    def _schedule_view_update(self) -> None:
+        # 動いているタイマーは掛け直さない（入力が続いても 1 フレームごとに反映する）
+        if not self._view_update_timer.isActive():
+            self._view_update_timer.start()
+
+    def _apply_view_update(self) -> None:
+        """溜めたズームとパンを 1 回の描き直し/スクロールで反映する（1 表示フレームに 1 回）"""
+        started = time.perf_counter()
+        zoom, (shift_x, shift_y) = self._pending_zoom, self._pending_zoom_shift
+        pan_x, pan_y = self._pending_pan
+        self._pending_zoom, self._pending_zoom_shift = 1.0, (0.0, 0.0)
+        # スクロールは整数なので、端数は次のフレームへ持ち越す
+        self._pending_pan = (pan_x - round(pan_x), pan_y - round(pan_y))
         h_bar, v_bar = self.scroll_area.horizontalScrollBar(), self.scroll_area.verticalScrollBar()
-        h_scroll = (h_bar.value() + mouse_pos.x()) * (
-            self.scale_factor / old_scale_factor
-        ) - mouse_pos.x()
-        v_scroll = (v_bar.value() + mouse_pos.y()) * (
-            self.scale_factor / old_scale_factor
-        ) - mouse_pos.y()
-        h_bar.setValue(int(h_scroll))
-        v_bar.setValue(int(v_scroll))
-        self.update_status_bar()
+        if zoom != 1.0:
+            self._redraw_interactive()
+            h_bar.setValue(round(h_bar.value() * zoom + shift_x))
+            v_bar.setValue(round(v_bar.value() * zoom + shift_y))
+            self.update_status_bar()
+        if round(pan_x) or round(pan_y):
+            h_bar.setValue(h_bar.value() - round(pan_x))
+            v_bar.setValue(v_bar.value() - round(pan_y))
+        logger.debug(
+            "view update (zoom x%.3f, pan %+.0f,%+.0f) took %.1f ms",
+            zoom,
+            pan_x,
+            pan_y,
+            (time.perf_counter() - started) * 1000,
+        )
 
     def _scroll_image(self, event) -> None:
         scroll_amount = event.angleDelta().y() // 120 * 40
@@ -289,37 +419,20 @@ class RenderingMixin:
                 self.scroll_area.verticalScrollBar().value() - scroll_amount
             )
 
-    def _toggle_gif_playback(self) -> bool:
-        if self.current_movie and self.current_movie.isValid():
-            state = self.current_movie.state()
-            if state == QMovie.MovieState.Running:
-                self.current_movie.setPaused(True)
-            elif state == QMovie.MovieState.Paused:
-                self.current_movie.setPaused(False)
-            self.update_status_bar()
-            return True
-        return False
-
-    def _step_gif_frame(self, key: int) -> None:
-        if (
-            self.current_movie
-            and self.current_movie.isValid()
-            and self.current_movie.frameCount() > 0
-        ):
-            current_frame = self.current_movie.currentFrameNumber()
-            total_frames = self.current_movie.frameCount()
-            new_frame = (current_frame + 1) % total_frames
-            self.current_movie.jumpToFrame(new_frame)
-            self.current_movie.setPaused(True)
-            self.update_status_bar()
-
     def _clear_display(self) -> None:
-        self.stop_movie()
+        if self._compare_pair is not None:
+            self._leave_compare_mode()
+        self.stop_animation()
         self.is_loading = False
         self.original_pixmap = QPixmap()
-        self.svg_renderer = None
+        self.svg_path = None
+        self._svg_tiles.clear()
+        self._cancel_svg_tiles()
+        self._renditions.clear()
+        self._mipmaps = []
         self.image_label.setText(WELCOME_TEXT)
         self.image_label.setStyleSheet(NOTICE_TEXT_STYLE)
         self.current_index = -1
+        self._refresh_histogram_overlay()
         self.statusBar().showMessage("")
         self.setWindowTitle(DEFAULT_TITLE)
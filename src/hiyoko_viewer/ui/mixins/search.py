@@ -0,0 +1,101 @@
+"""ファイル名のタイプアヘッド検索（``/`` または ``Ctrl+F`` で開始）のミックスイン。
+
+検索用インデックス (:class:`~hiyoko_viewer.core.name_index.NameIndex`) は
+ファイル一覧の読み込み後に worker で作られ、ここでは引くだけにする。
+"""
+
+from __future__ import annotations
+
+from PyQt6.QtCore import Qt, pyqtSlot
+from PyQt6.QtGui import QKeyEvent
+
+from ...core.name_index import NameIndex
+
+
+class NameSearchMixin:
+    """入力した文字列にファイル名が一致する画像へジャンプするメソッド群。"""
+
+    @pyqtSlot(int, object)
+    def on_name_index_ready(self, generation: int, index: NameIndex) -> None:
+        if generation != self._load_generation:
+            return
+        self._name_index = index
+
+    def _request_name_index(self) -> None:
+        """表示中のファイル一覧に対する検索インデックスの構築を worker に依頼する"""
+        self._name_index = None
+        self.request_build_name_index.emit(self._load_generation, self.image_files.names)
+
+    def _start_name_search(self) -> None:
+        self._search_text = ""
+        self._search_rank = -1
+        self._search_prompt = "🔍 "
+        self.update_status_bar()
+
+    def _end_name_search(self) -> None:
+        self._search_text = None
+        self._search_prompt = None
+        self.update_status_bar()
+
+    def _handle_search_key(self, event: QKeyEvent) -> bool:
+        """検索中のキー入力を処理する。検索を終えて通常処理に回す場合は False"""
+        key = event.key()
+        if key == Qt.Key.Key_Escape:
+            self._end_name_search()
+            return True
+        if key in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            # 同じ検索語で次の一致へ（末尾まで行ったら先頭に戻る）
+            self._run_name_search(self._search_rank)
+            return True
+        if key == Qt.Key.Key_Backspace:
+            self._search_text = self._search_text[:-1]
+            self._run_name_search(-1)
+            return True
+        text = event.text()
+        if text and text.isprintable():
+            self._search_text += text
+            self._run_name_search(-1)
+            return True
+        self._end_name_search()
+        return False
+
+    def _run_name_search(self, after: int) -> None:
+        """ランク ``after`` より後の一致を探し、見つかればその画像を読み込む"""
+        text = self._search_text
+        if not text:
+            self._search_prompt = "🔍 "
+            self.update_status_bar()
+            return
+        if self._name_index is None:
+            self._search_prompt = f"🔍 {text}（索引を作成中...）"
+            self.update_status_bar()
+            return
+
+        position = None
+        rank = after
+        wrapped = after < 0
+        while position is None:
+            hit = self._name_index.search(text, rank)
+            if hit is None:
+                if wrapped:
+                    break
+                rank, wrapped = -1, True
+                continue
+            rank, name_id = hit
+            try:
+                position = self.image_files.position_of_id(name_id)
+            except ValueError:
+                # 仕分け/削除済みの名前は飛ばす
+                continue
+
+        if position is None:
+            self._search_prompt = f"🔍 {text}（見つかりません）"
+            self.update_status_bar()
+            return
+        self._search_rank = rank
+        self._search_prompt = f"🔍 {text}"
+        if position != self.current_index and not self.is_loading:
+            self.current_index = position
+            self.load_image_by_index()
+        else:
+            self.update_status_bar()
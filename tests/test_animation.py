@@ -0,0 +1,252 @@
+import numpy as np
+import pytest
+from PIL import Image
+from PyQt6.QtGui import QImage
+
+from hiyoko_viewer.config.constants import ANIMATION_DEFAULT_FRAME_MS, ANIMATION_QUEUE_SIZE
+from hiyoko_viewer.services import animation
+from hiyoko_viewer.services.animation import AnimationDecoder, open_animation
+
+COLORS = [(255, 0, 0), (0, 255, 0), (0, 0, 255)]
+
+
+def _save_animation(path, *, durations=(50, 60, 70), size=(40, 20)) -> None:
+    frames = [Image.new("RGB", size, color) for color in COLORS]
+    frames[0].save(path, save_all=True, append_images=frames[1:], duration=list(durations), loop=0)
+
+
+@pytest.mark.parametrize("name", ["anim.gif", "anim.png", "anim.webp"])
+def test_open_animation_reads_frames_and_durations(tmp_path, name) -> None:
+    path = tmp_path / name
+    _save_animation(path)
+
+    source = open_animation(str(path))
+
+    assert source is not None
+    assert source.frame_count == 3
+    image, duration = source.read(1)
+    assert duration == 60
+    assert image.pixelColor(5, 5).getRgb()[:3] == pytest.approx((0, 255, 0), abs=8)
+
+
+def test_open_animation_can_rewind_to_first_frame(tmp_path) -> None:
+    path = tmp_path / "anim.gif"
+    _save_animation(path)
+    source = open_animation(str(path))
+
+    source.read(0)
+    source.read(2)
+    image, duration = source.read(0)
+
+    assert duration == 50
+    assert image.pixelColor(5, 5).getRgb()[:3] == (255, 0, 0)
+
+
+def test_open_animation_returns_none_for_still_or_unreadable_image(tmp_path) -> None:
+    still = tmp_path / "still.png"
+    Image.new("RGB", (4, 4)).save(still)
+
+    assert open_animation(str(still)) is None
+    assert open_animation(str(tmp_path / "missing.gif")) is None
+
+
+def test_open_animation_decodes_animated_jpeg_xl(tmp_path) -> None:
+    imagecodecs = pytest.importorskip("imagecodecs")
+    if not hasattr(imagecodecs, "jpegxl_encode"):
+        pytest.skip("imagecodecs に JPEG XL コーデックが無い")
+    frames = np.zeros((3, 8, 8, 3), np.uint8)
+    frames[1, :, :, 1] = 255
+    path = tmp_path / "anim.jxl"
+    path.write_bytes(imagecodecs.jpegxl_encode(frames, lossless=True))
+    still = tmp_path / "still.jxl"
+    still.write_bytes(imagecodecs.jpegxl_encode(frames[0], lossless=True))
+
+    source = open_animation(str(path))
+
+    assert open_animation(str(still)) is None
+    assert source.frame_count == 3
+    image, duration = source.read(1)
+    assert duration == ANIMATION_DEFAULT_FRAME_MS
+    assert image.pixelColor(2, 2).getRgb() == (0, 255, 0, 255)
+
+
+def test_decoder_sends_queue_after_first_frame_and_refills_on_request(tmp_path) -> None:
+    path = tmp_path / "anim.gif"
+    _save_animation(path)
+    decoder = AnimationDecoder()
+    opened: list = []
+    frames: list = []
+    decoder.animation_opened.connect(lambda *args: opened.append(args))
+    decoder.frame_decoded.connect(
+        lambda serial, index, image, duration: frames.append((serial, index, duration))
+    )
+
+    decoder.open(1, str(path), QImage(str(path)))
+
+    # 先頭は表示済みなので 2 枚目から、ループしながら待ち行列の分だけ送る
+    assert opened == [(1, 3, 50)]
+    assert [index for _, index, _ in frames] == [(1 + i) % 3 for i in range(ANIMATION_QUEUE_SIZE)]
+    assert frames[0][2] == 60
+
+    frames.clear()
+    decoder.request_frames(1, 2)
+    decoder.request_frames(0, 2)
+
+    assert [(serial, index) for serial, index, _ in frames] == [
+        (1, (1 + ANIMATION_QUEUE_SIZE) % 3),
+        (1, (2 + ANIMATION_QUEUE_SIZE) % 3),
+    ]
+
+
+@pytest.mark.parametrize("name", ["anim.png", "anim.gif"])
+def test_decoder_uses_loaded_first_frame_instead_of_decoding_it_again(
+    tmp_path, monkeypatch, name
+) -> None:
+    path = tmp_path / name
+    _save_animation(path)
+    reads: list[int] = []
+    open_source = animation.open_animation
+
+    def recording_open(file_path):
+        source = open_source(file_path)
+        read = source.read
+        monkeypatch.setattr(source, "read", lambda index: reads.append(index) or read(index))
+        return source
+
+    monkeypatch.setattr(animation, "open_animation", recording_open)
+    decoder = AnimationDecoder()
+    opened: list = []
+    decoder.animation_opened.connect(lambda *args: opened.append(args))
+    first = QImage(40, 20, QImage.Format.Format_RGB32)
+    first.fill(0x123456)
+
+    decoder.open(1, str(path), first)
+
+    assert opened == [(1, 3, 50)]
+    # 先頭フレームは ImageLoader が表示したものをそのままキャッシュしている
+    data, (shape, duration) = decoder._cache.get(0)
+    assert animation._unpack(data, shape).pixelColor(5, 5).getRgb()[:3] == (0x12, 0x34, 0x56)
+    if name == "anim.png":
+        # 好きなフレームから読める形式は先頭フレームをデコードしない
+        assert 0 not in reads
+    else:
+        # Qt のデコーダは順にしか読めないので、2 枚目のために 1 度だけ読む
+        assert reads.count(0) == 1
+
+
+def test_decoder_stops_when_cancelled_and_prescales_frames(tmp_path) -> None:
+    path = tmp_path / "anim.gif"
+    _save_animation(path, size=(400, 200))
+    decoder = AnimationDecoder()
+    frames: list = []
+
+    def on_frame(serial, index, image, duration) -> None:
+        frames.append((image.width(), image.height()))
+        # 1 枚目を受け取った時点で別の画像へ移った
+        decoder.cancel_older_than(2)
+
+    decoder.frame_decoded.connect(on_frame)
+    decoder.set_display_size(100, 50)
+    decoder.open(1, str(path), QImage(str(path)))
+    decoder.request_frames(1, 1)
+
+    assert frames == [(100, 50)]
+
+
+def test_decoder_seeks_and_serves_decoded_frames_from_cache(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "anim.gif"
+    _save_animation(path)
+    decoder = AnimationDecoder()
+    frames: list = []
+    decoder.frame_decoded.connect(
+        lambda serial, index, image, duration: frames.append(
+            (index, image.pixelColor(5, 5).getRgb()[:3], duration)
+        )
+    )
+    decoder.open(1, str(path), QImage(str(path)))
+    reads: list[int] = []
+    read = decoder._source.read
+    monkeypatch.setattr(decoder._source, "read", lambda index: reads.append(index) or read(index))
+    frames.clear()
+
+    # 一度デコードしたフレームへ戻るときはデコードし直さない
+    decoder.seek(1, 0)
+    decoder.request_frames(1, 2)
+
+    assert frames == [(0, (255, 0, 0), 50), (1, (0, 255, 0), 60)]
+    assert reads == []
+
+
+def test_decoder_applies_only_latest_seek_and_caches_skipped_frames(tmp_path) -> None:
+    path = tmp_path / "anim.gif"
+    _save_animation(path, durations=(50, 60, 70))
+    decoder = AnimationDecoder()
+    indices: list[int] = []
+    decoder.open(1, str(path), QImage(str(path)))
+    decoder.frame_decoded.connect(lambda serial, index, image, duration: indices.append(index))
+    decoder._cache.clear()
+
+    decoder.seek(1, 1)
+    decoder.seek(2, 2)
+    decoder.request_frames(1, 1)
+
+    assert indices == [2]
+    # 順にしか読めない形式なので、2 枚目まで読み進めた途中のフレームもキャッシュにある
+    assert 0 in decoder._cache and 1 in decoder._cache
+
+
+def test_decoder_drops_cached_frames_when_display_size_changes(tmp_path) -> None:
+    path = tmp_path / "anim.gif"
+    _save_animation(path, size=(400, 200))
+    decoder = AnimationDecoder()
+    sizes: list = []
+    decoder.frame_decoded.connect(
+        lambda serial, index, image, duration: sizes.append((image.width(), image.height()))
+    )
+    decoder.set_display_size(200, 100)
+    decoder.open(1, str(path), QImage(str(path)))
+
+    decoder.set_display_size(100, 50)
+    decoder.seek(1, 0)
+    decoder.request_frames(1, 1)
+
+    assert sizes[-1] == (100, 50)
+
+
+def test_open_animation_skips_still_images_after_reading_only_the_header(
+    tmp_path, monkeypatch
+) -> None:
+    Image.new("RGB", (4, 4)).save(tmp_path / "still.png")
+    Image.new("RGB", (4, 4)).save(tmp_path / "still.webp", lossless=True)
+    monkeypatch.setattr(animation.Path, "read_bytes", lambda self: pytest.fail("read whole file"))
+
+    assert open_animation(str(tmp_path / "still.png")) is None
+    assert open_animation(str(tmp_path / "still.webp")) is None
+
+
+def test_jpeg_xl_animation_decodes_one_frame_at_a_time(tmp_path, monkeypatch) -> None:
+    imagecodecs = pytest.importorskip("imagecodecs")
+    if not hasattr(imagecodecs, "jpegxl_encode"):
+        pytest.skip("imagecodecs に JPEG XL コーデックが無い")
+    frames = np.zeros((4, 8, 8, 3), np.uint8)
+    for index in range(4):
+        frames[index, :, :, 0] = 60 * index
+    path = tmp_path / "anim.jxl"
+    path.write_bytes(imagecodecs.jpegxl_encode(frames, lossless=True))
+    decode = imagecodecs.jpegxl_decode
+    decoded: list = []
+
+    def recording_decode(data, *args, index=None, **kwargs):
+        result = decode(data, *args, index=index, **kwargs)
+        decoded.append(result.shape)
+        return result
+
+    monkeypatch.setattr(imagecodecs, "jpegxl_decode", recording_decode)
+
+    source = open_animation(str(path))
+    image, _ = source.read(3)
+
+    assert source.frame_count == 4
+    assert image.pixelColor(2, 2).getRgb()[:3] == (180, 0, 0)
+    # フレーム数は見出しから数え、全フレームをまとめた配列も先頭フレームも作らない
+    assert decoded == [(8, 8, 3)]
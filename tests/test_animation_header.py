@@ -0,0 +1,29 @@
+import io
+
+from PIL import Image
+
+from hiyoko_viewer.core.animation_header import may_be_animated
+
+
+def _encode(frames: int, image_format: str, **options) -> io.BytesIO:
+    buffer = io.BytesIO()
+    images = [Image.new("RGB", (8, 8), (index * 80, 0, 0)) for index in range(frames)]
+    images[0].save(buffer, image_format, save_all=frames > 1, append_images=images[1:], **options)
+    buffer.seek(0)
+    return buffer
+
+
+def test_png_is_animated_only_with_animation_control_before_image_data() -> None:
+    still = _encode(1, "PNG", pnginfo=None)
+
+    assert may_be_animated(_encode(3, "PNG")) is True
+    assert may_be_animated(still) is False
+
+
+def test_webp_uses_extended_header_animation_flag() -> None:
+    assert may_be_animated(_encode(3, "WEBP", lossless=True)) is True
+    assert may_be_animated(_encode(1, "WEBP", lossless=True)) is False
+
+
+def test_unknown_formats_may_be_animated() -> None:
+    assert may_be_animated(io.BytesIO(b"GIF89a" + b"\x00" * 32)) is True
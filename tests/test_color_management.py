@@ -0,0 +1,80 @@
+import pytest
+from PyQt6.QtCore import QPointF
+from PyQt6.QtGui import QColor, QColorSpace, QImage
+
+from hiyoko_viewer.services.color_management import ColorManager, output_color_space
+
+SRGB = QColorSpace(QColorSpace.NamedColorSpace.SRgb)
+DISPLAY_P3 = QColorSpace(QColorSpace.NamedColorSpace.DisplayP3)
+
+
+def _image(color: QColor, color_space: QColorSpace | None = None) -> QImage:
+    image = QImage(4, 4, QImage.Format.Format_RGB32)
+    image.fill(color)
+    if color_space is not None:
+        image.setColorSpace(color_space)
+    return image
+
+
+def test_convert_maps_embedded_profile_to_output_profile() -> None:
+    manager = ColorManager()
+
+    # Display P3 の緑 (0, 200, 0) は sRGB では (0, 204, 0)
+    image = manager.convert(_image(QColor(0, 200, 0), DISPLAY_P3))
+
+    assert image.pixelColor(0, 0).getRgb() == (0, 204, 0, 255)
+    assert image.colorSpace() == SRGB
+
+
+def test_convert_treats_untagged_images_as_srgb() -> None:
+    manager = ColorManager()
+    untagged = manager.convert(_image(QColor(10, 20, 30)))
+    assert untagged.pixelColor(0, 0).getRgb() == (10, 20, 30, 255)
+
+    assert manager.set_output_profile(bytes(DISPLAY_P3.iccProfile()))
+    converted = manager.convert(_image(QColor(0, 204, 0)))
+
+    assert converted.colorSpace() == DISPLAY_P3
+    assert converted.pixelColor(0, 0).green() < 204
+
+
+@pytest.mark.parametrize(
+    "image_format", [QImage.Format.Format_Grayscale8, QImage.Format.Format_Grayscale16]
+)
+def test_convert_maps_gray_profile_to_rgb_output(image_format) -> None:
+    # 埋め込みプロファイル（ガンマ 1.8 のグレー）経由で作る
+    gray = QColorSpace.fromIccProfile(
+        QColorSpace(QPointF(0.3127, 0.3290), QColorSpace.TransferFunction.Gamma, 1.8).iccProfile()
+    )
+    assert gray.colorModel() == QColorSpace.ColorModel.Gray
+    image = QImage(4, 4, image_format)
+    image.fill(QColor(128, 128, 128))
+    image.setColorSpace(gray)
+
+    converted = ColorManager().convert(image)
+
+    # グレーのままではなく、出力プロファイルの RGB の画素になる
+    assert converted.format() == QImage.Format.Format_RGB32
+    assert converted.colorSpace() == SRGB
+    red, green, blue, _ = converted.pixelColor(0, 0).getRgb()
+    assert red == green == blue
+    assert red == pytest.approx(146, abs=1)
+
+
+def test_convert_reuses_transform_per_profile_pair() -> None:
+    manager = ColorManager()
+
+    manager.convert(_image(QColor(0, 200, 0), DISPLAY_P3))
+    manager.convert(_image(QColor(200, 0, 0), DISPLAY_P3))
+    manager.convert(_image(QColor(0, 0, 200), SRGB))
+
+    # sRGB → sRGB は変換しない
+    assert len(manager._transforms) == 1
+
+
+def test_set_output_profile_rejects_invalid_profile() -> None:
+    manager = ColorManager()
+
+    assert manager.set_output_profile(b"not a profile") is False
+    assert output_color_space(b"") == SRGB
+    assert output_color_space(b"not a profile") is None
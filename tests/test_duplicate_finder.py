@@ -0,0 +1,72 @@
+from PyQt6.QtGui import QColor, QImage, QPainter
+
+from hiyoko_viewer.core.hash_cache import HashCache
+from hiyoko_viewer.services import duplicate_finder
+from hiyoko_viewer.services.duplicate_finder import DuplicateFinder, compute_hashes
+
+
+def _write_pattern(path, size: int = 64, variant: int = 0) -> None:
+    image = QImage(size, size, QImage.Format.Format_RGB32)
+    image.fill(QColor(255, 255, 255))
+    painter = QPainter(image)
+    if variant == 0:
+        painter.fillRect(0, 0, size // 2, size, QColor(0, 0, 0))
+    else:
+        painter.fillRect(0, 0, size, size // 3, QColor(0, 0, 0))
+        painter.fillRect(0, size * 2 // 3, size, size // 3, QColor(90, 90, 90))
+    painter.end()
+    assert image.save(str(path))
+
+
+def test_compute_hashes_matches_resized_copy_and_rejects_non_images(tmp_path) -> None:
+    _write_pattern(tmp_path / "a.png")
+    _write_pattern(tmp_path / "a_large.png", size=256)
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+
+    assert compute_hashes(str(tmp_path / "a.png")) == compute_hashes(str(tmp_path / "a_large.png"))
+    assert compute_hashes(str(tmp_path / "broken.png")) is None
+
+
+def test_hash_cache_round_trips_unsigned_hashes(tmp_path) -> None:
+    cache = HashCache(str(tmp_path / "cache" / "hashes.sqlite3"))
+    cache.store("dir", [("a.png", 1.5, 10, (1 << 64) - 1, 1 << 63)])
+
+    assert cache.load_directory("dir") == {"a.png": (1.5, 10, (1 << 64) - 1, 1 << 63)}
+    assert cache.load_directory("other") == {}
+    cache.close()
+
+
+def test_find_duplicates_groups_similar_images_and_reuses_cache(tmp_path, monkeypatch) -> None:
+    _write_pattern(tmp_path / "a.png")
+    _write_pattern(tmp_path / "a_copy.jpg", size=128)
+    _write_pattern(tmp_path / "b.png", variant=1)
+    cache_path = str(tmp_path / "cache.sqlite3")
+    names = ["a.png", "b.png", "a_copy.jpg"]
+    emitted: list[tuple] = []
+    progress: list[tuple] = []
+    finder = DuplicateFinder(cache_path)
+    finder.duplicates_ready.connect(lambda *args: emitted.append(args))
+    finder.hash_progress.connect(lambda *args: progress.append(args))
+
+    finder.find_duplicates(1, str(tmp_path), names)
+
+    assert emitted == [(1, [[0, 2]])]
+    assert progress == [(1, 3, 3)]
+
+    # 2 回目は変更の無いファイルのハッシュを計算し直さない
+    monkeypatch.setattr(duplicate_finder, "compute_hashes", lambda path: None)
+    finder.find_duplicates(2, str(tmp_path), names)
+
+    assert emitted[-1] == (2, [[0, 2]])
+
+
+def test_find_duplicates_stops_when_a_newer_generation_is_requested(tmp_path) -> None:
+    _write_pattern(tmp_path / "a.png")
+    emitted: list[tuple] = []
+    finder = DuplicateFinder()
+    finder.duplicates_ready.connect(lambda *args: emitted.append(args))
+    finder.cancel_older_than(5)
+
+    finder.find_duplicates(3, str(tmp_path), ["a.png"])
+
+    assert emitted == []
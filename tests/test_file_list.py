@@ -0,0 +1,192 @@
+import os
+import random
+
+import pytest
+
+from hiyoko_viewer.core.file_list import ImageFileList
+
+
+def test_image_file_list_orders_names_by_key_and_joins_directory() -> None:
+    files = ImageFileList("dir", ["b.png", "c.png", "a.png"], key=str)
+
+    assert len(files) == 3
+    assert list(files) == [os.path.join("dir", name) for name in ("a.png", "b.png", "c.png")]
+    assert files[-1] == os.path.join("dir", "c.png")
+    # 名前テーブルは並べ替えないので、ID は worker が返した順のまま
+    assert files.position_of_id(0) == 1
+    assert files.id_at(0) == 2
+
+
+def test_image_file_list_remove_at_skips_tombstones() -> None:
+    files = ImageFileList("", ["a", "b", "c", "d"])
+
+    assert files.remove_at(1) == "b"
+    assert files.remove_at(2) == "d"
+
+    assert list(files) == ["a", "c"]
+    assert files[1] == "c"
+    assert files.index("c") == 1
+    assert "b" not in files
+    with pytest.raises(ValueError):
+        files.index("b")
+    with pytest.raises(IndexError):
+        files[2]
+
+
+def test_image_file_list_shuffle_keeps_removals_and_unshuffle_restores_order() -> None:
+    files = ImageFileList("", [f"{i:03}" for i in range(100)])
+    files.remove_at(10)
+
+    files.shuffle(random.Random(0))
+    assert files.is_shuffled
+    assert sorted(files) == [f"{i:03}" for i in range(100) if i != 10]
+
+    removed = files.remove_at(0)
+    files.unshuffle()
+
+    assert not files.is_shuffled
+    assert len(files) == 98
+    assert removed not in files
+    assert list(files) == [f"{i:03}" for i in range(100) if i != 10 and f"{i:03}" != removed]
+
+
+def test_image_file_list_positions_match_linear_scan_after_many_removals() -> None:
+    names = [f"{i:04}.png" for i in range(1000)]
+    files = ImageFileList("root", names)
+    expected = [os.path.join("root", name) for name in names]
+    rng = random.Random(1)
+
+    for _ in range(300):
+        position = rng.randrange(len(files))
+        assert files.remove_at(position) == expected.pop(position)
+
+    assert list(files) == expected
+    assert [files[i] for i in range(len(files))] == expected
+    for i in range(0, len(expected), 37):
+        assert files.index(expected[i]) == i
+
+
+def test_empty_image_file_list_is_falsy() -> None:
+    files = ImageFileList.empty()
+
+    assert not files
+    assert list(files) == []
+
+
+def test_id_of_name_finds_hidden_names_but_not_removed_ones() -> None:
+    files = ImageFileList("dir", ["a", os.path.join("sub", "b"), "c"])
+    files.set_hidden(b"\x00\x00\x01")
+    files.remove_at(0)
+
+    assert files.id_of_name(os.path.join("sub", "b")) == 1
+    assert files.id_of_name("c") == 2
+    assert files.id_of_name("a") is None
+    assert files.id_of_name("missing") is None
+
+
+def test_image_file_list_extend_appends_to_every_order_and_set_order_resorts() -> None:
+    files = ImageFileList("", [f"{i:03}" for i in range(50)])
+    files.remove_at(0)
+    files.shuffle(random.Random(2))
+
+    files.extend(f"{i:03}" for i in range(50, 130))
+
+    assert len(files) == 129
+    assert files[-1] == "129"
+    assert sorted(files) == [f"{i:03}" for i in range(1, 130)]
+    assert files.index("077") == files.position_of_id(77)
+
+    files.unshuffle()
+    files.set_order(reversed(range(130)))
+
+    assert files[0] == "129"
+    assert files[-1] == "001"
+    assert "000" not in files
+
+
+def test_set_hidden_filters_every_order_and_keeps_removed_items_gone() -> None:
+    files = ImageFileList("", [f"{i:02}" for i in range(10)])
+    files.remove_at(0)
+    hidden = bytes(1 if i % 2 else 0 for i in range(10))
+
+    files.set_hidden(hidden)
+
+    assert list(files) == ["02", "04", "06", "08"]
+    assert (len(files), files.total, files.is_filtered) == (4, 9, True)
+    assert "03" not in files
+    with pytest.raises(ValueError):
+        files.position_of_id(3)
+    # 隠れた項目からは、その次に表示されている項目へ移れる（末尾なら先頭へ）
+    assert files.position_at_or_after_id(3) == files.index("04")
+    assert files.position_at_or_after_id(9) == 0
+
+    files.shuffle(random.Random(3))
+    assert sorted(files) == ["02", "04", "06", "08"]
+    files.unshuffle()
+    files.set_order(reversed(range(10)))
+    assert list(files) == ["08", "06", "04", "02"]
+
+    files.set_hidden(None)
+    assert list(files) == [f"{i:02}" for i in reversed(range(1, 10))]
+    assert not files.is_filtered
+
+
+def test_set_order_rebuilds_counts_when_most_items_are_hidden() -> None:
+    files = ImageFileList("", [f"{i:03}" for i in range(200)])
+    files.set_hidden(bytes(0 if i % 50 == 0 else 1 for i in range(200)))
+
+    files.set_order(range(200))
+
+    assert list(files) == ["000", "050", "100", "150"]
+    assert [files.position_of_id(i) for i in (0, 50, 100, 150)] == [0, 1, 2, 3]
+    assert files.position_at_or_after_id(51) == 2
+
+
+def test_set_hidden_rejects_wrong_length() -> None:
+    files = ImageFileList("", ["a", "b"])
+
+    with pytest.raises(ValueError):
+        files.set_hidden(b"\x00")
+
+
+def test_restore_id_puts_removed_item_back_in_every_order() -> None:
+    files = ImageFileList("", [f"{i:02}" for i in range(10)])
+    files.shuffle(random.Random(0))
+    shuffled = list(files)
+    position = shuffled.index("05")
+    files.remove_at(position)
+
+    files.restore_id(5)
+    files.restore_id(5)
+
+    assert list(files) == shuffled
+    assert files.position_of_id(5) == position
+    files.unshuffle()
+    assert list(files) == [f"{i:02}" for i in range(10)]
+
+
+def test_remove_id_removes_hidden_item_without_shifting_positions() -> None:
+    files = ImageFileList("", ["a", "b", "c", "d"])
+    files.set_hidden(b"\x00\x01\x00\x00")
+
+    assert files.remove_id(1) == "b"
+    assert files.remove_id(2) == "c"
+    assert list(files) == ["a", "d"]
+    assert files.position_of_id(3) == 1
+    with pytest.raises(ValueError):
+        files.remove_id(2)
+
+    files.set_hidden(None)
+    assert list(files) == ["a", "d"]
+
+
+def test_restore_id_keeps_hidden_item_hidden() -> None:
+    files = ImageFileList("", ["a", "b", "c"])
+    files.remove_at(0)
+    files.set_hidden(b"\x01\x00\x00")
+
+    files.restore_id(0)
+    assert list(files) == ["b", "c"]
+
+    files.set_hidden(None)
+    assert list(files) == ["a", "b", "c"]
@@ -0,0 +1,159 @@
+import errno
+import os
+import shutil
+
+import pytest
+
+from hiyoko_viewer.services import file_ops
+from hiyoko_viewer.services.file_ops import FileOperationQueue, move_file
+
+
+def _collect(queue: FileOperationQueue) -> list[tuple]:
+    results: list[tuple] = []
+    queue.operation_finished.connect(lambda op_id: results.append(("finished", op_id)))
+    queue.operation_failed.connect(lambda op_id, message: results.append(("failed", op_id)))
+    return results
+
+
+def test_move_file_renames_within_same_filesystem(tmp_path) -> None:
+    source = tmp_path / "a.png"
+    source.write_bytes(b"data")
+
+    move_file(str(source), str(tmp_path / "b.png"))
+
+    assert not source.exists()
+    assert (tmp_path / "b.png").read_bytes() == b"data"
+
+
+def _cross_device_from(monkeypatch, source) -> None:
+    """``source`` からの名前の付け替えだけを別ドライブ扱いにする（一時ファイルからは通す）"""
+    real_rename, real_link = os.rename, os.link
+
+    def rename(src, dst):
+        if src == str(source):
+            raise OSError(errno.EXDEV, "cross-device link")
+        real_rename(src, dst)
+
+    def link(src, dst, **kwargs):
+        if src == str(source):
+            raise OSError(errno.EXDEV, "cross-device link")
+        real_link(src, dst, **kwargs)
+
+    monkeypatch.setattr(file_ops.os, "rename", rename)
+    monkeypatch.setattr(file_ops.os, "link", link)
+
+
+def test_move_file_copies_across_filesystems_with_progress(tmp_path, monkeypatch) -> None:
+    source = tmp_path / "a.png"
+    source.write_bytes(b"x" * 10)
+    os.utime(source, (1_000_000, 1_000_000))
+    _cross_device_from(monkeypatch, source)
+    monkeypatch.setattr(file_ops, "MOVE_CHUNK_SIZE", 4)
+    progress: list[tuple[int, int]] = []
+
+    move_file(str(source), str(tmp_path / "b.png"), lambda *args: progress.append(args))
+
+    assert not source.exists()
+    assert (tmp_path / "b.png").read_bytes() == b"x" * 10
+    assert os.path.getmtime(tmp_path / "b.png") == 1_000_000
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["b.png"]
+    assert progress[-1] == (10, 10)
+
+
+def test_move_file_copy_does_not_overwrite_file_created_during_copy(tmp_path, monkeypatch) -> None:
+    source = tmp_path / "a.png"
+    source.write_bytes(b"new")
+    (tmp_path / "b.png.part").write_bytes(b"stale")
+    _cross_device_from(monkeypatch, source)
+    real_copystat = shutil.copystat
+
+    def copystat(src, dst):
+        # コピーし終えて名前を付けるまでの間に、別のプロセスが同名のファイルを置いた
+        (tmp_path / "b.png").write_bytes(b"old")
+        real_copystat(src, dst)
+
+    monkeypatch.setattr(file_ops.shutil, "copystat", copystat)
+
+    with pytest.raises(FileExistsError):
+        move_file(str(source), str(tmp_path / "b.png"))
+
+    assert source.read_bytes() == b"new"
+    assert (tmp_path / "b.png").read_bytes() == b"old"
+    assert (tmp_path / "b.png.part").read_bytes() == b"stale"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.png", "b.png", "b.png.part"]
+
+
+def test_move_file_refuses_to_overwrite(tmp_path) -> None:
+    (tmp_path / "a.png").write_bytes(b"new")
+    (tmp_path / "b.png").write_bytes(b"old")
+
+    with pytest.raises(FileExistsError):
+        move_file(str(tmp_path / "a.png"), str(tmp_path / "b.png"))
+
+    assert (tmp_path / "a.png").read_bytes() == b"new"
+    assert (tmp_path / "b.png").read_bytes() == b"old"
+
+
+def test_move_file_without_hard_links_still_refuses_to_overwrite(tmp_path, monkeypatch) -> None:
+    def no_links(*args, **kwargs):
+        raise OSError(errno.EPERM, "operation not permitted")
+
+    (tmp_path / "a.png").write_bytes(b"new")
+    (tmp_path / "b.png").write_bytes(b"old")
+    monkeypatch.setattr(file_ops.os, "link", no_links)
+
+    with pytest.raises(FileExistsError):
+        move_file(str(tmp_path / "a.png"), str(tmp_path / "b.png"))
+    move_file(str(tmp_path / "a.png"), str(tmp_path / "c.png"))
+
+    assert (tmp_path / "b.png").read_bytes() == b"old"
+    assert (tmp_path / "c.png").read_bytes() == b"new"
+
+
+def test_move_creates_destination_folder_and_reports_failure(tmp_path) -> None:
+    (tmp_path / "a.png").write_bytes(b"data")
+    queue = FileOperationQueue()
+    results = _collect(queue)
+
+    queue.move(1, str(tmp_path / "a.png"), str(tmp_path / "_ok" / "a.png"))
+    queue.move(2, str(tmp_path / "missing.png"), str(tmp_path / "_ok" / "missing.png"))
+
+    assert (tmp_path / "_ok" / "a.png").exists()
+    assert results == [("finished", 1), ("failed", 2)]
+
+
+def test_trash_batches_paths_into_one_call(tmp_path, monkeypatch) -> None:
+    calls: list[object] = []
+    monkeypatch.setattr(file_ops, "send2trash", calls.append)
+    queue = FileOperationQueue()
+    results = _collect(queue)
+
+    queue.trash(1, str(tmp_path / "a.png"))
+    queue.trash(2, str(tmp_path / "b.png"))
+    assert calls == []
+
+    queue.flush()
+
+    assert calls == [[str(tmp_path / "a.png"), str(tmp_path / "b.png")]]
+    assert results == [("finished", 1), ("finished", 2)]
+
+
+def test_trash_retries_one_by_one_when_batch_fails(tmp_path, monkeypatch) -> None:
+    def fake_send2trash(paths) -> None:
+        if isinstance(paths, list):
+            # 1 件目だけ送れた状態で失敗する
+            os.remove(paths[0])
+            raise OSError("batch failed")
+        raise OSError("locked")
+
+    (tmp_path / "a.png").write_bytes(b"a")
+    (tmp_path / "b.png").write_bytes(b"b")
+    monkeypatch.setattr(file_ops, "send2trash", fake_send2trash)
+    queue = FileOperationQueue()
+    results = _collect(queue)
+
+    queue.trash(1, str(tmp_path / "a.png"))
+    queue.trash(2, str(tmp_path / "b.png"))
+    queue.flush()
+
+    assert results == [("finished", 1), ("failed", 2)]
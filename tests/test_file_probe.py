@@ -0,0 +1,108 @@
+import os
+from datetime import datetime
+
+from PIL import Image
+
+from hiyoko_viewer.core.file_stats import DimensionFilter
+from hiyoko_viewer.services import file_probe
+from hiyoko_viewer.services.file_probe import FileProbe, read_header
+
+
+def _write_jpeg(path, size: tuple[int, int], captured: str | None = None) -> None:
+    image = Image.new("RGB", size, "red")
+    exif = Image.Exif()
+    if captured is not None:
+        exif.get_ifd(0x8769)[0x9003] = captured
+    image.save(path, "JPEG", exif=exif.tobytes())
+
+
+def test_read_header_reads_size_and_capture_time(tmp_path) -> None:
+    _write_jpeg(tmp_path / "a.jpg", (7, 3), "2020:01:02 03:04:05")
+
+    assert read_header(str(tmp_path / "a.jpg")) == (
+        7,
+        3,
+        datetime(2020, 1, 2, 3, 4, 5).timestamp(),
+    )
+
+
+def test_read_header_returns_unknown_for_unreadable_file(tmp_path) -> None:
+    (tmp_path / "broken.png").write_bytes(b"not an image")
+
+    width, height, captured = read_header(str(tmp_path / "broken.png"))
+
+    assert (width, height) == (-1, -1)
+    assert captured != captured  # NaN
+
+
+def test_compute_sort_order_reads_headers_once_and_reuses_stats(tmp_path, monkeypatch) -> None:
+    _write_jpeg(tmp_path / "a.jpg", (10, 10))
+    _write_jpeg(tmp_path / "b.jpg", (2, 2))
+    emitted: list[tuple] = []
+    probe = FileProbe()
+    probe.sort_order_ready.connect(lambda *args: emitted.append(args))
+    probe.load_listing(1, str(tmp_path), ["a.jpg", "b.jpg"])
+
+    probe.compute_sort_order(1, "pixels")
+    # 2 回目はヘッダを読み直さない
+    monkeypatch.setattr(
+        "hiyoko_viewer.services.file_probe.read_header",
+        lambda path: (_ for _ in ()).throw(AssertionError(path)),
+    )
+    probe.compute_sort_order(1, "pixels")
+    probe.compute_sort_order(1, "name")
+
+    assert emitted == [(1, "pixels", [1, 0]), (1, "pixels", [1, 0]), (1, "name", [0, 1])]
+
+
+def test_compute_sort_order_ignores_other_or_cancelled_generation(tmp_path) -> None:
+    emitted: list[tuple] = []
+    probe = FileProbe()
+    probe.sort_order_ready.connect(lambda *args: emitted.append(args))
+    probe.load_listing(1, str(tmp_path), [])
+
+    probe.compute_sort_order(2, "mtime")
+    probe.cancel_older_than(3)
+    probe.compute_sort_order(1, "mtime")
+
+    assert emitted == []
+
+
+def test_read_header_swaps_size_for_rotated_exif_orientation(tmp_path) -> None:
+    image = Image.new("RGB", (8, 2), "blue")
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    image.save(tmp_path / "rotated.jpg", "JPEG", exif=exif.tobytes())
+
+    width, height, _ = read_header(str(tmp_path / "rotated.jpg"))
+
+    assert (width, height) == (2, 8)
+
+
+def test_compute_filter_emits_hidden_flags_and_caches_headers_by_mtime(
+    tmp_path, monkeypatch
+) -> None:
+    _write_jpeg(tmp_path / "tall.jpg", (2, 6))
+    _write_jpeg(tmp_path / "wide.jpg", (6, 2))
+    emitted: list[tuple] = []
+    read: list[str] = []
+    original_read_header = file_probe.read_header
+
+    def counting_read_header(path: str):
+        read.append(os.path.basename(path))
+        return original_read_header(path)
+
+    monkeypatch.setattr(file_probe, "read_header", counting_read_header)
+    probe = FileProbe()
+    probe.filter_ready.connect(lambda *args: emitted.append(args))
+    portrait = DimensionFilter(aspect="portrait")
+
+    probe.load_listing(1, str(tmp_path), ["tall.jpg", "wide.jpg"])
+    probe.compute_filter(1, portrait)
+    # 同じフォルダを開き直しても、更新されていないファイルのヘッダは読み直さない
+    os.utime(tmp_path / "wide.jpg", (1_000_000, 1_000_000))
+    probe.load_listing(2, str(tmp_path), ["wide.jpg", "tall.jpg"])
+    probe.compute_filter(2, portrait)
+
+    assert emitted == [(1, portrait, b"\x00\x01"), (2, portrait, b"\x01\x00")]
+    assert sorted(read) == ["tall.jpg", "wide.jpg", "wide.jpg"]
@@ -0,0 +1,90 @@
+import math
+import os
+from datetime import datetime
+
+from hiyoko_viewer.core.file_stats import (
+    DimensionFilter,
+    FileStats,
+    hidden_flags,
+    needs_headers,
+    parse_exif_datetime,
+    sort_order,
+    stat_files,
+)
+
+
+def _stats(**columns) -> FileStats:
+    count = len(next(iter(columns.values())))
+    stats = FileStats(count)
+    for name, values in columns.items():
+        column = getattr(stats, name)
+        for name_id, value in enumerate(values):
+            column[name_id] = value
+    return stats
+
+
+def test_stat_files_collects_mtime_and_size_and_skips_missing(tmp_path) -> None:
+    (tmp_path / "a.png").write_bytes(b"12345")
+    os.utime(tmp_path / "a.png", (1_000_000, 1_000_000))
+
+    stats = stat_files(str(tmp_path), ["a.png", "missing.png"])
+
+    assert len(stats) == 2
+    assert (stats.mtime[0], stats.size[0]) == (1_000_000, 5)
+    assert math.isnan(stats.mtime[1])
+    assert stats.has_headers is False
+
+
+def test_parse_exif_datetime_accepts_text_and_bytes() -> None:
+    expected = datetime(2024, 5, 6, 7, 8, 9).timestamp()
+
+    assert parse_exif_datetime("2024:05:06 07:08:09") == expected
+    assert parse_exif_datetime(b"2024:05:06 07:08:09\x00") == expected
+    assert math.isnan(parse_exif_datetime("    :  :     :  :  "))
+    assert math.isnan(parse_exif_datetime(None))
+
+
+def test_sort_order_by_value_keeps_name_order_for_ties_and_puts_unknown_last() -> None:
+    names = ["d.png", "c.png", "b.png", "a.png"]
+    stats = _stats(mtime=[30.0, math.nan, 10.0, 10.0], size=[1, 1, 2, 0])
+
+    assert sort_order(names, stats, "mtime") == [3, 2, 0, 1]
+    assert sort_order(names, stats, "size") == [3, 1, 0, 2]
+    assert sort_order(names, None, "name") == [3, 2, 1, 0]
+
+
+def test_sort_order_by_pixels_and_captured_time() -> None:
+    names = ["a.png", "b.png", "c.png"]
+    stats = _stats(
+        width=[10, 5, -1],
+        height=[10, 5, -1],
+        mtime=[5.0, 1.0, 3.0],
+        captured=[math.nan, 4.0, math.nan],
+    )
+
+    assert sort_order(names, stats, "pixels") == [1, 0, 2]
+    # 撮影日時の無い画像は更新日時で代用する
+    assert sort_order(names, stats, "captured") == [2, 1, 0]
+    assert needs_headers("pixels") and needs_headers("captured")
+    assert not needs_headers("mtime")
+
+
+def test_dimension_filter_checks_minimum_size_and_aspect() -> None:
+    assert not DimensionFilter().is_active
+    assert DimensionFilter(aspect="square").is_active
+
+    small = DimensionFilter(min_width=100, min_height=50)
+    assert small.accepts(100, 50)
+    assert not small.accepts(99, 500)
+    # サイズ不明（読めなかった画像）は隠さない
+    assert small.accepts(-1, -1)
+    assert DimensionFilter(aspect="portrait").accepts(10, 20)
+    assert not DimensionFilter(aspect="portrait").accepts(20, 20)
+    assert DimensionFilter(aspect="landscape").accepts(30, 20)
+    assert DimensionFilter(aspect="square").accepts(20, 20)
+
+
+def test_hidden_flags_marks_rejected_name_ids() -> None:
+    stats = _stats(width=[10, 40, -1], height=[30, 20, -1])
+
+    assert hidden_flags(stats, DimensionFilter(aspect="portrait")) == b"\x00\x01\x00"
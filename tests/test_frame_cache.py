@@ -0,0 +1,49 @@
+from hiyoko_viewer.core.frame_cache import FrameCache
+
+
+def test_frame_cache_returns_stored_frames_by_index() -> None:
+    cache = FrameCache(1000)
+
+    cache.put(3, b"abc", ("meta", 3))
+
+    assert cache.get(3) == (b"abc", ("meta", 3))
+    assert cache.get(4) is None
+    assert 3 in cache and len(cache) == 1
+
+
+def test_frame_cache_compresses_frames_beyond_half_the_budget() -> None:
+    cache = FrameCache(1000)
+    frame = bytes(400)
+
+    cache.put(0, frame, None)
+    cache.put(1, frame, None)
+
+    # 2 枚目は予算の半分を超えるので圧縮して持つ（取り出すと元に戻る）
+    assert cache.nbytes < 2 * len(frame)
+    assert cache.get(1) == (frame, None)
+
+
+def test_frame_cache_evicts_least_recently_used_over_budget() -> None:
+    cache = FrameCache(250)
+    frames = [bytes([i]) * 100 + bytes(range(100)) for i in range(3)]
+
+    cache.put(0, frames[0], None)
+    cache.put(1, frames[1], None)
+    cache.get(0)
+    cache.put(2, frames[2], None)
+
+    assert cache.nbytes <= 250
+    assert 1 not in cache
+    assert cache.get(0) == (frames[0], None)
+
+
+def test_frame_cache_replaces_and_clears_entries() -> None:
+    cache = FrameCache(1000)
+
+    cache.put(0, b"old", None)
+    cache.put(0, b"new!", None)
+    assert cache.get(0) == (b"new!", None)
+    assert cache.nbytes == 4
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
@@ -0,0 +1,21 @@
+from hiyoko_viewer.core.frame_pacing import frame_delay, frames_to_drop
+
+
+def test_frame_delay_uses_default_for_missing_or_too_short_duration() -> None:
+    assert frame_delay(None, 100) == 100
+    assert frame_delay(0, 100) == 100
+    assert frame_delay(10, 100) == 100
+    assert frame_delay(20, 100) == 20
+    assert frame_delay(33.4, 100) == 33
+
+
+def test_frames_to_drop_skips_frames_whose_whole_period_has_passed() -> None:
+    assert frames_to_drop(0, [40, 40, 40]) == 0
+    assert frames_to_drop(39, [40, 40, 40]) == 0
+    assert frames_to_drop(85, [40, 40, 40]) == 2
+
+
+def test_frames_to_drop_always_keeps_last_queued_frame() -> None:
+    assert frames_to_drop(1000, [40, 40]) == 1
+    assert frames_to_drop(1000, [40]) == 0
+    assert frames_to_drop(1000, []) == 0
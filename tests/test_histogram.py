@@ -0,0 +1,43 @@
+import numpy as np
+
+from hiyoko_viewer.core.histogram import HISTOGRAM_BINS, compute_histogram
+
+
+def test_compute_histogram_counts_channels_and_luma() -> None:
+    rgb = np.array([[[255, 0, 0], [0, 255, 0]], [[0, 0, 255], [128, 128, 128]]], dtype=np.uint8)
+
+    histogram = compute_histogram(rgb)
+
+    assert histogram.pixel_count == 4
+    for bins in histogram[:4]:
+        assert bins.shape == (HISTOGRAM_BINS,) and bins.sum() == 4
+    assert histogram.red[255] == 1 and histogram.red[0] == 2 and histogram.red[128] == 1
+    # BT.709: 緑が最も明るく、青が最も暗い
+    assert histogram.luma[54] == 1 and histogram.luma[182] == 1 and histogram.luma[19] == 1
+    assert histogram.luma[128] == 1
+
+
+def test_compute_histogram_reports_clipping_fractions() -> None:
+    rgb = np.zeros((1, 4, 3), dtype=np.uint8)
+    rgb[0, 0] = (255, 200, 10)  # 1 チャンネルでも飽和すれば白飛び
+    rgb[0, 1] = (0, 0, 0)  # 全チャンネル 0 は黒つぶれ
+    rgb[0, 2] = (0, 0, 90)  # 純色の暗部は黒つぶれと数えない
+    rgb[0, 3] = (100, 100, 100)
+
+    histogram = compute_histogram(rgb)
+
+    assert histogram.highlight_clipped == 0.25
+    assert histogram.shadow_clipped == 0.25
+
+
+def test_compute_histogram_skips_fully_transparent_pixels() -> None:
+    rgb = np.zeros((2, 2, 3), dtype=np.uint8)
+    alpha = np.array([[0, 0], [0, 255]], dtype=np.uint8)
+
+    histogram = compute_histogram(rgb, alpha)
+    assert histogram.pixel_count == 1
+    assert histogram.red[0] == 1
+    assert histogram.shadow_clipped == 1.0
+
+    empty = compute_histogram(rgb, np.zeros((2, 2), dtype=np.uint8))
+    assert empty.pixel_count == 0 and empty.highlight_clipped == 0.0
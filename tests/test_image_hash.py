@@ -0,0 +1,68 @@
+import random
+
+import numpy as np
+
+from hiyoko_viewer.core.image_hash import (
+    DHASH_SIZE,
+    PHASH_SIZE,
+    dhash,
+    group_similar,
+    hamming_distance,
+    phash,
+)
+
+
+def _gradient(size: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size]
+    return (x * 3 + y * 5 + rng.integers(0, 40, (size, size))) % 256
+
+
+def test_phash_is_stable_for_small_changes_and_differs_for_other_images() -> None:
+    image = _gradient(PHASH_SIZE)
+    brighter = np.clip(image + 10, 0, 255)
+
+    assert phash(image) == phash(image.copy())
+    assert hamming_distance(phash(image), phash(brighter)) <= 4
+    assert hamming_distance(phash(image), phash(_gradient(PHASH_SIZE, seed=1).T)) > 10
+
+
+def test_dhash_compares_horizontal_neighbours() -> None:
+    width, height = DHASH_SIZE
+    increasing = np.tile(np.arange(width), (height, 1))
+
+    assert dhash(increasing) == (1 << 64) - 1
+    assert dhash(increasing[:, ::-1]) == 0
+
+
+def test_group_similar_links_near_hashes_and_skips_missing() -> None:
+    base = 0x0123_4567_89AB_CDEF
+    hashes = [
+        (base, 0),
+        (base ^ 0b111, 1),  # pHash 3 ビット差
+        None,
+        (~base & ((1 << 64) - 1), 0),  # まったく別物
+        (base ^ 0b1, 0xFFFF),  # pHash は近いが dHash が遠い
+        (base, 0),  # 完全一致
+    ]
+
+    assert group_similar(hashes, max_distance=6, max_dhash_distance=4) == [[0, 1, 5]]
+
+
+def test_group_similar_finds_every_pair_within_distance() -> None:
+    rng = random.Random(0)
+    hashes: list[tuple[int, int] | None] = []
+    for _ in range(300):
+        value = rng.getrandbits(64)
+        hashes.append((value, 0))
+        for _ in range(rng.randrange(7)):
+            value ^= 1 << rng.randrange(64)
+        hashes.append((value, 0))
+
+    groups = group_similar(hashes, max_distance=6, max_dhash_distance=64)
+
+    group_of = {name_id: index for index, group in enumerate(groups) for name_id in group}
+    for a in range(len(hashes)):
+        for b in range(a + 1, len(hashes)):
+            if hamming_distance(hashes[a][0], hashes[b][0]) <= 6:
+                assert group_of[a] == group_of[b]
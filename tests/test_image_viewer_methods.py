@@ -1,16 +1,24 @@
 import os
+from collections import OrderedDict, deque
 from types import SimpleNamespace
 
 import pytest
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QMovie
 
 from hiyoko_viewer.config import constants
-from hiyoko_viewer.config.constants import OK_FOLDER
+from hiyoko_viewer.config.constants import OK_FOLDER, QUARANTINE_FOLDER
+from hiyoko_viewer.core import file_list
+from hiyoko_viewer.core.file_list import ImageFileList
+from hiyoko_viewer.core.file_stats import DimensionFilter
+from hiyoko_viewer.core.name_index import NameIndex
+from hiyoko_viewer.services.file_ops import FILE_OP_MOVE, FileOperation
+from hiyoko_viewer.services.sibling_prefetcher import FolderListing
 from hiyoko_viewer.ui import main_window
 from hiyoko_viewer.ui.main_window import ImageViewer
+from hiyoko_viewer.ui.mixins import animation as animation_mixin
+from hiyoko_viewer.ui.mixins import compare, integrity, navigation, rendering
+from hiyoko_viewer.ui.mixins import histogram as histogram_mixin
 from hiyoko_viewer.ui.mixins import input as input_events
-from hiyoko_viewer.ui.mixins import navigation, rendering
 
 
 class _ScrollBar:
@@ -90,12 +98,17 @@ class _KeyEvent:
         key: Qt.Key,
         modifiers: Qt.KeyboardModifier = Qt.KeyboardModifier.NoModifier,
         auto_repeat: bool = False,
+        text: str = "",
     ) -> None:
         self._key = key
         self._modifiers = modifiers
         self._auto_repeat = auto_repeat
+        self._text = text
         self.ignored = False
 
+    def text(self) -> str:
+        return self._text
+
     def key(self) -> Qt.Key:
         return self._key
 
@@ -109,47 +122,6 @@ class _KeyEvent:
         self.ignored = True
 
 
-class _Movie:
-    def __init__(self, state: QMovie.MovieState = QMovie.MovieState.Running) -> None:
-        self._state = state
-        self.paused_values: list[bool] = []
-        self.jumped_to: list[int] = []
-        self.stopped = False
-        self.started = False
-        self.frameChanged = SimpleNamespace(
-            connect=lambda *args: None,
-            disconnect=lambda *args: None,
-        )
-
-    def isValid(self) -> bool:
-        return True
-
-    def state(self) -> QMovie.MovieState:
-        return self._state
-
-    def setPaused(self, paused: bool) -> None:
-        self.paused_values.append(paused)
-        self._state = QMovie.MovieState.Paused if paused else QMovie.MovieState.Running
-
-    def frameCount(self) -> int:
-        return 3
-
-    def currentFrameNumber(self) -> int:
-        return 1
-
-    def jumpToFrame(self, frame: int) -> None:
-        self.jumped_to.append(frame)
-
-    def stop(self) -> None:
-        self.stopped = True
-
-    def start(self) -> None:
-        self.started = True
-
-    def currentPixmap(self) -> "_Pixmap":
-        return _Pixmap()
-
-
 class _Emitter:
     def __init__(self) -> None:
         self.emitted: list[tuple] = []
@@ -158,6 +130,14 @@ class _Emitter:
         self.emitted.append(args)
 
 
+class _TreeScanner:
+    def __init__(self) -> None:
+        self.cancelled: list[int] = []
+
+    def cancel_older_than(self, generation: int) -> None:
+        self.cancelled.append(generation)
+
+
 class _StatusBar:
     def __init__(self) -> None:
         self.messages: list[tuple] = []
@@ -173,10 +153,10 @@ class _StatusBar:
 class _ImageLabel:
     def __init__(self) -> None:
         self.texts: list[str] = []
-        self.movies: list[object | None] = []
+        self.frames: list[object] = []
         self.scaled_contents_values: list[bool] = []
-        self.fixed_sizes: list[object] = []
         self.pixmaps: list[object] = []
+        self.views: list[tuple[object, tuple[int, int]]] = []
         self.adjusted = False
         self.minimum_sizes: list[tuple[int, int]] = []
         self.maximum_sizes: list[tuple[int, int]] = []
@@ -185,18 +165,9 @@ class _ImageLabel:
     def setText(self, text: str) -> None:
         self.texts.append(text)
 
-    def setMovie(self, movie: object | None) -> None:
-        self.movies.append(movie)
-
     def setScaledContents(self, value: bool) -> None:
         self.scaled_contents_values.append(value)
 
-    def setFixedSize(self, size: object) -> None:
-        self.fixed_sizes.append(size)
-
-    def movie(self) -> object | None:
-        return self.movies[-1] if self.movies else None
-
     def setMinimumSize(self, width: int, height: int) -> None:
         self.minimum_sizes.append((width, height))
 
@@ -206,6 +177,16 @@ class _ImageLabel:
     def setPixmap(self, pixmap: object) -> None:
         self.pixmaps.append(pixmap)
 
+    def show_frame(self, frame: object) -> None:
+        self.frames.append(frame)
+
+    def set_view(self, source: object, display_size) -> None:
+        self.views.append((source, (display_size.width(), display_size.height())))
+
+    def set_tiled_view(self, placeholder: object, display_size, tile_size: int, tiles) -> None:
+        self.views.append((placeholder, (display_size.width(), display_size.height())))
+        self.tiles = dict(tiles)
+
     def adjustSize(self) -> None:
         self.adjusted = True
 
@@ -273,6 +254,12 @@ class _Pixmap:
     def size(self) -> _Size:
         return _Size(self._width, self._height)
 
+    def cacheKey(self) -> int:
+        return id(self)
+
+    def setDevicePixelRatio(self, ratio: float) -> None:
+        self.device_pixel_ratio = ratio
+
     def scaled(self, *args) -> "_Pixmap":
         if args and isinstance(args[0], _Size):
             return _Pixmap(args[0].width(), args[0].height())
@@ -281,6 +268,13 @@ class _Pixmap:
         return _Pixmap(self._width, self._height)
 
 
+def _bind_device_pixels(viewer: SimpleNamespace, ratio: float = 1.0) -> SimpleNamespace:
+    """画面の倍率と、ビューポートをデバイスピクセルで返すメソッドを付ける"""
+    viewer.devicePixelRatioF = lambda: ratio
+    viewer._viewport_device_size = lambda: ImageViewer._viewport_device_size(viewer)
+    return viewer
+
+
 class _FakeQPixmap:
     """worker からの QImage を GUI スレッドで変換する経路の代用。
 
@@ -293,16 +287,15 @@ class _FakeQPixmap:
         return image
 
 
-class _ImageContext:
-    def __init__(self, *, is_animated: bool, n_frames: int) -> None:
-        self.is_animated = is_animated
-        self.n_frames = n_frames
+class _Action:
+    def __init__(self, checked: bool = False) -> None:
+        self.checked = checked
 
-    def __enter__(self) -> "_ImageContext":
-        return self
+    def isChecked(self) -> bool:
+        return self.checked
 
-    def __exit__(self, exc_type, exc, tb) -> None:
-        return None
+    def setChecked(self, checked: bool) -> None:
+        self.checked = checked
 
 
 class _Settings:
@@ -373,20 +366,18 @@ def test_toggle_fit_mode_updates_zoom_and_redraws() -> None:
     assert calls == ["redraw", "status"]
 
 
-def test_toggle_shuffle_mode_can_restore_sorted_order() -> None:
+def test_toggle_shuffle_mode_can_restore_sorted_order(monkeypatch) -> None:
     calls: list[str] = []
-    viewer = SimpleNamespace(
-        image_files=["b.png", "a.png"],
-        sorted_image_files=["a.png", "b.png"],
-        current_index=0,
-        is_shuffled=True,
-    )
+    monkeypatch.setattr(file_list.random, "shuffle", lambda items: items.reverse())
+    image_files = ImageFileList("", ["a.png", "b.png"])
+    image_files.shuffle()
+    viewer = SimpleNamespace(image_files=image_files, current_index=0, is_shuffled=True)
     viewer.update_status_bar = lambda: calls.append("status")
 
     ImageViewer._toggle_shuffle_mode(viewer)
 
     assert viewer.is_shuffled is False
-    assert viewer.image_files == ["a.png", "b.png"]
+    assert list(viewer.image_files) == ["a.png", "b.png"]
     assert viewer.current_index == 1
     assert calls == ["status"]
 
@@ -401,387 +392,1245 @@ def test_scroll_image_moves_vertical_and_horizontal_scrollbars() -> None:
     assert viewer.scroll_area.horizontalScrollBar().value() == 60
 
 
-def test_toggle_gif_playback_pauses_and_resumes_movie() -> None:
-    calls: list[str] = []
-    movie = _Movie()
-    viewer = SimpleNamespace(current_movie=movie)
-    viewer.update_status_bar = lambda: calls.append("status")
+class _AnimationTimer:
+    def __init__(self) -> None:
+        self.started: list[int | None] = []
+        self.active = False
 
-    assert ImageViewer._toggle_gif_playback(viewer) is True
-    assert ImageViewer._toggle_gif_playback(viewer) is True
+    def start(self, msec: int | None = None) -> None:
+        self.started.append(msec)
+        self.active = True
 
-    assert movie.paused_values == [True, False]
-    assert calls == ["status", "status"]
+    def stop(self) -> None:
+        self.active = False
+
+    def isActive(self) -> bool:
+        return self.active
 
 
-def test_toggle_gif_playback_returns_false_without_movie() -> None:
-    viewer = SimpleNamespace(current_movie=None)
+class _Scrubber:
+    def __init__(self) -> None:
+        self.visible = False
+        self.maximum = 0
+        self.value = 0
+        self.slider_down = False
+        self.signals_blocked = False
 
-    assert ImageViewer._toggle_gif_playback(viewer) is False
+    def blockSignals(self, blocked: bool) -> None:
+        self.signals_blocked = blocked
 
+    def setMaximum(self, maximum: int) -> None:
+        self.maximum = maximum
 
-def test_step_gif_frame_advances_and_pauses() -> None:
-    calls: list[str] = []
-    movie = _Movie()
-    viewer = SimpleNamespace(current_movie=movie)
+    def isSliderDown(self) -> bool:
+        return self.slider_down
+
+    def setValue(self, value: int) -> None:
+        assert self.signals_blocked
+        self.value = value
+
+    def show(self) -> None:
+        self.visible = True
+
+    def hide(self) -> None:
+        self.visible = False
+
+
+def _animation_viewer(*, frame_count: int = 5, queued=(), pending: int = 0) -> SimpleNamespace:
+    calls: list[object] = []
+    viewer = SimpleNamespace(
+        calls=calls,
+        image_label=_ImageLabel(),
+        frame_scrubber=_Scrubber(),
+        _animation_serial=5,
+        _animation_frames=deque(queued),
+        _animation_frame=None,
+        _animation_frame_count=frame_count,
+        _animation_index=0,
+        _animation_paused=False,
+        _animation_dropped=0,
+        _animation_due=1000.0,
+        _animation_pending=pending,
+        _animation_next_index=queued[-1][0] + 1 if queued else 1,
+        _animation_seek_index=None,
+        _animation_seek_id=0,
+        _animation_timer=_AnimationTimer(),
+        _animation_status_timer=_AnimationTimer(),
+        request_animation_frames=_Emitter(),
+        request_open_animation=_Emitter(),
+        animation_decoder=SimpleNamespace(
+            cancel_older_than=lambda serial: calls.append(("cancel", serial)),
+            set_display_size=lambda width, height: calls.append(("size", width, height)),
+            seek=lambda seek_id, index: calls.append(("seek", seek_id, index)),
+        ),
+    )
+    for name in (
+        "is_animating",
+        "_schedule_next_frame",
+        "_show_animation_frame",
+        "_top_up_animation_frames",
+        "_refresh_animation_status",
+        "_sync_frame_scrubber",
+        "_seek_animation",
+    ):
+        method = getattr(ImageViewer, name)
+        setattr(viewer, name, lambda *args, method=method: method(viewer, *args))
     viewer.update_status_bar = lambda: calls.append("status")
+    return viewer
 
-    ImageViewer._step_gif_frame(viewer, Qt.Key.Key_Period)
 
-    assert movie.jumped_to == [2]
-    assert movie.paused_values == [True]
-    assert calls == ["status"]
+def test_advance_animation_drops_frames_whose_time_has_passed(monkeypatch) -> None:
+    monkeypatch.setattr(animation_mixin, "_now_ms", lambda: 1130.0)
+    viewer = _animation_viewer(queued=[(1, "f1", 100), (2, "f2", 100), (3, "f3", 100)])
 
+    ImageViewer._advance_animation(viewer)
 
-def test_load_image_from_path_requests_directory_scan(tmp_path) -> None:
-    emitter = _Emitter()
-    calls: list[str] = []
-    image_path = tmp_path / "Photo.PNG"
-    viewer = SimpleNamespace(request_load_list=emitter, _load_generation=0)
-    viewer._clear_display = lambda: calls.append("clear")
+    # 130ms 遅れ → 表示期間の過ぎた 1 枚を飛ばし、2 枚目を出して残りを予約する
+    assert viewer.image_label.frames == ["f2"]
+    assert viewer._animation_index == 2
+    assert viewer._animation_dropped == 1
+    assert viewer._animation_due == 1200.0
+    assert viewer._animation_timer.started == [70]
+    assert viewer._animation_status_timer.started == [None]
+    # 残り 1 枚 + 依頼中 3 枚で待ち行列の大きさに戻す
+    assert viewer.request_animation_frames.emitted == [(5, 3)]
+    assert viewer._animation_pending == 3
 
-    ImageViewer.load_image_from_path(viewer, str(image_path))
 
-    assert calls == ["clear"]
-    assert viewer._load_generation == 1
-    assert emitter.emitted == [
-        (1, str(tmp_path), os.path.normcase(os.path.normpath(str(image_path))))
-    ]
+def test_advance_animation_waits_while_paused_or_starved() -> None:
+    viewer = _animation_viewer()
 
+    ImageViewer._advance_animation(viewer)
+    viewer._animation_frames.append((1, "f1", 100))
+    viewer._animation_paused = True
+    ImageViewer._advance_animation(viewer)
 
-def test_load_image_from_path_ignores_empty_path() -> None:
-    viewer = SimpleNamespace()
-    viewer._clear_display = lambda: (_ for _ in ()).throw(AssertionError("should not clear"))
+    assert viewer.image_label.frames == []
+    assert viewer.request_animation_frames.emitted == []
 
-    ImageViewer.load_image_from_path(viewer, "")
 
+def test_on_animation_frame_ignores_stale_serial_and_schedules(monkeypatch) -> None:
+    monkeypatch.setattr(animation_mixin, "_now_ms", lambda: 1500.0)
+    monkeypatch.setattr(animation_mixin, "QPixmap", _FakeQPixmap)
+    viewer = _animation_viewer(pending=4)
 
-def test_on_file_list_loaded_sets_error_text_for_empty_list() -> None:
-    label = _ImageLabel()
-    viewer = SimpleNamespace(image_label=label, _load_generation=0)
+    ImageViewer.on_animation_frame(viewer, 4, 1, "old", 100)
+    ImageViewer.on_animation_frame(viewer, 5, 1, "new", 100)
 
-    ImageViewer.on_file_list_loaded(viewer, 0, [], -1)
+    # 待たせていたフレームは届いた時点から数え直す
+    assert list(viewer._animation_frames) == [(1, "new", 100)]
+    assert viewer._animation_next_index == 2
+    assert viewer._animation_pending == 3
+    assert viewer._animation_due == 1500.0
+    assert viewer._animation_timer.started == [0]
+    assert viewer.request_animation_frames.emitted == []
 
-    assert label.texts == ["画像の読み込みに失敗しました。"]
 
+def test_on_animation_frame_discards_frames_out_of_sequence(monkeypatch) -> None:
+    monkeypatch.setattr(animation_mixin, "QPixmap", _FakeQPixmap)
+    viewer = _animation_viewer(pending=4)
+    viewer._animation_next_index = 3
 
-def test_on_file_list_loaded_sorts_and_keeps_selected_file(monkeypatch) -> None:
-    loaded: list[int] = []
-    monkeypatch.setattr(navigation, "windows_logical_key", lambda path: path)
-    viewer = SimpleNamespace(
-        sorted_image_files=[],
-        image_files=[],
-        is_shuffled=True,
-        current_index=-1,
-        _load_generation=1,
-    )
-    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+    ImageViewer.on_animation_frame(viewer, 5, 1, "before seek", 100)
 
-    ImageViewer.on_file_list_loaded(viewer, 1, ["b.png", "a.png"], 0)
+    assert not viewer._animation_frames
+    assert viewer.request_animation_frames.emitted == [(5, 1)]
 
-    assert viewer.sorted_image_files == ["a.png", "b.png"]
-    assert viewer.image_files == ["a.png", "b.png"]
-    assert viewer.is_shuffled is False
-    assert viewer.current_index == 1
-    assert loaded == [1]
 
+def test_on_animation_opened_records_frame_count_and_first_due(monkeypatch) -> None:
+    monkeypatch.setattr(animation_mixin, "_now_ms", lambda: 2000.0)
+    viewer = _animation_viewer(frame_count=0)
 
-def test_on_file_list_loaded_ignores_stale_generation(monkeypatch) -> None:
-    loaded: list[int] = []
-    monkeypatch.setattr(navigation, "windows_logical_key", lambda path: path)
-    viewer = SimpleNamespace(
-        sorted_image_files=[],
-        image_files=[],
-        is_shuffled=False,
-        current_index=-1,
-        _load_generation=2,
-    )
-    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+    ImageViewer.on_animation_opened(viewer, 4, 9, 70)
+    assert viewer._animation_frame_count == 0
+    ImageViewer.on_animation_opened(viewer, 5, 9, 70)
 
-    # 世代 1 の結果が返ってきても、現在の世代 2 とは異なるので無視する
-    ImageViewer.on_file_list_loaded(viewer, 1, ["a.png", "b.png"], 0)
+    assert viewer._animation_frame_count == 9
+    assert viewer._animation_due == 2070.0
+    assert viewer.calls == ["status"]
+    assert viewer.frame_scrubber.visible is True
+    assert viewer.frame_scrubber.maximum == 8
+    assert viewer.frame_scrubber.signals_blocked is False
 
-    assert viewer.image_files == []
-    assert loaded == []
 
+def test_toggle_animation_playback_pauses_and_resumes(monkeypatch) -> None:
+    monkeypatch.setattr(animation_mixin, "_now_ms", lambda: 3000.0)
+    viewer = _animation_viewer(queued=[(1, "f1", 100)])
+    viewer._animation_timer.active = True
 
-def test_load_image_by_index_emits_current_file(tmp_path) -> None:
-    image_path = tmp_path / "a.png"
-    image_path.write_bytes(b"fake image")
-    status_bar = _StatusBar()
-    emitter = _Emitter()
-    titles: list[str] = []
-    viewer = SimpleNamespace(
-        is_loading=False,
-        current_index=0,
-        image_files=[str(image_path)],
-        fit_to_window=False,
-        scale_factor=3.0,
-        current_filesize=0,
-        request_load_image=emitter,
-        _load_generation=4,
-    )
-    viewer.windowTitle = lambda: "Window"
-    viewer.setWindowTitle = titles.append
-    viewer.statusBar = lambda: status_bar
+    assert ImageViewer._toggle_animation_playback(viewer) is True
+    assert viewer._animation_paused is True
+    assert viewer._animation_timer.isActive() is False
+    assert ImageViewer._toggle_animation_playback(viewer) is True
 
-    ImageViewer.load_image_by_index(viewer)
+    assert viewer._animation_paused is False
+    assert viewer._animation_due == 3000.0
+    assert viewer._animation_timer.started == [0]
+    assert viewer.calls == ["status", "status"]
 
-    assert viewer.fit_to_window is True
-    assert viewer.scale_factor == 1.0
-    assert viewer.is_loading is True
-    assert viewer.current_filesize == len(b"fake image")
-    assert titles == ["Window | 読み込み中..."]
-    assert status_bar.messages == [("読み込み中...", None)]
-    assert emitter.emitted == [(4, str(image_path))]
 
+def test_toggle_animation_playback_returns_false_for_still_image() -> None:
+    viewer = _animation_viewer(frame_count=0)
 
-def test_move_current_image_and_load_next_moves_to_subfolder(tmp_path) -> None:
-    image_path = tmp_path / "a.png"
-    next_path = tmp_path / "b.png"
-    image_path.write_bytes(b"fake")
-    next_path.write_bytes(b"fake")
-    loaded: list[int] = []
-    viewer = SimpleNamespace(
-        is_loading=False,
-        image_files=[str(image_path), str(next_path)],
-        sorted_image_files=[str(image_path), str(next_path)],
-        current_index=0,
-        _release_current_file_handles=lambda: None,
-    )
-    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
-    viewer._clear_display = lambda: loaded.append(-1)
-    viewer._remove_path_from_lists = lambda path: ImageViewer._remove_path_from_lists(viewer, path)
+    assert ImageViewer._toggle_animation_playback(viewer) is False
+    assert viewer.calls == []
 
-    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
 
-    assert (tmp_path / OK_FOLDER / "a.png").exists()
-    assert viewer.image_files == [str(next_path)]
-    assert loaded == [0]
+def test_step_animation_frame_pauses_and_shows_next_queued_frame() -> None:
+    viewer = _animation_viewer(queued=[(1, "f1", 100), (2, "f2", 100)])
 
+    ImageViewer._step_animation_frame(viewer, 1)
 
-def test_delete_current_image_and_load_next_uses_send2trash(monkeypatch, tmp_path) -> None:
-    image_path = tmp_path / "a.png"
-    next_path = tmp_path / "b.png"
-    trashed: list[str] = []
-    loaded: list[int] = []
-    viewer = SimpleNamespace(
-        is_loading=False,
-        image_files=[str(image_path), str(next_path)],
-        sorted_image_files=[str(image_path), str(next_path)],
-        current_index=0,
-        _release_current_file_handles=lambda: None,
-    )
-    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
-    viewer._clear_display = lambda: loaded.append(-1)
-    viewer._remove_path_from_lists = lambda path: ImageViewer._remove_path_from_lists(viewer, path)
-    monkeypatch.setattr(navigation, "send2trash", trashed.append)
+    assert viewer._animation_paused is True
+    assert viewer.image_label.frames == ["f1"]
+    assert viewer._animation_index == 1
+    assert viewer.frame_scrubber.value == 1
+    assert viewer.request_animation_frames.emitted == [(5, 3)]
+    assert viewer.calls == ["status"]
 
-    ImageViewer.delete_current_image_and_load_next(viewer)
 
-    assert trashed == [str(image_path)]
-    assert viewer.image_files == [str(next_path)]
-    assert loaded == [0]
+def test_step_animation_frame_backward_seeks_and_shows_frame_on_arrival(monkeypatch) -> None:
+    monkeypatch.setattr(animation_mixin, "QPixmap", _FakeQPixmap)
+    viewer = _animation_viewer(queued=[(1, "f1", 100), (2, "f2", 100)], pending=2)
 
+    # 先頭から 1 コマ戻ると末尾のコマ
+    ImageViewer._step_animation_frame(viewer, -1)
 
-def test_update_status_bar_shows_static_image_details() -> None:
-    status_bar = _StatusBar()
-    viewer = SimpleNamespace(
-        original_pixmap=_Pixmap(),
-        current_filesize=1024 * 1024,
-        fit_to_window=True,
-        scroll_area=_ScrollAreaWithViewport(),
-        is_shuffled=False,
-        current_movie=None,
-    )
-    viewer.statusBar = lambda: status_bar
+    assert viewer._animation_paused is True
+    assert not viewer._animation_frames
+    assert ("seek", 1, 4) in viewer.calls
+    assert viewer.request_animation_frames.emitted == [(5, 2)]
 
-    ImageViewer.update_status_bar(viewer)
+    # 移動前に頼んだコマは捨て、移動先のコマは待たずに表示する
+    ImageViewer.on_animation_frame(viewer, 5, 3, "stale", 100)
+    ImageViewer.on_animation_frame(viewer, 5, 4, "f4", 100)
+    ImageViewer.on_animation_frame(viewer, 5, 0, "f0", 100)
 
-    assert status_bar.messages == [("🖼️ 200x100  |  💾 1.00MB  |  ↕️ 200.0%", None)]
+    assert viewer.image_label.frames == ["f4"]
+    assert viewer._animation_index == 4
+    assert viewer._animation_seek_index is None
+    assert list(viewer._animation_frames) == [(0, "f0", 100)]
 
 
-def test_update_status_bar_clears_message_without_pixmap() -> None:
-    status_bar = _StatusBar()
-    viewer = SimpleNamespace(original_pixmap=_Pixmap(is_null=True))
-    viewer.statusBar = lambda: status_bar
+def test_step_animation_frame_counts_from_pending_seek_target() -> None:
+    viewer = _animation_viewer()
+    viewer._animation_index = 2
+    viewer._animation_seek_index = 0
 
-    ImageViewer.update_status_bar(viewer)
+    ImageViewer._step_animation_frame(viewer, -1)
 
-    assert status_bar.cleared is True
+    assert ("seek", 1, 4) in viewer.calls
+    assert viewer._animation_seek_index == 4
 
 
-def test_load_image_by_index_ignores_invalid_index() -> None:
-    viewer = SimpleNamespace(is_loading=False, current_index=2, image_files=["a.png"])
-    viewer.request_load_image = _Emitter()
+def test_on_frame_scrubbed_seeks_only_while_animating() -> None:
+    viewer = _animation_viewer(frame_count=0)
+    ImageViewer.on_frame_scrubbed(viewer, 3)
+    assert viewer.calls == []
 
-    ImageViewer.load_image_by_index(viewer)
+    viewer._animation_frame_count = 10
+    ImageViewer.on_frame_scrubbed(viewer, 7)
 
-    assert viewer.request_load_image.emitted == []
+    assert viewer.calls[0] == ("seek", 1, 7)
+    assert viewer._animation_next_index == 7
 
 
-def test_load_image_by_index_uses_zero_filesize_for_missing_file(tmp_path) -> None:
-    missing_path = tmp_path / "missing.png"
-    status_bar = _StatusBar()
-    emitter = _Emitter()
-    titles: list[str] = []
-    viewer = SimpleNamespace(
-        is_loading=False,
-        current_index=0,
-        image_files=[str(missing_path)],
-        request_load_image=emitter,
-        _load_generation=4,
-    )
-    viewer.windowTitle = lambda: "Window"
-    viewer.setWindowTitle = titles.append
-    viewer.statusBar = lambda: status_bar
+def test_sync_frame_scrubber_leaves_value_alone_while_dragging() -> None:
+    viewer = _animation_viewer()
+    viewer._animation_index = 3
+    viewer.frame_scrubber.slider_down = True
 
-    ImageViewer.load_image_by_index(viewer)
+    ImageViewer._sync_frame_scrubber(viewer)
 
-    assert viewer.current_filesize == 0
-    assert emitter.emitted == [(4, str(missing_path))]
+    assert viewer.frame_scrubber.value == 0
+    assert viewer.frame_scrubber.visible is True
 
 
-def test_move_current_image_and_load_next_clears_when_last_file(tmp_path) -> None:
-    image_path = tmp_path / "a.png"
-    image_path.write_bytes(b"fake")
-    calls: list[str] = []
-    viewer = SimpleNamespace(
-        is_loading=False,
-        image_files=[str(image_path)],
-        sorted_image_files=[str(image_path)],
-        current_index=0,
-        _release_current_file_handles=lambda: None,
-    )
-    viewer._clear_display = lambda: calls.append("clear")
-    viewer._remove_path_from_lists = lambda path: ImageViewer._remove_path_from_lists(viewer, path)
+def test_stop_animation_cancels_decoder_and_resets_state() -> None:
+    viewer = _animation_viewer(queued=[(1, "f1", 100)], pending=3)
+    viewer._animation_frame = "f0"
+    viewer._animation_dropped = 3
+    viewer._animation_timer.active = True
+    viewer.frame_scrubber.visible = True
 
-    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+    ImageViewer.stop_animation(viewer)
 
-    assert (tmp_path / OK_FOLDER / "a.png").exists()
-    assert viewer.image_files == []
-    assert calls == ["clear"]
+    assert viewer._animation_serial == 6
+    assert viewer.calls == [("cancel", 6)]
+    assert viewer._animation_timer.isActive() is False
+    assert not viewer._animation_frames
+    assert viewer._animation_frame is None
+    assert viewer._animation_frame_count == 0
+    assert viewer._animation_dropped == 0
+    assert viewer._animation_pending == 0
+    assert viewer.frame_scrubber.visible is False
 
 
-def test_move_current_image_and_load_next_reports_errors(monkeypatch, tmp_path) -> None:
-    image_path = tmp_path / "a.png"
-    status_bar = _StatusBar()
-    viewer = SimpleNamespace(is_loading=False, image_files=[str(image_path)], current_index=0)
-    viewer.statusBar = lambda: status_bar
-    viewer._release_current_file_handles = lambda: None
-    monkeypatch.setattr(navigation.shutil, "move", lambda *args: (_ for _ in ()).throw(OSError))
+def test_start_animation_requests_only_animatable_formats() -> None:
+    viewer = _animation_viewer()
+    viewer.stop_animation = lambda: ImageViewer.stop_animation(viewer)
+    viewer._update_animation_size = lambda size: ImageViewer._update_animation_size(viewer, size)
+    viewer.image_label.display_size = lambda: _Size(320, 160)
 
-    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+    first = object()
+    ImageViewer._start_animation(viewer, "photo.jpg", first)
+    ImageViewer._start_animation(viewer, "anim.GIF", first)
 
-    assert status_bar.messages == [("エラー: ファイルの移動に失敗しました", 5000)]
+    # 表示した画像を先頭フレームとして渡す
+    assert viewer.request_open_animation.emitted == [(7, "anim.GIF", first)]
+    assert viewer._animation_pending == constants.ANIMATION_QUEUE_SIZE
+    assert viewer._animation_next_index == 1
+    assert ("size", 320, 160) in viewer.calls
 
 
-def test_delete_current_image_and_load_next_clears_when_last_file(monkeypatch, tmp_path) -> None:
-    image_path = tmp_path / "a.png"
+def test_redraw_static_image_redraws_current_animation_frame() -> None:
+    sizes: list[tuple[int, int]] = []
+    viewer = _static_viewer(_Pixmap(), fit_to_window=True)
+    viewer.is_animating = lambda: True
+    viewer._animation_frame = "frame"
+    viewer._update_animation_size = lambda size: sizes.append((size.width(), size.height()))
+
+    ImageViewer._redraw_static_image(viewer)
+
+    # 以降のコマを worker が新しい表示サイズで縮小するよう伝える
+    assert sizes == [(400, 200)]
+    assert viewer.image_label.views == [("frame", (400, 200))]
+
+
+def test_load_image_from_path_requests_directory_scan(tmp_path) -> None:
+    emitter = _Emitter()
     calls: list[str] = []
+    image_path = tmp_path / "Photo.PNG"
+    prefetch = _Emitter()
     viewer = SimpleNamespace(
-        is_loading=False,
-        image_files=[str(image_path)],
-        sorted_image_files=[str(image_path)],
-        current_index=0,
-        _release_current_file_handles=lambda: None,
+        request_load_list=emitter,
+        request_prefetch_siblings=prefetch,
+        _load_generation=0,
+        recursive_mode=False,
+        tree_scanner=_TreeScanner(),
+        sibling_prefetcher=_TreeScanner(),
+        file_probe=_TreeScanner(),
+        duplicate_finder=_TreeScanner(),
+        integrity_checker=_TreeScanner(),
+    )
+    viewer._request_sibling_prefetch = lambda generation, directory: (
+        ImageViewer._request_sibling_prefetch(viewer, generation, directory)
     )
     viewer._clear_display = lambda: calls.append("clear")
-    viewer._remove_path_from_lists = lambda path: ImageViewer._remove_path_from_lists(viewer, path)
-    monkeypatch.setattr(navigation, "send2trash", lambda path: None)
+    viewer._begin_listing = lambda: ImageViewer._begin_listing(viewer)
 
-    ImageViewer.delete_current_image_and_load_next(viewer)
+    ImageViewer.load_image_from_path(viewer, str(image_path))
 
-    assert viewer.image_files == []
     assert calls == ["clear"]
+    assert viewer._load_generation == 1
+    assert viewer.tree_scanner.cancelled == [1]
+    assert emitter.emitted == [
+        (1, str(tmp_path), os.path.normcase(os.path.normpath(str(image_path))))
+    ]
+    # 兄弟フォルダの先読みも同時に依頼し、前の先読み結果は捨てる
+    assert viewer.sibling_prefetcher.cancelled == [1]
+    assert prefetch.emitted == [(1, str(tmp_path))]
+    assert viewer._sibling_folders == {}
 
 
-def test_delete_current_image_and_load_next_reports_errors(monkeypatch, tmp_path) -> None:
+def test_load_image_from_path_requests_tree_scan_in_recursive_mode(tmp_path) -> None:
+    emitter = _Emitter()
     image_path = tmp_path / "a.png"
-    status_bar = _StatusBar()
-    viewer = SimpleNamespace(is_loading=False, image_files=[str(image_path)], current_index=0)
-    viewer.statusBar = lambda: status_bar
-    viewer._release_current_file_handles = lambda: None
-    monkeypatch.setattr(navigation, "send2trash", lambda path: (_ for _ in ()).throw(OSError))
+    viewer = SimpleNamespace(
+        request_scan_tree=emitter,
+        _load_generation=3,
+        recursive_mode=True,
+        _tree_list_pending=False,
+        tree_scanner=_TreeScanner(),
+        file_probe=_TreeScanner(),
+        duplicate_finder=_TreeScanner(),
+        integrity_checker=_TreeScanner(),
+    )
+    viewer._clear_display = lambda: None
+    viewer._begin_listing = lambda: ImageViewer._begin_listing(viewer)
+    viewer._request_sibling_prefetch = lambda generation, directory: None
 
-    ImageViewer.delete_current_image_and_load_next(viewer)
+    ImageViewer.load_image_from_path(viewer, str(image_path))
 
-    assert status_bar.messages == [("エラー: ファイルの削除に失敗しました", 5000)]
+    assert viewer._tree_list_pending is True
+    assert emitter.emitted == [
+        (4, str(tmp_path), os.path.normcase(os.path.normpath(str(image_path))))
+    ]
 
 
-def test_open_image_requests_selected_file(monkeypatch) -> None:
-    loaded: list[str] = []
-    viewer = SimpleNamespace(is_loading=False)
-    viewer.load_image_from_path = loaded.append
-    monkeypatch.setattr(
-        main_window.QFileDialog,
-        "getOpenFileName",
-        lambda *args: ("selected.png", ""),
-    )
+def test_open_forwarded_paths_opens_first_path_and_raises_window() -> None:
+    calls: list[object] = []
+    viewer = SimpleNamespace(_forwarded_selection=None)
 
-    ImageViewer.open_image(viewer)
+    def load_image_from_path(path: str) -> None:
+        calls.append(path)
+        viewer._forwarded_selection = None
 
-    assert loaded == ["selected.png"]
+    viewer.load_image_from_path = load_image_from_path
+    viewer.show_window = lambda: calls.append("show")
 
+    ImageViewer.open_forwarded_paths(viewer, ["/a/1.png"])
+    assert viewer._forwarded_selection is None
 
-def test_open_image_ignores_loading_state() -> None:
-    viewer = SimpleNamespace(is_loading=True)
-    viewer.load_image_from_path = lambda path: (_ for _ in ()).throw(AssertionError)
+    first = os.path.join(os.sep, "a", "1.png")
+    ImageViewer.open_forwarded_paths(
+        viewer,
+        [
+            first,
+            os.path.join(os.sep, "a", "sub", "2.png"),
+            os.path.join(os.sep, "b", "3.png"),
+        ],
+    )
+    # 先頭のファイルのフォルダからの相対名（一覧の名前と同じ形）で覚えておく
+    assert viewer._forwarded_selection == {
+        "1.png",
+        os.path.join("sub", "2.png"),
+        os.path.join(os.pardir, "b", "3.png"),
+    }
 
-    ImageViewer.open_image(viewer)
+    ImageViewer.open_forwarded_paths(viewer, [])
+    assert calls == ["/a/1.png", "show", first, "show", "show"]
 
 
-def test_redraw_image_dispatches_to_static_or_gif_renderer() -> None:
-    calls: list[str] = []
-    viewer = SimpleNamespace(original_pixmap=_Pixmap(), current_movie=None)
-    viewer._redraw_static_image = lambda: calls.append("static")
-    viewer._redraw_gif = lambda: calls.append("gif")
+def test_listing_ready_restricts_to_forwarded_paths_and_keeps_it_under_filter() -> None:
+    viewer = _filter_viewer(["a.png", "b.png", "c.png", "d.png"])
+    viewer._load_generation = 2
+    viewer.sort_key = "name"
+    viewer.request_probe_listing = _Emitter()
+    viewer._request_name_index = lambda: None
+    viewer._restrict_to_forwarded = lambda: ImageViewer._restrict_to_forwarded(viewer)
+    status_bar = _StatusBar()
+    viewer.statusBar = lambda: status_bar
+    viewer._forwarded_selection = {"a.png", "c.png", os.path.join(os.pardir, "other", "x.png")}
 
-    ImageViewer.redraw_image(viewer)
-    viewer.current_movie = _Movie()
-    ImageViewer.redraw_image(viewer)
+    ImageViewer._on_listing_ready(viewer)
 
-    assert calls == ["static", "gif"]
+    assert viewer._forwarded_selection is None
+    assert list(viewer.image_files) == [os.path.join("dir", "a.png"), os.path.join("dir", "c.png")]
+    # 開いたフォルダに無いファイルは、開けなかったことを知らせる
+    assert status_bar.messages == [
+        (
+            "選択された 2 件だけを表示しています（1 件は開いたフォルダに無いため表示できません）",
+            5000,
+        )
+    ]
 
+    # 解像度の絞り込みを重ねても、渡されたファイル以外は出てこない
+    viewer.dimension_filter = DimensionFilter(min_width=10)
+    ImageViewer.on_filter_ready(viewer, 2, viewer.dimension_filter, b"\x01\x00\x00\x00")
+    assert list(viewer.image_files) == [os.path.join("dir", "c.png")]
 
-def test_redraw_image_ignores_null_pixmap() -> None:
-    viewer = SimpleNamespace(original_pixmap=_Pixmap(is_null=True), current_movie=None)
-    viewer._redraw_static_image = lambda: (_ for _ in ()).throw(AssertionError)
+    viewer.dimension_filter = DimensionFilter()
+    ImageViewer._set_dimension_filter(viewer, viewer.dimension_filter)
+    assert len(viewer.image_files) == 2
 
-    ImageViewer.redraw_image(viewer)
+
+def test_restrict_to_forwarded_reports_paths_outside_the_folder_without_filtering() -> None:
+    viewer = _filter_viewer(["a.png", "b.png"])
+    status_bar = _StatusBar()
+    viewer.statusBar = lambda: status_bar
+    viewer._forwarded_selection = {"a.png", os.path.join(os.pardir, "other", "x.png")}
+
+    ImageViewer._restrict_to_forwarded(viewer)
+
+    # 表示できるのが 1 件だけなら絞り込まず、開けなかったファイルだけを知らせる
+    assert viewer._forwarded_hidden is None
+    assert len(viewer.image_files) == 2
+    assert status_bar.messages == [
+        ("選択されたうち 1 件は開いたフォルダに無いため表示できません", 5000)
+    ]
+
+
+def test_on_tree_chunk_loaded_creates_list_then_extends_it() -> None:
+    loaded: list[int] = []
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(
+        image_files=ImageFileList.empty(),
+        is_shuffled=False,
+        current_index=-1,
+        _load_generation=1,
+        _tree_list_pending=True,
+    )
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.on_tree_chunk_loaded(viewer, 1, "root", ["b.png", "a.png"], 0)
+    ImageViewer.on_tree_chunk_loaded(viewer, 1, "root", [os.path.join("sub", "c.png")], -1)
+    # 別世代の塊は無視する
+    ImageViewer.on_tree_chunk_loaded(viewer, 0, "old", ["x.png"], -1)
+
+    # 開いた b.png（名前 ID 0）が論理順で 2 番目に来る
+    assert loaded == [1]
+    assert list(viewer.image_files) == [
+        os.path.join("root", "a.png"),
+        os.path.join("root", "b.png"),
+        os.path.join("root", "sub", "c.png"),
+    ]
+    assert status_bar.messages == [("📂 スキャン中... 3 件", 2000)]
+
+
+def test_on_tree_scan_finished_reorders_and_keeps_current_file() -> None:
+    calls: list[str] = []
+    titles: list[str] = []
+    viewer = SimpleNamespace(
+        image_files=ImageFileList("root", ["a.png", "c.png", "b.png"]),
+        current_index=2,
+        _load_generation=1,
+    )
+    viewer.setWindowTitle = titles.append
+    viewer.update_status_bar = lambda: calls.append("status")
+    viewer._refresh_title = lambda: ImageViewer._refresh_title(viewer)
+    viewer._apply_order = lambda order: ImageViewer._apply_order(viewer, order)
+    viewer._on_listing_ready = lambda: calls.append("listing")
+
+    ImageViewer.on_tree_scan_finished(viewer, 1, [0, 2, 1])
+
+    assert viewer.current_index == 1
+    assert viewer.image_files[1] == os.path.join("root", "b.png")
+    assert titles == ["[2/3] b.png"]
+    assert calls == ["status", "listing"]
+
+
+def test_on_tree_scan_finished_reports_empty_tree() -> None:
+    label = _ImageLabel()
+    viewer = SimpleNamespace(
+        image_files=ImageFileList("root", []),
+        current_index=-1,
+        image_label=label,
+        _load_generation=1,
+    )
+
+    ImageViewer.on_tree_scan_finished(viewer, 1, [])
+
+    assert label.texts == ["画像の読み込みに失敗しました。"]
+
+
+def test_on_listing_ready_sends_listing_and_requests_non_name_order() -> None:
+    calls: list[str] = []
+    image_files = ImageFileList("dir", ["a.png", "b.png"])
+    viewer = SimpleNamespace(
+        image_files=image_files,
+        _load_generation=4,
+        sort_key="mtime",
+        dimension_filter=DimensionFilter(aspect="portrait"),
+        request_probe_listing=_Emitter(),
+        request_sort_order=_Emitter(),
+        request_filter=_Emitter(),
+        _forwarded_selection=None,
+    )
+    viewer._request_name_index = lambda: calls.append("index")
+
+    ImageViewer._on_listing_ready(viewer)
+
+    assert calls == ["index"]
+    assert viewer.request_probe_listing.emitted == [(4, "dir", image_files.names)]
+    assert viewer.request_sort_order.emitted == [(4, "mtime")]
+    assert viewer.request_filter.emitted == [(4, DimensionFilter(aspect="portrait"))]
+
+    viewer.sort_key = "name"
+    viewer.request_sort_order.emitted.clear()
+    ImageViewer._on_listing_ready(viewer)
+    # 名前順は一覧の読み込み時点で並んでいるので、worker に頼まない
+    assert viewer.request_sort_order.emitted == []
+
+
+def test_cycle_sort_order_advances_and_requests_order_from_worker() -> None:
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(
+        image_files=ImageFileList("dir", ["a.png"]),
+        _load_generation=2,
+        sort_key="pixels",
+        request_sort_order=_Emitter(),
+    )
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer._cycle_sort_order(viewer)
+    ImageViewer._cycle_sort_order(viewer)
+
+    assert viewer.sort_key == "mtime"
+    assert viewer.request_sort_order.emitted == [(2, "name"), (2, "mtime")]
+    assert status_bar.messages[-1] == ("並び順: 更新日時", 2000)
+
+
+def test_on_sort_order_ready_applies_only_current_key_and_generation() -> None:
+    titles: list[str] = []
+    viewer = SimpleNamespace(
+        image_files=ImageFileList("dir", ["a.png", "b.png", "c.png"]),
+        current_index=0,
+        _load_generation=1,
+        sort_key="size",
+    )
+    viewer.setWindowTitle = titles.append
+    viewer.update_status_bar = lambda: None
+    viewer._refresh_title = lambda: ImageViewer._refresh_title(viewer)
+    viewer._apply_order = lambda order: ImageViewer._apply_order(viewer, order)
+
+    ImageViewer.on_sort_order_ready(viewer, 0, "size", [2, 1, 0])
+    ImageViewer.on_sort_order_ready(viewer, 1, "mtime", [2, 1, 0])
+    assert titles == []
+
+    ImageViewer.on_sort_order_ready(viewer, 1, "size", [2, 1, 0])
+
+    # 表示中の a.png はそのままで、位置だけが末尾に移る
+    assert viewer.current_index == 2
+    assert list(viewer.image_files)[0] == os.path.join("dir", "c.png")
+    assert titles == ["[3/3] a.png"]
+
+
+def _filter_viewer(names: list[str], current_index: int = 0) -> SimpleNamespace:
+    viewer = SimpleNamespace(
+        image_files=ImageFileList("dir", names),
+        current_index=current_index,
+        _load_generation=1,
+        dimension_filter=DimensionFilter(),
+        _duplicate_groups=None,
+        _forwarded_selection=None,
+        _forwarded_hidden=None,
+        image_label=_ImageLabel(),
+        request_filter=_Emitter(),
+        calls=[],
+    )
+    viewer.statusBar = lambda: _StatusBar()
+    viewer.setWindowTitle = lambda title: viewer.calls.append(("title", title))
+    viewer.update_status_bar = lambda: None
+    viewer.load_image_by_index = lambda: viewer.calls.append(("load", viewer.current_index))
+    viewer._apply_hidden = lambda hidden: ImageViewer._apply_hidden(viewer, hidden)
+    viewer._refresh_title = lambda: ImageViewer._refresh_title(viewer)
+
+    def clear_display() -> None:
+        viewer.current_index = -1
+        viewer.calls.append(("clear",))
+
+    viewer._clear_display = clear_display
+    return viewer
+
+
+def test_set_dimension_filter_requests_worker_and_clearing_applies_directly() -> None:
+    viewer = _filter_viewer(["a.png", "b.png"])
+    portrait = DimensionFilter(aspect="portrait")
+
+    ImageViewer._set_dimension_filter(viewer, portrait)
+    assert viewer.request_filter.emitted == [(1, portrait)]
+
+    ImageViewer.on_filter_ready(viewer, 1, portrait, b"\x00\x01")
+    assert len(viewer.image_files) == 1
+
+    ImageViewer._set_dimension_filter(viewer, DimensionFilter())
+    assert len(viewer.image_files) == 2
+    assert viewer.request_filter.emitted == [(1, portrait)]
+
+
+def test_on_filter_ready_moves_to_next_visible_image_when_current_is_hidden() -> None:
+    viewer = _filter_viewer(["a.png", "b.png", "c.png"], current_index=1)
+    viewer.dimension_filter = DimensionFilter(min_width=10)
+
+    # 古い世代や別の条件の結果は無視する
+    ImageViewer.on_filter_ready(viewer, 0, viewer.dimension_filter, b"\x00\x01\x00")
+    ImageViewer.on_filter_ready(viewer, 1, DimensionFilter(), b"\x00\x01\x00")
+    assert len(viewer.image_files) == 3
+
+    ImageViewer.on_filter_ready(viewer, 1, viewer.dimension_filter, b"\x00\x01\x00")
+
+    assert viewer.current_index == 1
+    assert viewer.image_files[1] == os.path.join("dir", "c.png")
+    assert viewer.calls == [("load", 1)]
+
+
+def test_on_filter_ready_keeps_visible_current_image_and_reports_empty_result() -> None:
+    viewer = _filter_viewer(["a.png", "b.png"], current_index=1)
+    viewer.dimension_filter = DimensionFilter(min_height=10)
+
+    ImageViewer.on_filter_ready(viewer, 1, viewer.dimension_filter, b"\x01\x00")
+    assert viewer.current_index == 0
+    assert viewer.calls == [("title", "[1/1] b.png")]
+
+    ImageViewer.on_filter_ready(viewer, 1, viewer.dimension_filter, b"\x01\x01")
+    assert viewer.calls[-1] == ("clear",)
+    assert viewer.image_label.texts == ["条件に合う画像がありません。"]
+
+    # 条件を外すと先頭から表示し直す
+    ImageViewer._apply_hidden(viewer, None)
+    assert viewer.calls[-1] == ("load", 0)
+
+
+def _folder_listing(directory: str = "next") -> FolderListing:
+    return FolderListing(directory, ["b.png", "a.png"], [1, 0], _Pixmap())
+
+
+def test_show_sibling_folder_opens_prefetched_listing_without_decoding() -> None:
+    displayed: list[tuple] = []
+    prefetched: list[tuple] = []
+    listing = _folder_listing()
+    viewer = SimpleNamespace(
+        is_loading=False,
+        recursive_mode=False,
+        image_files=ImageFileList("current", ["x.png"]),
+        current_index=0,
+        _load_generation=1,
+        _sibling_folders={1: listing},
+        _name_index={"x.png": 0},
+        _forwarded_selection=["x.png"],
+        _forwarded_hidden=b"\x00",
+        _integrity_failures={"x.png"},
+        tree_scanner=_TreeScanner(),
+        file_probe=_TreeScanner(),
+        duplicate_finder=_TreeScanner(),
+        integrity_checker=_TreeScanner(),
+    )
+    viewer._clear_display = lambda: None
+    viewer._begin_listing = lambda: ImageViewer._begin_listing(viewer)
+    viewer._request_sibling_prefetch = lambda *args: prefetched.append(args)
+    viewer._remember_histogram = lambda path, histogram: None
+    viewer._show_sibling_folder = lambda direction: ImageViewer._show_sibling_folder(
+        viewer, direction
+    )
+    viewer.load_image_by_index = lambda preloaded=None: displayed.append(
+        (viewer.current_index, viewer.image_files[viewer.current_index], preloaded)
+    )
+    viewer._on_listing_ready = lambda: None
+
+    ImageViewer.show_next_folder(viewer)
+
+    assert viewer._load_generation == 2
+    # ファイルを開き直したときと同じく、前の一覧に紐づく処理と状態を捨てる
+    for worker in (
+        viewer.tree_scanner,
+        viewer.file_probe,
+        viewer.duplicate_finder,
+        viewer.integrity_checker,
+    ):
+        assert worker.cancelled == [2]
+    assert viewer._name_index is None
+    assert viewer._forwarded_selection is None
+    assert viewer._forwarded_hidden is None
+    assert viewer._integrity_failures is None
+    assert prefetched == [(2, "next")]
+    # worker でソート済みの順序（a.png が先頭）をそのまま使い、先読み画像を渡す
+    assert displayed == [(0, os.path.join("next", "a.png"), listing.first_image)]
+
+
+def test_show_sibling_folder_waits_for_prefetch_and_reports_missing_folder() -> None:
+    status_bar = _StatusBar()
+    jumped: list[int] = []
+    viewer = SimpleNamespace(
+        is_loading=False,
+        image_files=ImageFileList("current", ["x.png"]),
+        _load_generation=1,
+        _sibling_folders={},
+        _pending_folder_jump=0,
+    )
+    viewer.statusBar = lambda: status_bar
+    viewer._show_sibling_folder = lambda direction: ImageViewer._show_sibling_folder(
+        viewer, direction
+    )
+
+    ImageViewer.show_prev_folder(viewer)
+    assert viewer._pending_folder_jump == -1
+
+    # 先読みが届いたら、待っていた方向へ移動する
+    viewer._show_sibling_folder = jumped.append
+    ImageViewer.on_sibling_prefetched(viewer, 1, 1, None)
+    ImageViewer.on_sibling_prefetched(viewer, 1, -1, None)
+    ImageViewer.on_sibling_prefetched(viewer, 0, -1, _folder_listing())
+    assert jumped == [-1]
+    assert viewer._sibling_folders == {1: None, -1: None}
+
+    ImageViewer._show_sibling_folder(viewer, 1)
+    assert status_bar.messages == [
+        ("フォルダを検索中...", None),
+        ("次のフォルダはありません", 3000),
+    ]
+
+
+def test_load_image_by_index_displays_preloaded_image_directly(tmp_path) -> None:
+    displayed: list[tuple] = []
+    emitter = _Emitter()
+    image = _Pixmap()
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        is_loading=False,
+        current_index=0,
+        image_files=[str(tmp_path / "a.png")],
+        request_load_image=emitter,
+        _load_generation=3,
+    )
+    viewer.windowTitle = lambda: "Window"
+    viewer.setWindowTitle = lambda title: None
+    viewer.statusBar = lambda: _StatusBar()
+    viewer.update_image_display = lambda *args: displayed.append(args)
+
+    ImageViewer.load_image_by_index(viewer, preloaded=image)
+
+    assert emitter.emitted == []
+    assert displayed == [(3, str(tmp_path / "a.png"), image)]
+
+
+def test_set_recursive_mode_reloads_current_file() -> None:
+    loaded: list[str] = []
+    viewer = SimpleNamespace(
+        recursive_mode=False,
+        image_files=ImageFileList("root", ["a.png"]),
+        current_index=0,
+    )
+    viewer.load_image_from_path = loaded.append
+
+    ImageViewer._set_recursive_mode(viewer, True)
+
+    assert viewer.recursive_mode is True
+    assert loaded == [os.path.join("root", "a.png")]
+
+
+def test_load_image_from_path_ignores_empty_path() -> None:
+    viewer = SimpleNamespace()
+    viewer._clear_display = lambda: (_ for _ in ()).throw(AssertionError("should not clear"))
+
+    ImageViewer.load_image_from_path(viewer, "")
+
+
+def test_on_file_list_loaded_sets_error_text_for_empty_list() -> None:
+    label = _ImageLabel()
+    viewer = SimpleNamespace(image_label=label, _load_generation=0)
+
+    ImageViewer.on_file_list_loaded(viewer, 0, "", [], -1)
+
+    assert label.texts == ["画像の読み込みに失敗しました。"]
+
+
+def test_on_file_list_loaded_sorts_and_keeps_selected_file(monkeypatch) -> None:
+    loaded: list[int] = []
+    monkeypatch.setattr(navigation, "windows_logical_key", lambda path: path)
+    viewer = SimpleNamespace(
+        image_files=ImageFileList.empty(),
+        is_shuffled=True,
+        current_index=-1,
+        _load_generation=1,
+    )
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+    viewer._on_listing_ready = lambda: loaded.append("listing")
+
+    ImageViewer.on_file_list_loaded(viewer, 1, "dir", ["b.png", "a.png"], 0)
+
+    assert list(viewer.image_files) == [os.path.join("dir", "a.png"), os.path.join("dir", "b.png")]
+    assert viewer.is_shuffled is False
+    assert viewer.current_index == 1
+    assert loaded == [1, "listing"]
+
+
+def test_on_file_list_loaded_ignores_stale_generation(monkeypatch) -> None:
+    loaded: list[int] = []
+    monkeypatch.setattr(navigation, "windows_logical_key", lambda path: path)
+    viewer = SimpleNamespace(
+        image_files=ImageFileList.empty(),
+        is_shuffled=False,
+        current_index=-1,
+        _load_generation=2,
+    )
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+
+    # 世代 1 の結果が返ってきても、現在の世代 2 とは異なるので無視する
+    ImageViewer.on_file_list_loaded(viewer, 1, "dir", ["a.png", "b.png"], 0)
+
+    assert len(viewer.image_files) == 0
+    assert loaded == []
+
+
+def test_load_image_by_index_emits_current_file(tmp_path) -> None:
+    image_path = tmp_path / "a.png"
+    image_path.write_bytes(b"fake image")
+    status_bar = _StatusBar()
+    emitter = _Emitter()
+    titles: list[str] = []
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        is_loading=False,
+        current_index=0,
+        image_files=[str(image_path)],
+        fit_to_window=False,
+        scale_factor=3.0,
+        current_filesize=0,
+        request_load_image=emitter,
+        image_loader=SimpleNamespace(cancel_mipmaps=lambda: None),
+        _load_generation=4,
+    )
+    viewer.windowTitle = lambda: "Window"
+    viewer.setWindowTitle = titles.append
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.load_image_by_index(viewer)
+
+    assert viewer.fit_to_window is True
+    assert viewer.scale_factor == 1.0
+    assert viewer.is_loading is True
+    assert viewer.current_filesize == len(b"fake image")
+    assert titles == ["Window | 読み込み中..."]
+    assert status_bar.messages == [("読み込み中...", None)]
+    assert emitter.emitted == [(4, str(image_path))]
+
+
+def _file_operation_viewer(image_files, current_index: int = 0) -> SimpleNamespace:
+    """仕分け/削除の依頼を記録するだけの viewer（ファイル操作はワーカー側の責務）"""
+    viewer = SimpleNamespace(
+        is_loading=False,
+        image_files=image_files,
+        current_index=current_index,
+        _load_generation=1,
+        _next_file_op_id=0,
+        _pending_file_operations={},
+        _undo_journal=deque(maxlen=constants.UNDO_JOURNAL_SIZE),
+        _release_current_file_handles=lambda: None,
+        request_move_file=_Emitter(),
+        request_trash_file=_Emitter(),
+        _clear_display=lambda: None,
+        load_image_by_index=lambda: None,
+    )
+    viewer._queue_file_operation = lambda kind, destination="", name_id=None: (
+        ImageViewer._queue_file_operation(viewer, kind, destination, name_id)
+    )
+    viewer._remove_current_and_load_next = lambda: (
+        ImageViewer._remove_current_and_load_next(viewer)
+    )
+    viewer._reinsert_file = lambda operation, jump: (
+        ImageViewer._reinsert_file(viewer, operation, jump)
+    )
+    viewer._refresh_title = lambda: None
+    return viewer
+
+
+def test_move_current_image_and_load_next_queues_move_to_subfolder(tmp_path) -> None:
+    image_path = tmp_path / "a.png"
+    next_path = tmp_path / "b.png"
+    loaded: list[int] = []
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png"]))
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+
+    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+
+    destination = os.path.join(str(tmp_path), OK_FOLDER, "a.png")
+    assert viewer.request_move_file.emitted == [(1, str(image_path), destination)]
+    assert viewer._pending_file_operations[1] == FileOperation(
+        1, FILE_OP_MOVE, str(image_path), destination, 1, 0
+    )
+    assert list(viewer.image_files) == [str(next_path)]
+    assert loaded == [0]
+
+
+def test_delete_current_image_and_load_next_queues_trash(tmp_path) -> None:
+    image_path = tmp_path / "a.png"
+    next_path = tmp_path / "b.png"
+    loaded: list[int] = []
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png"]))
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+
+    ImageViewer.delete_current_image_and_load_next(viewer)
+
+    assert viewer.request_trash_file.emitted == [(1, str(image_path))]
+    assert list(viewer.image_files) == [str(next_path)]
+    assert loaded == [0]
+
+
+def test_update_status_bar_shows_static_image_details() -> None:
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        original_pixmap=_Pixmap(),
+        current_filesize=1024 * 1024,
+        fit_to_window=True,
+        scroll_area=_ScrollAreaWithViewport(),
+        is_shuffled=False,
+        is_animating=lambda: False,
+        sort_key="name",
+        dimension_filter=DimensionFilter(),
+        _search_prompt=None,
+        _duplicate_groups=None,
+    )
+    viewer.statusBar = lambda: status_bar
+    _bind_device_pixels(viewer)
+
+    ImageViewer.update_status_bar(viewer)
+    # 200% の画面では同じビューポートに画面の画素で倍の大きさまで収まる
+    _bind_device_pixels(viewer, 2.0)
+    ImageViewer.update_status_bar(viewer)
+
+    assert status_bar.messages == [
+        ("🖼️ 200x100  |  💾 1.00MB  |  ↕️ 200.0%", None),
+        ("🖼️ 200x100  |  💾 1.00MB  |  ↕️ 400.0%", None),
+    ]
+
+
+def test_update_status_bar_clears_message_without_pixmap() -> None:
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(original_pixmap=_Pixmap(is_null=True), _search_prompt=None)
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.update_status_bar(viewer)
+
+    assert status_bar.cleared is True
+
+
+def test_load_image_by_index_ignores_invalid_index() -> None:
+    viewer = SimpleNamespace(is_loading=False, current_index=2, image_files=["a.png"])
+    viewer.request_load_image = _Emitter()
+
+    ImageViewer.load_image_by_index(viewer)
+
+    assert viewer.request_load_image.emitted == []
+
+
+def test_load_image_by_index_uses_zero_filesize_for_missing_file(tmp_path) -> None:
+    missing_path = tmp_path / "missing.png"
+    status_bar = _StatusBar()
+    emitter = _Emitter()
+    titles: list[str] = []
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        is_loading=False,
+        current_index=0,
+        image_files=[str(missing_path)],
+        request_load_image=emitter,
+        image_loader=SimpleNamespace(cancel_mipmaps=lambda: None),
+        _load_generation=4,
+    )
+    viewer.windowTitle = lambda: "Window"
+    viewer.setWindowTitle = titles.append
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.load_image_by_index(viewer)
+
+    assert viewer.current_filesize == 0
+    assert emitter.emitted == [(4, str(missing_path))]
+
+
+def test_move_current_image_and_load_next_clears_when_last_file(tmp_path) -> None:
+    calls: list[str] = []
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png"]))
+    viewer._clear_display = lambda: calls.append("clear")
+
+    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+
+    assert len(viewer.request_move_file.emitted) == 1
+    assert len(viewer.image_files) == 0
+    assert calls == ["clear"]
+
+
+def test_failed_move_restores_file_and_reports_error(tmp_path) -> None:
+    status_bar = _StatusBar()
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png", "c.png"]))
+    viewer.statusBar = lambda: status_bar
+    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+    viewer.current_index = 1  # c.png を表示中
+
+    ImageViewer.on_file_operation_failed(viewer, 1, "denied")
+
+    assert list(viewer.image_files) == [str(tmp_path / n) for n in ("a.png", "b.png", "c.png")]
+    assert viewer.current_index == 2
+    assert viewer._pending_file_operations == {}
+    assert viewer._undo_journal == deque()
+    assert status_bar.messages == [("エラー: ファイルの移動に失敗しました", 5000)]
+
+
+def test_delete_current_image_and_load_next_clears_when_last_file(tmp_path) -> None:
+    calls: list[str] = []
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png"]))
+    viewer._clear_display = lambda: calls.append("clear")
+
+    ImageViewer.delete_current_image_and_load_next(viewer)
+
+    assert viewer.request_trash_file.emitted == [(1, str(tmp_path / "a.png"))]
+    assert len(viewer.image_files) == 0
+    assert calls == ["clear"]
+
+
+def test_failed_delete_of_last_file_shows_it_again(tmp_path) -> None:
+    status_bar = _StatusBar()
+    loaded: list[int] = []
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png"]))
+    viewer.statusBar = lambda: status_bar
+    ImageViewer.delete_current_image_and_load_next(viewer)
+    viewer.current_index = -1  # _clear_display 後の状態
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+
+    ImageViewer.on_file_operation_failed(viewer, 1, "denied")
+
+    assert list(viewer.image_files) == [str(tmp_path / "a.png")]
+    assert loaded == [0]
+    assert status_bar.messages == [("エラー: ファイルの削除に失敗しました", 5000)]
+
+
+def test_failed_operation_from_previous_listing_only_reports_error(tmp_path) -> None:
+    status_bar = _StatusBar()
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png"]))
+    viewer.statusBar = lambda: status_bar
+    ImageViewer.delete_current_image_and_load_next(viewer)
+    viewer._load_generation = 2
+
+    ImageViewer.on_file_operation_failed(viewer, 1, "denied")
+
+    assert list(viewer.image_files) == [str(tmp_path / "b.png")]
+    assert status_bar.messages == [("エラー: ファイルの削除に失敗しました", 5000)]
 
 
-def test_stop_movie_stops_and_clears_current_movie() -> None:
-    movie = _Movie()
-    label = _ImageLabel()
-    viewer = SimpleNamespace(current_movie=movie, image_label=label)
+def test_finished_move_is_recorded_for_undo_but_trash_is_not(tmp_path) -> None:
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png", "c.png"]))
+    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+    ImageViewer.delete_current_image_and_load_next(viewer)
+
+    ImageViewer.on_file_operation_finished(viewer, 1)
+    ImageViewer.on_file_operation_finished(viewer, 2)
+    ImageViewer.on_file_operation_finished(viewer, 99)
+
+    assert [operation.op_id for operation in viewer._undo_journal] == [1]
+    assert viewer._pending_file_operations == {}
+
+
+def test_undo_last_file_operation_moves_file_back_and_shows_it(tmp_path) -> None:
+    status_bar = _StatusBar()
+    loaded: list[int] = []
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png"]))
+    viewer.statusBar = lambda: status_bar
+    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+    ImageViewer.on_file_operation_finished(viewer, 1)
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+
+    ImageViewer.undo_last_file_operation(viewer)
+
+    moved = os.path.join(str(tmp_path), OK_FOLDER, "a.png")
+    assert viewer.request_move_file.emitted[-1] == (2, moved, str(tmp_path / "a.png"))
+    assert viewer._undo_journal == deque()
+
+    ImageViewer.on_file_operation_finished(viewer, 2)
+
+    assert list(viewer.image_files) == [str(tmp_path / "a.png"), str(tmp_path / "b.png")]
+    assert loaded == [0]
+    assert status_bar.messages == [("元に戻しました: a.png", 3000)]
+
+
+def test_failed_undo_keeps_move_in_journal(tmp_path) -> None:
+    status_bar = _StatusBar()
+    viewer = _file_operation_viewer(ImageFileList(str(tmp_path), ["a.png", "b.png"]))
+    viewer.statusBar = lambda: status_bar
+    ImageViewer.move_current_image_and_load_next(viewer, OK_FOLDER)
+    ImageViewer.on_file_operation_finished(viewer, 1)
+    ImageViewer.undo_last_file_operation(viewer)
+
+    ImageViewer.on_file_operation_failed(viewer, 2, "exists")
+
+    (operation,) = viewer._undo_journal
+    assert operation.kind == FILE_OP_MOVE
+    assert operation.source == str(tmp_path / "a.png")
+    assert list(viewer.image_files) == [str(tmp_path / "b.png")]
+    assert status_bar.messages == [("エラー: 元に戻せませんでした（exists）", 5000)]
+
+
+def test_undo_last_file_operation_reports_empty_journal() -> None:
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(_undo_journal=deque())
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.undo_last_file_operation(viewer)
+
+    assert status_bar.messages == [("元に戻せる仕分けはありません", 3000)]
+
+
+def test_on_move_progress_shows_percentage() -> None:
+    status_bar = _StatusBar()
+    operation = FileOperation(3, FILE_OP_MOVE, "/p/a.png", "/p/_ok/a.png", 1, 0)
+    viewer = SimpleNamespace(_pending_file_operations={3: operation})
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.on_move_progress(viewer, 3, 25, 100)
+    ImageViewer.on_move_progress(viewer, 4, 25, 100)
+
+    assert status_bar.messages == [("📦 移動中... 25% a.png", 2000)]
+
+
+def test_open_image_requests_selected_file(monkeypatch) -> None:
+    loaded: list[str] = []
+    viewer = SimpleNamespace(is_loading=False)
+    viewer.load_image_from_path = loaded.append
+    monkeypatch.setattr(
+        main_window.QFileDialog,
+        "getOpenFileName",
+        lambda *args: ("selected.png", ""),
+    )
+
+    ImageViewer.open_image(viewer)
+
+    assert loaded == ["selected.png"]
+
+
+def test_open_image_ignores_loading_state() -> None:
+    viewer = SimpleNamespace(is_loading=True)
+    viewer.load_image_from_path = lambda path: (_ for _ in ()).throw(AssertionError)
 
-    ImageViewer.stop_movie(viewer)
+    ImageViewer.open_image(viewer)
+
+
+def test_redraw_image_ignores_null_pixmap() -> None:
+    viewer = SimpleNamespace(original_pixmap=_Pixmap(is_null=True))
+    viewer._redraw_static_image = lambda fast=False: (_ for _ in ()).throw(AssertionError)
 
-    assert movie.stopped is True
-    assert viewer.current_movie is None
-    assert label.movies == [None]
+    ImageViewer.redraw_image(viewer)
 
 
-def test_update_status_bar_includes_shuffle_and_movie_state() -> None:
+def test_update_status_bar_includes_shuffle_and_animation_state() -> None:
     status_bar = _StatusBar()
     viewer = SimpleNamespace(
+        _compare_pair=None,
         original_pixmap=_Pixmap(),
         current_filesize=512 * 1024,
         fit_to_window=False,
         scale_factor=1.25,
         is_shuffled=True,
-        current_movie=_Movie(QMovie.MovieState.Paused),
+        is_animating=lambda: True,
+        _animation_paused=True,
+        _animation_index=1,
+        _animation_frame_count=3,
+        _animation_dropped=2,
+        sort_key="mtime",
+        dimension_filter=DimensionFilter(min_width=100),
+        image_files=ImageFileList("dir", ["a.png", "b.png"]),
+        _search_prompt="🔍 ab",
+        _duplicate_groups=None,
     )
     viewer.statusBar = lambda: status_bar
 
     ImageViewer.update_status_bar(viewer)
 
     assert status_bar.messages == [
-        ("🖼️ 200x100  |  💾 0.50MB  |   125.0%  |  🔀  |  🎞️ [2/3] ⏸", None)
+        (
+            "🔍 ab  |  🖼️ 200x100  |  💾 0.50MB  |   125.0%  |  ⇅ 更新日時  |  📐 2/2  |  🔀  |  "
+            "🎞️ [2/3] 落ち 2 ⏸",
+            None,
+        )
     ]
 
 
+def test_update_status_bar_shows_duplicate_group_instead_of_filter() -> None:
+    status_bar = _StatusBar()
+    image_files = ImageFileList("dir", ["a.png", "b.png", "c.png"])
+    image_files.set_hidden(b"\x00\x01\x00")
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        original_pixmap=_Pixmap(),
+        current_filesize=0,
+        fit_to_window=False,
+        scale_factor=1.0,
+        is_shuffled=False,
+        is_animating=lambda: False,
+        sort_key="name",
+        dimension_filter=DimensionFilter(min_width=100),
+        image_files=image_files,
+        _search_prompt=None,
+        _duplicate_groups=[[0, 2], [1, 2]],
+        _duplicate_group_index=0,
+    )
+    viewer.statusBar = lambda: status_bar
+
+    ImageViewer.update_status_bar(viewer)
+
+    assert status_bar.messages[-1][0].endswith("🧬 グループ 1/2 (2枚)")
+
+
 def test_handle_wheel_event_dispatches_zoom_or_scroll() -> None:
     calls: list[str] = []
     viewer = SimpleNamespace(is_loading=False)
@@ -796,7 +1645,7 @@ def test_handle_wheel_event_dispatches_zoom_or_scroll() -> None:
     assert calls == ["zoom", "scroll"]
 
 
-def test_mouse_press_starts_panning_or_toggles_gif(monkeypatch) -> None:
+def test_mouse_press_starts_panning_or_toggles_animation(monkeypatch) -> None:
     cursors: list[object] = []
     monkeypatch.setattr(input_events, "QCursor", lambda shape: ("cursor", shape))
     viewer = SimpleNamespace(
@@ -806,7 +1655,7 @@ def test_mouse_press_starts_panning_or_toggles_gif(monkeypatch) -> None:
         pan_last_mouse_pos=None,
     )
     viewer.setCursor = cursors.append
-    viewer._toggle_gif_playback = lambda: False
+    viewer._toggle_animation_playback = lambda: False
 
     assert ImageViewer._handle_mouse_press_on_viewport(viewer, _MouseEvent())
     assert viewer.is_panning is True
@@ -815,14 +1664,39 @@ def test_mouse_press_starts_panning_or_toggles_gif(monkeypatch) -> None:
 
     viewer.fit_to_window = True
     viewer.space_key_pressed = False
-    viewer._toggle_gif_playback = lambda: True
+    viewer._toggle_animation_playback = lambda: True
     assert ImageViewer._handle_mouse_press_on_viewport(viewer, _MouseEvent())
 
 
+class _ViewUpdateTimer:
+    def __init__(self) -> None:
+        self.starts = 0
+
+    def isActive(self) -> bool:
+        return self.starts > 0
+
+    def start(self) -> None:
+        self.starts += 1
+
+
+def _view_update_viewer(**attributes) -> SimpleNamespace:
+    """パン/ズームを溜めて 1 フレームにまとめて反映するメソッドを付けた viewer"""
+    viewer = SimpleNamespace(
+        _pending_pan=(0.0, 0.0),
+        _pending_zoom=1.0,
+        _pending_zoom_shift=(0.0, 0.0),
+        _view_update_timer=_ViewUpdateTimer(),
+        **attributes,
+    )
+    viewer._schedule_view_update = lambda: ImageViewer._schedule_view_update(viewer)
+    viewer._pan_by = lambda dx, dy: ImageViewer._pan_by(viewer, dx, dy)
+    return viewer
+
+
 def test_mouse_move_and_release_update_panning_state(monkeypatch) -> None:
     cursors: list[object] = []
     monkeypatch.setattr(input_events, "QCursor", lambda shape: ("cursor", shape))
-    viewer = SimpleNamespace(
+    viewer = _view_update_viewer(
         is_panning=True,
         pan_last_mouse_pos=_Point(4, 8),
         scroll_area=_ScrollArea(),
@@ -831,9 +1705,13 @@ def test_mouse_move_and_release_update_panning_state(monkeypatch) -> None:
     viewer.setCursor = cursors.append
 
     assert ImageViewer._handle_mouse_move_on_viewport(viewer, _MouseEvent())
+    # スクロールは次の表示フレームでまとめて行う
+    assert viewer.scroll_area.horizontalScrollBar().value() == 100
+    assert viewer._pending_pan == (6, 12)
+    assert viewer.pan_last_mouse_pos.x() == 10
+    ImageViewer._apply_view_update(viewer)
     assert viewer.scroll_area.horizontalScrollBar().value() == 94
     assert viewer.scroll_area.verticalScrollBar().value() == 188
-    assert viewer.pan_last_mouse_pos.x() == 10
 
     assert ImageViewer._handle_mouse_release_on_viewport(viewer, _MouseEvent())
     assert viewer.is_panning is False
@@ -842,7 +1720,7 @@ def test_mouse_move_and_release_update_panning_state(monkeypatch) -> None:
 
 def test_mouse_handlers_return_false_for_unhandled_events() -> None:
     viewer = SimpleNamespace(is_panning=False, fit_to_window=True, space_key_pressed=False)
-    viewer._toggle_gif_playback = lambda: False
+    viewer._toggle_animation_playback = lambda: False
 
     assert (
         ImageViewer._handle_mouse_press_on_viewport(viewer, _MouseEvent(Qt.MouseButton.RightButton))
@@ -852,41 +1730,506 @@ def test_mouse_handlers_return_false_for_unhandled_events() -> None:
     assert ImageViewer._handle_mouse_release_on_viewport(viewer, _MouseEvent()) is False
 
 
-def test_handle_key_press_on_scroll_area_dispatches_commands() -> None:
-    calls: list[tuple] = []
-    viewer = SimpleNamespace(is_loading=False)
-    viewer.move_current_image_and_load_next = lambda folder: calls.append(("move", folder))
-    viewer.show_next_image = lambda: calls.append(("next",))
-    viewer.show_prev_image = lambda: calls.append(("prev",))
-    viewer.delete_current_image_and_load_next = lambda: calls.append(("delete",))
-    viewer._step_gif_frame = lambda key: calls.append(("step", key))
+def test_handle_key_press_on_scroll_area_dispatches_commands() -> None:
+    calls: list[tuple] = []
+    viewer = SimpleNamespace(is_loading=False, _search_text=None, _compare_pair=None)
+    viewer.move_current_image_and_load_next = lambda folder: calls.append(("move", folder))
+    viewer.show_next_image = lambda: calls.append(("next",))
+    viewer.show_prev_image = lambda: calls.append(("prev",))
+    viewer.delete_current_image_and_load_next = lambda: calls.append(("delete",))
+    viewer._step_animation_frame = lambda step: calls.append(("step", step))
+    viewer.show_next_folder = lambda: calls.append(("next_folder",))
+    viewer.show_prev_folder = lambda: calls.append(("prev_folder",))
+    viewer._start_name_search = lambda: calls.append(("search",))
+    viewer.undo_last_file_operation = lambda: calls.append(("undo",))
+    viewer.show_next_duplicate_group = lambda: calls.append(("next_group",))
+    viewer.show_prev_duplicate_group = lambda: calls.append(("prev_group",))
+
+    events = [
+        _KeyEvent(Qt.Key.Key_7, Qt.KeyboardModifier.KeypadModifier),
+        _KeyEvent(Qt.Key.Key_9, Qt.KeyboardModifier.KeypadModifier),
+        _KeyEvent(Qt.Key.Key_Right),
+        _KeyEvent(Qt.Key.Key_Left),
+        _KeyEvent(Qt.Key.Key_Delete),
+        _KeyEvent(Qt.Key.Key_Period),
+        _KeyEvent(Qt.Key.Key_Comma),
+        _KeyEvent(Qt.Key.Key_Right, Qt.KeyboardModifier.ControlModifier),
+        _KeyEvent(Qt.Key.Key_PageUp, Qt.KeyboardModifier.ControlModifier),
+        _KeyEvent(Qt.Key.Key_Slash),
+        _KeyEvent(Qt.Key.Key_F, Qt.KeyboardModifier.ControlModifier),
+        _KeyEvent(Qt.Key.Key_Z, Qt.KeyboardModifier.ControlModifier),
+        _KeyEvent(Qt.Key.Key_BracketRight),
+        _KeyEvent(Qt.Key.Key_BracketLeft),
+    ]
+
+    assert all(ImageViewer._handle_key_press_on_scroll_area(viewer, event) for event in events)
+    assert calls == [
+        ("move", "_ok"),
+        ("move", "_ng"),
+        ("next",),
+        ("prev",),
+        ("delete",),
+        ("step", 1),
+        ("step", -1),
+        ("next_folder",),
+        ("prev_folder",),
+        ("search",),
+        ("search",),
+        ("undo",),
+        ("next_group",),
+        ("prev_group",),
+    ]
+    assert ImageViewer._handle_key_press_on_scroll_area(viewer, _KeyEvent(Qt.Key.Key_A)) is False
+
+
+class _ScrubTimer:
+    def __init__(self) -> None:
+        self.active = False
+
+    def isActive(self) -> bool:
+        return self.active
+
+    def start(self) -> None:
+        self.active = True
+
+    def stop(self) -> None:
+        self.active = False
+
+
+def _scrub_viewer(names: list[str]) -> SimpleNamespace:
+    calls: list[str] = []
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        is_loading=False,
+        _search_text=None,
+        image_files=ImageFileList("dir", names),
+        current_index=0,
+        _scrub_timer=_ScrubTimer(),
+        calls=calls,
+    )
+    viewer.statusBar = lambda: status_bar
+    viewer.setWindowTitle = lambda title: calls.append(title)
+    viewer.load_image_by_index = lambda: calls.append(("load", viewer.current_index))
+    viewer.show_next_image = lambda: calls.append("next")
+    viewer._scrub = lambda step: ImageViewer._scrub(viewer, step)
+    viewer._end_scrub = lambda: ImageViewer._end_scrub(viewer)
+    viewer._end_scrub_now = lambda: ImageViewer._end_scrub_now(viewer)
+    return viewer
+
+
+def test_key_repeat_scrubs_without_decoding_until_release() -> None:
+    viewer = _scrub_viewer(["a.png", "b.png", "c.png"])
+    right = _KeyEvent(Qt.Key.Key_Right, auto_repeat=True)
+
+    assert ImageViewer._handle_key_press_on_scroll_area(viewer, _KeyEvent(Qt.Key.Key_Right))
+    viewer.is_loading = True  # 最初の 1 枚を読み込み中
+    assert ImageViewer._handle_key_press_on_scroll_area(viewer, right)
+    assert ImageViewer._handle_key_press_on_scroll_area(viewer, right)
+    assert ImageViewer._handle_key_press_on_scroll_area(
+        viewer, _KeyEvent(Qt.Key.Key_Left, auto_repeat=True)
+    )
+
+    # 押しっぱなしの間は番号と名前を出すだけで、デコードを頼まない
+    assert viewer.calls == ["next", "[2/3] b.png", "[3/3] c.png", "[2/3] b.png"]
+    assert viewer.statusBar().messages[-1] == ("⏩ [2/3] b.png", None)
+    # 位置が表示とずれている間は仕分け/削除を受け付けない
+    assert viewer.is_loading is True
+    assert viewer._scrub_timer.isActive()
+
+    ImageViewer._end_scrub_now(viewer)
+    ImageViewer._end_scrub_now(viewer)
+
+    # 止まった位置だけを 1 回読み込む
+    assert viewer.calls[-1] == ("load", 1)
+    assert viewer.calls.count(("load", 1)) == 1
+    assert viewer.is_loading is False
+
+
+def _compare_viewer(names: list[str]) -> SimpleNamespace:
+    calls: list = []
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(
+        is_loading=False,
+        _search_text=None,
+        image_files=ImageFileList("dir", names),
+        current_index=0,
+        original_pixmap=_Pixmap(200, 100),
+        svg_path=None,
+        fit_to_window=False,
+        scale_factor=2.0,
+        _mipmaps=[],
+        _renditions=OrderedDict(),
+        _rendition_source=0,
+        _compare_pair=None,
+        _compare_views={},
+        _load_generation=5,
+        request_load_image=_Emitter(),
+        calls=calls,
+    )
+    viewer.statusBar = lambda: status_bar
+    viewer.stop_animation = lambda: calls.append("stop")
+    viewer.redraw_image = lambda: calls.append(("redraw", viewer.original_pixmap))
+    viewer.update_status_bar = lambda: None
+    viewer._refresh_title = lambda: calls.append(("title", viewer.current_index))
+    viewer._refresh_histogram_overlay = lambda: None
+    for name in (
+        "_start_comparison",
+        "_leave_compare_mode",
+        "_current_compare_view",
+        "_compare_id_for_path",
+        "_compare_opponent",
+        "_flip_comparison",
+        "_show_compare_view",
+        "_decide_comparison",
+        "_move_files_to_folder",
+    ):
+        setattr(viewer, name, getattr(ImageViewer, name).__get__(viewer))
+    viewer._queue_file_operation = lambda kind, destination, name_id: calls.append(
+        ("queue", destination, name_id)
+    )
+    viewer._release_current_file_handles = lambda: calls.append("release")
+    return viewer
+
+
+def test_compare_mode_keeps_both_images_decoded_and_flips_without_reloading(
+    monkeypatch,
+) -> None:
+    monkeypatch.setattr(compare, "QPixmap", _FakeQPixmap)
+    viewer = _compare_viewer(["a.png", "b.png", "c.png"])
+    first = viewer.original_pixmap
+
+    ImageViewer._toggle_compare_mode(viewer)
+    assert viewer._compare_pair == (0, 1)
+    assert viewer.request_load_image.emitted == [(5, os.path.join("dir", "b.png"))]
+
+    # 相手のデコード結果は表示せずに持っておく（倍の大きさの画像）
+    second = _Pixmap(400, 200)
+    assert ImageViewer._store_compare_image(viewer, os.path.join("dir", "b.png"), second)
+    assert viewer.original_pixmap is first
+
+    assert ImageViewer._handle_compare_key(viewer, _KeyEvent(Qt.Key.Key_Right))
+    assert viewer.original_pixmap is second
+    assert viewer.current_index == 1
+    # 表示上の幅が揃うよう倍率を合わせる
+    assert viewer.scale_factor == 1.0
+    assert ImageViewer._handle_compare_key(viewer, _KeyEvent(Qt.Key.Key_Left))
+    assert viewer.original_pixmap is first
+    assert viewer.current_index == 0
+    assert viewer.scale_factor == 2.0
+    # 切り替えではデコードし直さない
+    assert len(viewer.request_load_image.emitted) == 1
+
+
+def test_compare_flip_waits_until_opponent_is_decoded() -> None:
+    viewer = _compare_viewer(["a.png", "b.png"])
+    first = viewer.original_pixmap
+    ImageViewer._toggle_compare_mode(viewer)
+
+    ImageViewer._handle_compare_key(viewer, _KeyEvent(Qt.Key.Key_Right))
+
+    assert viewer.original_pixmap is first
+    assert viewer.statusBar().messages[-1] == ("比較する画像を読み込み中...", 2000)
+
+
+def test_compare_enter_sends_opponent_to_ng_and_keeps_winner_on_screen(monkeypatch) -> None:
+    monkeypatch.setattr(compare, "QPixmap", _FakeQPixmap)
+    viewer = _compare_viewer(["a.png", "b.png", "c.png"])
+    ImageViewer._toggle_compare_mode(viewer)
+    winner = _Pixmap(200, 100)
+    ImageViewer._store_compare_image(viewer, os.path.join("dir", "b.png"), winner)
+    ImageViewer._flip_comparison(viewer)
+
+    assert ImageViewer._handle_compare_key(viewer, _KeyEvent(Qt.Key.Key_Return))
+
+    loser_destination = os.path.join("dir", constants.NG_FOLDER, "a.png")
+    assert ("queue", loser_destination, 0) in viewer.calls
+    assert "release" not in viewer.calls
+    assert viewer.original_pixmap is winner
+    assert viewer.image_files.path_of(viewer.image_files.id_at(viewer.current_index)) == (
+        os.path.join("dir", "b.png")
+    )
+    # 残った方と一覧で次の画像で比較を続ける
+    assert viewer._compare_pair == (1, 2)
+    assert viewer.request_load_image.emitted[-1] == (5, os.path.join("dir", "c.png"))
+
+
+def test_compare_keypad_9_sends_shown_image_to_ng_and_ends_with_last_pair(monkeypatch) -> None:
+    monkeypatch.setattr(compare, "QPixmap", _FakeQPixmap)
+    viewer = _compare_viewer(["a.png", "b.png"])
+    ImageViewer._toggle_compare_mode(viewer)
+    winner = _Pixmap(200, 100)
+    ImageViewer._store_compare_image(viewer, os.path.join("dir", "b.png"), winner)
+
+    ImageViewer._handle_compare_key(
+        viewer, _KeyEvent(Qt.Key.Key_9, Qt.KeyboardModifier.KeypadModifier)
+    )
+
+    assert ("queue", os.path.join("dir", constants.NG_FOLDER, "a.png"), 0) in viewer.calls
+    assert viewer.original_pixmap is winner
+    assert len(viewer.image_files) == 1
+    assert viewer._compare_pair is None
+
+
+def test_load_image_by_index_ends_comparison(tmp_path) -> None:
+    calls: list = []
+    viewer = SimpleNamespace(
+        is_loading=False,
+        current_index=0,
+        image_files=[str(tmp_path / "a.png")],
+        _compare_pair=(0, 1),
+        _load_generation=1,
+    )
+    viewer._leave_compare_mode = lambda: calls.append("leave")
+    viewer.windowTitle = lambda: "Window"
+    viewer.setWindowTitle = lambda title: None
+    viewer.statusBar = lambda: _StatusBar()
+    viewer.update_image_display = lambda *args: calls.append("display")
+
+    # 画像送り等で比較中の 2 枚以外へ移ったら比較は終わる
+    ImageViewer.load_image_by_index(viewer, preloaded=_Pixmap())
+
+    assert calls == ["leave", "display"]
+    assert viewer.fit_to_window is True
+
+
+class _HistogramOverlay:
+    def __init__(self, hidden: bool = False) -> None:
+        self.hidden = hidden
+        self.histograms: list = []
+
+    def isHidden(self) -> bool:
+        return self.hidden
+
+    def set_histogram(self, histogram) -> None:
+        self.histograms.append(histogram)
+
+
+def test_histograms_are_kept_per_path_and_shown_for_current_image(monkeypatch) -> None:
+    monkeypatch.setattr(histogram_mixin, "HISTOGRAM_CACHE_SIZE", 2)
+    viewer = SimpleNamespace(
+        _load_generation=2,
+        _histograms=OrderedDict(),
+        image_files=["a.png", "b.png", "c.png"],
+        current_index=1,
+        original_pixmap=_Pixmap(),
+        histogram_overlay=_HistogramOverlay(),
+    )
+    viewer._remember_histogram = lambda path, histogram: ImageViewer._remember_histogram(
+        viewer, path, histogram
+    )
+
+    viewer._refresh_histogram_overlay = lambda: ImageViewer._refresh_histogram_overlay(viewer)
+
+    # 前の一覧の結果は捨てる
+    ImageViewer.on_histogram_ready(viewer, 1, "b.png", "old")
+    for path in ("a.png", "b.png", "c.png"):
+        ImageViewer.on_histogram_ready(viewer, 2, path, f"histogram {path}")
+    assert list(viewer._histograms) == ["b.png", "c.png"]
+    # 表示中の画像の分は、画像の後に届いた時点で出す
+    assert viewer.histogram_overlay.histograms == ["histogram b.png"]
+
+    viewer.current_index = 0
+    ImageViewer._refresh_histogram_overlay(viewer)
+    assert viewer.histogram_overlay.histograms == ["histogram b.png", None]
+
+    # 隠している間は渡さない
+    viewer.histogram_overlay.hidden = True
+    ImageViewer._refresh_histogram_overlay(viewer)
+    assert len(viewer.histogram_overlay.histograms) == 2
+
+
+def test_h_key_toggles_histogram_through_menu_action() -> None:
+    calls: list[str] = []
+    viewer = SimpleNamespace(is_loading=False)
+    viewer.histogram_action = SimpleNamespace(toggle=lambda: calls.append("toggle"))
+    viewer._toggle_histogram_overlay = lambda: ImageViewer._toggle_histogram_overlay(viewer)
+
+    ImageViewer.keyPressEvent(viewer, _KeyEvent(Qt.Key.Key_H))
+
+    assert calls == ["toggle"]
+
+
+def test_key_release_ends_scrub_only_when_really_released() -> None:
+    viewer = _scrub_viewer(["a.png", "b.png"])
+    ImageViewer._scrub(viewer, -1)
+
+    # 自動リピートの離しは無視し、本当に離したときだけ読み込む
+    ImageViewer._handle_key_release_on_scroll_area(
+        viewer, _KeyEvent(Qt.Key.Key_Left, auto_repeat=True)
+    )
+    assert ("load", 1) not in viewer.calls
+    ImageViewer._handle_key_release_on_scroll_area(viewer, _KeyEvent(Qt.Key.Key_Left))
+    assert viewer.calls[-1] == ("load", 1)
+
+
+def _duplicate_viewer(names: list[str]) -> SimpleNamespace:
+    viewer = SimpleNamespace(
+        is_loading=False,
+        image_files=ImageFileList("dir", names),
+        current_index=0,
+        _load_generation=1,
+        dimension_filter=DimensionFilter(),
+        _duplicate_groups=None,
+        _duplicate_group_index=0,
+        request_find_duplicates=_Emitter(),
+        status_bar=_StatusBar(),
+        loaded=[],
+    )
+    viewer.statusBar = lambda: viewer.status_bar
+    viewer.load_image_by_index = lambda: viewer.loaded.append(
+        viewer.image_files[viewer.current_index]
+    )
+    viewer._show_duplicate_group = lambda index, direction: ImageViewer._show_duplicate_group(
+        viewer, index, direction
+    )
+    viewer._leave_duplicate_review = lambda: ImageViewer._leave_duplicate_review(viewer)
+
+    def set_dimension_filter(dimension_filter) -> None:
+        viewer._duplicate_groups = None
+        viewer.image_files.set_hidden(None)
+
+    viewer._set_dimension_filter = set_dimension_filter
+    return viewer
+
+
+def test_toggle_duplicate_review_requests_search_for_current_listing() -> None:
+    viewer = _duplicate_viewer(["a.png", "b.png"])
+
+    ImageViewer._toggle_duplicate_review(viewer)
+    ImageViewer.on_hash_progress(viewer, 1, 1, 2)
+    ImageViewer.on_hash_progress(viewer, 0, 2, 2)
+
+    assert viewer.request_find_duplicates.emitted == [(1, "dir", ["a.png", "b.png"])]
+    assert viewer.status_bar.messages == [
+        ("🧬 類似画像を検索中...", None),
+        ("🧬 類似画像を検索中... 1/2", None),
+    ]
+
+
+def test_duplicate_review_shows_one_group_at_a_time() -> None:
+    viewer = _duplicate_viewer(["a.png", "b.png", "c.png", "d.png", "e.png"])
+
+    ImageViewer.on_duplicates_ready(viewer, 0, [[0, 1]])
+    assert viewer._duplicate_groups is None
+
+    ImageViewer.on_duplicates_ready(viewer, 1, [[0, 3], [1, 2, 4]])
+    assert list(viewer.image_files) == [os.path.join("dir", "a.png"), os.path.join("dir", "d.png")]
+    assert viewer.loaded == [os.path.join("dir", "a.png")]
+
+    ImageViewer.show_next_duplicate_group(viewer)
+    assert len(viewer.image_files) == 3
+    assert viewer._duplicate_group_index == 1
+
+    # 仕分けで 1 枚しか残っていないグループは飛ばす
+    viewer.image_files.remove_at(0)
+    viewer.image_files.remove_at(0)
+    ImageViewer.show_next_duplicate_group(viewer)
+    assert viewer._duplicate_group_index == 0
+    ImageViewer.show_prev_duplicate_group(viewer)
+    assert viewer._duplicate_group_index == 0
+    assert viewer.loaded[-1] == os.path.join("dir", "a.png")
+
+
+def test_duplicate_review_ends_when_no_group_is_left() -> None:
+    viewer = _duplicate_viewer(["a.png", "b.png", "c.png"])
+    ImageViewer.on_duplicates_ready(viewer, 1, [[0, 1]])
+    viewer.image_files.remove_at(0)
+
+    ImageViewer.show_next_duplicate_group(viewer)
+
+    assert viewer._duplicate_groups is None
+    assert len(viewer.image_files) == 2
+    assert viewer.status_bar.messages[-1] == ("確認の残っている類似画像はありません", 3000)
+
+
+def test_duplicate_review_reports_no_result_and_toggle_leaves_review() -> None:
+    viewer = _duplicate_viewer(["a.png", "b.png"])
+
+    ImageViewer.on_duplicates_ready(viewer, 1, [])
+    assert viewer.status_bar.messages == [("類似画像は見つかりませんでした", 3000)]
+
+    ImageViewer.on_duplicates_ready(viewer, 1, [[0, 1]])
+    ImageViewer._toggle_duplicate_review(viewer)
+    assert viewer._duplicate_groups is None
+    assert viewer.request_find_duplicates.emitted == []
+
+
+def _search_viewer(names: list[str], current_index: int = 0) -> SimpleNamespace:
+    image_files = ImageFileList("dir", names)
+    viewer = SimpleNamespace(
+        is_loading=False,
+        image_files=image_files,
+        current_index=current_index,
+        _load_generation=1,
+        _name_index=NameIndex(names),
+        _search_text=None,
+        _search_rank=-1,
+        _search_prompt=None,
+        loaded=[],
+    )
+    viewer.update_status_bar = lambda: None
+    viewer.load_image_by_index = lambda: viewer.loaded.append(viewer.current_index)
+    viewer._end_name_search = lambda: ImageViewer._end_name_search(viewer)
+    viewer._run_name_search = lambda after: ImageViewer._run_name_search(viewer, after)
+    return viewer
+
+
+def test_name_search_jumps_while_typing_and_cycles_with_enter() -> None:
+    viewer = _search_viewer(["cat1.png", "dog.png", "cat2.png", "hotcat.png"])
+    ImageViewer._start_name_search(viewer)
+
+    for char in "cat":
+        assert ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_A, text=char))
+    # 前方一致（cat1 → cat2）→ 部分一致（hotcat）→ 先頭へ戻る
+    for _ in range(3):
+        ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_Return))
+
+    assert viewer.loaded == [2, 3, 0]
+    assert viewer.current_index == 0
+    assert viewer._search_prompt == "🔍 cat"
+
+
+def test_name_search_skips_removed_files_and_reports_no_match() -> None:
+    viewer = _search_viewer(["a1.png", "a2.png", "b.png"], current_index=2)
+    viewer.image_files.remove_at(0)
+    ImageViewer._start_name_search(viewer)
+
+    ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_A, text="a"))
+    assert viewer.loaded == [0]
+    assert viewer.image_files[0] == os.path.join("dir", "a2.png")
+
+    ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_Z, text="z"))
+    assert viewer._search_prompt == "🔍 az（見つかりません）"
+    ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_Backspace))
+    assert viewer._search_text == "a"
+
+
+def test_name_search_ends_on_escape_or_navigation_key() -> None:
+    viewer = _search_viewer(["a.png"])
+    ImageViewer._start_name_search(viewer)
+
+    assert ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_Escape)) is True
+    assert viewer._search_text is None
+
+    ImageViewer._start_name_search(viewer)
+    # 矢印キーなどは検索を終えて通常のキー処理に回す
+    assert ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_Right)) is False
+    assert viewer._search_text is None
+    assert viewer._search_prompt is None
+
 
-    events = [
-        _KeyEvent(Qt.Key.Key_7, Qt.KeyboardModifier.KeypadModifier),
-        _KeyEvent(Qt.Key.Key_9, Qt.KeyboardModifier.KeypadModifier),
-        _KeyEvent(Qt.Key.Key_Right),
-        _KeyEvent(Qt.Key.Key_Left),
-        _KeyEvent(Qt.Key.Key_Delete),
-        _KeyEvent(Qt.Key.Key_Period),
-    ]
+def test_name_search_waits_for_index_and_ignores_stale_index() -> None:
+    viewer = _search_viewer(["a.png"])
+    viewer._name_index = None
+    ImageViewer._start_name_search(viewer)
+    ImageViewer._handle_search_key(viewer, _KeyEvent(Qt.Key.Key_A, text="a"))
 
-    assert [ImageViewer._handle_key_press_on_scroll_area(viewer, event) for event in events] == [
-        True,
-        True,
-        True,
-        True,
-        True,
-        True,
-    ]
-    assert calls == [
-        ("move", "_ok"),
-        ("move", "_ng"),
-        ("next",),
-        ("prev",),
-        ("delete",),
-        ("step", Qt.Key.Key_Period),
-    ]
-    assert ImageViewer._handle_key_press_on_scroll_area(viewer, _KeyEvent(Qt.Key.Key_A)) is False
+    assert viewer._search_prompt == "🔍 a（索引を作成中...）"
+    ImageViewer.on_name_index_ready(viewer, 0, NameIndex(["a.png"]))
+    assert viewer._name_index is None
+    ImageViewer.on_name_index_ready(viewer, 1, NameIndex(["a.png"]))
+    assert viewer._name_index is not None
 
 
 def test_key_press_event_handles_window_shortcuts(monkeypatch) -> None:
@@ -898,6 +2241,7 @@ def test_key_press_event_handles_window_shortcuts(monkeypatch) -> None:
     viewer.close = lambda: calls.append("close")
     viewer._toggle_fit_mode = lambda: calls.append("fit")
     viewer._toggle_shuffle_mode = lambda: calls.append("shuffle")
+    viewer._cycle_sort_order = lambda: calls.append("sort")
     viewer.show_metadata_dialog = lambda: calls.append("metadata")
 
     for key in [
@@ -906,12 +2250,13 @@ def test_key_press_event_handles_window_shortcuts(monkeypatch) -> None:
         Qt.Key.Key_Escape,
         Qt.Key.Key_F,
         Qt.Key.Key_R,
+        Qt.Key.Key_S,
         Qt.Key.Key_I,
     ]:
         ImageViewer.keyPressEvent(viewer, _KeyEvent(key))
 
     assert viewer.space_key_pressed is True
-    assert calls == ["cursor", "fullscreen", "close", "fit", "shuffle", "metadata"]
+    assert calls == ["cursor", "fullscreen", "close", "fit", "shuffle", "sort", "metadata"]
 
 
 def test_key_press_event_ignores_while_loading() -> None:
@@ -935,38 +2280,23 @@ def test_key_release_event_clears_space_state() -> None:
     assert calls == ["unset"]
 
 
-def test_is_animated_webp_detects_animated_webp(monkeypatch) -> None:
-    monkeypatch.setattr(
-        rendering.Image, "open", lambda path: _ImageContext(is_animated=True, n_frames=2)
-    )
-
-    assert ImageViewer._is_animated_webp(SimpleNamespace(), "image.webp") is True
-
-
-def test_is_animated_webp_returns_false_for_static_or_invalid_images(monkeypatch) -> None:
-    assert ImageViewer._is_animated_webp(SimpleNamespace(), "image.png") is False
-
-    monkeypatch.setattr(
-        rendering.Image, "open", lambda path: _ImageContext(is_animated=True, n_frames=1)
-    )
-    assert ImageViewer._is_animated_webp(SimpleNamespace(), "image.webp") is False
-
-    monkeypatch.setattr(rendering.Image, "open", lambda path: (_ for _ in ()).throw(OSError))
-    assert ImageViewer._is_animated_webp(SimpleNamespace(), "broken.webp") is False
-
-
 def test_update_image_display_sets_static_pixmap_and_title(monkeypatch) -> None:
     calls: list[str] = []
     titles: list[str] = []
     viewer = SimpleNamespace(
+        _compare_pair=None,
         image_files=["photo.png"],
         current_index=0,
-        current_movie=None,
+        is_animating=lambda: False,
         image_label=_ImageLabel(),
         _load_generation=1,
+        _svg_tiles=OrderedDict(),
     )
-    viewer.stop_movie = lambda: calls.append("stop")
+    viewer.stop_animation = lambda: calls.append("stop")
+    viewer._start_animation = lambda path, first: calls.append(f"animate {path}")
+    viewer._cancel_svg_tiles = lambda: calls.append("cancel tiles")
     viewer.redraw_image = lambda: calls.append("redraw")
+    viewer._refresh_histogram_overlay = lambda: calls.append("histogram")
     viewer.update_status_bar = lambda: calls.append("status")
     viewer.setWindowTitle = titles.append
     # worker は QImage を渡し、GUI スレッド側で QPixmap.fromImage で変換する
@@ -976,46 +2306,52 @@ def test_update_image_display_sets_static_pixmap_and_title(monkeypatch) -> None:
     ImageViewer.update_image_display(viewer, 1, "photo.png", image)
 
     assert viewer.original_pixmap is image
+    assert viewer.svg_path is None
     assert viewer.is_loading is False
-    assert calls == ["stop", "redraw", "status"]
+    # 1 枚目を表示してから、続きのフレームを worker に頼む
+    assert calls == ["stop", "cancel tiles", "redraw", "histogram", "status", "animate photo.png"]
     assert titles == ["[1/1] photo.png"]
 
 
-def test_update_image_display_uses_movie_for_gif(monkeypatch) -> None:
-    movie = _Movie()
-    titles: list[str] = []
+def test_update_image_display_keeps_svg_raster_as_placeholder(monkeypatch) -> None:
     viewer = SimpleNamespace(
-        image_files=["animation.gif"],
+        _compare_pair=None,
+        image_files=["drawing.svg"],
         current_index=0,
-        current_movie=None,
+        is_animating=lambda: False,
         image_label=_ImageLabel(),
         _load_generation=1,
+        _svg_tiles=OrderedDict({"old": _Pixmap()}),
     )
-    viewer.stop_movie = lambda: None
-    viewer.on_gif_first_frame = lambda frame: None
-    viewer.update_gif_frame_status = lambda frame: None
-    viewer.setWindowTitle = titles.append
-    monkeypatch.setattr(rendering, "QMovie", lambda path: movie)
+    viewer.stop_animation = lambda: None
+    viewer._start_animation = lambda path, first: None
+    viewer._cancel_svg_tiles = lambda: None
+    viewer.redraw_image = lambda: None
+    viewer._refresh_histogram_overlay = lambda: None
+    viewer.update_status_bar = lambda: None
+    viewer.setWindowTitle = lambda title: None
+    monkeypatch.setattr(rendering, "QPixmap", _FakeQPixmap)
 
-    ImageViewer.update_image_display(viewer, 1, "animation.gif", _Pixmap())
+    # 解析/ラスタライズは worker に任せ、GUI スレッドでは SVG を読まない
+    image = _Pixmap()
+    ImageViewer.update_image_display(viewer, 1, "drawing.svg", image)
 
-    assert viewer.current_movie is movie
-    assert viewer.image_label.movies == [movie]
-    assert movie.started is True
-    assert viewer.is_loading is False
-    assert titles == ["[1/1] animation.gif"]
+    assert viewer.svg_path == "drawing.svg"
+    assert viewer.original_pixmap is image
+    assert viewer._svg_tiles == {}
 
 
 def test_update_image_display_ignores_stale_path() -> None:
     calls: list[str] = []
     viewer = SimpleNamespace(
+        _compare_pair=None,
         image_files=["current.png"],
         current_index=0,
-        current_movie=None,
+        is_animating=lambda: False,
         image_label=_ImageLabel(),
         _load_generation=1,
     )
-    viewer.stop_movie = lambda: calls.append("stop")
+    viewer.stop_animation = lambda: calls.append("stop")
 
     # 古いパスの結果が返ってきたら無視する
     ImageViewer.update_image_display(viewer, 1, "old.png", _Pixmap())
@@ -1026,7 +2362,7 @@ def test_update_image_display_ignores_stale_path() -> None:
 def test_update_image_display_ignores_empty_file_list() -> None:
     calls: list[str] = []
     viewer = SimpleNamespace(image_files=[], current_index=-1, _load_generation=1)
-    viewer.stop_movie = lambda: calls.append("stop")
+    viewer.stop_animation = lambda: calls.append("stop")
 
     ImageViewer.update_image_display(viewer, 1, "photo.png", _Pixmap())
 
@@ -1038,11 +2374,11 @@ def test_update_image_display_ignores_stale_generation() -> None:
     viewer = SimpleNamespace(
         image_files=["photo.png"],
         current_index=0,
-        current_movie=None,
+        is_animating=lambda: False,
         image_label=_ImageLabel(),
         _load_generation=2,
     )
-    viewer.stop_movie = lambda: calls.append("stop")
+    viewer.stop_animation = lambda: calls.append("stop")
 
     # 別ディレクトリを開き直した後（世代 2）に、古い世代 1 の結果が届いても無視する
     ImageViewer.update_image_display(viewer, 1, "photo.png", _Pixmap())
@@ -1050,29 +2386,6 @@ def test_update_image_display_ignores_stale_generation() -> None:
     assert calls == []
 
 
-def test_on_gif_first_frame_sets_pixmap_and_disconnects() -> None:
-    calls: list[str] = []
-    viewer = SimpleNamespace(current_movie=_Movie())
-    viewer.on_gif_first_frame = lambda frame: None
-    viewer.redraw_image = lambda: calls.append("redraw")
-    viewer.update_status_bar = lambda: calls.append("status")
-
-    ImageViewer.on_gif_first_frame(viewer, 0)
-
-    assert isinstance(viewer.original_pixmap, _Pixmap)
-    assert calls == ["redraw", "status"]
-
-
-def test_update_gif_frame_status_updates_when_movie_is_valid() -> None:
-    calls: list[str] = []
-    viewer = SimpleNamespace(current_movie=_Movie())
-    viewer.update_status_bar = lambda: calls.append("status")
-
-    ImageViewer.update_gif_frame_status(viewer, 0)
-
-    assert calls == ["status"]
-
-
 def test_toggle_fullscreen_enters_and_restores_window_state() -> None:
     calls: list[str] = []
     viewer = SimpleNamespace(_was_maximized_before_fullscreen=False)
@@ -1095,34 +2408,51 @@ def test_toggle_fullscreen_enters_and_restores_window_state() -> None:
 def test_toggle_shuffle_mode_shuffles_and_loads(monkeypatch) -> None:
     calls: list[str] = []
     viewer = SimpleNamespace(
-        image_files=["a.png", "b.png"],
-        sorted_image_files=["a.png", "b.png"],
+        image_files=ImageFileList("", ["a.png", "b.png"]),
         current_index=1,
         is_shuffled=False,
     )
     viewer.load_image_by_index = lambda: calls.append("load")
-    monkeypatch.setattr(navigation.random, "shuffle", lambda items: items.reverse())
+    monkeypatch.setattr(file_list.random, "shuffle", lambda items: items.reverse())
 
     ImageViewer._toggle_shuffle_mode(viewer)
 
     assert viewer.is_shuffled is True
-    assert viewer.image_files == ["b.png", "a.png"]
+    assert list(viewer.image_files) == ["b.png", "a.png"]
     assert viewer.current_index == 0
     assert calls == ["load"]
 
 
-def test_redraw_static_image_fit_and_original_size_modes() -> None:
+def _static_viewer(
+    pixmap, *, fit_to_window: bool, scale_factor: float = 1.0, svg=None, ratio: float = 1.0
+):
     label = _ImageLabel()
-    scroll_area = _ScrollAreaWithViewport()
     viewer = SimpleNamespace(
         image_label=label,
-        scroll_area=scroll_area,
-        original_pixmap=_Pixmap(),
-        svg_renderer=None,
-        fit_to_window=True,
-        scale_factor=1.5,
+        scroll_area=_ScrollAreaWithViewport(),
+        original_pixmap=pixmap,
+        svg_path=svg,
+        fit_to_window=fit_to_window,
+        scale_factor=scale_factor,
+        _renditions=OrderedDict(),
+        _rendition_source=0,
+        _mipmaps=[],
+        _animation_frame=None,
+    )
+    viewer.is_animating = lambda: False
+    viewer._mipmap_for = lambda size: ImageViewer._mipmap_for(viewer, size)
+    viewer._scaled_pixmap_for = lambda size, fast=False: ImageViewer._scaled_pixmap_for(
+        viewer, size, fast
     )
-    viewer._scaled_pixmap_for = lambda bounds: ImageViewer._scaled_pixmap_for(viewer, bounds)
+    viewer._aspect_fit_size = lambda bounds: ImageViewer._aspect_fit_size(viewer, bounds)
+    return _bind_device_pixels(viewer, ratio)
+
+
+def test_redraw_static_image_fit_and_original_size_modes() -> None:
+    # 200x100 をビューポート 400x200 に収めると 2 倍 → 元画像をそのまま描かせる
+    pixmap = _Pixmap()
+    viewer = _static_viewer(pixmap, fit_to_window=True, scale_factor=1.5)
+    label = viewer.image_label
 
     ImageViewer._redraw_static_image(viewer)
     viewer.fit_to_window = False
@@ -1131,31 +2461,243 @@ def test_redraw_static_image_fit_and_original_size_modes() -> None:
     assert label.minimum_sizes == [(1, 1), (1, 1)]
     assert label.maximum_sizes == [(16777215, 16777215), (16777215, 16777215)]
     assert label.scaled_contents_values == [False, False]
-    assert scroll_area.widget_resizable_values == [True, False]
-    assert len(label.pixmaps) == 2
-    assert label.pixmaps[-1].width() == 300
-    assert label.pixmaps[-1].height() == 150
+    assert viewer.scroll_area.widget_resizable_values == [True, False]
+    assert label.views == [(pixmap, (400, 200)), (pixmap, (300, 150))]
+    assert viewer._renditions == {}
     assert label.adjusted is True
 
 
-def test_render_svg_rasterizes_at_requested_size(qapp) -> None:
-    from PyQt6.QtCore import QByteArray, QSize
-    from PyQt6.QtSvg import QSvgRenderer
+def test_redraw_static_image_sizes_views_in_device_pixels() -> None:
+    # 200% の画面: ビューポート 400x200 は画面の画素で 800x400
+    pixmap = _Pixmap(width=1000, height=500)
+    viewer = _static_viewer(pixmap, fit_to_window=True, ratio=2.0)
+
+    ImageViewer._redraw_static_image(viewer)
+    viewer.fit_to_window = False
+    ImageViewer._redraw_static_image(viewer)
+
+    (fitted, fitted_size), (original, original_size) = viewer.image_label.views
+    # 縮小版は画面の画素の大きさで 1 回だけ作り、描くときには拡縮させない
+    assert (fitted.width(), fitted.height()) == fitted_size == (800, 400)
+    assert fitted.device_pixel_ratio == 2.0
+    # 100% は画像の 1 画素 = 画面の 1 画素
+    assert original is pixmap and original_size == (1000, 500)
+
+
+def test_on_device_pixel_ratio_changed_drops_renditions_and_redraws() -> None:
+    calls: list = []
+    viewer = SimpleNamespace(
+        _renditions=OrderedDict({(400, 200): _Pixmap()}),
+        _svg_tiles=OrderedDict({"tile": _Pixmap()}),
+    )
+    viewer._cancel_svg_tiles = lambda: calls.append("cancel")
+    viewer.redraw_image = lambda: calls.append("redraw")
+    viewer.update_status_bar = lambda: calls.append("status")
+
+    ImageViewer._on_device_pixel_ratio_changed(viewer)
+
+    assert viewer._renditions == {} and viewer._svg_tiles == {}
+    assert calls == ["cancel", "redraw", "status"]
+
+
+def test_redraw_static_image_draws_smooth_rendition_when_zoomed_out() -> None:
+    pixmap = _Pixmap(width=2000, height=1000)
+    viewer = _static_viewer(pixmap, fit_to_window=True)
+
+    # 操作中はまだ縮小せず、元画像を最近傍で描かせる
+    ImageViewer._redraw_static_image(viewer, fast=True)
+    ImageViewer._redraw_static_image(viewer)
+
+    (first, first_size), (second, second_size) = viewer.image_label.views
+    assert first is pixmap and first_size == (400, 200)
+    assert second is not pixmap and (second.width(), second.height()) == (400, 200)
+    assert second_size == (400, 200)
+
+
+def _svg_viewer(scale_factor: float) -> SimpleNamespace:
+    viewer = _static_viewer(
+        _Pixmap(), fit_to_window=False, scale_factor=scale_factor, svg="drawing.svg"
+    )
+    viewer._svg_tiles = OrderedDict()
+    viewer._svg_tile_request = 0
+    viewer.svg_tiler = _Emitter()
+    viewer.svg_tiler.cancel_older_than = lambda request: viewer.svg_tiler.emit("cancel", request)
+    viewer._svg_tile_timer = SimpleNamespace(start=lambda: viewer.svg_tiler.emit("timer"))
+    viewer._cancel_svg_tiles = lambda: ImageViewer._cancel_svg_tiles(viewer)
+    viewer._show_svg_tiles = lambda size, fast=False: ImageViewer._show_svg_tiles(
+        viewer, size, fast
+    )
+    return viewer
+
+
+def test_redraw_static_image_shows_cached_svg_tiles_over_placeholder() -> None:
+    from hiyoko_viewer.core.tiles import TileKey
+
+    viewer = _svg_viewer(scale_factor=4.0)
+    tile = _Pixmap(512, 400)
+    viewer._svg_tiles[TileKey(800, 400, 0, 0)] = tile
+    viewer._svg_tiles[TileKey(200, 100, 0, 0)] = _Pixmap()
+
+    ImageViewer._redraw_static_image(viewer)
+    assert viewer.image_label.tiles == {(0, 0): tile}
+    # 操作中の途中の倍率はタイルを依頼せず、描きかけの依頼も打ち切る
+    ImageViewer._redraw_static_image(viewer, fast=True)
+
+    assert viewer.image_label.views[0] == (viewer.original_pixmap, (800, 400))
+    assert viewer.svg_tiler.emitted == [("timer",), ("cancel", 1)]
+    assert viewer._renditions == {}
+
+
+def test_request_visible_svg_tiles_asks_only_for_missing_visible_tiles(monkeypatch) -> None:
+    from PyQt6.QtCore import QSize
+
+    from hiyoko_viewer.core.tiles import TileKey
+
+    monkeypatch.setattr(rendering, "SVG_TILE_SIZE", 100)
+    viewer = _svg_viewer(scale_factor=4.0)
+    viewer.image_label.has_view = lambda: True
+    viewer.image_label.display_size = lambda: QSize(800, 400)
+    viewer.scroll_area.horizontal = _ScrollBar(250)
+    viewer.scroll_area.vertical = _ScrollBar(0)
+    viewer._svg_tiles[TileKey(800, 400, 3, 0)] = _Pixmap()
+    viewer.request_svg_tiles = _Emitter()
+
+    ImageViewer._request_visible_svg_tiles(viewer)
+
+    # ビューポート 400x200 で x=250..650, y=0..200 が見えている（列 2〜6、行 0〜1）
+    ((request, path, keys),) = viewer.request_svg_tiles.emitted
+    assert (request, path) == (1, "drawing.svg")
+    assert set(keys) == {
+        TileKey(800, 400, column, row) for column in range(2, 7) for row in range(2)
+    } - {TileKey(800, 400, 3, 0)}
+    assert viewer.svg_tiler.emitted == [("cancel", 1)]
+
+
+def test_on_svg_tile_ready_caches_and_paints_tile_for_current_zoom(monkeypatch) -> None:
+    from PyQt6.QtCore import QSize
+
+    from hiyoko_viewer.core.tiles import TileKey
+
+    monkeypatch.setattr(rendering, "QPixmap", _FakeQPixmap)
+    monkeypatch.setattr(rendering, "SVG_TILE_CACHE_SIZE", 1)
+    added: list = []
+    viewer = SimpleNamespace(svg_path="drawing.svg", _svg_tiles=OrderedDict())
+    _bind_device_pixels(viewer, 2.0)
+    viewer.image_label = SimpleNamespace(
+        display_size=lambda: QSize(800, 400),
+        add_tile=lambda column, row, tile: added.append((column, row)),
+    )
+
+    ImageViewer.on_svg_tile_ready(viewer, "other.svg", TileKey(800, 400, 0, 0), _Pixmap())
+    ImageViewer.on_svg_tile_ready(viewer, "drawing.svg", TileKey(400, 200, 0, 0), _Pixmap())
+    ImageViewer.on_svg_tile_ready(viewer, "drawing.svg", TileKey(800, 400, 1, 0), _Pixmap())
+
+    assert list(viewer._svg_tiles) == [TileKey(800, 400, 1, 0)]
+    assert added == [(1, 0)]
+    # タイルはデバイスピクセルで描いてあるので、画面の倍率を付けて渡す
+    assert viewer._svg_tiles[TileKey(800, 400, 1, 0)].device_pixel_ratio == 2.0
+
+
+class _TransformRecordingPixmap(_Pixmap):
+    def __init__(self) -> None:
+        super().__init__()
+        self.modes: list = []
+
+    def scaled(self, width, height, aspect_mode, mode) -> _Pixmap:
+        self.modes.append(mode)
+        return _Pixmap(width, height)
+
+
+def test_scaled_pixmap_for_caches_smooth_renditions_per_size(monkeypatch) -> None:
+    from PyQt6.QtCore import QSize
+
+    monkeypatch.setattr(rendering, "RENDITION_CACHE_SIZE", 2)
+    pixmap = _TransformRecordingPixmap()
+    viewer = SimpleNamespace(
+        original_pixmap=pixmap,
+        svg_path=None,
+        _renditions=OrderedDict(),
+        _rendition_source=0,
+        _mipmaps=[],
+        devicePixelRatioF=lambda: 1.5,
+    )
+    viewer._mipmap_for = lambda size: ImageViewer._mipmap_for(viewer, size)
+    smooth = Qt.TransformationMode.SmoothTransformation
+
+    assert ImageViewer._scaled_pixmap_for(viewer, QSize(100, 50), fast=True) is None
+    small = ImageViewer._scaled_pixmap_for(viewer, QSize(100, 50))
+    # 同じ表示サイズに戻ったら（操作中でも）平滑済みのものをそのまま使う
+    assert ImageViewer._scaled_pixmap_for(viewer, QSize(100, 50), fast=True) is small
+    ImageViewer._scaled_pixmap_for(viewer, QSize(200, 100))
+    ImageViewer._scaled_pixmap_for(viewer, QSize(300, 150))
+    assert list(viewer._renditions) == [(200, 100), (300, 150)]
+    assert pixmap.modes == [smooth, smooth, smooth]
+    assert small.device_pixel_ratio == 1.5
+
+    # 画像が変わったら覚えていた分は捨てる
+    viewer.original_pixmap = _TransformRecordingPixmap()
+    ImageViewer._scaled_pixmap_for(viewer, QSize(200, 100))
+    assert list(viewer._renditions) == [(200, 100)]
+
+
+def test_redraw_static_image_draws_fast_zoom_out_from_nearest_mipmap() -> None:
+    pixmap = _Pixmap(width=4000, height=2000)
+    half, quarter = _Pixmap(2000, 1000), _Pixmap(1000, 500)
+    viewer = _static_viewer(pixmap, fit_to_window=True)
+    viewer._mipmaps = [half, quarter]
+
+    ImageViewer._redraw_static_image(viewer, fast=True)
+
+    assert viewer.image_label.views == [(quarter, (400, 200))]
+
 
-    svg = (
-        b'<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50">'
-        b'<rect width="100" height="50" fill="#3776ab"/></svg>'
+def test_mipmap_for_picks_smallest_level_not_below_requested_size() -> None:
+    from PyQt6.QtCore import QSize
+
+    pixmap = _Pixmap(width=4000, height=2000)
+    half, quarter = _Pixmap(2000, 1000), _Pixmap(1000, 500)
+    viewer = SimpleNamespace(original_pixmap=pixmap, _mipmaps=[half, quarter])
+
+    assert ImageViewer._mipmap_for(viewer, QSize(600, 300)) is quarter
+    assert ImageViewer._mipmap_for(viewer, QSize(1500, 750)) is half
+    assert ImageViewer._mipmap_for(viewer, QSize(3000, 1500)) is pixmap
+    viewer._mipmaps = []
+    assert ImageViewer._mipmap_for(viewer, QSize(600, 300)) is pixmap
+
+
+def test_on_mipmaps_ready_keeps_levels_only_for_current_static_image(qapp) -> None:
+    from PyQt6.QtGui import QImage
+
+    levels = [QImage(200, 100, QImage.Format.Format_ARGB32)]
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        _load_generation=3,
+        is_loading=False,
+        current_index=0,
+        image_files=["/images/a.png"],
+        svg_path=None,
+        is_animating=lambda: False,
+        _mipmaps=[],
+    )
+
+    ImageViewer.on_mipmaps_ready(viewer, 2, "/images/a.png", levels)
+    ImageViewer.on_mipmaps_ready(viewer, 3, "/images/b.png", levels)
+    assert viewer._mipmaps == []
+
+    ImageViewer.on_mipmaps_ready(viewer, 3, "/images/a.png", levels)
+    assert [(level.width(), level.height()) for level in viewer._mipmaps] == [(200, 100)]
+
+
+def test_redraw_interactive_draws_fast_and_schedules_smooth_redraw() -> None:
+    calls: list = []
+    viewer = SimpleNamespace(
+        _smooth_redraw_timer=SimpleNamespace(start=lambda: calls.append("timer"))
     )
-    renderer = QSvgRenderer(QByteArray(svg))
-    assert renderer.isValid()
-    viewer = SimpleNamespace(svg_renderer=renderer)
+    viewer.redraw_image = lambda fast=False: calls.append(("redraw", fast))
 
-    # 固有サイズ(100x50)とは無関係に、要求したピクセルサイズで生成される＝ズームしても鮮明
-    pixmap = ImageViewer._render_svg(viewer, QSize(800, 400))
+    ImageViewer._redraw_interactive(viewer)
 
-    assert not pixmap.isNull()
-    assert pixmap.width() == 800
-    assert pixmap.height() == 400
+    assert calls == [("redraw", True), "timer"]
 
 
 def test_aspect_fit_size_keeps_aspect_ratio(qapp) -> None:
@@ -1177,43 +2719,22 @@ def qapp():
     yield app
 
 
-def test_redraw_gif_fit_and_original_size_modes() -> None:
-    label = _ImageLabel()
-    scroll_area = _ScrollAreaWithViewport()
-    movie = _Movie(QMovie.MovieState.Paused)
-    viewer = SimpleNamespace(
-        image_label=label,
-        scroll_area=scroll_area,
-        original_pixmap=_Pixmap(),
-        fit_to_window=True,
-        scale_factor=1.5,
-        current_movie=movie,
-    )
-
-    ImageViewer._redraw_gif(viewer)
-    viewer.fit_to_window = False
-    ImageViewer._redraw_gif(viewer)
-
-    assert label.scaled_contents_values == [True, True]
-    assert scroll_area.widget_resizable_values == [False, False]
-    assert len(label.fixed_sizes) == 2
-    assert label.movies == [movie]
-    assert movie.started is True
-
-
 def test_zoom_at_cursor_switches_from_fit_mode_and_scrolls() -> None:
     calls: list[str] = []
     scroll_area = _ScrollAreaWithViewport()
-    viewer = SimpleNamespace(
+    viewer = _view_update_viewer(
         scale_factor=1.0,
         fit_to_window=True,
         original_pixmap=_Pixmap(),
         scroll_area=scroll_area,
     )
-    viewer.redraw_image = lambda: calls.append("redraw")
+    _bind_device_pixels(viewer)
+    viewer._redraw_interactive = lambda: calls.append("redraw")
     viewer.update_status_bar = lambda: calls.append("status")
 
     ImageViewer._zoom_at_cursor(viewer, _WheelEvent(Qt.KeyboardModifier.ControlModifier))
+    assert calls == []
+    ImageViewer._apply_view_update(viewer)
 
     assert viewer.fit_to_window is False
     assert viewer.scale_factor > 2.0
@@ -1222,6 +2743,52 @@ def test_zoom_at_cursor_switches_from_fit_mode_and_scrolls() -> None:
     assert calls == ["redraw", "status"]
 
 
+def test_zoom_notches_in_one_frame_redraw_once_and_keep_cursor_anchor() -> None:
+    calls: list[str] = []
+    viewer = _view_update_viewer(
+        scale_factor=1.0,
+        fit_to_window=False,
+        original_pixmap=_Pixmap(),
+        scroll_area=_ScrollAreaWithViewport(),
+    )
+    viewer._redraw_interactive = lambda: calls.append("redraw")
+    viewer.update_status_bar = lambda: calls.append("status")
+    notches = [(_Point(10, 20), 120), (_Point(30, 40), 120), (_Point(50, 60), -120)]
+
+    for position, delta in notches:
+        ImageViewer._zoom_at_cursor(
+            viewer, _WheelEvent(Qt.KeyboardModifier.ControlModifier, delta, position)
+        )
+    ImageViewer._apply_view_update(viewer)
+
+    # 3 ノッチでも描き直しは 1 回、タイマーも最初の 1 回だけ掛ける
+    assert calls == ["redraw", "status"]
+    assert viewer._view_update_timer.starts == 1
+    # 各ノッチをそのカーソル位置で順に当てたのと同じスクロール位置になる
+    expected_x, expected_y = 100.0, 200.0
+    for position, delta in notches:
+        factor = constants.ZOOM_IN_FACTOR if delta > 0 else 1 / constants.ZOOM_IN_FACTOR
+        expected_x = (expected_x + position.x()) * factor - position.x()
+        expected_y = (expected_y + position.y()) * factor - position.y()
+    assert viewer.scale_factor == pytest.approx(constants.ZOOM_IN_FACTOR)
+    assert viewer.scroll_area.horizontalScrollBar().value() == round(expected_x)
+    assert viewer.scroll_area.verticalScrollBar().value() == round(expected_y)
+
+
+def test_pan_moves_in_one_frame_scroll_once_and_carry_fractions() -> None:
+    viewer = _view_update_viewer(scroll_area=_ScrollArea())
+
+    for _ in range(3):
+        ImageViewer._pan_by(viewer, 1.5, -0.25)
+    ImageViewer._apply_view_update(viewer)
+
+    assert viewer._view_update_timer.starts == 1
+    # 4.5 → 4 だけ動かし、残りの 0.5 は次のフレームへ持ち越す
+    assert viewer.scroll_area.horizontalScrollBar().value() == 96
+    assert viewer.scroll_area.verticalScrollBar().value() == 201
+    assert viewer._pending_pan == (0.5, 0.25)
+
+
 def test_zoom_at_cursor_returns_when_pixmap_width_is_zero() -> None:
     viewer = SimpleNamespace(
         scale_factor=1.0,
@@ -1229,7 +2796,8 @@ def test_zoom_at_cursor_returns_when_pixmap_width_is_zero() -> None:
         original_pixmap=_Pixmap(width=0, height=100),
         scroll_area=_ScrollAreaWithViewport(),
     )
-    viewer.redraw_image = lambda: (_ for _ in ()).throw(AssertionError)
+    _bind_device_pixels(viewer)
+    viewer._redraw_interactive = lambda: (_ for _ in ()).throw(AssertionError)
 
     ImageViewer._zoom_at_cursor(viewer, _WheelEvent(Qt.KeyboardModifier.ControlModifier))
 
@@ -1242,17 +2810,28 @@ def test_clear_display_resets_viewer_state(monkeypatch) -> None:
     label = _ImageLabel()
     titles: list[str] = []
     calls: list[str] = []
-    viewer = SimpleNamespace(image_label=label, is_loading=True)
-    viewer.stop_movie = lambda: calls.append("stop")
+    viewer = SimpleNamespace(
+        _compare_pair=None,
+        image_label=label,
+        is_loading=True,
+        _renditions={(1, 1): _Pixmap()},
+        _svg_tiles={"tile": _Pixmap()},
+    )
+    viewer.stop_animation = lambda: calls.append("stop")
+    viewer._cancel_svg_tiles = lambda: calls.append("cancel tiles")
+    viewer._refresh_histogram_overlay = lambda: calls.append("histogram")
     viewer.statusBar = lambda: status_bar
     viewer.setWindowTitle = titles.append
     monkeypatch.setattr(rendering, "QPixmap", lambda: _Pixmap(is_null=True))
 
     ImageViewer._clear_display(viewer)
 
-    assert calls == ["stop"]
+    assert calls == ["stop", "cancel tiles", "histogram"]
     assert viewer.is_loading is False
     assert viewer.original_pixmap.isNull() is True
+    assert viewer.svg_path is None
+    assert viewer._svg_tiles == {}
+    assert viewer._renditions == {}
     assert label.texts == [constants.WELCOME_TEXT]
     assert label.styles == [constants.NOTICE_TEXT_STYLE]
     assert viewer.current_index == -1
@@ -1262,35 +2841,53 @@ def test_clear_display_resets_viewer_state(monkeypatch) -> None:
 
 def test_load_settings_restores_maximized_window(monkeypatch) -> None:
     calls: list[str] = []
-    _Settings.values = {"main_window/maximized": "true"}
+    _Settings.values = {
+        "main_window/maximized": "true",
+        "view/sort_order": "mtime",
+        "view/histogram": True,
+        "color/output_profile": "display.icc",
+    }
     monkeypatch.setattr(main_window, "QSettings", _Settings)
-    viewer = SimpleNamespace()
+    viewer = SimpleNamespace(histogram_action=_Action())
     viewer.showMaximized = lambda: calls.append("maximized")
     viewer.restoreGeometry = lambda geometry: calls.append("geometry")
+    viewer._apply_output_profile = lambda path: calls.append(f"profile {path}")
 
     ImageViewer._load_settings(viewer)
 
-    assert calls == ["maximized"]
+    assert calls == ["maximized", "profile display.icc"]
+    assert viewer.sort_key == "mtime"
+    assert viewer.histogram_action.isChecked() is True
 
 
 def test_load_settings_restores_saved_geometry(monkeypatch) -> None:
     calls: list[bytes] = []
-    _Settings.values = {"main_window/maximized": "false", "main_window/geometry": b"geometry"}
+    _Settings.values = {
+        "main_window/maximized": "false",
+        "main_window/geometry": b"geometry",
+        "view/sort_order": "unknown",
+    }
     monkeypatch.setattr(main_window, "QSettings", _Settings)
-    viewer = SimpleNamespace()
+    viewer = SimpleNamespace(histogram_action=_Action())
     viewer.showMaximized = lambda: (_ for _ in ()).throw(AssertionError)
     viewer.restoreGeometry = calls.append
+    viewer._apply_output_profile = lambda path: calls.append(path)
 
     ImageViewer._load_settings(viewer)
 
-    assert calls == [b"geometry"]
+    # プロファイルが保存されていなければ sRGB
+    assert calls == [b"geometry", ""]
+    # 知らない値は名前順に戻す
+    assert viewer.sort_key == "name"
 
 
 def test_save_settings_leaves_fullscreen_and_writes_geometry(monkeypatch) -> None:
     calls: list[str] = []
     _Settings.written = {}
     monkeypatch.setattr(main_window, "QSettings", _Settings)
-    viewer = SimpleNamespace()
+    viewer = SimpleNamespace(
+        sort_key="size", _output_profile_path="display.icc", histogram_action=_Action(True)
+    )
     viewer.isFullScreen = lambda: True
     viewer.showNormal = lambda: calls.append("normal")
     viewer.isMaximized = lambda: False
@@ -1300,6 +2897,9 @@ def test_save_settings_leaves_fullscreen_and_writes_geometry(monkeypatch) -> Non
 
     assert calls == ["normal"]
     assert _Settings.written == {
+        "view/sort_order": "size",
+        "view/histogram": True,
+        "color/output_profile": "display.icc",
         "main_window/maximized": "false",
         "main_window/geometry": b"geometry",
     }
@@ -1308,59 +2908,49 @@ def test_save_settings_leaves_fullscreen_and_writes_geometry(monkeypatch) -> Non
 def test_save_settings_skips_geometry_when_maximized(monkeypatch) -> None:
     _Settings.written = {}
     monkeypatch.setattr(main_window, "QSettings", _Settings)
-    viewer = SimpleNamespace()
+    viewer = SimpleNamespace(sort_key="name", _output_profile_path="", histogram_action=_Action())
     viewer.isFullScreen = lambda: False
     viewer.isMaximized = lambda: True
     viewer.saveGeometry = lambda: (_ for _ in ()).throw(AssertionError)
 
     ImageViewer._save_settings(viewer)
 
-    assert _Settings.written == {"main_window/maximized": "true"}
+    assert _Settings.written == {
+        "view/sort_order": "name",
+        "view/histogram": False,
+        "color/output_profile": "",
+        "main_window/maximized": "true",
+    }
 
 
-def test_move_removes_path_from_sorted_image_files(tmp_path) -> None:
+def test_move_removes_path_from_shuffled_and_sorted_orders(monkeypatch, tmp_path) -> None:
     image_path = tmp_path / "a.png"
     next_path = tmp_path / "b.png"
-    image_path.write_bytes(b"fake")
-    next_path.write_bytes(b"fake")
-    viewer = SimpleNamespace(
-        is_loading=False,
-        image_files=[str(image_path), str(next_path)],
-        sorted_image_files=[str(image_path), str(next_path)],
-        current_index=0,
-        _release_current_file_handles=lambda: None,
-    )
-    viewer.load_image_by_index = lambda: None
-    viewer._clear_display = lambda: None
-    viewer._remove_path_from_lists = lambda path: ImageViewer._remove_path_from_lists(viewer, path)
+    monkeypatch.setattr(file_list.random, "shuffle", lambda items: items.reverse())
+    image_files = ImageFileList(str(tmp_path), ["a.png", "b.png"])
+    image_files.shuffle()
+    viewer = _file_operation_viewer(image_files, current_index=1)
 
     ImageViewer.move_current_image_and_load_next(viewer, "_ok")
 
     assert str(image_path) not in viewer.image_files
-    assert str(image_path) not in viewer.sorted_image_files
-    assert str(next_path) in viewer.sorted_image_files
+    viewer.image_files.unshuffle()
+    assert list(viewer.image_files) == [str(next_path)]
 
 
-def test_delete_removes_path_from_sorted_image_files(monkeypatch, tmp_path) -> None:
+def test_delete_removes_path_from_shuffled_and_sorted_orders(monkeypatch, tmp_path) -> None:
     image_path = tmp_path / "a.png"
     next_path = tmp_path / "b.png"
-    viewer = SimpleNamespace(
-        is_loading=False,
-        image_files=[str(image_path), str(next_path)],
-        sorted_image_files=[str(image_path), str(next_path)],
-        current_index=0,
-        _release_current_file_handles=lambda: None,
-    )
-    viewer.load_image_by_index = lambda: None
-    viewer._clear_display = lambda: None
-    viewer._remove_path_from_lists = lambda path: ImageViewer._remove_path_from_lists(viewer, path)
-    monkeypatch.setattr(navigation, "send2trash", lambda path: None)
+    monkeypatch.setattr(file_list.random, "shuffle", lambda items: items.reverse())
+    image_files = ImageFileList(str(tmp_path), ["a.png", "b.png"])
+    image_files.shuffle()
+    viewer = _file_operation_viewer(image_files, current_index=1)
 
     ImageViewer.delete_current_image_and_load_next(viewer)
 
     assert str(image_path) not in viewer.image_files
-    assert str(image_path) not in viewer.sorted_image_files
-    assert str(next_path) in viewer.sorted_image_files
+    viewer.image_files.unshuffle()
+    assert list(viewer.image_files) == [str(next_path)]
 
 
 def test_close_event_hides_without_clearing_session() -> None:
@@ -1384,3 +2974,163 @@ def test_close_event_hides_without_clearing_session() -> None:
     assert ignored == [True]
     assert viewer.image_files == ["photo.png"]
     assert viewer.current_index == 0
+
+
+def test_move_files_to_folder_removes_listed_files_and_advances_past_current(tmp_path) -> None:
+    loaded: list[int] = []
+    released: list[bool] = []
+    viewer = _file_operation_viewer(
+        ImageFileList(str(tmp_path), ["a.png", "b.png", "c.png", "d.png"]), current_index=1
+    )
+    viewer.load_image_by_index = lambda: loaded.append(viewer.current_index)
+    viewer._release_current_file_handles = lambda: released.append(True)
+
+    moved = ImageViewer._move_files_to_folder(viewer, [0, 1], QUARANTINE_FOLDER)
+
+    assert moved == 2
+    assert released == [True]
+    assert [destination for _, _, destination in viewer.request_move_file.emitted] == [
+        os.path.join(str(tmp_path), QUARANTINE_FOLDER, "a.png"),
+        os.path.join(str(tmp_path), QUARANTINE_FOLDER, "b.png"),
+    ]
+    assert list(viewer.image_files) == [str(tmp_path / "c.png"), str(tmp_path / "d.png")]
+    assert loaded == [0]
+
+    # 表示中でない画像だけなら読み込み直さず、表示位置だけ付け替える
+    assert ImageViewer._move_files_to_folder(viewer, [0, 3], QUARANTINE_FOLDER) == 1
+    assert list(viewer.image_files) == [str(tmp_path / "c.png")]
+    assert viewer.current_index == 0
+    assert loaded == [0]
+
+
+def _integrity_viewer(names: list[str]) -> SimpleNamespace:
+    viewer = SimpleNamespace(
+        is_loading=False,
+        image_files=ImageFileList("dir", names),
+        _load_generation=1,
+        _integrity_failures=None,
+        request_integrity_scan=_Emitter(),
+        status_bar=_StatusBar(),
+        moved=[],
+    )
+    viewer.statusBar = lambda: viewer.status_bar
+    viewer._move_files_to_folder = lambda name_ids, folder: (
+        viewer.moved.append((name_ids, folder)) or len(name_ids)
+    )
+    return viewer
+
+
+def test_integrity_scan_streams_progress_into_status_bar() -> None:
+    viewer = _integrity_viewer(["a.png", "b.png", "c.png"])
+
+    ImageViewer.start_integrity_scan(viewer)
+    # 検査中は重ねて依頼しない
+    ImageViewer.start_integrity_scan(viewer)
+    ImageViewer.on_integrity_progress(viewer, 1, 2, 3, [(1, "Qt: Unable to read image data")])
+    ImageViewer.on_integrity_progress(viewer, 0, 3, 3, [(2, "stale")])
+
+    assert viewer.request_integrity_scan.emitted == [(1, "dir", ["a.png", "b.png", "c.png"])]
+    assert viewer._integrity_failures == [(1, "Qt: Unable to read image data")]
+    assert viewer.status_bar.messages == [
+        ("🩺 破損チェック中...", None),
+        ("🩺 破損チェック中... 2/3（破損 1）", None),
+    ]
+
+
+def test_integrity_scan_reports_clean_result() -> None:
+    viewer = _integrity_viewer(["a.png"])
+    ImageViewer.start_integrity_scan(viewer)
+
+    ImageViewer.on_integrity_finished(viewer, 1, 1)
+
+    assert viewer._integrity_failures is None
+    assert viewer.status_bar.messages[-1] == ("破損ファイルは見つかりませんでした（1 件）", 3000)
+
+
+@pytest.mark.parametrize("accepted", [True, False])
+def test_integrity_scan_offers_to_quarantine_broken_files(monkeypatch, accepted) -> None:
+    shown: list[list] = []
+
+    class _Dialog:
+        def __init__(self, failures, parent=None) -> None:
+            shown.append(failures)
+
+        def exec(self):
+            return (
+                integrity.QDialog.DialogCode.Accepted
+                if accepted
+                else integrity.QDialog.DialogCode.Rejected
+            )
+
+    monkeypatch.setattr(integrity, "IntegrityReportDialog", _Dialog)
+    viewer = _integrity_viewer(["a.png", "b.png", "c.png"])
+    ImageViewer.start_integrity_scan(viewer)
+    ImageViewer.on_integrity_progress(viewer, 1, 3, 3, [(0, "broken"), (2, "truncated")])
+    # 検査中に仕分け済みになったものは除く
+    viewer.image_files.remove_at(0)
+
+    ImageViewer.on_integrity_finished(viewer, 1, 3)
+
+    assert shown == [[("c.png", "truncated")]]
+    if accepted:
+        assert viewer.moved == [([2], QUARANTINE_FOLDER)]
+        assert viewer.status_bar.messages[-1] == (
+            f"1 件を {QUARANTINE_FOLDER} へ移動しました",
+            3000,
+        )
+    else:
+        assert viewer.moved == []
+
+
+def _profile_viewer() -> SimpleNamespace:
+    calls: list[object] = []
+    status_bar = _StatusBar()
+    viewer = SimpleNamespace(
+        calls=calls,
+        _output_profile_path="",
+        _load_generation=3,
+        image_files=ImageFileList("/images", ["a.png"]),
+        output_profile_changed=_Emitter(),
+        reset_profile_action=SimpleNamespace(setEnabled=lambda enabled: calls.append(enabled)),
+    )
+    viewer.statusBar = lambda: status_bar
+    viewer._apply_output_profile = lambda path: ImageViewer._apply_output_profile(viewer, path)
+    viewer._set_output_profile = lambda path: ImageViewer._set_output_profile(viewer, path)
+    viewer._request_sibling_prefetch = lambda generation, directory: calls.append(
+        ("prefetch", generation, directory)
+    )
+    viewer.load_image_by_index = lambda: calls.append("reload")
+    return viewer
+
+
+def test_set_output_profile_sends_icc_to_workers_and_reloads(tmp_path) -> None:
+    from PyQt6.QtGui import QColorSpace
+
+    icc = bytes(QColorSpace(QColorSpace.NamedColorSpace.DisplayP3).iccProfile())
+    profile = tmp_path / "display.icc"
+    profile.write_bytes(icc)
+    viewer = _profile_viewer()
+
+    ImageViewer._set_output_profile(viewer, str(profile))
+
+    assert viewer._output_profile_path == str(profile)
+    assert viewer.output_profile_changed.emitted == [(icc,)]
+    # 変換済みの表示中の画像と先読み済みの先頭画像を読み直す
+    assert viewer.calls == [True, ("prefetch", 3, "/images"), "reload"]
+
+    ImageViewer._reset_output_profile(viewer)
+    assert viewer._output_profile_path == ""
+    assert viewer.output_profile_changed.emitted[-1] == (b"",)
+
+
+def test_set_output_profile_rejects_unreadable_or_invalid_profile(tmp_path) -> None:
+    broken = tmp_path / "broken.icc"
+    broken.write_bytes(b"not a profile")
+    viewer = _profile_viewer()
+
+    ImageViewer._set_output_profile(viewer, str(broken))
+    ImageViewer._set_output_profile(viewer, str(tmp_path / "missing.icc"))
+
+    assert viewer.output_profile_changed.emitted == []
+    assert viewer.calls == []
+    assert viewer.statusBar().messages[-1] == ("エラー: このカラープロファイルは使えません", 5000)
@@ -0,0 +1,117 @@
+"""起動時の import の予算。
+
+``-X importtime`` で別プロセスに import を測らせ、起動の 2 つの経路がそれぞれ予算に収まることを確かめる。
+
+* パスを渡して終わる 2 番目以降のインスタンス: ``python -m hiyoko_viewer`` が ``main()`` に
+  入るまでの import（``hiyoko_viewer.__main__`` の import と同じ）。GUI 一式を読み込まない
+* 最初のインスタンス: それに加えて :mod:`hiyoko_viewer.gui` の import。特定のファイルや
+  操作でしか使わない重い依存は読み込まない
+
+読み込むモジュールの確認は常に行う。import 時間の予算はマシンの負荷で揺れるので、
+環境変数 ``HIYOKO_CHECK_IMPORT_BUDGET=1`` を設定したときだけ確かめる。
+"""
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import hiyoko_viewer
+
+# 2 番目以降のインスタンスが読み込まないもの（ウィジェット/ミックスイン一式）
+GUI_MODULES = (
+    "PyQt6.QtGui",
+    "PyQt6.QtWidgets",
+    "hiyoko_viewer.gui",
+    "hiyoko_viewer.ui",
+)
+
+# 最初に使う時点まで読み込まないもの（画像のメタデータ/ヘッダ/ハッシュ、ごみ箱、SVG、破損チェック、
+# 画素の計算）
+DEFERRED_MODULES = (
+    "PIL",
+    "send2trash",
+    "PyQt6.QtSvg",
+    "concurrent.futures.process",
+    "numpy",
+    "imagecodecs",
+)
+
+# import の合計（マイクロ秒）。現状はそれぞれ 0.05 秒前後と 0.3 秒前後。超えたら新しく増えた
+# import を見直すこと
+FORWARD_IMPORT_BUDGET_US = 250_000
+STARTUP_IMPORT_BUDGET_US = 1_000_000
+
+FORWARD_STATEMENT = "import hiyoko_viewer.__main__"
+STARTUP_STATEMENT = "import hiyoko_viewer.__main__, hiyoko_viewer.gui"
+
+budget_check = pytest.mark.skipif(
+    os.environ.get("HIYOKO_CHECK_IMPORT_BUDGET") != "1",
+    reason="import 時間の予算は HIYOKO_CHECK_IMPORT_BUDGET=1 のときだけ確かめる",
+)
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+
+def _measure_imports(statement: str) -> tuple[dict[str, int], int]:
+    """``statement`` を実行したときの各モジュールの累積時間と、最上位の import の合計"""
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    src_dir = str(Path(hiyoko_viewer.__file__).resolve().parents[1])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (src_dir, env.get("PYTHONPATH"))))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    cumulative = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        cumulative[match.group(4)] = int(match.group(2))
+        if len(match.group(3)) == 1:
+            total += int(match.group(2))
+    return cumulative, total
+
+
+def _loaded(imports: dict[str, int], modules: tuple[str, ...]) -> list[str]:
+    return [
+        name
+        for name in imports
+        if any(name == module or name.startswith(module + ".") for module in modules)
+    ]
+
+
+def test_forwarding_instance_skips_gui_and_deferred_modules() -> None:
+    imports, _ = _measure_imports(FORWARD_STATEMENT)
+
+    assert "PyQt6.QtNetwork" in imports
+    assert _loaded(imports, GUI_MODULES + DEFERRED_MODULES) == []
+
+
+def test_startup_skips_deferred_modules() -> None:
+    imports, _ = _measure_imports(STARTUP_STATEMENT)
+
+    assert "hiyoko_viewer.ui.main_window" in imports
+    assert _loaded(imports, DEFERRED_MODULES) == []
+
+
+@budget_check
+@pytest.mark.parametrize(
+    ("statement", "budget_us"),
+    [
+        (FORWARD_STATEMENT, FORWARD_IMPORT_BUDGET_US),
+        (STARTUP_STATEMENT, STARTUP_IMPORT_BUDGET_US),
+    ],
+)
+def test_imports_stay_within_budget(statement: str, budget_us: int) -> None:
+    _, total = _measure_imports(statement)
+
+    assert total <= budget_us
@@ -0,0 +1,58 @@
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest
+from PyQt6.QtCore import QCoreApplication, QEventLoop, QTimer
+from PyQt6.QtNetwork import QLocalSocket
+
+from hiyoko_viewer.core.ipc_protocol import encode_message
+from hiyoko_viewer.services.instance_server import InstanceServer
+
+
+@pytest.fixture(scope="module")
+def qapp() -> QCoreApplication:
+    app = QCoreApplication.instance()
+    if app is None:
+        app = QCoreApplication([])
+    return app
+
+
+def test_enqueue_merges_paths_into_one_batch() -> None:
+    server = InstanceServer()
+    received: list[list] = []
+    server.paths_received.connect(received.append)
+
+    server.enqueue(["/a.png", "/b.png"])
+    server.enqueue(["/b.png", "", "/c.png"])
+    assert received == []
+
+    server.flush()
+
+    assert received == [["/a.png", "/b.png", "/c.png"]]
+
+
+def test_server_reads_fragmented_messages_from_several_peers(qapp, tmp_path) -> None:
+    server = InstanceServer()
+    received: list[list] = []
+    server.paths_received.connect(received.append)
+    name = f"hiyoko-viewer-test-{os.getpid()}"
+    assert server.listen(name)
+    loop = QEventLoop()
+    server.paths_received.connect(lambda paths: loop.quit())
+    first = encode_message(["/x/1.png", "/x/2.png"])
+    peers = []
+    for message in (first[:3], encode_message(["/x/3.png"])):
+        peer = QLocalSocket()
+        peer.connectToServer(name)
+        assert peer.waitForConnected(1000)
+        peer.write(message)
+        peer.flush()
+        peers.append(peer)
+    # 1 通目の残りは遅れて届く（受け取る側は待たずに、届いた分だけ読む）
+    QTimer.singleShot(50, lambda: (peers[0].write(first[3:]), peers[0].flush()))
+    QTimer.singleShot(5000, loop.quit)
+
+    loop.exec()
+
+    assert received == [["/x/3.png", "/x/1.png", "/x/2.png"]]
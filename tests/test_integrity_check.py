@@ -0,0 +1,135 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtGui import QColor, QImage, QImageReader
+
+from hiyoko_viewer import check
+from hiyoko_viewer.config.constants import INTEGRITY_ALLOCATION_LIMIT_MB, QUARANTINE_FOLDER
+from hiyoko_viewer.core.integrity_journal import IntegrityJournal
+from hiyoko_viewer.services import integrity_check
+from hiyoko_viewer.services.integrity_check import (
+    IntegrityChecker,
+    check_image,
+    init_check_worker,
+    iter_checks,
+)
+
+
+def _write_image(path, size: int = 64) -> None:
+    image = QImage(size, size, QImage.Format.Format_RGB32)
+    image.fill(QColor(200, 30, 30))
+    assert image.save(str(path))
+
+
+def _write_truncated_jpeg(path) -> None:
+    buffer = io.BytesIO()
+    _write_image(path, size=256)
+    data = path.read_bytes()
+    buffer.write(data[: len(data) // 2])
+    path.write_bytes(buffer.getvalue())
+
+
+def test_check_image_reports_truncated_and_undecodable_files(tmp_path) -> None:
+    _write_image(tmp_path / "ok.png")
+    _write_image(tmp_path / "ok.jpg")
+    _write_truncated_jpeg(tmp_path / "cut.jpg")
+    (tmp_path / "broken.png").write_bytes(b"\x89PNG\r\n\x1a\n" + b"x" * 64)
+
+    assert check_image(str(tmp_path / "ok.png")) == ""
+    assert check_image(str(tmp_path / "ok.jpg")) == ""
+    # Qt の JPEG デコーダは途中で切れたファイルも読めたことにするので Pillow で見つける
+    assert check_image(str(tmp_path / "cut.jpg")).startswith("Pillow: ")
+    assert check_image(str(tmp_path / "broken.png")).startswith("Qt: ")
+    assert check_image(str(tmp_path / "missing.png")) == "ファイルが見つかりません"
+
+
+def test_image_over_qt_allocation_limit_is_not_reported_as_broken(tmp_path) -> None:
+    # 1024×1024 は 32bit で 4 MB。上限を 1 MB に下げて、既定の 256 MB を超える大きな画像を再現する
+    _write_image(tmp_path / "large.png", size=1024)
+    default_limit = QImageReader.allocationLimit()
+    QImageReader.setAllocationLimit(1)
+    try:
+        # Qt は上限を超える画像のデコードを断る
+        assert QImageReader(str(tmp_path / "large.png")).read().isNull()
+        assert check_image(str(tmp_path / "large.png")) == ""
+
+        init_check_worker()
+
+        assert QImageReader.allocationLimit() == INTEGRITY_ALLOCATION_LIMIT_MB
+        assert check_image(str(tmp_path / "large.png")) == ""
+    finally:
+        QImageReader.setAllocationLimit(default_limit)
+
+
+def test_iter_checks_streams_chunks_and_resumes_from_journal(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(integrity_check, "INTEGRITY_CHUNK_SIZE", 2)
+    _write_image(tmp_path / "a.png")
+    (tmp_path / "b.png").write_bytes(b"not an image")
+    _write_image(tmp_path / "c.png")
+    names = ["a.png", "b.png", "c.png"]
+    journal = IntegrityJournal(str(tmp_path / "journal" / "integrity.sqlite3"))
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        results = list(iter_checks(str(tmp_path), names, pool, journal))
+
+    assert [checked for checked, _ in results] == [0, 2, 3]
+    assert [name_id for _, failures in results for name_id, _ in failures] == [1]
+
+    # 2 回目は記録済みの結果をそのまま返し、デコードし直さない
+    monkeypatch.setattr(integrity_check, "check_image", lambda path: "should not run")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        results = list(iter_checks(str(tmp_path), names, pool, journal))
+
+    assert results == [(3, [(1, journal.load_directory(str(tmp_path))["b.png"][2])])]
+    journal.close()
+
+
+def test_iter_checks_stops_between_chunks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(integrity_check, "INTEGRITY_CHUNK_SIZE", 1)
+    for name in ("a.png", "b.png"):
+        _write_image(tmp_path / name)
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        results = list(
+            iter_checks(str(tmp_path), ["a.png", "b.png"], pool, should_stop=lambda: True)
+        )
+
+    assert results == [(0, [])]
+
+
+def test_integrity_checker_scans_with_process_pool(tmp_path) -> None:
+    _write_image(tmp_path / "a.png")
+    (tmp_path / "b.png").write_bytes(b"not an image")
+    progress: list[tuple] = []
+    finished: list[tuple] = []
+    checker = IntegrityChecker(max_workers=1)
+    checker.integrity_progress.connect(lambda *args: progress.append(args))
+    checker.integrity_finished.connect(lambda *args: finished.append(args))
+
+    checker.scan(1, str(tmp_path), ["a.png", "b.png"])
+
+    assert [name_id for *_, failures in progress for name_id, _ in failures] == [1]
+    assert progress[-1][:3] == (1, 2, 2)
+    assert finished == [(1, 2)]
+
+    checker.cancel_older_than(5)
+    checker.scan(3, str(tmp_path), ["a.png"])
+    assert finished == [(1, 2)]
+
+
+def test_check_command_lists_and_quarantines_broken_files(tmp_path, monkeypatch, capsys) -> None:
+    monkeypatch.setattr(check, "cache_file_path", lambda name: str(tmp_path / "cache" / name))
+    folder = tmp_path / "photos"
+    (folder / "sub").mkdir(parents=True)
+    _write_image(folder / "a.png")
+    (folder / "sub" / "b.png").write_bytes(b"not an image")
+
+    assert check.main([str(folder), "--recursive", "--quarantine", "--workers", "1"]) == 1
+
+    broken_path = folder / "sub" / "b.png"
+    assert capsys.readouterr().out.startswith(f"{broken_path}\tQt: ")
+    assert not broken_path.exists()
+    assert (folder / "sub" / QUARANTINE_FOLDER / "b.png").exists()
+
+    # 隔離フォルダは次回の検査対象にならない
+    assert check.main([str(folder), "--recursive", "--workers", "1"]) == 0
@@ -0,0 +1,30 @@
+import pytest
+
+from hiyoko_viewer.core import ipc_protocol
+from hiyoko_viewer.core.ipc_protocol import MessageBuffer, encode_message
+
+
+def test_message_round_trips_many_paths() -> None:
+    paths = ["C:\\画像\\a.png", "/tmp/改行\nを含む.png", "/tmp/b.jxl"]
+
+    assert MessageBuffer().feed(encode_message(paths)) == [paths]
+
+
+def test_buffer_reassembles_messages_split_across_reads() -> None:
+    data = encode_message(["/a.png"]) + encode_message([]) + encode_message(["/b.png", "/c.png"])
+    buffer = MessageBuffer()
+
+    messages = []
+    for index in range(len(data)):
+        messages += buffer.feed(data[index : index + 1])
+
+    assert messages == [["/a.png"], [], ["/b.png", "/c.png"]]
+
+
+def test_buffer_rejects_oversized_message(monkeypatch) -> None:
+    monkeypatch.setattr(ipc_protocol, "MAX_MESSAGE_BYTES", 8)
+
+    with pytest.raises(ValueError):
+        MessageBuffer().feed(b"\x00\x00\x00\x09")
+    with pytest.raises(ValueError):
+        encode_message(["/too/long.png"])
@@ -0,0 +1,186 @@
+import io
+import struct
+
+import numpy as np
+import pytest
+
+from hiyoko_viewer.core.jxl_header import (
+    JxlMetadata,
+    count_frames,
+    has_animation,
+    read_codestream_head,
+    read_metadata,
+)
+
+
+def _require_jpegxl():
+    imagecodecs = pytest.importorskip("imagecodecs")
+    if not hasattr(imagecodecs, "jpegxl_encode"):
+        pytest.skip("imagecodecs に JPEG XL コーデックが無い")
+    return imagecodecs
+
+
+def _box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+class _BitWriter:
+    """LSB から順にビットを書く（テスト用のコードストリームを組み立てる）"""
+
+    def __init__(self) -> None:
+        self._bits: list[int] = []
+
+    def bits(self, count: int, value: int) -> "_BitWriter":
+        self._bits.extend((value >> shift) & 1 for shift in range(count))
+        return self
+
+    def enum(self, value: int) -> "_BitWriter":
+        if value < 2:
+            return self.bits(2, value)
+        if value < 18:
+            return self.bits(2, 2).bits(4, value - 2)
+        return self.bits(2, 3).bits(6, value - 18)
+
+    def to_bytes(self) -> bytes:
+        padded = self._bits + [0] * (-len(self._bits) % 8)
+        return bytes(
+            sum(bit << shift for shift, bit in enumerate(padded[i : i + 8]))
+            for i in range(0, len(padded), 8)
+        )
+
+
+def _hdr_codestream(transfer: int) -> bytes:
+    """8x8・10bit・BT.2020 の原色で、伝達特性が ``transfer`` のコードストリームの先頭"""
+    writer = _BitWriter()
+    writer.bits(1, 1).bits(5, 0).bits(3, 1)  # SizeHeader: small, 高さ 8, 縦横比 1:1
+    writer.bits(1, 0).bits(1, 0)  # all_default / extra_fields
+    writer.bits(1, 0).bits(2, 1)  # bit_depth: 整数 10bit
+    writer.bits(1, 1).bits(2, 0).bits(1, 1)  # modular_16bit_buffers, 追加チャンネル 0, xyb
+    writer.bits(1, 0).bits(1, 0)  # ColourEncoding: all_default / want_icc
+    writer.enum(0)  # colour_space = RGB
+    writer.enum(1)  # white_point = D65
+    writer.enum(9)  # primaries = BT.2100
+    writer.bits(1, 0).enum(transfer)  # have_gamma, transfer_function
+    writer.enum(0)  # rendering_intent
+    return b"\xff\x0a" + writer.to_bytes()
+
+
+def _container(codestream: bytes, *, partial: bool = False) -> bytes:
+    signature = b"\x00\x00\x00\x0cJXL \r\n\x87\n"
+    ftyp = _box(b"ftyp", b"jxl \x00\x00\x00\x00jxl ")
+    if partial:
+        return signature + ftyp + _box(b"jxlp", b"\x80\x00\x00\x00" + codestream)
+    return signature + ftyp + _box(b"jxlc", codestream)
+
+
+def test_has_animation_distinguishes_still_and_animated_codestreams() -> None:
+    imagecodecs = _require_jpegxl()
+    still = imagecodecs.jpegxl_encode(np.zeros((8, 8, 3), np.uint8), lossless=True)
+    animated = imagecodecs.jpegxl_encode(np.zeros((3, 8, 8, 3), np.uint8), lossless=True)
+
+    assert has_animation(still) is False
+    assert has_animation(animated) is True
+
+
+def test_has_animation_reads_codestream_inside_container() -> None:
+    imagecodecs = _require_jpegxl()
+    animated = imagecodecs.jpegxl_encode(np.zeros((2, 8, 8, 3), np.uint8), lossless=True)
+
+    assert has_animation(_container(animated)) is True
+    assert has_animation(_container(animated, partial=True)) is True
+
+
+def test_read_codestream_head_skips_boxes_before_the_codestream() -> None:
+    codestream = b"\xff\x0a" + bytes(range(40))
+    exif = _box(b"Exif", b"\x00" * 100_000)
+    container = _container(codestream)
+    signature_and_ftyp = container[: len(container) - len(_box(b"jxlc", codestream))]
+
+    head = read_codestream_head(
+        io.BytesIO(signature_and_ftyp + exif + _box(b"jxlc", codestream)), 16
+    )
+
+    assert head == codestream[:16]
+    assert read_codestream_head(io.BytesIO(codestream), 8) == codestream[:8]
+    assert read_codestream_head(io.BytesIO(b"GIF89a"), 8) == b""
+
+
+def test_has_animation_rejects_other_or_truncated_data() -> None:
+    assert has_animation(b"") is False
+    assert has_animation(b"\x89PNG\r\n\x1a\n") is False
+    assert has_animation(b"\xff\x0a") is False
+    assert has_animation(_container(b"")) is False
+
+
+def test_read_metadata_reads_bit_depth_and_extra_channels_of_real_files() -> None:
+    imagecodecs = _require_jpegxl()
+    still = imagecodecs.jpegxl_encode(np.zeros((8, 8, 3), np.uint8), lossless=True)
+    deep = imagecodecs.jpegxl_encode(
+        np.zeros((2, 8, 8, 4), np.uint16), lossless=True, bitspersample=12
+    )
+
+    assert read_metadata(still) == JxlMetadata(False, 8, False, 13, 1)
+    metadata = read_metadata(_container(deep))
+    # アルファの追加チャンネルの後ろの ColourEncoding まで読めている
+    assert metadata.have_animation is True
+    assert metadata.bits_per_sample == 12
+    assert metadata.primaries == 1
+
+
+@pytest.mark.parametrize("transfer", [16, 18], ids=["pq", "hlg"])
+def test_read_metadata_reads_hdr_transfer_function(transfer) -> None:
+    metadata = read_metadata(_hdr_codestream(transfer))
+
+    assert metadata == JxlMetadata(False, 10, False, transfer, 9)
+
+
+def test_read_metadata_rejects_other_or_truncated_data() -> None:
+    assert read_metadata(b"\x89PNG\r\n\x1a\n") is None
+    assert read_metadata(_hdr_codestream(16)[:4]) is None
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"lossless": True},
+        {"distance": 1.0},
+        {"lossless": True, "effort": 1},
+        {"distance": 2.0, "usecontainer": True},
+    ],
+    ids=["lossless", "lossy", "fast", "container"],
+)
+def test_count_frames_matches_the_decoded_frames(options) -> None:
+    imagecodecs = _require_jpegxl()
+    frames = np.random.default_rng(0).integers(0, 255, (5, 64, 96, 4), dtype=np.uint8)
+    data = imagecodecs.jpegxl_encode(frames, **options)
+
+    assert count_frames(data) == imagecodecs.jpegxl_decode(data).shape[0] == 5
+
+
+def test_count_frames_counts_stills_and_split_codestreams() -> None:
+    imagecodecs = _require_jpegxl()
+    still = imagecodecs.jpegxl_encode(np.zeros((8, 8, 3), np.uint8), lossless=True)
+    gray = imagecodecs.jpegxl_encode(
+        np.zeros((3, 40, 40), np.uint8), photometric="gray", lossless=True
+    )
+
+    assert count_frames(still) == 1
+    assert count_frames(gray) == 3
+    assert count_frames(_container(gray, partial=True)) == 3
+
+
+def test_count_frames_reads_permuted_toc_of_tall_frames() -> None:
+    imagecodecs = _require_jpegxl()
+    # LF 群が複数になる高さでは、エンコーダが TOC を並べ替えて（エントロピー符号化して）書く
+    frames = np.random.default_rng(0).integers(0, 255, (3, 4200, 16, 3), dtype=np.uint8)
+
+    assert count_frames(imagecodecs.jpegxl_encode(frames, lossless=True, effort=1)) == 3
+    assert count_frames(imagecodecs.jpegxl_encode(frames, distance=1.0, effort=1)) == 3
+
+
+def test_count_frames_rejects_other_or_truncated_data() -> None:
+    imagecodecs = _require_jpegxl()
+    animated = imagecodecs.jpegxl_encode(np.zeros((3, 8, 8, 3), np.uint8), lossless=True)
+
+    assert count_frames(b"\x89PNG\r\n\x1a\n") is None
+    assert count_frames(animated[: len(animated) - 4]) is None
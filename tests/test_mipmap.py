@@ -0,0 +1,29 @@
+from hiyoko_viewer.core.mipmap import BYTES_PER_PIXEL, level_for, pyramid_sizes
+
+
+def test_pyramid_sizes_halves_until_min_size() -> None:
+    assert pyramid_sizes(4000, 3000, 256, 1 << 30) == [
+        (2000, 1500),
+        (1000, 750),
+        (500, 375),
+    ]
+
+
+def test_pyramid_sizes_is_empty_for_small_images() -> None:
+    assert pyramid_sizes(400, 300, 256, 1 << 30) == []
+
+
+def test_pyramid_sizes_drops_largest_levels_over_budget() -> None:
+    budget = (1000 * 750 + 500 * 375) * BYTES_PER_PIXEL
+
+    assert pyramid_sizes(4000, 3000, 400, budget) == [(1000, 750), (500, 375)]
+
+
+def test_level_for_picks_smallest_level_not_below_request() -> None:
+    sizes = [(2000, 1000), (1000, 500), (500, 250)]
+
+    assert level_for(sizes, 600, 300) == 1
+    assert level_for(sizes, 500, 250) == 2
+    assert level_for(sizes, 100, 50) == 2
+    assert level_for(sizes, 3000, 1500) == -1
+    assert level_for([], 100, 50) == -1
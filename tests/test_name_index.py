@@ -0,0 +1,40 @@
+import os
+
+from hiyoko_viewer.core.name_index import NameIndex
+
+
+def _matches(index: NameIndex, query: str) -> list[int]:
+    found: list[int] = []
+    rank = -1
+    while (hit := index.search(query, rank)) is not None:
+        rank, name_id = hit
+        found.append(name_id)
+    return found
+
+
+def test_search_returns_prefix_matches_before_substring_matches() -> None:
+    index = NameIndex(["xcat.png", "Cat2.png", "dog.png", "cat1.png"])
+
+    assert _matches(index, "CAT") == [3, 1, 0]
+    assert len(index) == 4
+
+
+def test_search_matches_basename_only() -> None:
+    index = NameIndex([os.path.join("cats", "a.png"), os.path.join("b", "cat.png")])
+
+    assert _matches(index, "cat") == [1]
+
+
+def test_search_returns_none_for_empty_or_missing_query() -> None:
+    index = NameIndex(["a.png"])
+
+    assert index.search("") is None
+    assert index.search("zzz") is None
+    assert NameIndex([]).search("a") is None
+
+
+def test_substring_match_reports_each_name_once() -> None:
+    index = NameIndex(["aaa.png", "baaa.png"])
+
+    # 名前の中で何度一致しても 1 回だけ返し、前方一致した名前を部分一致で再び返さない
+    assert _matches(index, "aa") == [0, 1]
@@ -0,0 +1,65 @@
+import os
+
+from PyQt6.QtGui import QImage
+
+from hiyoko_viewer.config.constants import OK_FOLDER
+from hiyoko_viewer.core import sorting
+from hiyoko_viewer.services import sibling_prefetcher
+from hiyoko_viewer.services.sibling_prefetcher import SiblingPrefetcher, list_sibling_folders
+
+
+def _write_png(path, width: int = 4, height: int = 3) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(0xFF3366)
+    assert image.save(str(path), "PNG")
+
+
+def test_list_sibling_folders_sorts_and_skips_sorting_folders(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(sibling_prefetcher, "windows_logical_key", sorting.natural_key)
+    for name in ("b10", "b2", "a", OK_FOLDER):
+        (tmp_path / name).mkdir()
+    (tmp_path / "file.png").write_bytes(b"fake")
+
+    folders, index = list_sibling_folders(str(tmp_path / "b2"))
+
+    assert [os.path.basename(path) for path in folders] == ["a", "b2", "b10"]
+    assert index == 1
+
+
+def test_prefetch_emits_next_and_previous_listing_with_decoded_first_image(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setattr(sibling_prefetcher, "windows_logical_key", sorting.natural_key)
+    (tmp_path / "a" / "only.txt").parent.mkdir()
+    (tmp_path / "a" / "only.txt").write_text("no images", encoding="utf-8")
+    _write_png(tmp_path / "b" / "current.png")
+    # 画像の無いフォルダは飛ばして、その先のフォルダを先読みする
+    (tmp_path / "c").mkdir()
+    _write_png(tmp_path / "d" / "img10.png", width=8)
+    _write_png(tmp_path / "d" / "img2.png", width=5)
+    emitted: list[tuple] = []
+    prefetcher = SiblingPrefetcher()
+    prefetcher.sibling_prefetched.connect(lambda *args: emitted.append(args))
+
+    prefetcher.prefetch(3, str(tmp_path / "b"))
+
+    assert [(generation, direction) for generation, direction, _ in emitted] == [(3, 1), (3, -1)]
+    listing = emitted[0][2]
+    assert listing.directory == str(tmp_path / "d")
+    assert listing.first_path == str(tmp_path / "d" / "img2.png")
+    assert listing.first_image.width() == 5
+    assert emitted[1][2] is None
+
+
+def test_prefetch_stops_when_a_newer_generation_is_requested(tmp_path) -> None:
+    _write_png(tmp_path / "a" / "x.png")
+    (tmp_path / "b").mkdir()
+    emitted: list[tuple] = []
+    prefetcher = SiblingPrefetcher()
+    prefetcher.sibling_prefetched.connect(lambda *args: emitted.append(args))
+    prefetcher.sibling_prefetched.connect(lambda *args: prefetcher.cancel_older_than(5))
+
+    prefetcher.prefetch(1, str(tmp_path / "a"))
+
+    assert len(emitted) == 1
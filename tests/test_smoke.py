@@ -14,14 +14,55 @@ def test_public_modules_import_cleanly() -> None:
     for name in (
         "hiyoko_viewer",
         "hiyoko_viewer.app",
+        "hiyoko_viewer.gui",
+        "hiyoko_viewer.check",
         "hiyoko_viewer.ui.main_window",
+        "hiyoko_viewer.ui.canvas",
+        "hiyoko_viewer.ui.histogram_overlay",
         "hiyoko_viewer.ui.mixins.rendering",
+        "hiyoko_viewer.ui.mixins.animation",
+        "hiyoko_viewer.ui.mixins.color_profile",
+        "hiyoko_viewer.ui.mixins.compare",
+        "hiyoko_viewer.ui.mixins.histogram",
         "hiyoko_viewer.ui.mixins.navigation",
+        "hiyoko_viewer.ui.mixins.search",
+        "hiyoko_viewer.ui.mixins.filtering",
+        "hiyoko_viewer.ui.mixins.file_operations",
+        "hiyoko_viewer.ui.mixins.duplicates",
+        "hiyoko_viewer.ui.mixins.integrity",
         "hiyoko_viewer.ui.mixins.input",
         "hiyoko_viewer.ui.dialogs.metadata_dialog",
+        "hiyoko_viewer.ui.dialogs.filter_dialog",
+        "hiyoko_viewer.ui.dialogs.integrity_dialog",
+        "hiyoko_viewer.services.animation",
+        "hiyoko_viewer.services.cache_paths",
+        "hiyoko_viewer.services.color_management",
+        "hiyoko_viewer.services.duplicate_finder",
+        "hiyoko_viewer.services.file_ops",
+        "hiyoko_viewer.services.file_probe",
         "hiyoko_viewer.services.image_loader",
+        "hiyoko_viewer.services.instance_server",
+        "hiyoko_viewer.services.integrity_check",
+        "hiyoko_viewer.services.sibling_prefetcher",
+        "hiyoko_viewer.services.svg_tiles",
+        "hiyoko_viewer.services.tree_scanner",
+        "hiyoko_viewer.core.animation_header",
+        "hiyoko_viewer.core.file_list",
+        "hiyoko_viewer.core.file_stats",
+        "hiyoko_viewer.core.frame_cache",
+        "hiyoko_viewer.core.frame_pacing",
+        "hiyoko_viewer.core.hash_cache",
+        "hiyoko_viewer.core.image_hash",
+        "hiyoko_viewer.core.integrity_journal",
+        "hiyoko_viewer.core.ipc_protocol",
+        "hiyoko_viewer.core.jxl_entropy",
+        "hiyoko_viewer.core.jxl_header",
         "hiyoko_viewer.core.metadata",
+        "hiyoko_viewer.core.mipmap",
+        "hiyoko_viewer.core.name_index",
         "hiyoko_viewer.core.sorting",
+        "hiyoko_viewer.core.tiles",
+        "hiyoko_viewer.core.tone_mapping",
         "hiyoko_viewer.core.resources",
     ):
         assert importlib.import_module(name) is not None
@@ -43,10 +84,12 @@ def test_image_viewer_composes_all_mixins() -> None:
     from hiyoko_viewer.ui.mixins.input import InputEventMixin
     from hiyoko_viewer.ui.mixins.navigation import NavigationMixin
     from hiyoko_viewer.ui.mixins.rendering import RenderingMixin
+    from hiyoko_viewer.ui.mixins.search import NameSearchMixin
 
     mro = ImageViewer.__mro__
     assert RenderingMixin in mro
     assert NavigationMixin in mro
+    assert NameSearchMixin in mro
     assert InputEventMixin in mro
     # 入力イベント系の super() チェーンが QMainWindow に到達するための前提
     assert mro.index(InputEventMixin) < mro.index(QMainWindow)
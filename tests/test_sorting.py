@@ -46,7 +46,36 @@ def test_windows_logical_key_fallback_is_case_insensitive() -> None:
     assert sorted(paths, key=_create_windows_logical_key(None)) == ["a1.png", "A2.png", "b10.png"]
 
 
+def test_init_collation_sets_collate_locale_only_for_fallback(monkeypatch) -> None:
+    calls: list[tuple[int, str]] = []
+    monkeypatch.setattr(sorting.locale, "setlocale", lambda *args: calls.append(args))
+
+    monkeypatch.setattr(sorting, "_STRCMP_LOGICALW", None)
+    sorting.init_collation()
+    # 並べ替え自体はロケールを設定し直さない（worker スレッドから呼ばれる）
+    sorted(["b.png", "a.png"], key=_create_windows_logical_key(None))
+    assert calls == [(sorting.locale.LC_COLLATE, "")]
+
+    monkeypatch.setattr(sorting, "_STRCMP_LOGICALW", object())
+    sorting.init_collation()
+    assert len(calls) == 1
+
+
 def test_load_windows_logical_comparer_returns_none_on_non_windows(monkeypatch) -> None:
     monkeypatch.setattr(sorting.sys, "platform", "linux")
 
     assert _load_windows_logical_comparer() is None
+
+
+def test_tree_logical_key_groups_by_folder_and_lists_files_first(monkeypatch) -> None:
+    monkeypatch.setattr(sorting, "windows_logical_key", natural_key)
+    paths = ["sub10/a.png", "b.png", "sub2/z/c.png", "sub2/d.png", "a10.png", "a2.png"]
+
+    assert sorted(paths, key=sorting.tree_logical_key) == [
+        "a2.png",
+        "a10.png",
+        "b.png",
+        "sub2/d.png",
+        "sub2/z/c.png",
+        "sub10/a.png",
+    ]
@@ -0,0 +1,55 @@
+from PyQt6.QtCore import QByteArray
+from PyQt6.QtGui import QColor
+from PyQt6.QtSvg import QSvgRenderer
+
+from hiyoko_viewer.core.tiles import TileKey
+from hiyoko_viewer.services.svg_tiles import SvgTileRenderer, render_tile
+
+SVG = (
+    b'<svg xmlns="http://www.w3.org/2000/svg" width="100" height="50">'
+    b'<rect width="50" height="50" fill="#ff0000"/>'
+    b'<rect x="50" width="50" height="50" fill="#0000ff"/></svg>'
+)
+
+
+def test_render_tile_draws_only_its_part_at_zoomed_size() -> None:
+    renderer = QSvgRenderer(QByteArray(SVG))
+
+    # 800x400 に拡大したときの右下のタイル（x=512..800）は青だけ
+    image = render_tile(renderer, TileKey(800, 400, 1, 0), 512)
+
+    assert (image.width(), image.height()) == (288, 400)
+    assert image.pixelColor(10, 10) == QColor(0, 0, 255)
+
+
+def test_render_tiles_reuses_document_and_stops_when_superseded(tmp_path) -> None:
+    svg_path = tmp_path / "drawing.svg"
+    svg_path.write_bytes(SVG)
+    tiler = SvgTileRenderer()
+    received: list = []
+    keys = [TileKey(800, 400, 0, 0), TileKey(800, 400, 1, 0)]
+
+    def on_tile(path, key, image) -> None:
+        received.append(key)
+        # 1 枚目を受け取った時点で新しい依頼が来た
+        tiler.cancel_older_than(2)
+
+    tiler.tile_ready.connect(on_tile)
+    tiler.render_tiles(1, str(svg_path), keys)
+    renderer = tiler._renderer
+    tiler.render_tiles(2, str(svg_path), keys[1:])
+
+    assert received == [keys[0], keys[1]]
+    assert tiler._renderer is renderer
+
+
+def test_render_tiles_ignores_unparsable_document(tmp_path) -> None:
+    svg_path = tmp_path / "broken.svg"
+    svg_path.write_bytes(b"<svg")
+    tiler = SvgTileRenderer()
+    received: list = []
+    tiler.tile_ready.connect(lambda *args: received.append(args))
+
+    tiler.render_tiles(1, str(svg_path), [TileKey(100, 50, 0, 0)])
+
+    assert received == []
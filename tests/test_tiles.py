@@ -0,0 +1,18 @@
+from hiyoko_viewer.core.tiles import TileKey, tile_bounds, visible_tiles
+
+
+def test_tile_bounds_clips_last_column_and_row_to_display() -> None:
+    assert tile_bounds(TileKey(250, 120, 0, 0), 100) == (0, 0, 100, 100)
+    assert tile_bounds(TileKey(250, 120, 2, 1), 100) == (200, 100, 50, 20)
+
+
+def test_visible_tiles_covers_visible_range_nearest_center_first() -> None:
+    keys = visible_tiles(1000, 1000, 150, 0, 450, 100, 100)
+
+    assert {(key.column, key.row) for key in keys} == {(1, 0), (2, 0), (3, 0), (4, 0)}
+    assert (keys[0].column, keys[0].row) in {(2, 0), (3, 0)}
+    assert all((key.width, key.height) == (1000, 1000) for key in keys)
+
+
+def test_visible_tiles_is_empty_outside_display() -> None:
+    assert visible_tiles(200, 100, 300, 0, 500, 100, 100) == []
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from hiyoko_viewer.core.tone_mapping import (
+    TRANSFER_HLG,
+    TRANSFER_PQ,
+    TRANSFER_SRGB,
+    apply_lut,
+    hdr_lut,
+    linear_lut,
+)
+
+
+def _pq_code(nits: float) -> float:
+    """輝度 → PQ の符号値（0..1）"""
+    m1, m2 = 2610 / 16384, 2523 / 4096 * 128
+    c1, c2, c3 = 3424 / 4096, 2413 / 4096 * 32, 2392 / 4096 * 32
+    y = (nits / 10000) ** m1
+    return ((c1 + c2 * y) / (1 + c3 * y)) ** m2
+
+
+@pytest.mark.parametrize("transfer", [TRANSFER_PQ, TRANSFER_HLG], ids=["pq", "hlg"])
+def test_hdr_lut_is_monotonic_from_black_to_white(transfer) -> None:
+    lut = hdr_lut(transfer, 10)
+
+    assert lut.shape == (1024,) and lut.dtype == np.uint8
+    assert lut[0] == 0 and lut[-1] == 255
+    assert (np.diff(lut.astype(np.int16)) >= 0).all()
+
+
+def test_hdr_lut_keeps_reference_white_below_clipping_and_peak_at_white() -> None:
+    lut = hdr_lut(TRANSFER_PQ, 12)
+
+    def at(nits: float) -> int:
+        return int(lut[round(_pq_code(nits) * 4095)])
+
+    # 線形に縮めると 203 nit（PQ で約 0.58）は 148 程度の灰色になり、白が白っぽく浮かない
+    assert 200 < at(203) < 250
+    # 想定ピーク（1000 nit）でちょうど白、それより明るい符号値も白に張り付く
+    assert at(1000) == 255
+    assert at(4000) == 255
+    # 基準白より暗い中間調は圧縮されず、輝度の順序も保つ
+    assert at(20) < at(100) < at(203)
+
+
+def test_hdr_lut_rejects_sdr_transfer() -> None:
+    with pytest.raises(ValueError):
+        hdr_lut(TRANSFER_SRGB, 10)
+
+
+def test_linear_lut_scales_full_range_to_8bit() -> None:
+    lut = linear_lut(10)
+
+    assert lut[0] == 0 and lut[512] == 128 and lut[1023] == 255
+
+
+def test_apply_lut_in_tiles_matches_whole_image_lookup() -> None:
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 1024, size=(7, 9, 3), dtype=np.uint16)
+    lut = hdr_lut(TRANSFER_PQ, 10)
+
+    # 一度に 5 画素ずつ（行をまたいで）変換しても結果は同じ
+    assert (apply_lut(pixels, lut, tile_pixels=5) == lut[pixels]).all()
+
+
+def test_apply_lut_scales_alpha_linearly_and_clips_out_of_range_codes() -> None:
+    pixels = np.array([[[1023, 0, 2000, 512]]], dtype=np.uint16)
+    lut = hdr_lut(TRANSFER_PQ, 10)
+
+    out = apply_lut(pixels, lut, alpha=True)
+
+    # 色はトーンマッピング（範囲外は端の値）、アルファは線形
+    assert out.tolist() == [[[255, 0, 255, 128]]]
+
+
+def test_apply_lut_maps_float_pixels_onto_the_lut_range() -> None:
+    pixels = np.array([[0.0, 0.5, 1.0, 1.5]], dtype=np.float32)
+    lut = linear_lut(16)
+
+    assert apply_lut(pixels, lut).tolist() == [[0, 128, 255, 255]]
@@ -0,0 +1,132 @@
+import os
+
+from hiyoko_viewer.config.constants import NG_FOLDER, OK_FOLDER
+from hiyoko_viewer.services import tree_scanner
+from hiyoko_viewer.services.tree_scanner import TreeScanner, scan_directory
+
+
+def _touch(path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"fake")
+
+
+def _collect(scanner: TreeScanner) -> tuple[list[tuple], list[tuple]]:
+    chunks: list[tuple] = []
+    finished: list[tuple] = []
+    scanner.chunk_loaded.connect(lambda *args: chunks.append(args))
+    scanner.scan_finished.connect(lambda *args: finished.append(args))
+    return chunks, finished
+
+
+def test_scan_directory_lists_images_and_skips_sorting_folders(tmp_path) -> None:
+    _touch(tmp_path / "a.png")
+    _touch(tmp_path / "memo.txt")
+    _touch(tmp_path / "sub" / "b.jpg")
+    _touch(tmp_path / OK_FOLDER / "ok.png")
+    _touch(tmp_path / NG_FOLDER.upper() / "ng.png")
+
+    names, folders = scan_directory(str(tmp_path), "")
+    sub_names, sub_folders = scan_directory(str(tmp_path), "sub")
+
+    assert names == ["a.png"]
+    assert folders == ["sub"]
+    assert sub_names == [os.path.join("sub", "b.jpg")]
+    assert sub_folders == []
+
+
+def test_scan_streams_root_first_and_finishes_with_tree_order(tmp_path) -> None:
+    _touch(tmp_path / "b.png")
+    _touch(tmp_path / "a.png")
+    _touch(tmp_path / "sub2" / "c.png")
+    _touch(tmp_path / "sub1" / "deep" / "d.png")
+    _touch(tmp_path / "sub1" / "e.png")
+    _touch(tmp_path / OK_FOLDER / "skip.png")
+    scanner = TreeScanner()
+    chunks, finished = _collect(scanner)
+
+    target = os.path.normcase(os.path.normpath(str(tmp_path / "b.png")))
+    scanner.scan(5, str(tmp_path), target)
+
+    # 最初の塊は開いたファイルのフォルダ直下で、開いたファイルの名前 ID を伴う
+    generation, root, first_names, initial_index = chunks[0]
+    assert (generation, root) == (5, str(tmp_path))
+    assert sorted(first_names) == ["a.png", "b.png"]
+    assert first_names[initial_index] == "b.png"
+    assert all(chunk[3] == -1 for chunk in chunks[1:])
+
+    names = [name for chunk in chunks for name in chunk[2]]
+    assert len(finished) == 1
+    assert finished[0][0] == 5
+    assert [names[i] for i in finished[0][1]] == [
+        "a.png",
+        "b.png",
+        os.path.join("sub1", "e.png"),
+        os.path.join("sub1", "deep", "d.png"),
+        os.path.join("sub2", "c.png"),
+    ]
+
+
+def test_scan_stops_when_a_newer_generation_is_requested(tmp_path, monkeypatch) -> None:
+    _touch(tmp_path / "a.png")
+    _touch(tmp_path / "sub" / "b.png")
+    scanner = TreeScanner()
+    chunks, finished = _collect(scanner)
+    # 最初の塊を送った直後に別フォルダが開かれた状況を作る
+    scanner.chunk_loaded.connect(lambda *args: scanner.cancel_older_than(9))
+
+    scanner.scan(1, str(tmp_path), "")
+
+    assert len(chunks) == 1
+    assert finished == []
+
+
+def test_scan_reports_missing_root(tmp_path) -> None:
+    scanner = TreeScanner()
+    chunks, finished = _collect(scanner)
+
+    scanner.scan(2, str(tmp_path / "missing"), "")
+
+    assert chunks == [(2, str(tmp_path / "missing"), [], -1)]
+    assert finished == [(2, [])]
+
+
+def test_scan_flushes_in_chunks(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(tree_scanner, "SCAN_CHUNK_SIZE", 2)
+    for folder in range(3):
+        for i in range(3):
+            _touch(tmp_path / f"d{folder}" / f"{i}.png")
+    scanner = TreeScanner()
+    chunks, finished = _collect(scanner)
+
+    scanner.scan(1, str(tmp_path), "")
+
+    assert len(chunks) >= 3
+    assert sum(len(chunk[2]) for chunk in chunks) == 9
+    assert sorted(finished[0][1]) == list(range(9))
+
+
+def test_scan_orders_by_folder_without_a_key_per_file(tmp_path, monkeypatch) -> None:
+    for folder in ("b", "a", os.path.join("a", "x")):
+        for name in ("c.png", "a.png", "b.png"):
+            _touch(tmp_path / folder / name)
+    folder_keys: list[str] = []
+    real_folder_key = tree_scanner.tree_folder_key
+
+    def folder_key(relative_dir: str):
+        folder_keys.append(relative_dir)
+        return real_folder_key(relative_dir)
+
+    monkeypatch.setattr(tree_scanner, "tree_folder_key", folder_key)
+    scanner = TreeScanner()
+    chunks, finished = _collect(scanner)
+
+    scanner.scan(1, str(tmp_path), "")
+
+    names = [name for chunk in chunks for name in chunk[2]]
+    assert [names[i] for i in finished[0][1]] == [
+        os.path.join(folder, name)
+        for folder in ("a", os.path.join("a", "x"), "b")
+        for name in ("a.png", "b.png", "c.png")
+    ]
+    # 並べ替えのキーは画像のあるフォルダ 1 つにつき 1 回だけ作る
+    assert sorted(folder_keys) == sorted(["a", os.path.join("a", "x"), "b"])
@@ -5,7 +5,9 @@ os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
 import pytest
 from PyQt6.QtWidgets import QApplication
 
+from hiyoko_viewer.core.file_stats import DimensionFilter
 from hiyoko_viewer.ui.dialogs import metadata_dialog as widgets
+from hiyoko_viewer.ui.dialogs.filter_dialog import DimensionFilterDialog
 from hiyoko_viewer.ui.dialogs.metadata_dialog import JsonHighlighter, MetadataDialog
 
 
@@ -48,3 +50,131 @@ def test_json_highlighter_builds_rules_for_json_tokens() -> None:
         r"\b(true|false)\b",
         r"\bnull\b",
     ]
+
+
+def test_dimension_filter_dialog_round_trips_and_resets(qapp) -> None:
+    current = DimensionFilter(min_width=640, min_height=0, aspect="portrait")
+    dialog = DimensionFilterDialog(current)
+
+    assert dialog.dimension_filter() == current
+
+    dialog.reset()
+
+    assert dialog.dimension_filter() == DimensionFilter()
+
+
+def test_image_canvas_paints_zoomed_source_with_nearest_neighbor(qapp) -> None:
+    from PyQt6.QtCore import QSize
+    from PyQt6.QtGui import QColor, QImage, QPixmap
+
+    from hiyoko_viewer.ui.canvas import ImageCanvas
+
+    source = QImage(2, 1, QImage.Format.Format_RGB32)
+    source.setPixelColor(0, 0, QColor(255, 0, 0))
+    source.setPixelColor(1, 0, QColor(0, 0, 255))
+    canvas = ImageCanvas("text")
+    canvas.resize(300, 100)
+
+    canvas.set_view(QPixmap.fromImage(source), QSize(200, 100))
+    image = canvas.grab().toImage()
+
+    assert canvas.sizeHint() == QSize(200, 100)
+    assert canvas.text() == ""
+    # 幅 300 の中央に 200 幅で描き、拡大しても境界はぼやけない
+    assert image.pixelColor(50, 50) == QColor(255, 0, 0)
+    assert image.pixelColor(149, 50) == QColor(255, 0, 0)
+    assert image.pixelColor(150, 50) == QColor(0, 0, 255)
+    assert image.pixelColor(249, 50) == QColor(0, 0, 255)
+
+    canvas.setText("画像の読み込みに失敗しました")
+    assert not canvas.has_view()
+
+
+def test_image_canvas_fills_missing_tiles_from_placeholder(qapp) -> None:
+    from PyQt6.QtCore import QSize
+    from PyQt6.QtGui import QColor, QPixmap
+
+    from hiyoko_viewer.ui.canvas import ImageCanvas
+
+    placeholder = QPixmap(10, 5)
+    placeholder.fill(QColor(255, 0, 0))
+    tile = QPixmap(100, 100)
+    tile.fill(QColor(0, 0, 255))
+    canvas = ImageCanvas()
+    canvas.resize(200, 100)
+
+    canvas.set_tiled_view(placeholder, QSize(200, 100), 100, {})
+    canvas.add_tile(1, 0, tile)
+    image = canvas.grab().toImage()
+
+    assert canvas.display_size() == QSize(200, 100)
+    assert image.pixelColor(50, 50) == QColor(255, 0, 0)
+    assert image.pixelColor(150, 50) == QColor(0, 0, 255)
+
+
+def test_image_canvas_show_frame_keeps_display_size(qapp) -> None:
+    from PyQt6.QtCore import QSize
+    from PyQt6.QtGui import QColor, QPixmap
+
+    from hiyoko_viewer.ui.canvas import ImageCanvas
+
+    first = QPixmap(100, 50)
+    first.fill(QColor(255, 0, 0))
+    # worker が縮小して届けたコマは元画像より小さくても、同じ表示サイズで描く
+    frame = QPixmap(50, 25)
+    frame.fill(QColor(0, 0, 255))
+    canvas = ImageCanvas()
+    canvas.resize(200, 100)
+
+    canvas.show_frame(frame)
+    assert not canvas.has_view()
+    canvas.set_view(first, QSize(200, 100))
+    canvas.show_frame(frame)
+    image = canvas.grab().toImage()
+
+    assert canvas.display_size() == QSize(200, 100)
+    assert image.pixelColor(10, 10) == QColor(0, 0, 255)
+    assert image.pixelColor(190, 90) == QColor(0, 0, 255)
+
+
+def test_image_canvas_maps_device_pixel_display_size_to_logical(qapp) -> None:
+    from PyQt6.QtCore import QRectF, QSize
+    from PyQt6.QtGui import QPixmap
+
+    from hiyoko_viewer.ui.canvas import ImageCanvas
+
+    canvas = ImageCanvas()
+    canvas.devicePixelRatioF = lambda: 1.5
+    canvas.resize(201, 100)
+
+    canvas.set_view(QPixmap(300, 90), QSize(300, 90))
+
+    # 150% の画面で 300x90 の画素は論理 200x60（端数は切り上げて収める）
+    assert canvas.sizeHint() == QSize(200, 60)
+    # 中央寄せの位置も画面の画素の境界に揃える（301.5 - 300 → 0、150 - 90 → 30 画素）
+    assert canvas._target_rect() == QRectF(0, 20, 200, 60)
+
+
+def test_histogram_overlay_lights_clipping_warnings(qapp) -> None:
+    import numpy as np
+    from PyQt6.QtGui import QColor
+
+    from hiyoko_viewer.core.histogram import compute_histogram
+    from hiyoko_viewer.ui import histogram_overlay
+    from hiyoko_viewer.ui.histogram_overlay import HistogramOverlay
+
+    overlay = HistogramOverlay()
+    overlay.set_histogram(None)
+    assert not overlay.grab().isNull()
+
+    rgb = np.full((10, 10, 3), 255, dtype=np.uint8)
+    rgb[0] = 40
+    overlay.set_histogram(compute_histogram(rgb))
+    image = overlay.grab().toImage()
+
+    # 右上の三角（白飛び）だけが警告の色で点灯する
+    highlight = image.pixelColor(overlay.width() - 10, 10)
+    shadow = image.pixelColor(10, 10)
+    assert highlight == histogram_overlay._HIGHLIGHT_WARNING
+    assert shadow != histogram_overlay._SHADOW_WARNING
+    assert shadow != QColor(0, 0, 0, 0)
@@ -50,29 +50,34 @@ def test_load_file_list_emits_supported_images_in_original_case(tmp_path) -> Non
     image_c.write_bytes(b"fake")
     ignored.write_text("not an image", encoding="utf-8")
 
-    emitted: list[tuple[int, list[str], int]] = []
+    emitted: list[tuple[int, str, list[str], int]] = []
     loader = ImageLoader()
-    loader.list_loaded.connect(lambda gen, paths, index: emitted.append((gen, paths, index)))
+    loader.list_loaded.connect(
+        lambda gen, directory, names, index: emitted.append((gen, directory, names, index))
+    )
 
     target_path = os.path.normcase(os.path.normpath(str(image_a)))
     loader.load_file_list(1, str(tmp_path), target_path)
 
     assert len(emitted) == 1
-    gen, paths, index = emitted[0]
+    gen, directory, names, index = emitted[0]
     assert gen == 1
+    assert directory == str(tmp_path)
     # 表示用に元の大文字小文字を保持したまま返す（並び順は呼び出し側が決める）
-    assert set(paths) == {str(image_a), str(image_b), str(image_c)}
-    assert paths[index] == str(image_a)
+    assert set(names) == {"b.PNG", "a.jpg", "c.JXL"}
+    assert names[index] == "b.PNG"
 
 
 def test_load_file_list_emits_empty_result_for_missing_directory(tmp_path) -> None:
-    emitted: list[tuple[int, list[str], int]] = []
+    emitted: list[tuple[int, str, list[str], int]] = []
     loader = ImageLoader()
-    loader.list_loaded.connect(lambda gen, paths, index: emitted.append((gen, paths, index)))
+    loader.list_loaded.connect(
+        lambda gen, directory, names, index: emitted.append((gen, directory, names, index))
+    )
 
     loader.load_file_list(2, str(tmp_path / "missing"), "missing.png")
 
-    assert emitted == [(2, [], -1)]
+    assert emitted == [(2, str(tmp_path / "missing"), [], -1)]
 
 
 def test_load_file_list_uses_first_image_when_target_is_not_in_directory(tmp_path) -> None:
@@ -81,17 +86,19 @@ def test_load_file_list_uses_first_image_when_target_is_not_in_directory(tmp_pat
     image_a.write_bytes(b"fake")
     image_b.write_bytes(b"fake")
 
-    emitted: list[tuple[int, list[str], int]] = []
+    emitted: list[tuple[int, str, list[str], int]] = []
     loader = ImageLoader()
-    loader.list_loaded.connect(lambda gen, paths, index: emitted.append((gen, paths, index)))
+    loader.list_loaded.connect(
+        lambda gen, directory, names, index: emitted.append((gen, directory, names, index))
+    )
 
     target_path = os.path.normcase(os.path.normpath(str(tmp_path / "missing.png")))
     loader.load_file_list(3, str(tmp_path), target_path)
 
     assert len(emitted) == 1
-    gen, paths, index = emitted[0]
+    gen, _directory, names, index = emitted[0]
     assert gen == 3
-    assert set(paths) == {str(image_a), str(image_b)}
+    assert set(names) == {"a.png", "b.jpg"}
     assert index == 0
 
 
@@ -231,3 +238,112 @@ def test_load_image_scales_high_bit_depth_jpeg_xl(monkeypatch, tmp_path, bit_dep
     # 黒は黒、白はフルスケール（/257 固定だと 10/12bit でほぼ黒になっていた）
     assert image.pixelColor(0, 0).getRgb() == (0, 0, 0, 255)
     assert image.pixelColor(1, 0).getRgb() == (255, 255, 255, 255)
+
+
+def test_load_image_emits_mipmaps_after_image(tmp_path) -> None:
+    from PyQt6.QtGui import QImage
+
+    image_path = tmp_path / "large.png"
+    source = QImage(1200, 800, QImage.Format.Format_RGB32)
+    source.fill(0x336699)
+    assert source.save(str(image_path))
+    events: list = []
+    loader = ImageLoader()
+    loader.image_loaded.connect(lambda gen, path, image: events.append("image"))
+    loader.mipmaps_ready.connect(lambda gen, path, levels: events.append((gen, levels)))
+
+    loader.load_image(2, str(image_path))
+
+    assert events[0] == "image"
+    gen, levels = events[1]
+    assert gen == 2
+    assert [(level.width(), level.height()) for level in levels] == [(600, 400), (300, 200)]
+
+
+def test_load_image_emits_histogram_of_sampled_pixels_after_image(tmp_path) -> None:
+    from PyQt6.QtGui import QColor, QImage
+
+    image_path = tmp_path / "bright.png"
+    source = QImage(2000, 1000, QImage.Format.Format_RGB32)
+    source.fill(QColor(255, 255, 255))
+    for x in range(1000):
+        for y in range(0, 1000, 100):
+            source.setPixelColor(x, y, QColor(0, 0, 0))
+    assert source.save(str(image_path))
+    events: list = []
+    loader = ImageLoader()
+    loader.histogram_ready.connect(lambda gen, path, histogram: events.append(histogram))
+    loader.image_loaded.connect(lambda gen, path, image: events.append("image"))
+
+    loader.load_image(3, str(image_path))
+
+    # 表示を待たせないよう、画像を先に渡す
+    image, histogram = events[:2]
+    assert image == "image"
+    # 長辺 HISTOGRAM_SAMPLE_SIZE まで間引いてから数える
+    assert histogram.pixel_count == 512 * 256
+    assert histogram.highlight_clipped > 0.9
+    assert 0 < histogram.shadow_clipped < 0.1
+
+
+def test_image_histogram_is_none_for_null_image() -> None:
+    from PyQt6.QtGui import QImage
+
+    from hiyoko_viewer.services.image_loader import image_histogram
+
+    assert image_histogram(QImage()) is None
+
+
+def test_build_mipmaps_stops_when_cancelled() -> None:
+    from PyQt6.QtGui import QImage
+
+    image = QImage(2048, 2048, QImage.Format.Format_RGB32)
+
+    assert image_loader.build_mipmaps(image, should_stop=lambda: True) == []
+    assert len(image_loader.build_mipmaps(image)) == 3
+
+
+def test_load_image_converts_embedded_profile_to_output_profile(tmp_path) -> None:
+    from PIL import Image
+    from PyQt6.QtGui import QColorSpace
+
+    p3 = QColorSpace(QColorSpace.NamedColorSpace.DisplayP3)
+    image_path = tmp_path / "wide.png"
+    Image.new("RGB", (4, 4), (0, 200, 0)).save(image_path, icc_profile=bytes(p3.iccProfile()))
+    emitted = []
+    loader = ImageLoader()
+    loader.image_loaded.connect(lambda gen, path, image: emitted.append(image))
+
+    loader.load_image(1, str(image_path))
+    loader.set_output_profile(bytes(p3.iccProfile()))
+    loader.load_image(2, str(image_path))
+
+    srgb, unchanged = emitted
+    assert srgb.pixelColor(0, 0).getRgb() == (0, 204, 0, 255)
+    assert unchanged.pixelColor(0, 0).getRgb() == (0, 200, 0, 255)
+
+
+def test_load_image_tone_maps_hdr_jpeg_xl(monkeypatch, tmp_path) -> None:
+    """PQ の JXL は線形に縮めず SDR へトーンマッピングし、BT.2020 の原色を付けて返す。"""
+    imagecodecs = _require_jpegxl()
+    # 10bit PQ の符号値: 0 / 約 203 nit（基準白）/ 1000 nit
+    array = np.array([[[0, 0, 0], [594, 594, 594], [769, 769, 769]]], dtype=np.uint16)
+    image_path = tmp_path / "hdr.jxl"
+    image_path.write_bytes(imagecodecs.jpegxl_encode(array, lossless=True, bitspersample=10))
+
+    monkeypatch.setattr(image_loader, "QImageReader", _NullReader)
+    monkeypatch.setattr(
+        image_loader,
+        "read_metadata",
+        lambda data: image_loader.JxlMetadata(False, 10, False, 16, 9),
+    )
+
+    image = image_loader.decode_image(str(image_path))
+
+    assert image.pixelColor(0, 0).getRgb() == (0, 0, 0, 255)
+    # 線形に縮めると 148 前後の灰色になる
+    assert 200 < image.pixelColor(1, 0).red() < 250
+    assert image.pixelColor(2, 0).getRgb() == (255, 255, 255, 255)
+    color_space = image.colorSpace()
+    assert color_space.primaries() == image_loader.QColorSpace.Primaries.Bt2020
+    assert color_space.transferFunction() == image_loader.QColorSpace.TransferFunction.SRgb